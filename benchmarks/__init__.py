@@ -0,0 +1 @@
+"""Performance benchmarks for the contract assistant. Run modules with ``python -m benchmarks.<name>``."""
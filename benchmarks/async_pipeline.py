@@ -0,0 +1,143 @@
+"""
+Throughput benchmark for the asynchronous EnhancedContractSystem pipeline.
+
+Simulates a router whose Gemini call blocks for ``--llm-latency`` seconds and
+compares processing N questions one at a time with processing them
+concurrently through ``process_question``. Besides wall-clock time it
+records the peak number of LLM calls in flight at once, which shows overlap
+without depending on how loaded the machine is.
+
+    python -m benchmarks.async_pipeline --questions 20 --llm-latency 0.2
+"""
+
+import argparse
+import asyncio
+import threading
+import time
+from datetime import datetime
+from typing import Dict
+from unittest.mock import Mock
+
+from src.models.document import Document
+from src.models.enhanced import EnhancedResponse, ResponseType
+from src.services.enhanced_contract_system import (
+    EnhancedContractSystem, ProcessingContext, SystemConfiguration
+)
+
+
+class BlockingRouter:
+    """Router stand-in whose calls block like a Gemini call and count how many overlap."""
+
+    def __init__(self, llm_latency: float):
+        self.llm_latency = llm_latency
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._lock = threading.Lock()
+
+    def route_question(self, question: str, **kwargs) -> EnhancedResponse:
+        with self._lock:
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            time.sleep(self.llm_latency)  # Blocking HTTP call to the LLM
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+        return EnhancedResponse(
+            content=f"The agreement allocates liability to the Recipient. ({question})",
+            response_type=ResponseType.DOCUMENT_ANALYSIS,
+            confidence=0.9
+        )
+
+
+def build_system(llm_latency: float, max_concurrent_requests: int) -> EnhancedContractSystem:
+    """Enhanced system with in-memory storage and a router that blocks like a Gemini call."""
+    document = Document(
+        id="bench_doc",
+        title="Benchmark Agreement",
+        file_type="txt",
+        file_size=100,
+        upload_timestamp=datetime.now(),
+        processing_status="completed",
+        original_text="The Recipient shall indemnify the Provider against all liability."
+    )
+    # The quality enhancer reads document.content
+    document.content = document.original_text
+    storage = Mock()
+    storage.get_document.return_value = document
+
+    monitor = Mock()
+    monitor._get_system_metrics.return_value = {}
+
+    config = SystemConfiguration(
+        enable_caching=False,
+        enable_advanced_analysis=False,
+        max_concurrent_requests=max_concurrent_requests
+    )
+    system = EnhancedContractSystem(storage=storage, config=config, monitor=monitor)
+
+    system.response_router = BlockingRouter(llm_latency)
+    return system
+
+
+async def run_sequential(system: EnhancedContractSystem, questions: int) -> float:
+    start = time.perf_counter()
+    for i in range(questions):
+        await system.process_question(f"Question {i} about liability?", "bench_doc",
+                                      ProcessingContext(session_id=f"s{i}"))
+    return time.perf_counter() - start
+
+
+async def run_concurrent(system: EnhancedContractSystem, questions: int) -> float:
+    start = time.perf_counter()
+    await asyncio.gather(*[
+        system.process_question(f"Question {i} about liability?", "bench_doc",
+                                ProcessingContext(session_id=f"s{i}"))
+        for i in range(questions)
+    ])
+    return time.perf_counter() - start
+
+
+def run_benchmark(questions: int = 20, llm_latency: float = 0.2,
+                  max_concurrent_requests: int = 10) -> Dict[str, float]:
+    """Return elapsed time and throughput for sequential and concurrent runs."""
+    system = build_system(llm_latency, max_concurrent_requests)
+    try:
+        sequential = asyncio.run(run_sequential(system, questions))
+        sequential_peak = system.response_router.peak_in_flight
+        system.response_router.peak_in_flight = 0
+        concurrent = asyncio.run(run_concurrent(system, questions))
+        concurrent_peak = system.response_router.peak_in_flight
+    finally:
+        system.thread_pool.shutdown(wait=True)
+
+    return {
+        "questions": questions,
+        "sequential_seconds": sequential,
+        "concurrent_seconds": concurrent,
+        "sequential_qps": questions / sequential,
+        "concurrent_qps": questions / concurrent,
+        "speedup": sequential / concurrent,
+        "sequential_peak_in_flight": sequential_peak,
+        "concurrent_peak_in_flight": concurrent_peak
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", type=int, default=20)
+    parser.add_argument("--llm-latency", type=float, default=0.2)
+    parser.add_argument("--max-concurrent", type=int, default=10)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.questions, args.llm_latency, args.max_concurrent)
+    print(f"Questions:        {results['questions']}")
+    print(f"Sequential:       {results['sequential_seconds']:.2f}s ({results['sequential_qps']:.1f} q/s)")
+    print(f"Concurrent:       {results['concurrent_seconds']:.2f}s ({results['concurrent_qps']:.1f} q/s)")
+    print(f"Speedup:          {results['speedup']:.1f}x")
+    print(f"Peak LLM calls:   {results['sequential_peak_in_flight']} sequential, "
+          f"{results['concurrent_peak_in_flight']} concurrent")
+
+
+if __name__ == "__main__":
+    main()
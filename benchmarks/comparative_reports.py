@@ -0,0 +1,153 @@
+"""
+Data gathering for comparative (multi-document) Excel reports.
+
+Compares the per-document path (``get_document`` plus
+``get_document_analysis``, which runs a lookup and three child queries per
+document) with the batched ``get_documents`` and ``get_document_analyses``
+calls the report generator now uses, on a scratch database of analysed
+documents. Also times the whole comparative report with the batched path.
+
+    python -m benchmarks.comparative_reports --documents 10 100 1000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from src.models.document import (
+    Commitment, ComprehensiveAnalysis, DeliverableDate, Document, RiskAssessment
+)
+from src.services.excel_report_generator import ExcelReportGenerator
+from src.storage.database import DatabaseManager
+from src.storage.document_storage import DocumentStorage
+from src.storage.enhanced_storage import EnhancedDocumentStorage
+from src.storage.migrations import DatabaseMigrator
+
+RISKS_PER_DOCUMENT = 5
+COMMITMENTS_PER_DOCUMENT = 5
+DATES_PER_DOCUMENT = 3
+
+
+def build_storage(db_path: str) -> Tuple[DatabaseManager, DocumentStorage, EnhancedDocumentStorage]:
+    """Migrated scratch database with storages bound to it."""
+    db = DatabaseManager(db_path, instrument_queries=True)
+    migrator = DatabaseMigrator()
+    migrator.db_manager = db
+    migrator.run_migrations()
+
+    storage = DocumentStorage()
+    storage.db_manager = db
+    enhanced = EnhancedDocumentStorage()
+    enhanced.db_manager = db
+    return db, storage, enhanced
+
+
+def populate(storage: DocumentStorage, enhanced: EnhancedDocumentStorage, count: int) -> List[str]:
+    """Create ``count`` documents, each with one comprehensive analysis."""
+    now = datetime.now()
+    documents = [
+        Document(id=f"doc{index}", title=f"Contract {index}.pdf", file_type="pdf", file_size=1024,
+                 upload_timestamp=now, processing_status="completed", original_text="Text")
+        for index in range(count)
+    ]
+    storage.create_documents(documents)
+
+    severities = ["High", "Medium", "Low"]
+    for document in documents:
+        enhanced.save_comprehensive_analysis(ComprehensiveAnalysis(
+            document_id=document.id,
+            analysis_id=f"{document.id}_analysis",
+            document_overview=f"Overview of {document.title}",
+            key_findings=["Finding 1", "Finding 2"],
+            critical_information=["Critical 1"],
+            recommended_actions=["Action 1"],
+            executive_recommendation="Proceed",
+            key_legal_terms=["indemnity", "termination"],
+            risks=[
+                RiskAssessment(f"{document.id}_risk{index}", f"Risk {index}", severities[index % 3], "Legal",
+                               ["Party A"], ["Mitigate"], "source", 0.8)
+                for index in range(RISKS_PER_DOCUMENT)
+            ],
+            commitments=[
+                Commitment(f"{document.id}_commitment{index}", f"Commitment {index}", "Party A", "Party B",
+                           now + timedelta(days=index), "Active", "source", "Deliverable")
+                for index in range(COMMITMENTS_PER_DOCUMENT)
+            ],
+            deliverable_dates=[
+                DeliverableDate(now + timedelta(days=index), f"Deliverable {index}", "Party A", "Report",
+                                "Pending", "source")
+                for index in range(DATES_PER_DOCUMENT)
+            ],
+            template_used=None,
+            confidence_score=0.9
+        ))
+    return [document.id for document in documents]
+
+
+def _timed_statements(db: DatabaseManager, func) -> Tuple[float, int]:
+    db.query_stats.reset()
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    return elapsed, sum(row['count'] for row in db.query_stats.get_statistics())
+
+
+def run_benchmark(document_counts: Tuple[int, ...] = (10, 100, 1000)) -> List[Dict[str, float]]:
+    """Time per-document and batched data gathering for each document count."""
+    results = []
+    for count in document_counts:
+        temp_dir = tempfile.mkdtemp()
+        try:
+            db, storage, enhanced = build_storage(os.path.join(temp_dir, "benchmark.db"))
+            document_ids = populate(storage, enhanced, count)
+            generator = ExcelReportGenerator(storage, os.path.join(temp_dir, "reports"), enhanced)
+
+            def per_document():
+                for document_id in document_ids:
+                    storage.get_document(document_id)
+                    enhanced.get_document_analysis(document_id)
+
+            def batched():
+                storage.get_documents(document_ids)
+                enhanced.get_document_analyses(document_ids)
+
+            per_document_seconds, per_document_statements = _timed_statements(db, per_document)
+            batched_seconds, batched_statements = _timed_statements(db, batched)
+            report_seconds, _ = _timed_statements(db, lambda: generator.generate_comparative_report(document_ids))
+
+            results.append({
+                "documents": count,
+                "per_document_ms": per_document_seconds * 1000,
+                "per_document_statements": per_document_statements,
+                "batched_ms": batched_seconds * 1000,
+                "batched_statements": batched_statements,
+                "speedup": per_document_seconds / batched_seconds if batched_seconds else float("inf"),
+                "report_ms": report_seconds * 1000
+            })
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    print(f"{'Documents':>9}  {'Per-document':>22}  {'Batched':>18}  {'Speedup':>7}  {'Full report':>11}")
+    for row in run_benchmark(tuple(args.documents)):
+        print(
+            f"{row['documents']:>9}  "
+            f"{row['per_document_ms']:>9.1f} ms {row['per_document_statements']:>6} stmts  "
+            f"{row['batched_ms']:>7.1f} ms {row['batched_statements']:>4} stmts  "
+            f"{row['speedup']:>6.1f}x  "
+            f"{row['report_ms']:>8.1f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
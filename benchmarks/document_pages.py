@@ -0,0 +1,128 @@
+"""
+Data loading of the Document Management page for large libraries.
+
+Compares what the page used to load on every render (every document with
+its full text through ``list_documents``, then counts, filters and sorting
+in Python) with what it loads now: status counts from one ``GROUP BY``, one
+keyset page of document summaries and the filtered total. The page is timed
+both first and deep into the listing, since keyset queries seek straight to
+the cursor.
+
+    python -m benchmarks.document_pages --documents 1000 10000
+"""
+
+import argparse
+import os
+import shutil
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+
+from src.models.document import Document
+from src.storage.database import DatabaseManager
+from src.storage.document_storage import DocumentStorage
+
+PAGE_SIZE = 25
+TEXT_SIZE = 20_000
+STATUSES = ("completed", "completed", "completed", "processing", "failed")
+
+
+def build_storage(db_path: str) -> DocumentStorage:
+    """Document storage bound to a scratch database."""
+    storage = DocumentStorage()
+    storage.db_manager = DatabaseManager(db_path, instrument_queries=False)
+    return storage
+
+
+def populate(storage: DocumentStorage, count: int, text_size: int = TEXT_SIZE) -> None:
+    """Create ``count`` documents with ``text_size`` characters of text each."""
+    started = datetime(2025, 1, 1)
+    text = "The Supplier shall deliver the Services. " * (text_size // 41 + 1)
+    storage.create_documents([
+        Document(id=f"doc{index:06d}", title=f"Contract {index}.pdf", file_type="pdf", file_size=len(text),
+                 upload_timestamp=started + timedelta(minutes=index),
+                 processing_status=STATUSES[index % len(STATUSES)], original_text=text[:text_size])
+        for index in range(count)
+    ])
+
+
+def _load_everything(storage: DocumentStorage) -> int:
+    documents = storage.list_documents()
+    status_counts = {}
+    for document in documents:
+        status_counts[document.processing_status] = status_counts.get(document.processing_status, 0) + 1
+    completed = [document for document in documents if document.processing_status == "completed"]
+    completed.sort(key=lambda document: document.upload_timestamp, reverse=True)
+    return len(completed[:PAGE_SIZE])
+
+
+def _load_page(storage: DocumentStorage, cursor=None) -> int:
+    storage.get_document_status_counts()
+    page = storage.list_document_summaries("newest", cursor, PAGE_SIZE, statuses=["completed"])
+    storage.count_documents(statuses=["completed"])
+    return len(page.documents)
+
+
+def _cursor_of_page(storage: DocumentStorage, page_number: int):
+    cursor = None
+    for _ in range(page_number - 1):
+        cursor = storage.list_document_summaries("newest", cursor, PAGE_SIZE, statuses=["completed"]).next_cursor
+    return cursor
+
+
+def _timed(func, repeats: int = 3) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmark(document_counts: Tuple[int, ...] = (1000, 10000), text_size: int = TEXT_SIZE) -> List[Dict[str, float]]:
+    """Time loading the page the old way and with keyset pages, for each library size."""
+    results = []
+    for count in document_counts:
+        temp_dir = tempfile.mkdtemp()
+        try:
+            storage = build_storage(os.path.join(temp_dir, "benchmark.db"))
+            populate(storage, count, text_size)
+            # Last page of the completed documents, three fifths of the library
+            deep = max(1, -(-(count * 3 // 5) // PAGE_SIZE))
+            deep_cursor = _cursor_of_page(storage, deep)
+            everything = _timed(lambda: _load_everything(storage))
+            first_page = _timed(lambda: _load_page(storage))
+            deep_page = _timed(lambda: _load_page(storage, deep_cursor))
+            results.append({
+                "documents": count,
+                "load_all_ms": everything * 1000,
+                "first_page_ms": first_page * 1000,
+                "deep_page": deep,
+                "deep_page_ms": deep_page * 1000,
+                "speedup": everything / first_page if first_page else float("inf")
+            })
+        finally:
+            shutil.rmtree(temp_dir, ignore_errors=True)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--documents", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--text-size", type=int, default=TEXT_SIZE)
+    args = parser.parse_args()
+
+    print(f"{'Documents':>9}  {'Load all':>11}  {'First page':>11}  {'Deep page':>18}  {'Speedup':>8}")
+    for row in run_benchmark(tuple(args.documents), args.text_size):
+        print(
+            f"{row['documents']:>9}  "
+            f"{row['load_all_ms']:>8.1f} ms  "
+            f"{row['first_page_ms']:>8.1f} ms  "
+            f"{row['deep_page_ms']:>6.1f} ms (page {row['deep_page']:>4})  "
+            f"{row['speedup']:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
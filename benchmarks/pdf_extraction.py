@@ -0,0 +1,94 @@
+"""
+Page-parallel PDF text extraction throughput.
+
+Builds a text PDF of the requested length and extracts it with one worker
+(the previous sequential behaviour) and with the page-parallel pool, reporting
+pages/second and how long the first page took to arrive.
+
+    python -m benchmarks.pdf_extraction --pages 300 --workers 4
+"""
+
+import argparse
+import time
+from typing import Dict, List
+
+from src.services.pdf_extraction import PdfExtractionStats, PdfPageExtractor
+
+
+def build_sample_pdf(pages: int, lines_per_page: int = 45) -> bytes:
+    """A minimal uncompressed PDF with ``lines_per_page`` lines of Helvetica text per page."""
+    objects: List[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # page tree, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_refs = []
+    for page in range(1, pages + 1):
+        lines = [
+            f"({'Section %d.%d: the Supplier shall deliver the Materials under clause %d' % (page, line, line)}) Tj T*"
+            for line in range(1, lines_per_page + 1)
+        ]
+        content = f"BT /F1 10 Tf 12 TL 50 780 Td {' '.join(lines)} ET".encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content))
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % (len(objects))
+        )
+        page_refs.append(b"%d 0 R" % len(objects))
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (b" ".join(page_refs), pages)
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(output))
+        output += b"%d 0 obj\n%s\nendobj\n" % (number, body)
+    xref = len(output)
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    output += b"".join(b"%010d 00000 n \n" % offset for offset in offsets)
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(output)
+
+
+def measure(extractor: PdfPageExtractor, data: bytes) -> Dict[str, float]:
+    stats = PdfExtractionStats()
+    start = time.perf_counter()
+    first_page_seconds = None
+    for _ in extractor.iter_pages(data, stats):
+        if first_page_seconds is None:
+            first_page_seconds = time.perf_counter() - start
+    return {
+        "seconds": stats.seconds,
+        "pages_per_second": stats.pages_per_second,
+        "first_page_seconds": first_page_seconds or 0.0,
+        "workers": stats.workers
+    }
+
+
+def run_benchmark(pages: int = 300, workers: int = 4, pages_per_task: int = 10) -> Dict[str, Dict[str, float]]:
+    """Sequential and page-parallel extraction of a ``pages``-page PDF."""
+    data = build_sample_pdf(pages)
+    return {
+        "sequential": measure(PdfPageExtractor(workers=1), data),
+        "parallel": measure(PdfPageExtractor(workers=workers, pages_per_task=pages_per_task,
+                                             parallel_min_pages=0), data)
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--pages-per-task", type=int, default=10)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.pages, args.workers, args.pages_per_task)
+    print(f"{'Mode':<11} {'Workers':>7} {'Total':>9} {'Pages/s':>9} {'First page':>11}")
+    for mode, row in results.items():
+        print(
+            f"{mode:<11} {row['workers']:>7} {row['seconds']:>8.2f}s "
+            f"{row['pages_per_second']:>9.1f} {row['first_page_seconds'] * 1000:>9.0f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Per-request overhead of reading system resource metrics.
+
+Compares the psutil calls ``ProductionMonitor._get_system_metrics()`` used to
+make on every processed question with reading the background sampler's
+cached snapshot, both directly and through
+``EnhancedContractSystem._get_performance_metrics()``.
+
+    python -m benchmarks.resource_sampling --calls 2000
+"""
+
+import argparse
+import time
+from typing import Callable, Dict
+from unittest.mock import Mock
+
+import psutil
+
+from src.services.enhanced_contract_system import EnhancedContractSystem, SystemConfiguration
+from src.services.production_monitor import ProductionMonitor
+
+
+def direct_system_metrics() -> Dict[str, object]:
+    """The previous in-request implementation: psutil calls on every read."""
+    return {
+        "cpu_percent": psutil.cpu_percent(),
+        "memory_percent": psutil.virtual_memory().percent,
+        "memory_mb": psutil.virtual_memory().used / 1024 / 1024,
+        "disk_percent": psutil.disk_usage('/').percent,
+        "load_average": psutil.getloadavg() if hasattr(psutil, 'getloadavg') else [0, 0, 0]
+    }
+
+
+def time_per_call(func: Callable[[], object], calls: int) -> float:
+    """Mean microseconds per call."""
+    func()  # warm up
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def run_benchmark(calls: int = 2000) -> Dict[str, float]:
+    """Return mean microseconds per call for direct and cached metric reads."""
+    monitor = ProductionMonitor()
+    system = EnhancedContractSystem(
+        storage=Mock(),
+        config=SystemConfiguration(enable_caching=False, enable_advanced_analysis=False),
+        monitor=monitor
+    )
+    try:
+        direct_us = time_per_call(direct_system_metrics, calls)
+        cached_us = time_per_call(monitor._get_system_metrics, calls)
+        request_metrics_us = time_per_call(system._get_performance_metrics, calls)
+    finally:
+        system.thread_pool.shutdown(wait=True)
+        monitor.resource_sampler.stop()
+
+    return {
+        "calls": calls,
+        "direct_us_per_call": direct_us,
+        "cached_us_per_call": cached_us,
+        "request_metrics_us_per_call": request_metrics_us,
+        "speedup": direct_us / cached_us
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--calls", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = run_benchmark(args.calls)
+    print(f"Calls:                   {results['calls']}")
+    print(f"Direct psutil reads:     {results['direct_us_per_call']:.1f} us/call")
+    print(f"Cached snapshot reads:   {results['cached_us_per_call']:.2f} us/call")
+    print(f"Per-request metrics:     {results['request_metrics_us_per_call']:.2f} us/call")
+    print(f"Speedup:                 {results['speedup']:.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Per-rerun setup cost of the Q&A page.
+
+Streamlit re-executes the page script on every interaction. This times the
+work ``EnhancedQAInterface`` does before rendering anything, as it used to
+run (migrations checked and every engine, analyzer and router rebuilt on
+each rerun, simulated by emptying the component registry first) and with
+the process-wide component registry, on a scratch database. Rebuilt engines
+also start with an empty semantic answer cache and conversation history,
+which the build count makes visible.
+
+    python -m benchmarks.streamlit_reruns --reruns 20
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from typing import Dict, List
+from unittest.mock import patch
+
+from src.storage.database import DatabaseManager
+from src.storage.migrations import migrator
+from src.ui import qa_interface
+from src.utils.component_registry import component_registry
+
+API_KEY = "benchmark-key"
+
+
+class _SessionState(dict):
+    """Attribute-style dict standing in for ``st.session_state`` outside ``streamlit run``."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+def _rerun() -> float:
+    started = time.perf_counter()
+    interface = qa_interface.EnhancedQAInterface()
+    interface._initialize_engines(API_KEY)
+    return time.perf_counter() - started
+
+
+def run_benchmark(reruns: int = 20) -> List[Dict[str, float]]:
+    """Time page setup per rerun without and with shared components."""
+    temp_dir = tempfile.mkdtemp()
+    try:
+        db = DatabaseManager(os.path.join(temp_dir, "benchmark.db"))
+        with patch.object(migrator, "db_manager", db), \
+                patch.object(qa_interface.st, "session_state", _SessionState()):
+            results = []
+            for mode in ("rebuilt", "shared"):
+                component_registry.clear()
+                migrator._migrated_paths.clear()
+                _rerun()  # The first render of a process builds everything in both modes
+                builds = component_registry.get_statistics()['builds']
+                timings = []
+                for _ in range(reruns):
+                    if mode == "rebuilt":
+                        component_registry.clear()
+                        migrator._migrated_paths.clear()
+                    timings.append(_rerun())
+                results.append({
+                    "mode": mode,
+                    "reruns": reruns,
+                    "median_ms": statistics.median(timings) * 1000,
+                    "max_ms": max(timings) * 1000,
+                    "builds": component_registry.get_statistics()['builds'] - builds
+                })
+            component_registry.clear()
+            migrator._migrated_paths.clear()
+            return results
+    finally:
+        shutil.rmtree(temp_dir, ignore_errors=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--reruns", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'Components':>10}  {'Reruns':>6}  {'Median':>10}  {'Max':>10}  {'Builds':>6}")
+    for row in run_benchmark(args.reruns):
+        print(f"{row['mode']:>10}  {row['reruns']:>6}  {row['median_ms']:>7.2f} ms  {row['max_ms']:>7.2f} ms  "
+              f"{row['builds']:>6}")
+
+
+if __name__ == "__main__":
+    main()
@@ -8,6 +8,7 @@ import argparse
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from src.app import initialize_app, shutdown_app, get_app
+from src.config import config
 from src.utils.logging_config import get_logger
 from src.utils.error_handling import DocumentQAError, format_error_for_ui
 
@@ -49,6 +50,88 @@ def run_streamlit():
         shutdown_app()
 
 
+def run_api(host: str, port: int, workers: int):
+    """Run the headless HTTP API with uvicorn."""
+    try:
+        import uvicorn
+    except ImportError:
+        print("❌ The HTTP API needs an ASGI server: pip install uvicorn")
+        return False
+    
+    try:
+        print("🌐 Starting headless HTTP API...")
+        print(f"   URL: http://{host}:{port}/api/health")
+        print(f"   Workers: {workers}")
+        print("   Press Ctrl+C to stop")
+        
+        # Each worker process builds its own services on startup
+        uvicorn.run("src.api.server:app", host=host, port=port, workers=workers, lifespan="on")
+        return True
+        
+    except KeyboardInterrupt:
+        print("\n🛑 Stopping HTTP API...")
+        return True
+    except Exception as e:
+        logger.error(f"Error running HTTP API: {e}", exc_info=True)
+        print(f"❌ Error starting HTTP API: {e}")
+        return False
+
+
+def run_ingest(directory: str, manifest: str, workers: int, batch_size: int,
+               max_concurrent_processing: int, process: bool):
+    """Bulk-ingest a directory of documents without the web interface."""
+    from src.services.bulk_ingestion import BulkIngestor
+    from src.storage.document_storage import DocumentStorage
+    from src.storage.migrations import migrator
+    from src.workflow.workflow_manager import WorkflowManager
+    
+    api_key = config.get_gemini_api_key()
+    if process and not api_key:
+        print("❌ GEMINI_API_KEY is required to process documents (use --no-process to only store them)")
+        return False
+    
+    workflow_manager = None
+    try:
+        print(f"📥 Ingesting {directory}...")
+        os.makedirs(config.DOCUMENTS_DIR, exist_ok=True)
+        os.makedirs(config.DATABASE_DIR, exist_ok=True)
+        migrator.run_migrations()
+        
+        storage = DocumentStorage()
+        if process:
+            workflow_manager = WorkflowManager(storage, max_workers=max_concurrent_processing)
+            workflow_manager.start()
+        
+        ingestor = BulkIngestor(
+            storage,
+            workflow_manager,
+            extraction_workers=workers or os.cpu_count() or 1,
+            batch_size=batch_size,
+            progress=print
+        )
+        stats = ingestor.ingest(directory, api_key=api_key, process=process, manifest_path=manifest)
+        
+        print("✅ Ingestion complete")
+        print(f"   Files found: {stats.files_found} ({stats.already_ingested} already ingested)")
+        print(f"   Stored: {stats.stored}, duplicates: {stats.duplicates}, failed: {stats.failed}")
+        print(f"   Extraction: {stats.extraction_rate()} over {stats.extraction_seconds:.1f}s")
+        if process:
+            print(f"   Processed: {stats.processed}, processing failed: {stats.processing_failed} "
+                  f"in {stats.processing_seconds:.1f}s")
+        return stats.failed == 0 and stats.processing_failed == 0
+        
+    except KeyboardInterrupt:
+        print("\n🛑 Ingestion interrupted; run the same command again to resume")
+        return False
+    except Exception as e:
+        logger.error(f"Error during bulk ingestion: {e}", exc_info=True)
+        print(f"❌ Ingestion error: {e}")
+        return False
+    finally:
+        if workflow_manager:
+            workflow_manager.stop()
+
+
 def run_system_check():
     """Run system health check."""
     try:
@@ -123,6 +206,28 @@ def main():
         action="store_true", 
         help="Start the web interface (default)"
     )
+    parser.add_argument(
+        "--api",
+        action="store_true",
+        help="Start the headless HTTP API instead of the web interface"
+    )
+    parser.add_argument(
+        "--host",
+        default=config.API_HOST,
+        help="Host for the HTTP API"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=config.API_PORT,
+        help="Port for the HTTP API"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=config.API_WORKERS,
+        help="Number of HTTP API worker processes"
+    )
     parser.add_argument(
         "--check", 
         action="store_true", 
@@ -134,19 +239,58 @@ def main():
         help="Initialize system only (no web interface)"
     )
     
+    subparsers = parser.add_subparsers(dest="command")
+    ingest_parser = subparsers.add_parser("ingest", help="Bulk-ingest a directory of documents")
+    ingest_parser.add_argument("directory", help="Directory to ingest (searched recursively)")
+    ingest_parser.add_argument(
+        "--manifest",
+        help="Resumable progress manifest (default: <directory>/.ingest_manifest.jsonl)"
+    )
+    ingest_parser.add_argument(
+        "--workers",
+        dest="extraction_workers",
+        type=int,
+        default=config.INGEST_EXTRACTION_WORKERS,
+        help="Text extraction processes (default: one per CPU)"
+    )
+    ingest_parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=config.INGEST_BATCH_SIZE,
+        help="Documents stored per database transaction"
+    )
+    ingest_parser.add_argument(
+        "--max-concurrent-processing",
+        type=int,
+        default=config.INGEST_MAX_CONCURRENT_PROCESSING,
+        help="Documents processed by the AI workflow at once"
+    )
+    ingest_parser.add_argument(
+        "--no-process",
+        action="store_true",
+        help="Store extracted text without queueing AI processing"
+    )
+    
     args = parser.parse_args()
     
     # Default to web interface if no specific command
-    if not any([args.check, args.init]):
+    if not any([args.check, args.init, args.api, args.command]):
         args.web = True
     
     success = False
     
     try:
-        if args.check:
+        if args.command == "ingest":
+            success = run_ingest(
+                args.directory, args.manifest, args.extraction_workers, args.batch_size,
+                args.max_concurrent_processing, not args.no_process
+            )
+        elif args.check:
             success = run_system_check()
         elif args.init:
             success = run_init_only()
+        elif args.api:
+            success = run_api(args.host, args.port, args.workers)
         elif args.web:
             success = run_streamlit()
         
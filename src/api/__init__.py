@@ -0,0 +1 @@
+"""Headless HTTP API for the Document Q&A System."""
@@ -0,0 +1,594 @@
+"""
+Headless HTTP API for ingestion, Q&A, analysis and Excel reports.
+
+``DocumentQAAPI`` is a plain ASGI application with no framework dependency,
+so it runs under any ASGI server; ``python main.py --api`` serves it with
+uvicorn, optionally as several worker processes. Documents, jobs, sessions
+and report metadata live in the shared SQLite database and reports in the
+shared reports directory, so any worker can answer for any of them. Blocking
+work (SQLite, text extraction, Gemini calls) runs in threads, so one event
+loop serves many concurrent clients.
+
+Endpoints:
+    GET  /api/health
+    POST /api/documents?filename=NAME          raw file bytes (spooled to disk); queued for processing
+    GET  /api/documents[?status=STATUS]
+    GET  /api/documents/{id}
+    GET  /api/jobs/{job_id}
+    POST /api/sessions                         {"document_id"}
+    POST /api/documents/{id}/questions         {"question", "session_id", "mode", "stream"}
+    POST /api/documents/{id}/questions/batch   {"questions", "session_id"}
+    GET  /api/documents/{id}/analysis
+    POST /api/documents/{id}/analysis          {"template_id"}
+    POST /api/documents/{id}/reports           {"report_type"}
+    GET  /api/reports/download/{report_id}
+"""
+
+import asyncio
+import io
+import json
+import os
+import re
+import tempfile
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, BinaryIO, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from src.config import config
+from src.models.document import ComprehensiveAnalysis, Document
+from src.services.contract_analyst_engine import ContractAnalystEngine, create_contract_analyst_engine
+from src.services.enhanced_contract_system import EnhancedContractSystem, ProcessingContext, SystemConfiguration
+from src.services.enhanced_summary_analyzer import EnhancedSummaryAnalyzer
+from src.services.excel_report_generator import ExcelReportGenerator
+from src.services.qa_engine import AnswerStream, QAEngine, create_qa_engine
+from src.services.text_extraction import TextExtractor
+from src.storage.document_storage import DocumentStorage
+from src.storage.enhanced_storage import EnhancedDocumentStorage
+from src.workflow.workflow_manager import WorkflowManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+QUESTION_MODES = ("standard", "contract", "enhanced")
+REPORT_TYPES = ("comprehensive", "risks_only", "commitments_only")
+XLSX_CONTENT_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+DOWNLOAD_CHUNK_BYTES = 64 * 1024
+
+# ComprehensiveAnalysis.to_dict stores these as JSON strings
+_ANALYSIS_JSON_FIELDS = (
+    "key_findings", "critical_information", "recommended_actions",
+    "key_legal_terms", "risks", "commitments", "deliverable_dates"
+)
+
+
+class HTTPError(Exception):
+    """Error returned to the client as ``{"error": message}`` with an HTTP status."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+@dataclass
+class Request:
+    """The parts of an HTTP request the handlers use."""
+    method: str
+    path: str
+    query: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes = b""
+    # Upload bodies are spooled to a temporary file instead of ``body``
+    body_file: Optional[BinaryIO] = None
+
+    def json(self) -> Dict[str, Any]:
+        if not self.body:
+            return {}
+        try:
+            data = json.loads(self.body)
+        except (UnicodeDecodeError, json.JSONDecodeError) as e:
+            raise HTTPError(400, f"Invalid JSON body: {e}")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "JSON body must be an object")
+        return data
+
+
+@dataclass
+class Response:
+    status: int
+    body: bytes
+    content_type: str = "application/json"
+    headers: Optional[Dict[str, str]] = None
+
+
+@dataclass
+class StreamingResponse:
+    status: int
+    chunks: AsyncIterator[bytes]
+    content_type: str
+    headers: Optional[Dict[str, str]] = None
+
+
+def json_response(data: Any, status: int = 200) -> Response:
+    return Response(status, json.dumps(data, default=str).encode("utf-8"))
+
+
+def sse_event(data: Any, event: Optional[str] = None) -> bytes:
+    """Encode one server-sent event."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data, default=str)}\n\n".encode("utf-8")
+
+
+@dataclass
+class APIServices:
+    """Components the API delegates to; one set per worker process."""
+    storage: DocumentStorage
+    text_extractor: TextExtractor
+    qa_engine: QAEngine
+    contract_engine: ContractAnalystEngine
+    workflow_manager: WorkflowManager
+    contract_system: EnhancedContractSystem
+    summary_analyzer: EnhancedSummaryAnalyzer
+    enhanced_storage: EnhancedDocumentStorage
+    report_generator: ExcelReportGenerator
+
+    def shutdown(self) -> None:
+        self.workflow_manager.stop()
+        self.contract_system.shutdown()
+
+
+def create_services(api_key: str) -> APIServices:
+    """Build the API's components and start the document processing worker."""
+    from src.storage.migrations import migrator
+
+    os.makedirs(config.DOCUMENTS_DIR, exist_ok=True)
+    os.makedirs(config.DATABASE_DIR, exist_ok=True)
+    migrator.run_migrations()
+
+    storage = DocumentStorage()
+    workflow_manager = WorkflowManager(storage)
+    workflow_manager.start()
+
+    return APIServices(
+        storage=storage,
+        text_extractor=TextExtractor(),
+        qa_engine=create_qa_engine(api_key, storage),
+        contract_engine=create_contract_analyst_engine(api_key, storage),
+        workflow_manager=workflow_manager,
+        # Worker processes share cached responses through one SQLite file
+        contract_system=EnhancedContractSystem(storage, SystemConfiguration(
+            shared_cache_path=os.path.join(config.DATABASE_DIR, "response_cache.db")
+        )),
+        summary_analyzer=EnhancedSummaryAnalyzer(storage, api_key),
+        enhanced_storage=EnhancedDocumentStorage(),
+        report_generator=ExcelReportGenerator(storage)
+    )
+
+
+class DocumentQAAPI:
+    """
+    ASGI application exposing the Document Q&A System over HTTP.
+
+    Services are created on the ASGI lifespan startup event, inside each
+    worker process, unless they are passed in.
+    """
+
+    def __init__(self, services: Optional[APIServices] = None, api_key: Optional[str] = None,
+                 max_concurrent_requests: Optional[int] = None, max_upload_bytes: Optional[int] = None):
+        self.services = services
+        self.api_key = api_key if api_key is not None else config.get_gemini_api_key()
+        self.max_concurrent_requests = max_concurrent_requests or config.API_MAX_CONCURRENT_REQUESTS
+        self.max_upload_bytes = max_upload_bytes or config.MAX_INGEST_FILE_SIZE_MB * 1024 * 1024
+        self.max_body_bytes = config.MAX_FILE_SIZE_MB * 1024 * 1024
+        self.spool_threshold = config.EXTRACTION_SPOOL_THRESHOLD_MB * 1024 * 1024
+        self._owns_services = services is None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+        # Routes whose bodies are file uploads, spooled to a temporary file rather than held in memory
+        self._upload_routes = {("POST", "/api/documents")}
+        self._routes: List[Tuple[str, "re.Pattern[str]", Callable[..., Awaitable[Any]]]] = [
+            ("GET", re.compile(r"/api/health"), self.health),
+            ("POST", re.compile(r"/api/documents"), self.upload_document),
+            ("GET", re.compile(r"/api/documents"), self.list_documents),
+            ("GET", re.compile(r"/api/documents/(?P<document_id>[^/]+)"), self.get_document),
+            ("GET", re.compile(r"/api/jobs/(?P<job_id>[^/]+)"), self.get_job),
+            ("POST", re.compile(r"/api/sessions"), self.create_session),
+            ("POST", re.compile(r"/api/documents/(?P<document_id>[^/]+)/questions"), self.ask_question),
+            ("POST", re.compile(r"/api/documents/(?P<document_id>[^/]+)/questions/batch"), self.ask_questions_batch),
+            ("GET", re.compile(r"/api/documents/(?P<document_id>[^/]+)/analysis"), self.get_analysis),
+            ("POST", re.compile(r"/api/documents/(?P<document_id>[^/]+)/analysis"), self.run_analysis),
+            ("POST", re.compile(r"/api/documents/(?P<document_id>[^/]+)/reports"), self.create_report),
+            ("GET", re.compile(r"/api/reports/download/(?P<report_id>[^/]+)"), self.download_report),
+        ]
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._handle_http(scope, receive, send)
+
+    # ASGI plumbing
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                try:
+                    await self.startup()
+                except Exception as e:
+                    logger.error(f"API startup failed: {e}", exc_info=True)
+                    await send({"type": "lifespan.startup.failed", "message": str(e)})
+                    return
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def startup(self) -> None:
+        if self.services is None:
+            self.services = await asyncio.to_thread(create_services, self.api_key)
+        logger.info(f"Document Q&A API ready (pid {os.getpid()})")
+
+    async def shutdown(self) -> None:
+        if self.services is not None and self._owns_services:
+            await asyncio.to_thread(self.services.shutdown)
+            self.services = None
+
+    async def _handle_http(self, scope, receive, send) -> None:
+        request = None
+        try:
+            request = await self._read_request(scope, receive)
+            response = await self._dispatch(request)
+        except HTTPError as e:
+            response = json_response({"error": e.message}, e.status)
+        except Exception as e:
+            logger.error(f"Unhandled error in {scope.get('method')} {scope.get('path')}: {e}", exc_info=True)
+            response = json_response({"error": "Internal server error"}, 500)
+        finally:
+            if request is not None and request.body_file is not None:
+                request.body_file.close()
+
+        if isinstance(response, StreamingResponse):
+            await self._send_streaming(send, response)
+        else:
+            await self._send(send, response)
+
+    async def _read_request(self, scope, receive) -> Request:
+        headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope.get("headers", [])}
+        query = {key: values[0] for key, values in parse_qs(scope.get("query_string", b"").decode("latin-1")).items()}
+
+        method, path = scope["method"], scope["path"].rstrip("/") or "/"
+        upload = (method, path) in self._upload_routes
+        limit = self.max_upload_bytes if upload else self.max_body_bytes
+
+        declared = headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > limit:
+            raise HTTPError(413, f"Request body exceeds {limit} bytes")
+
+        body = tempfile.SpooledTemporaryFile(max_size=self.spool_threshold) if upload else io.BytesIO()
+        try:
+            while True:
+                message = await receive()
+                if message["type"] == "http.disconnect":
+                    break
+                body.write(message.get("body", b""))
+                if body.tell() > limit:
+                    raise HTTPError(413, f"Request body exceeds {limit} bytes")
+                if not message.get("more_body", False):
+                    break
+        except BaseException:
+            body.close()
+            raise
+
+        if upload:
+            body.seek(0)
+            return Request(method, path, query, headers, body_file=body)
+        return Request(method, path, query, headers, body.getvalue())
+
+    async def _dispatch(self, request: Request):
+        allowed = []
+        for method, pattern, handler in self._routes:
+            match = pattern.fullmatch(request.path)
+            if match is None:
+                continue
+            if method != request.method:
+                allowed.append(method)
+                continue
+            if self.services is None:
+                raise HTTPError(503, "Service is starting")
+            if handler == self.health:
+                return await handler(request)
+            async with self._get_semaphore():
+                return await handler(request, **match.groupdict())
+
+        if allowed:
+            raise HTTPError(405, f"Method not allowed; use {', '.join(allowed)}")
+        raise HTTPError(404, "Not found")
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Limits requests doing blocking work at once; the rest wait their turn"""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent_requests)
+        return self._semaphore
+
+    @staticmethod
+    def _start_message(status: int, content_type: str, headers: Optional[Dict[str, str]],
+                       content_length: Optional[int] = None) -> Dict[str, Any]:
+        raw_headers = [(b"content-type", content_type.encode("latin-1"))]
+        if content_length is not None:
+            raw_headers.append((b"content-length", str(content_length).encode("latin-1")))
+        for key, value in (headers or {}).items():
+            raw_headers.append((key.lower().encode("latin-1"), value.encode("latin-1")))
+        return {"type": "http.response.start", "status": status, "headers": raw_headers}
+
+    async def _send(self, send, response: Response) -> None:
+        await send(self._start_message(response.status, response.content_type, response.headers, len(response.body)))
+        await send({"type": "http.response.body", "body": response.body})
+
+    async def _send_streaming(self, send, response: StreamingResponse) -> None:
+        await send(self._start_message(response.status, response.content_type, response.headers))
+        try:
+            async for chunk in response.chunks:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        except Exception as e:
+            logger.error(f"Error while streaming response: {e}")
+        finally:
+            await response.chunks.aclose()
+        await send({"type": "http.response.body", "body": b""})
+
+    # Handlers
+
+    async def health(self, request: Request) -> Response:
+        return json_response({
+            "status": "ok",
+            "pid": os.getpid(),
+            "workflow": self.services.workflow_manager.get_queue_status()
+        })
+
+    async def upload_document(self, request: Request) -> Response:
+        """Extract text from the uploaded file and queue the document for processing."""
+        filename = os.path.basename(request.query.get("filename") or request.headers.get("x-filename", ""))
+        if not filename:
+            raise HTTPError(400, "Pass the file name as ?filename= or an X-Filename header")
+        upload = request.body_file
+        size = upload.seek(0, os.SEEK_END) if upload is not None else 0
+        if not size:
+            raise HTTPError(400, "Request body must contain the file")
+        if not self.api_key:
+            raise HTTPError(503, "Gemini API key not configured")
+
+        extractor = self.services.text_extractor
+        error_message = extractor.check(filename, size)
+        if error_message:
+            raise HTTPError(400, error_message)
+
+        result = await asyncio.to_thread(extractor.extract, upload, filename, size)
+        if result.error:
+            raise HTTPError(422, result.error)
+
+        document = Document(
+            id=str(uuid.uuid4()),
+            title=filename,
+            file_type=result.file_type.lstrip("."),
+            file_size=result.size,
+            upload_timestamp=datetime.now(),
+            original_text=result.text,
+            text_encoding=result.encoding,
+            sections=[section.to_dict() for section in result.sections] or None
+        )
+        job_id = await asyncio.to_thread(
+            self.services.workflow_manager.submit_document_for_processing, document, self.api_key
+        )
+        return json_response({
+            "document_id": document.id,
+            "job_id": job_id,
+            "status": "queued",
+            "job_url": f"/api/jobs/{job_id}",
+            "document_url": f"/api/documents/{document.id}"
+        }, 202)
+
+    async def list_documents(self, request: Request) -> Response:
+        documents = await asyncio.to_thread(self.services.storage.list_documents, request.query.get("status"))
+        return json_response({"documents": [self._document_summary(document) for document in documents]})
+
+    async def get_document(self, request: Request, document_id: str) -> Response:
+        document = await self._require_document(document_id)
+        job = await asyncio.to_thread(self.services.workflow_manager.get_document_processing_status, document_id)
+        return json_response({
+            **self._document_summary(document),
+            "summary": document.summary,
+            "analysis": document.analysis,
+            "extracted_info": document.extracted_info,
+            "latest_job": job.to_dict() if job else None
+        })
+
+    async def get_job(self, request: Request, job_id: str) -> Response:
+        job = await asyncio.to_thread(self.services.workflow_manager.get_job_status, job_id)
+        if job is None:
+            raise HTTPError(404, f"Job {job_id} not found")
+        return json_response(job.to_dict())
+
+    async def create_session(self, request: Request) -> Response:
+        document_id = request.json().get("document_id")
+        if not document_id:
+            raise HTTPError(400, "document_id is required")
+        await self._require_document(document_id)
+        session_id = await asyncio.to_thread(self.services.qa_engine.create_qa_session, document_id)
+        return json_response({"session_id": session_id, "document_id": document_id}, 201)
+
+    async def ask_question(self, request: Request, document_id: str):
+        """Answer one question; with ``"stream": true`` the answer arrives as server-sent events."""
+        data = request.json()
+        question = data.get("question")
+        if not isinstance(question, str) or not question.strip():
+            raise HTTPError(400, "question is required")
+        mode = data.get("mode", "standard")
+        if mode not in QUESTION_MODES:
+            raise HTTPError(400, f"mode must be one of {', '.join(QUESTION_MODES)}")
+        session_id = data.get("session_id")
+        stream = bool(data.get("stream", False))
+
+        await self._require_document(document_id)
+
+        if mode == "enhanced":
+            if stream:
+                raise HTTPError(400, "Streaming is not available in enhanced mode")
+            result = await self.services.contract_system.process_question(
+                question, document_id, ProcessingContext(session_id=session_id or str(uuid.uuid4()))
+            )
+            return json_response(self._enhanced_result(result))
+
+        engine = self.services.contract_engine if mode == "contract" else self.services.qa_engine
+        if not stream:
+            result = await asyncio.to_thread(engine.answer_question, question, document_id, session_id)
+            return json_response(result)
+
+        # Retrieval runs here; generation happens while the response streams
+        answer_stream = await asyncio.to_thread(engine.stream_answer, question, document_id, session_id)
+        return StreamingResponse(200, self._answer_events(answer_stream), "text/event-stream",
+                                 {"cache-control": "no-cache"})
+
+    async def ask_questions_batch(self, request: Request, document_id: str) -> Response:
+        data = request.json()
+        questions = data.get("questions")
+        if not isinstance(questions, list) or not questions or not all(isinstance(q, str) and q.strip() for q in questions):
+            raise HTTPError(400, "questions must be a non-empty list of strings")
+
+        await self._require_document(document_id)
+        results = await asyncio.to_thread(
+            self.services.qa_engine.answer_questions_batch, document_id, questions, data.get("session_id")
+        )
+        return json_response({"results": results})
+
+    async def get_analysis(self, request: Request, document_id: str) -> Response:
+        analysis = await asyncio.to_thread(self.services.enhanced_storage.get_document_analysis, document_id)
+        if analysis is None:
+            raise HTTPError(404, f"No comprehensive analysis for document {document_id}")
+        return json_response(self._analysis_payload(analysis))
+
+    async def run_analysis(self, request: Request, document_id: str) -> Response:
+        """Run and store a comprehensive analysis, optionally with a named template."""
+        template_id = request.json().get("template_id")
+        document = await self._require_document(document_id)
+
+        template = None
+        if template_id:
+            template = await asyncio.to_thread(self.services.enhanced_storage.get_analysis_template, template_id)
+            if template is None:
+                raise HTTPError(404, f"Analysis template {template_id} not found")
+
+        analysis = await asyncio.to_thread(
+            self.services.summary_analyzer.analyze_document_comprehensive, document, template
+        )
+        await asyncio.to_thread(self.services.enhanced_storage.save_comprehensive_analysis, analysis)
+        return json_response(self._analysis_payload(analysis), 201)
+
+    async def create_report(self, request: Request, document_id: str) -> Response:
+        report_type = request.json().get("report_type", "comprehensive")
+        if report_type not in REPORT_TYPES:
+            raise HTTPError(400, f"report_type must be one of {', '.join(REPORT_TYPES)}")
+        await self._require_document(document_id)
+
+        report = await asyncio.to_thread(
+            self.services.report_generator.generate_document_report, document_id, report_type
+        )
+        # Stored so any worker can serve the download
+        await asyncio.to_thread(self.services.enhanced_storage.save_excel_report, report)
+        return json_response({
+            "report_id": report.report_id,
+            "filename": report.filename,
+            "sheets": [sheet.name for sheet in report.sheets],
+            "created_at": report.created_at.isoformat(),
+            "expires_at": report.expires_at.isoformat(),
+            "download_url": f"/api/reports/download/{report.report_id}"
+        }, 201)
+
+    async def download_report(self, request: Request, report_id: str) -> StreamingResponse:
+        report = await asyncio.to_thread(self.services.enhanced_storage.get_excel_report, report_id)
+        if report is None or not os.path.isfile(report.file_path):
+            raise HTTPError(404, f"Report {report_id} not found")
+        return StreamingResponse(200, self._file_chunks(report.file_path), XLSX_CONTENT_TYPE, {
+            "content-disposition": f'attachment; filename="{report.filename}"',
+            "content-length": str(os.path.getsize(report.file_path))
+        })
+
+    # Helpers
+
+    async def _require_document(self, document_id: str) -> Document:
+        document = await asyncio.to_thread(self.services.storage.get_document, document_id)
+        if document is None:
+            raise HTTPError(404, f"Document {document_id} not found")
+        return document
+
+    async def _answer_events(self, answer_stream: AnswerStream) -> AsyncIterator[bytes]:
+        """Answer text chunks as ``data`` events, then the final result as a ``result`` event."""
+        chunks = iter(answer_stream)
+        try:
+            while True:
+                # Each chunk blocks on the model's HTTP stream, so read it in a thread
+                chunk = await asyncio.to_thread(next, chunks, None)
+                if chunk is None:
+                    break
+                yield sse_event({"text": chunk})
+            yield sse_event(answer_stream.result, event="result")
+        finally:
+            # Closes the model stream early if the client went away
+            await asyncio.to_thread(chunks.close)
+
+    async def _file_chunks(self, file_path: str) -> AsyncIterator[bytes]:
+        with open(file_path, "rb") as file:
+            while True:
+                chunk = await asyncio.to_thread(file.read, DOWNLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                yield chunk
+
+    @staticmethod
+    def _document_summary(document: Document) -> Dict[str, Any]:
+        return {
+            "id": document.id,
+            "title": document.title,
+            "file_type": document.file_type,
+            "file_size": document.file_size,
+            "processing_status": document.processing_status,
+            "document_type": document.document_type,
+            "is_legal_document": document.is_legal_document,
+            "legal_document_type": document.legal_document_type,
+            "upload_timestamp": document.upload_timestamp.isoformat(),
+            "updated_at": document.updated_at.isoformat() if isinstance(document.updated_at, datetime) else document.updated_at
+        }
+
+    @staticmethod
+    def _analysis_payload(analysis: ComprehensiveAnalysis) -> Dict[str, Any]:
+        payload = analysis.to_dict()
+        for field_name in _ANALYSIS_JSON_FIELDS:
+            payload[field_name] = json.loads(payload[field_name])
+        return payload
+
+    @staticmethod
+    def _enhanced_result(result) -> Dict[str, Any]:
+        response = result.response
+        return {
+            "answer": response.content,
+            "response_type": response.response_type.value,
+            "confidence": response.confidence,
+            "sources": response.sources,
+            "suggestions": response.suggestions,
+            "structured_format": response.structured_format,
+            "quality_score": result.quality_score,
+            "processing_time": result.processing_time,
+            "enhancements_applied": result.enhancements_applied,
+            "cache_hit": result.cache_hit
+        }
+
+
+def create_app(services: Optional[APIServices] = None) -> DocumentQAAPI:
+    """Create the ASGI application."""
+    return DocumentQAAPI(services)
+
+
+# Module-level application for ASGI servers (``uvicorn src.api.server:app``)
+app = create_app()
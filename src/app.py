@@ -7,7 +7,7 @@ import os
 import sys
 import signal
 import atexit
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from contextlib import contextmanager
 
 # Add src directory to path for imports
@@ -20,9 +20,14 @@ from src.utils.error_handling import (
 )
 from src.storage.database import db_manager
 from src.storage.document_storage import DocumentStorage
+from src.storage.migrations import migrator
 from src.services.file_handler import FileUploadHandler
 from src.services.qa_engine import QAEngine
+from src.services.production_monitor import MetricFamily, MetricSample, MetricType, get_global_monitor
+from src.services.metrics_exporter import start_metrics_exporter, stop_metrics_exporter
+from src.services.report_jobs import shutdown_report_job_manager
 from src.workflow.workflow_manager import WorkflowManager
+from src.utils.component_registry import component_registry
 
 logger = get_logger(__name__)
 
@@ -36,6 +41,8 @@ class DocumentQAApplication:
         self.file_handler: Optional[FileUploadHandler] = None
         self.qa_engine: Optional[QAEngine] = None
         self.workflow_manager: Optional[WorkflowManager] = None
+        # Storage, engines and analyzers shared by every Streamlit rerun and session
+        self.components = component_registry
         self._setup_signal_handlers()
     
     def _setup_signal_handlers(self):
@@ -86,6 +93,10 @@ class DocumentQAApplication:
         # Verify system health
         self._verify_system_health()
         
+        # Expose metrics for scraping if configured
+        if config.METRICS_EXPORTER_ENABLED:
+            self._start_metrics_exporter()
+        
         self.initialized = True
         logger.info("✅ Application initialization complete")
         return True
@@ -112,6 +123,10 @@ class DocumentQAApplication:
             
             for table, count in db_info['tables'].items():
                 logger.debug(f"Table {table}: {count} records")
+            
+            # Apply schema migrations once, at startup, rather than on every page render
+            if not migrator.ensure_migrated():
+                raise RuntimeError("Database migrations failed")
                 
         except Exception as e:
             raise DocumentQAError(
@@ -125,11 +140,11 @@ class DocumentQAApplication:
         """Initialize all application components."""
         try:
             # Initialize storage
-            self.storage = DocumentStorage()
+            self.storage = self.components.get("document_storage", DocumentStorage)
             logger.debug("Document storage initialized")
             
             # Initialize file handler
-            self.file_handler = FileUploadHandler()
+            self.file_handler = self.components.get("file_handler", FileUploadHandler)
             logger.debug("File upload handler initialized")
             
             # Initialize Q&A engine
@@ -137,7 +152,7 @@ class DocumentQAApplication:
             if not api_key:
                 logger.warning("Gemini API key not configured - Q&A functionality will be limited")
             
-            self.qa_engine = QAEngine(self.storage, api_key)
+            self.qa_engine = self.components.get(("qa_engine", api_key), lambda: QAEngine(self.storage, api_key))
             logger.debug("Q&A engine initialized")
             
             # Initialize workflow manager
@@ -151,6 +166,155 @@ class DocumentQAApplication:
                 original_error=e
             )
     
+    def _start_metrics_exporter(self):
+        """Register component metric collectors and start the OpenMetrics endpoint."""
+        monitor = get_global_monitor()
+        monitor.register_collector("database", self._collect_database_metrics)
+        monitor.register_collector("workflow", self._collect_workflow_metrics)
+        monitor.register_collector("qa_engine", self._collect_qa_metrics)
+        monitor.register_collector("extraction_cache", self._collect_extraction_cache_metrics)
+        monitor.register_collector("components", self._collect_component_metrics)
+        
+        exporter = start_metrics_exporter(config.METRICS_EXPORTER_HOST, config.METRICS_EXPORTER_PORT, monitor)
+        if exporter is None:
+            logger.warning("Metrics exporter not started - metrics remain available in-process only")
+    
+    def _collect_database_metrics(self) -> List[MetricFamily]:
+        """Database size, table row counts and statement timings per SQL shape."""
+        db_info = db_manager.get_database_info()
+        return [
+            MetricFamily(
+                "database_size_bytes", MetricType.GAUGE, "Size of the SQLite database file",
+                [MetricSample({}, db_info['database_size_bytes'])]
+            ),
+            MetricFamily(
+                "database_rows", MetricType.GAUGE, "Rows per database table",
+                [MetricSample({"table": table}, count) for table, count in db_info['tables'].items()]
+            )
+        ] + self._collect_query_metrics()
+    
+    def _collect_query_metrics(self) -> List[MetricFamily]:
+        """Statement counts, time and rows per normalized SQL shape."""
+        if db_manager.query_stats is None:
+            return []
+        
+        statements = db_manager.query_stats.get_statistics(limit=50)
+        summary = db_manager.query_stats.get_summary()
+        return [
+            MetricFamily(
+                "database_statements", MetricType.COUNTER, "SQLite statements executed per SQL shape",
+                [MetricSample({"query": row['shape'][:200]}, row['count']) for row in statements]
+            ),
+            MetricFamily(
+                "database_statement_seconds", MetricType.COUNTER, "Time spent in SQLite statements per SQL shape",
+                [MetricSample({"query": row['shape'][:200]}, row['total_ms'] / 1000) for row in statements]
+            ),
+            MetricFamily(
+                "database_statement_p95_seconds", MetricType.GAUGE, "95th percentile statement time per SQL shape",
+                [MetricSample({"query": row['shape'][:200]}, row['p95_ms'] / 1000) for row in statements]
+            ),
+            MetricFamily(
+                "database_statement_rows", MetricType.COUNTER, "Rows returned or changed per SQL shape",
+                [MetricSample({"query": row['shape'][:200]}, row['rows']) for row in statements]
+            ),
+            MetricFamily(
+                "database_slow_queries", MetricType.GAUGE, "Slow statements currently held in the slow-query log",
+                [MetricSample({}, summary['slow_queries'])]
+            )
+        ]
+    
+    def _collect_workflow_metrics(self) -> List[MetricFamily]:
+        """Document processing queue depth and active jobs."""
+        if not self.workflow_manager:
+            return []
+        
+        status = self.workflow_manager.get_queue_status()
+        return [
+            MetricFamily(
+                "workflow_queue_size", MetricType.GAUGE, "Documents waiting for processing",
+                [MetricSample({}, status['queue_size'])]
+            ),
+            MetricFamily(
+                "workflow_active_jobs", MetricType.GAUGE, "Documents currently being processed",
+                [MetricSample({}, status['active_jobs'])]
+            ),
+            MetricFamily(
+                "workflow_running", MetricType.GAUGE, "Whether the workflow worker is running",
+                [MetricSample({}, 1 if status['running'] else 0)]
+            )
+        ]
+    
+    def _collect_qa_metrics(self) -> List[MetricFamily]:
+        """Semantic answer cache statistics of the Q&A engine."""
+        semantic_cache = getattr(self.qa_engine, 'semantic_cache', None)
+        if semantic_cache is None:
+            return []
+        
+        stats = semantic_cache.get_statistics()
+        return [
+            MetricFamily(
+                "semantic_cache_entries", MetricType.GAUGE, "Answers held by the semantic question cache",
+                [MetricSample({}, stats['entries'])]
+            ),
+            MetricFamily(
+                "semantic_cache_lookups", MetricType.COUNTER, "Semantic question cache lookups by result",
+                [
+                    MetricSample({"result": "hit"}, stats['hits']),
+                    MetricSample({"result": "miss"}, stats['misses'])
+                ]
+            )
+        ]
+    
+    def _collect_extraction_cache_metrics(self) -> List[MetricFamily]:
+        """Hit rate and size of the on-disk extraction cache."""
+        extraction_cache = getattr(self.file_handler, 'extraction_cache', None)
+        if extraction_cache is None:
+            return []
+        
+        stats = extraction_cache.get_statistics()
+        return [
+            MetricFamily(
+                "extraction_cache_entries", MetricType.GAUGE, "Files held by the extraction cache",
+                [MetricSample({}, stats['entries'])]
+            ),
+            MetricFamily(
+                "extraction_cache_bytes", MetricType.GAUGE, "Compressed bytes held by the extraction cache",
+                [MetricSample({}, stats['bytes'])]
+            ),
+            MetricFamily(
+                "extraction_cache_lookups", MetricType.COUNTER, "Extraction cache lookups by result",
+                [
+                    MetricSample({"result": "hit"}, stats['hits']),
+                    MetricSample({"result": "miss"}, stats['misses'])
+                ]
+            ),
+            MetricFamily(
+                "extraction_cache_evictions", MetricType.COUNTER, "Extraction cache entries evicted for space",
+                [MetricSample({}, stats['evictions'])]
+            )
+        ]
+    
+    def _collect_component_metrics(self) -> List[MetricFamily]:
+        """Shared components built and reused across Streamlit reruns."""
+        stats = self.components.get_statistics()
+        return [
+            MetricFamily(
+                "shared_components", MetricType.GAUGE, "Components held by the process-wide registry",
+                [MetricSample({}, stats['components'])]
+            ),
+            MetricFamily(
+                "shared_component_lookups", MetricType.COUNTER, "Shared component lookups by result",
+                [
+                    MetricSample({"result": "reused"}, stats['hits']),
+                    MetricSample({"result": "built"}, stats['builds'])
+                ]
+            ),
+            MetricFamily(
+                "shared_component_build_seconds", MetricType.COUNTER, "Time spent building shared components",
+                [MetricSample({}, stats['build_seconds'])]
+            )
+        ]
+    
     def _verify_system_health(self):
         """Verify system health and component connectivity."""
         health_checks = []
@@ -210,6 +374,12 @@ class DocumentQAApplication:
                 self.workflow_manager.shutdown()
                 logger.debug("Workflow manager stopped")
             
+            # Stop background report generation
+            shutdown_report_job_manager()
+            
+            # Stop metrics exporter
+            stop_metrics_exporter()
+            
             # Close database connections
             if hasattr(db_manager, 'close_all_connections'):
                 db_manager.close_all_connections()
@@ -17,6 +17,8 @@ class Config:
     
     # API Configuration
     GEMINI_API_KEY: str = os.getenv("GEMINI_API_KEY", "")
+    # Calls started per minute by each Gemini client; 0 disables the limit
+    GEMINI_REQUESTS_PER_MINUTE: int = int(os.getenv("GEMINI_REQUESTS_PER_MINUTE", "0"))
     
     # Database Configuration
     DATABASE_PATH: str = os.getenv("DATABASE_PATH", "data/database/documents.db")
@@ -29,10 +31,74 @@ class Config:
     MAX_PROCESSING_JOBS: int = int(os.getenv("MAX_PROCESSING_JOBS", "5"))
     PROCESSING_TIMEOUT_SECONDS: int = int(os.getenv("PROCESSING_TIMEOUT_SECONDS", "300"))
     
+    # Semantic answer cache configuration
+    SEMANTIC_CACHE_ENABLED: bool = os.getenv("SEMANTIC_CACHE_ENABLED", "True").lower() == "true"
+    SEMANTIC_CACHE_THRESHOLD: float = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.92"))
+    
+    # Conversation contexts kept in memory by the shared conversational engine (least recently used dropped)
+    CONVERSATION_MAX_SESSIONS: int = int(os.getenv("CONVERSATION_MAX_SESSIONS", "1000"))
+    
+    # Batch question answering (several questions per LLM call)
+    BATCH_QA_MAX_PROMPT_TOKENS: int = int(os.getenv("BATCH_QA_MAX_PROMPT_TOKENS", "6000"))
+    BATCH_QA_MAX_QUESTIONS_PER_CALL: int = int(os.getenv("BATCH_QA_MAX_QUESTIONS_PER_CALL", "8"))
+    BATCH_QA_MAX_CONCURRENT_CALLS: int = int(os.getenv("BATCH_QA_MAX_CONCURRENT_CALLS", "4"))
+    
+    # Background Excel report generation
+    REPORT_MAX_CONCURRENT_JOBS: int = int(os.getenv("REPORT_MAX_CONCURRENT_JOBS", "2"))
+    # Unfinished jobs older than this lost their worker (restart or crash) and are failed
+    REPORT_JOB_TIMEOUT_SECONDS: int = int(os.getenv("REPORT_JOB_TIMEOUT_SECONDS", "1800"))
+    
+    # Metrics exporter (OpenMetrics endpoint for Prometheus-compatible scrapers)
+    METRICS_EXPORTER_ENABLED: bool = os.getenv("METRICS_EXPORTER_ENABLED", "False").lower() == "true"
+    METRICS_EXPORTER_HOST: str = os.getenv("METRICS_EXPORTER_HOST", "127.0.0.1")
+    METRICS_EXPORTER_PORT: int = int(os.getenv("METRICS_EXPORTER_PORT", "9464"))
+    
+    # Request tracing (in-process ring buffer of recent traces)
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "True").lower() == "true"
+    TRACING_SAMPLE_RATE: float = float(os.getenv("TRACING_SAMPLE_RATE", "1.0"))
+    TRACING_MAX_TRACES: int = int(os.getenv("TRACING_MAX_TRACES", "200"))
+    
+    # LLM token and cost accounting (prices in USD per million tokens)
+    LLM_USAGE_TRACKING_ENABLED: bool = os.getenv("LLM_USAGE_TRACKING_ENABLED", "True").lower() == "true"
+    LLM_INPUT_COST_PER_MILLION_TOKENS: float = float(os.getenv("LLM_INPUT_COST_PER_MILLION_TOKENS", "0.10"))
+    LLM_OUTPUT_COST_PER_MILLION_TOKENS: float = float(os.getenv("LLM_OUTPUT_COST_PER_MILLION_TOKENS", "0.40"))
+    
+    # SQLite statement instrumentation and slow-query log
+    DB_QUERY_INSTRUMENTATION_ENABLED: bool = os.getenv("DB_QUERY_INSTRUMENTATION_ENABLED", "True").lower() == "true"
+    DB_SLOW_QUERY_THRESHOLD_MS: float = float(os.getenv("DB_SLOW_QUERY_THRESHOLD_MS", "100"))
+    
+    # Headless HTTP API (python main.py --api)
+    API_HOST: str = os.getenv("API_HOST", "127.0.0.1")
+    API_PORT: int = int(os.getenv("API_PORT", "8000"))
+    API_WORKERS: int = int(os.getenv("API_WORKERS", "1"))
+    API_MAX_CONCURRENT_REQUESTS: int = int(os.getenv("API_MAX_CONCURRENT_REQUESTS", "32"))
+    
+    # Offline bulk ingestion (python main.py ingest <dir>); 0 extraction workers uses every CPU
+    INGEST_EXTRACTION_WORKERS: int = int(os.getenv("INGEST_EXTRACTION_WORKERS", "0"))
+    INGEST_BATCH_SIZE: int = int(os.getenv("INGEST_BATCH_SIZE", "200"))
+    INGEST_MAX_CONCURRENT_PROCESSING: int = int(os.getenv("INGEST_MAX_CONCURRENT_PROCESSING", "2"))
+    
+    # Largest file the HTTP API and bulk ingestion accept (the upload page keeps MAX_FILE_SIZE_MB);
+    # larger in-memory uploads and non-seekable streams are spooled to temporary files
+    MAX_INGEST_FILE_SIZE_MB: int = int(os.getenv("MAX_INGEST_FILE_SIZE_MB", "200"))
+    EXTRACTION_SPOOL_THRESHOLD_MB: int = int(os.getenv("EXTRACTION_SPOOL_THRESHOLD_MB", "16"))
+    
+    # Page-parallel PDF extraction; 0 workers uses up to 4 CPUs
+    PDF_EXTRACTION_WORKERS: int = int(os.getenv("PDF_EXTRACTION_WORKERS", "0"))
+    PDF_PARALLEL_MIN_PAGES: int = int(os.getenv("PDF_PARALLEL_MIN_PAGES", "40"))
+    PDF_PAGES_PER_TASK: int = int(os.getenv("PDF_PAGES_PER_TASK", "10"))
+    
+    # On-disk cache of extracted text, keyed by file bytes (data/database/extraction_cache.db)
+    EXTRACTION_CACHE_ENABLED: bool = os.getenv("EXTRACTION_CACHE_ENABLED", "True").lower() == "true"
+    EXTRACTION_CACHE_MAX_MB: int = int(os.getenv("EXTRACTION_CACHE_MAX_MB", "256"))
+    
     # UI Configuration
     STREAMLIT_PORT: int = int(os.getenv("STREAMLIT_PORT", "8501"))
     DEBUG_MODE: bool = os.getenv("DEBUG_MODE", "False").lower() == "true"
     
+    # Document Management page size (documents are paged with keyset queries)
+    DOCUMENT_PAGE_SIZE: int = int(os.getenv("DOCUMENT_PAGE_SIZE", "25"))
+    
     # Storage Paths
     DOCUMENTS_DIR: str = "data/documents"
     DATABASE_DIR: str = "data/database"
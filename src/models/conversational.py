@@ -2,7 +2,7 @@
 Conversational AI data models for enhanced Q&A capabilities.
 """
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import List, Dict, Any, Optional
 from datetime import datetime
 
@@ -73,15 +73,78 @@ class ExcelReport:
     sheets: List['ExcelSheet']
     created_at: datetime
     expires_at: datetime
+    # Identifies the inputs the report was built from, so identical requests can reuse it
+    fingerprint: Optional[str] = None
+    report_type: Optional[str] = None
+    # Degraded CSV written when the workbook could not be; never reused for later requests
+    is_fallback: bool = False
 
 
 @dataclass
 class ExcelSheet:
-    """Individual sheet within an Excel report."""
+    """Individual sheet within an Excel report.
+
+    ``data`` may be any iterable of row dicts, or of tuples (for example a
+    storage cursor) when ``columns`` names the header.
+    """
     name: str
     data: List[Dict[str, Any]]
     formatting: Dict[str, Any]
     charts: List[Dict[str, Any]]
+    columns: Optional[List[str]] = None
+
+
+@dataclass
+class ReportJob:
+    """Background Excel report generation job."""
+    job_id: str
+    fingerprint: str
+    subject_type: str  # document, conversation
+    subject_id: str
+    report_type: str
+    status: str = "queued"  # queued, running, completed, failed
+    report_id: Optional[str] = None
+    reused: bool = False
+    error_message: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+    completed_at: Optional[datetime] = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert report job to dictionary for storage."""
+        return {
+            'job_id': self.job_id,
+            'fingerprint': self.fingerprint,
+            'subject_type': self.subject_type,
+            'subject_id': self.subject_id,
+            'report_type': self.report_type,
+            'status': self.status,
+            'report_id': self.report_id,
+            'reused': self.reused,
+            'error_message': self.error_message,
+            'created_at': self.created_at.isoformat(),
+            'completed_at': self.completed_at.isoformat() if self.completed_at else None
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'ReportJob':
+        """Create report job from dictionary."""
+        return cls(
+            job_id=data['job_id'],
+            fingerprint=data['fingerprint'],
+            subject_type=data['subject_type'],
+            subject_id=data['subject_id'],
+            report_type=data['report_type'],
+            status=data.get('status', 'queued'),
+            report_id=data.get('report_id'),
+            reused=bool(data.get('reused', False)),
+            error_message=data.get('error_message'),
+            created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else datetime.now(),
+            completed_at=datetime.fromisoformat(data['completed_at']) if data.get('completed_at') else None
+        )
 
 
 @dataclass
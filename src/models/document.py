@@ -2,7 +2,7 @@
 
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Tuple
 import json
 
 
@@ -22,6 +22,8 @@ class Document:
     analysis: Optional[str] = None
     summary: Optional[str] = None
     embeddings: Optional[List[float]] = None
+    text_encoding: Optional[str] = None  # Detected encoding of TXT uploads
+    sections: Optional[List[Dict[str, Any]]] = None  # Section tree of DOCX uploads, with text offsets
     created_at: datetime = field(default_factory=datetime.now)
     updated_at: datetime = field(default_factory=datetime.now)
     # Enhanced fields for legal documents
@@ -45,6 +47,8 @@ class Document:
             'extracted_info': json.dumps(self.extracted_info) if self.extracted_info else None,
             'analysis': self.analysis,
             'summary': self.summary,
+            'text_encoding': self.text_encoding,
+            'sections': json.dumps(self.sections) if self.sections else None,
             'created_at': self.created_at.isoformat(),
             'updated_at': self.updated_at.isoformat(),
             'is_legal_document': self.is_legal_document,
@@ -69,6 +73,8 @@ class Document:
             extracted_info=json.loads(data['extracted_info']) if data.get('extracted_info') else None,
             analysis=data.get('analysis'),
             summary=data.get('summary'),
+            text_encoding=data.get('text_encoding'),
+            sections=json.loads(data['sections']) if data.get('sections') else None,
             created_at=datetime.fromisoformat(data['created_at']) if data.get('created_at') else datetime.now(),
             updated_at=datetime.fromisoformat(data['updated_at']) if data.get('updated_at') else datetime.now(),
             is_legal_document=data.get('is_legal_document', False),
@@ -79,6 +85,14 @@ class Document:
         )
 
 
+@dataclass
+class DocumentPage:
+    """One page of document summaries and the keyset cursor of the page after it."""
+    
+    documents: List[Document]
+    next_cursor: Optional[Tuple[Any, str]] = None  # (sort value, id) of the last row; None on the last page
+
+
 @dataclass
 class ProcessingJob:
     """Processing job model for tracking document processing."""
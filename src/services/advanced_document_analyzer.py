@@ -155,26 +155,29 @@ class AdvancedDocumentAnalyzer:
         try:
             logger.info(f"Starting advanced analysis for document {document.id}")
             
+            # Flatten the section tree once; every pattern match below is located in it
+            sections = self._document_sections(document)
+            
             # Parse document structure
-            document_structure = self._parse_document_structure(document)
+            document_structure = self._parse_document_structure(document, sections)
             
             # Find cross-references
             cross_references = self._find_cross_references(document, document_structure)
             
             # Identify exhibit references
-            exhibit_references = self._identify_exhibit_references(document)
+            exhibit_references = self._identify_exhibit_references(document, sections)
             
             # Extract timeline events
             timeline_events = self._extract_timeline_events(document)
             
             # Map party obligations
-            party_obligations = self._map_party_obligations(document)
+            party_obligations = self._map_party_obligations(document, sections)
             
             # Generate risk matrix
-            risk_matrix = self._generate_risk_matrix(document)
+            risk_matrix = self._generate_risk_matrix(document, sections)
             
             # Identify compliance requirements
-            compliance_requirements = self._identify_compliance_requirements(document)
+            compliance_requirements = self._identify_compliance_requirements(document, sections)
             
             # Analyze key relationships
             key_relationships = self._analyze_key_relationships(
@@ -211,7 +214,8 @@ class AdvancedDocumentAnalyzer:
                 key_relationships=[]
             )
     
-    def _parse_document_structure(self, document: Document) -> Dict[str, Any]:
+    def _parse_document_structure(self, document: Document,
+                                  sections: Optional[List[Dict]] = None) -> Dict[str, Any]:
         """Parse document structure and identify sections"""
         structure = {
             'sections': [],
@@ -221,20 +225,24 @@ class AdvancedDocumentAnalyzer:
             'total_sections': 0
         }
         
-        content = document.content
+        content = self._document_text(document)
         
-        # Find sections
-        for pattern_name, pattern in self.section_patterns.items():
-            matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                section_info = {
-                    'type': pattern_name,
-                    'number': match.group(1) if match.groups() else None,
-                    'title': match.group(2) if len(match.groups()) > 1 else None,
-                    'start_pos': match.start(),
-                    'text': match.group(0)
-                }
-                structure['sections'].append(section_info)
+        # Use the section tree recorded at extraction when there is one
+        structure['sections'] = list(sections) if sections is not None else self._document_sections(document)
+        
+        # Otherwise find sections
+        if not structure['sections']:
+            for pattern_name, pattern in self.section_patterns.items():
+                matches = re.finditer(pattern, content, re.IGNORECASE | re.MULTILINE)
+                for match in matches:
+                    section_info = {
+                        'type': pattern_name,
+                        'number': match.group(1) if match.groups() else None,
+                        'title': match.group(2) if len(match.groups()) > 1 else None,
+                        'start_pos': match.start(),
+                        'text': match.group(0)
+                    }
+                    structure['sections'].append(section_info)
         
         structure['total_sections'] = len(structure['sections'])
         
@@ -276,7 +284,7 @@ class AdvancedDocumentAnalyzer:
     ) -> List[CrossReference]:
         """Find cross-references between document sections"""
         cross_refs = []
-        content = document.content
+        content = self._document_text(document)
         
         # Direct section references
         reference_patterns = [
@@ -355,10 +363,13 @@ class AdvancedDocumentAnalyzer:
         
         return cross_refs
     
-    def _identify_exhibit_references(self, document: Document) -> List[ExhibitReference]:
+    def _identify_exhibit_references(self, document: Document,
+                                     sections: Optional[List[Dict]] = None) -> List[ExhibitReference]:
         """Identify and analyze exhibit references"""
+        if sections is None:
+            sections = self._document_sections(document)
         exhibits = []
-        content = document.content
+        content = self._document_text(document)
         
         # Find exhibit definitions
         exhibit_patterns = [
@@ -388,7 +399,7 @@ class AdvancedDocumentAnalyzer:
             
             for match in matches:
                 # Find the section containing this reference
-                section = self._find_containing_section(match.start(), [])
+                section = self._find_containing_section(match.start(), sections)
                 if section:
                     exhibit_map[exhibit_id]['references'].append(section)
         
@@ -417,7 +428,7 @@ class AdvancedDocumentAnalyzer:
     def _extract_timeline_events(self, document: Document) -> List[TimelineEvent]:
         """Extract timeline events and deadlines from document"""
         events = []
-        content = document.content
+        content = self._document_text(document)
         
         # Date patterns
         absolute_date_patterns = [
@@ -503,10 +514,13 @@ class AdvancedDocumentAnalyzer:
         
         return events
     
-    def _map_party_obligations(self, document: Document) -> Dict[str, List[PartyObligation]]:
+    def _map_party_obligations(self, document: Document,
+                               sections: Optional[List[Dict]] = None) -> Dict[str, List[PartyObligation]]:
         """Map obligations to specific parties"""
+        if sections is None:
+            sections = self._document_sections(document)
         obligations_by_party = {}
-        content = document.content
+        content = self._document_text(document)
         
         # Extract party names
         parties = self._extract_party_names(content)
@@ -573,7 +587,7 @@ class AdvancedDocumentAnalyzer:
                         deadline=deadline,
                         conditions=conditions,
                         consequences=consequences,
-                        section_reference=self._find_containing_section(match.start(), []) or "Unknown",
+                        section_reference=self._find_containing_section(match.start(), sections) or "Unknown",
                         priority=priority
                     )
                     
@@ -586,10 +600,13 @@ class AdvancedDocumentAnalyzer:
         
         return obligations_by_party
     
-    def _generate_risk_matrix(self, document: Document) -> List[RiskMatrixEntry]:
+    def _generate_risk_matrix(self, document: Document,
+                              sections: Optional[List[Dict]] = None) -> List[RiskMatrixEntry]:
         """Generate comprehensive risk assessment matrix"""
+        if sections is None:
+            sections = self._document_sections(document)
         risks = []
-        content = document.content.lower()
+        content = self._document_text(document).lower()
         
         # Risk categories and their indicators
         risk_categories = {
@@ -656,7 +673,7 @@ class AdvancedDocumentAnalyzer:
                     pattern = re.escape(indicator)
                     matches = re.finditer(pattern, content, re.IGNORECASE)
                     for match in matches:
-                        section = self._find_containing_section(match.start(), [])
+                        section = self._find_containing_section(match.start(), sections)
                         if section and section not in section_refs:
                             section_refs.append(section)
             
@@ -705,10 +722,13 @@ class AdvancedDocumentAnalyzer:
         
         return risks
     
-    def _identify_compliance_requirements(self, document: Document) -> List[ComplianceRequirement]:
+    def _identify_compliance_requirements(self, document: Document,
+                                          sections: Optional[List[Dict]] = None) -> List[ComplianceRequirement]:
         """Identify compliance requirements and regulatory obligations"""
+        if sections is None:
+            sections = self._document_sections(document)
         requirements = []
-        content = document.content.lower()
+        content = self._document_text(document).lower()
         
         # Compliance frameworks and their indicators
         frameworks = {
@@ -755,7 +775,7 @@ class AdvancedDocumentAnalyzer:
                     pattern = re.escape(indicator)
                     matches = re.finditer(pattern, content, re.IGNORECASE)
                     for match in matches:
-                        section = self._find_containing_section(match.start(), [])
+                        section = self._find_containing_section(match.start(), sections)
                         if section and section not in applicable_sections:
                             applicable_sections.append(section)
             
@@ -900,19 +920,50 @@ class AdvancedDocumentAnalyzer:
             'FDA', 'EPA', 'FTC', 'SEC', 'COSO', 'ISO 27001', 'PCI DSS'
         ]
     
+    def _document_text(self, document: Document) -> str:
+        """Get the text of a document"""
+        return getattr(document, 'content', None) or getattr(document, 'original_text', None) or ''
+    
+    def _document_sections(self, document: Document) -> List[Dict]:
+        """Flatten the section tree recorded at extraction, parents before their children"""
+        flattened = []
+        pending = list(reversed(getattr(document, 'sections', None) or []))
+        while pending:
+            section = pending.pop()
+            flattened.append({
+                'type': 'heading',
+                'number': section.get('number'),
+                'title': section.get('title'),
+                'level': section.get('level'),
+                'start_pos': section.get('start_offset', 0),
+                'end_pos': section.get('end_offset', 0),
+                'text': section.get('title')
+            })
+            pending.extend(reversed(section.get('children', [])))
+        return flattened
+    
     def _find_containing_section(self, position: int, sections: List[Dict]) -> Optional[str]:
         """Find the section containing a given position in the document"""
+        structured = [section for section in sections if 'end_pos' in section]
+        if structured:
+            # Children follow their parents, so the last match is the innermost section
+            containing = [section for section in structured if section['start_pos'] <= position <= section['end_pos']]
+            return self._get_section_identifier(containing[-1]) if containing else None
         # Simple implementation - would need document structure for full implementation
         return f"Section {position // 1000 + 1}"  # Rough approximation
     
     def _get_section_text(self, section: Dict, content: str) -> str:
         """Get the text content of a section"""
         start_pos = section.get('start_pos', 0)
+        if 'end_pos' in section:
+            return content[start_pos:section['end_pos']]
         # Simple implementation - extract next 500 characters
         return content[start_pos:start_pos + 500]
     
     def _get_section_identifier(self, section: Dict) -> str:
         """Get a string identifier for a section"""
+        if section.get('type') == 'heading':
+            return " ".join(part for part in (section.get('number'), section.get('title')) if part)
         section_type = section.get('type', 'Section')
         section_number = section.get('number', 'Unknown')
         return f"{section_type} {section_number}"
@@ -15,6 +15,7 @@ from enum import Enum
 from src.models.enhanced import EnhancedResponse, ResponseType, ToneType
 from src.models.document import Document
 from src.utils.logging_config import get_logger
+from src.utils.tracing import traced
 
 logger = get_logger(__name__)
 
@@ -97,6 +98,7 @@ class AnswerQualityEnhancer:
         self.compliance_frameworks = self._initialize_compliance_frameworks()
         self.example_templates = self._initialize_example_templates()
         
+    @traced("quality_enhancer.enhance_response_quality")
     def enhance_response_quality(
         self,
         response: EnhancedResponse,
@@ -0,0 +1,386 @@
+"""
+Offline bulk ingestion of a directory of documents.
+
+Text is extracted in a process pool with the same ``TextExtractor`` the
+upload page uses, reading each file from its path, so files up to
+``MAX_INGEST_FILE_SIZE_MB`` are accepted. Files are deduplicated by content hash, stored in
+batched transactions and queued on a ``WorkflowManager`` whose worker count
+bounds how many documents are processed at once. Every file handled is
+recorded in a JSON-lines manifest, so an interrupted run can be resumed
+without re-reading or re-storing what it already did.
+"""
+
+import hashlib
+import json
+import os
+import time
+import uuid
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set
+
+from src.models.document import Document
+from src.services.pdf_extraction import PdfPageExtractor
+from src.services.text_extraction import SUPPORTED_EXTENSIONS, TextExtractor
+from src.storage.document_storage import DocumentStorage
+from src.workflow.workflow_manager import WorkflowManager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+MANIFEST_FILENAME = ".ingest_manifest.jsonl"
+# Manifest statuses that need no further work on a resumed run
+DONE_STATUSES = ("ingested", "duplicate")
+# Document statuses left behind by an interrupted processing run
+UNFINISHED_PROCESSING_STATUSES = ("pending", "processing")
+
+_extractor: Optional[TextExtractor] = None
+
+
+@dataclass
+class ExtractedFile:
+    """Result of reading and extracting one file in a worker process"""
+    path: str
+    size: int
+    mtime_ns: int
+    sha256: str = ""
+    text: str = ""
+    error: Optional[str] = None
+    encoding: Optional[str] = None
+    sections: List[Dict] = field(default_factory=list)
+
+
+def extract_file(path: str) -> ExtractedFile:
+    """Hash a file and extract its text; runs in the extraction worker processes."""
+    global _extractor
+    if _extractor is None:
+        # Files are already extracted in parallel, so PDFs are read one page at a time
+        _extractor = TextExtractor(PdfPageExtractor(workers=1))
+
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError as e:
+        return ExtractedFile(path, 0, 0, error=f"Could not read file: {e}")
+
+    result = _extractor.extract(path)
+    return ExtractedFile(path, result.size, mtime_ns, result.sha256, result.text, result.error, result.encoding,
+                         [section.to_dict() for section in result.sections])
+
+
+def text_fingerprint(text: str) -> str:
+    """Hash of the text with whitespace normalized, to catch the same document in another format"""
+    return hashlib.sha256(" ".join(text.split()).encode("utf-8")).hexdigest()
+
+
+class IngestionManifest:
+    """
+    Append-only JSON-lines record of the files an ingestion run has handled.
+
+    Later lines for a path replace earlier ones, so retries simply append.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.entries: Dict[str, Dict] = {}
+        if os.path.exists(path):
+            with open(path, encoding="utf-8") as file:
+                for line in file:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        # A line cut short by an interrupted run
+                        logger.warning(f"Skipping unreadable manifest line in {path}")
+                        continue
+                    self.entries[entry["path"]] = entry
+
+    def is_done(self, path: str, size: int, mtime_ns: int) -> bool:
+        """Whether ``path`` was stored (or found to be a duplicate) and has not changed since"""
+        entry = self.entries.get(path)
+        return (
+            entry is not None
+            and entry.get("status") in DONE_STATUSES
+            and entry.get("size") == size
+            and entry.get("mtime_ns") == mtime_ns
+        )
+
+    def ingested_entries(self) -> List[Dict]:
+        return [entry for entry in self.entries.values() if entry.get("status") == "ingested"]
+
+    def record(self, entries: List[Dict]) -> None:
+        """Append entries; called only after the documents they name are committed"""
+        if not entries:
+            return
+        with open(self.path, "a", encoding="utf-8") as file:
+            for entry in entries:
+                file.write(json.dumps(entry) + "\n")
+            file.flush()
+            os.fsync(file.fileno())
+        for entry in entries:
+            self.entries[entry["path"]] = entry
+
+
+@dataclass
+class IngestionStats:
+    """Counters and throughput for one ingestion run"""
+    files_found: int = 0
+    already_ingested: int = 0
+    extracted: int = 0
+    failed: int = 0
+    duplicates: int = 0
+    stored: int = 0
+    queued: int = 0
+    resubmitted: int = 0
+    processed: int = 0
+    processing_failed: int = 0
+    bytes_read: int = 0
+    started: float = field(default_factory=time.monotonic)
+    extraction_seconds: float = 0.0
+    processing_seconds: float = 0.0
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def extraction_rate(self) -> str:
+        seconds = self.extraction_seconds or self.elapsed
+        handled = self.extracted + self.failed
+        return (
+            f"{handled / seconds if seconds else 0.0:.1f} files/s, "
+            f"{self.bytes_read / (1024 * 1024) / seconds if seconds else 0.0:.2f} MB/s"
+        )
+
+    def to_dict(self) -> Dict:
+        data = asdict(self)
+        data.pop("started")
+        data["elapsed_seconds"] = round(self.elapsed, 3)
+        return data
+
+
+class BulkIngestor:
+    """Walks a directory and ingests every supported file it finds."""
+
+    def __init__(
+        self,
+        storage: Optional[DocumentStorage] = None,
+        workflow_manager: Optional[WorkflowManager] = None,
+        extraction_workers: Optional[int] = None,
+        batch_size: int = 200,
+        progress: Optional[Callable[[str], None]] = None
+    ):
+        self.storage = storage or DocumentStorage()
+        self.workflow_manager = workflow_manager
+        self.extraction_workers = extraction_workers if extraction_workers is not None else (os.cpu_count() or 1)
+        self.batch_size = max(1, batch_size)
+        self.progress = progress or (lambda message: logger.info(message))
+        self.supported_extensions = SUPPORTED_EXTENSIONS
+
+    def discover(self, directory: str, recursive: bool = True) -> List[str]:
+        """Supported files under ``directory``, in a stable order."""
+        paths = []
+        for root, dirs, files in os.walk(directory):
+            dirs.sort()
+            for name in sorted(files):
+                if name.lower().endswith(self.supported_extensions):
+                    paths.append(os.path.abspath(os.path.join(root, name)))
+            if not recursive:
+                break
+        return paths
+
+    def ingest(self, directory: str, api_key: Optional[str] = None, process: bool = True,
+               manifest_path: Optional[str] = None, recursive: bool = True) -> IngestionStats:
+        """
+        Ingest a directory, optionally queueing the documents for AI processing.
+
+        Args:
+            directory: Directory to walk
+            api_key: Gemini API key used for processing
+            process: Queue stored documents on the workflow manager and wait for them
+            manifest_path: Progress manifest; defaults to a file inside ``directory``
+            recursive: Include subdirectories
+
+        Returns:
+            Counters and timings for the run
+        """
+        if not os.path.isdir(directory):
+            raise ValueError(f"Not a directory: {directory}")
+        if process and (self.workflow_manager is None or not api_key):
+            raise ValueError("Processing needs a workflow manager and a Gemini API key")
+
+        stats = IngestionStats()
+        manifest = IngestionManifest(manifest_path or os.path.join(directory, MANIFEST_FILENAME))
+
+        paths = self.discover(directory, recursive)
+        stats.files_found = len(paths)
+        pending = [path for path in paths if not self._unchanged_since_manifest(manifest, path)]
+        stats.already_ingested = len(paths) - len(pending)
+        self.progress(
+            f"Found {stats.files_found} files; {stats.already_ingested} already ingested, "
+            f"{len(pending)} to extract with {max(1, self.extraction_workers)} process(es)"
+        )
+
+        if process:
+            stats.resubmitted = self._resubmit_unfinished(manifest, api_key)
+            if stats.resubmitted:
+                self.progress(f"Re-queued {stats.resubmitted} documents left unprocessed by an earlier run")
+
+        self._store_files(self._extract_all(pending), manifest, stats, api_key, process)
+        stats.extraction_seconds = stats.elapsed
+        self.progress(
+            f"Extraction done: {stats.stored} stored, {stats.duplicates} duplicates, "
+            f"{stats.failed} failed ({stats.extraction_rate()})"
+        )
+
+        if process and (stats.queued or stats.resubmitted):
+            self._wait_for_processing(manifest, stats)
+
+        return stats
+
+    def _unchanged_since_manifest(self, manifest: IngestionManifest, path: str) -> bool:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        return manifest.is_done(path, stat.st_size, stat.st_mtime_ns)
+
+    def _extract_all(self, paths: List[str]) -> Iterator[ExtractedFile]:
+        """Extraction results as they complete, with a bounded number of files in flight"""
+        if self.extraction_workers <= 1:
+            for path in paths:
+                yield extract_file(path)
+            return
+
+        executor = ProcessPoolExecutor(max_workers=self.extraction_workers)
+        remaining = iter(paths)
+        in_flight: Set[Future] = set()
+        try:
+            for path in remaining:
+                in_flight.add(executor.submit(extract_file, path))
+                if len(in_flight) >= self.extraction_workers * 4:
+                    break
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+                    next_path = next(remaining, None)
+                    if next_path is not None:
+                        in_flight.add(executor.submit(extract_file, next_path))
+        finally:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def _store_files(self, results: Iterable[ExtractedFile], manifest: IngestionManifest,
+                     stats: IngestionStats, api_key: Optional[str], process: bool) -> None:
+        """Deduplicate extraction results and store them in batches"""
+        # Hashes of content already stored, mapped to the document holding it
+        known: Dict[str, str] = {}
+        for entry in manifest.ingested_entries():
+            for key in ("sha256", "text_sha256"):
+                if entry.get(key):
+                    known[entry[key]] = entry["document_id"]
+
+        documents: List[Document] = []
+        entries: List[Dict] = []
+        for result in results:
+            stats.bytes_read += result.size
+            entry = {
+                "path": result.path,
+                "size": result.size,
+                "mtime_ns": result.mtime_ns,
+                "sha256": result.sha256,
+                "recorded_at": datetime.now().isoformat()
+            }
+
+            if result.error:
+                stats.failed += 1
+                entries.append({**entry, "status": "failed", "error": result.error})
+                logger.warning(f"Extraction failed for {result.path}: {result.error}")
+            else:
+                stats.extracted += 1
+                text_sha256 = text_fingerprint(result.text)
+                duplicate_of = known.get(result.sha256) or known.get(text_sha256)
+                if duplicate_of:
+                    stats.duplicates += 1
+                    entries.append({**entry, "status": "duplicate", "duplicate_of": duplicate_of})
+                else:
+                    document = Document(
+                        id=str(uuid.uuid4()),
+                        title=os.path.basename(result.path),
+                        file_type=os.path.splitext(result.path)[1].lower().lstrip("."),
+                        file_size=result.size,
+                        upload_timestamp=datetime.now(),
+                        original_text=result.text,
+                        text_encoding=result.encoding,
+                        sections=result.sections or None
+                    )
+                    known[result.sha256] = known[text_sha256] = document.id
+                    documents.append(document)
+                    entries.append({**entry, "status": "ingested", "text_sha256": text_sha256,
+                                    "document_id": document.id})
+
+            if len(documents) >= self.batch_size or len(entries) >= self.batch_size * 4:
+                self._flush(documents, entries, manifest, stats, api_key, process)
+                documents, entries = [], []
+
+        self._flush(documents, entries, manifest, stats, api_key, process)
+
+    def _flush(self, documents: List[Document], entries: List[Dict], manifest: IngestionManifest,
+               stats: IngestionStats, api_key: Optional[str], process: bool) -> None:
+        """Store one batch in a single transaction, then record it in the manifest"""
+        if documents:
+            if process:
+                job_ids = self.workflow_manager.submit_documents_for_processing(documents, api_key)
+                stats.queued += len(job_ids)
+            else:
+                self.storage.create_documents(documents)
+            stats.stored += len(documents)
+        manifest.record(entries)
+
+        if documents:
+            handled = stats.extracted + stats.failed
+            self.progress(
+                f"  {handled + stats.already_ingested}/{stats.files_found} files | "
+                f"{stats.stored} stored, {stats.duplicates} duplicates, {stats.failed} failed | "
+                f"{stats.extraction_rate()}"
+            )
+
+    def _resubmit_unfinished(self, manifest: IngestionManifest, api_key: str) -> int:
+        """Queue documents from earlier runs whose processing never finished"""
+        document_ids = [entry["document_id"] for entry in manifest.ingested_entries()]
+        if not document_ids:
+            return 0
+        statuses = self.storage.get_processing_statuses(document_ids)
+        unfinished = [
+            document_id for document_id, status in statuses.items()
+            if status in UNFINISHED_PROCESSING_STATUSES
+        ]
+        documents = [document for document in map(self.storage.get_document, unfinished) if document]
+        for start in range(0, len(documents), self.batch_size):
+            self.workflow_manager.resubmit_documents(documents[start:start + self.batch_size], api_key)
+        return len(documents)
+
+    def _wait_for_processing(self, manifest: IngestionManifest, stats: IngestionStats,
+                             poll_seconds: float = 5.0) -> None:
+        """Block until the workflow manager drains its queue, reporting progress"""
+        started = time.monotonic()
+        total = stats.queued + stats.resubmitted
+        self.progress(f"Processing {total} documents with {self.workflow_manager.max_workers} concurrent worker(s)")
+
+        while not self.workflow_manager.is_idle():
+            time.sleep(poll_seconds)
+            remaining = self.workflow_manager.job_queue.unfinished_tasks
+            done = total - remaining
+            elapsed = time.monotonic() - started
+            self.progress(f"  processed {done}/{total} | {done / elapsed if elapsed else 0.0:.2f} documents/s")
+
+        stats.processing_seconds = time.monotonic() - started
+        document_ids = [entry["document_id"] for entry in manifest.ingested_entries()]
+        statuses = self.storage.get_processing_statuses(document_ids)
+        stats.processed = sum(1 for status in statuses.values() if status == "completed")
+        stats.processing_failed = sum(1 for status in statuses.values() if status == "failed")
+        self.progress(
+            f"Processing done in {stats.processing_seconds:.1f}s: "
+            f"{stats.processed} completed, {stats.processing_failed} failed"
+        )
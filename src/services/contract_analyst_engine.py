@@ -6,10 +6,12 @@ from typing import Dict, Any, List, Optional, Tuple
 from dataclasses import dataclass, field
 from datetime import datetime
 
-from src.services.qa_engine import QAEngine
+from src.services.qa_engine import GENERATION_ERROR, AnswerStream, QAEngine
+from src.services.llm_usage import usage_scoped
 from src.models.document import Document, QASession
 from src.storage.document_storage import DocumentStorage
 from src.utils.logging_config import get_logger
+from src.utils.tracing import traced
 from src.utils.error_handling import QAError
 
 logger = get_logger(__name__)
@@ -25,6 +27,8 @@ class ContractAnalysisResponse:
     confidence: float = 0.0
     document_type: str = "unknown"
     legal_terms_found: List[str] = field(default_factory=list)
+    # Set when the structured analysis failed, so the response is not cached
+    error: Optional[str] = None
 
 
 @dataclass
@@ -68,6 +72,7 @@ class ContractAnalystEngine(QAEngine):
     
     def __init__(self, storage: DocumentStorage, api_key: str):
         super().__init__(storage, api_key)
+        self.llm_client.component = "contract_analyst"
         self.contract_prompt_template = self._get_contract_analysis_prompt()
     
     def detect_legal_document(self, document: Document) -> Tuple[bool, Optional[str], float]:
@@ -145,6 +150,7 @@ class ContractAnalystEngine(QAEngine):
         
         return legal_terms
     
+    @traced("retrieval.find_legal_context")
     def find_legal_context(self, question: str, document: Document) -> List[Dict[str, Any]]:
         """
         Find relevant context with legal term weighting.
@@ -201,6 +207,7 @@ class ContractAnalystEngine(QAEngine):
         base_context.sort(key=lambda x: x['relevance_score'], reverse=True)
         return base_context
     
+    @traced("contract_engine.generate_contract_analysis")
     def generate_contract_analysis(self, question: str, context_sections: List[Dict[str, Any]], document: Document) -> ContractAnalysisResponse:
         """
         Generate structured contract analysis using specialized prompts.
@@ -216,56 +223,63 @@ class ContractAnalystEngine(QAEngine):
         # Detect document type if not already done
         is_legal, doc_type, confidence = self.detect_legal_document(document)
         
-        # Prepare context for the prompt
-        context_text = "\n\n".join([
-            f"**{section['source']}:**\n{section['text']}"
-            for section in context_sections
-        ])
-        
-        # Use contract-specific prompt
-        prompt = self.contract_prompt_template.format(
-            document_title=document.title,
-            document_type=doc_type or document.document_type or 'Legal Document',
-            context_text=context_text,
-            question=question
-        )
+        prompt = self._build_contract_prompt(question, context_sections, document, doc_type)
         
         try:
             # Generate response using Gemini API
             raw_response = self._call_gemini_api(prompt, max_tokens=800)
-            
-            # Parse structured response
-            structured_response = self.format_structured_response(raw_response)
-            
-            # Extract sources and legal terms
-            sources = self._extract_sources(context_sections)
-            legal_terms = []
-            for section in context_sections:
-                legal_terms.extend(section.get('legal_terms_found', []))
-            
-            return ContractAnalysisResponse(
-                direct_evidence=structured_response['direct_evidence'],
-                plain_explanation=structured_response['plain_explanation'],
-                implication_analysis=structured_response.get('implication_analysis'),
-                sources=sources,
-                confidence=confidence,
-                document_type=doc_type or 'Legal Document',
-                legal_terms_found=list(set(legal_terms))
-            )
+            return self._build_contract_analysis(raw_response, context_sections, doc_type, confidence)
             
         except Exception as e:
             logger.error(f"Error generating contract analysis: {e}")
-            # Fallback to standard analysis
+            # Fallback to standard analysis; a degraded answer (or the apology) is never cached
             fallback_answer = self.generate_answer(question, context_sections, document)
             return ContractAnalysisResponse(
                 direct_evidence=fallback_answer,
                 plain_explanation="Analysis could not be structured due to processing error.",
                 implication_analysis=None,
                 sources=self._extract_sources(context_sections),
-                confidence=0.5,
-                document_type=doc_type or 'Legal Document'
+                confidence=0.0,
+                document_type=doc_type or 'Legal Document',
+                error=GENERATION_ERROR
             )
     
+    def _build_contract_prompt(self, question: str, context_sections: List[Dict[str, Any]],
+                               document: Document, doc_type: Optional[str]) -> str:
+        """Fill the contract analysis prompt with the question and legal context."""
+        context_text = "\n\n".join([
+            f"**{section['source']}:**\n{section['text']}"
+            for section in context_sections
+        ])
+        
+        return self.contract_prompt_template.format(
+            document_title=document.title,
+            document_type=doc_type or document.document_type or 'Legal Document',
+            context_text=context_text,
+            question=question
+        )
+    
+    def _build_contract_analysis(self, raw_response: str, context_sections: List[Dict[str, Any]],
+                                 doc_type: Optional[str], confidence: float) -> ContractAnalysisResponse:
+        """Parse a raw model response into a structured contract analysis."""
+        structured_response = self.format_structured_response(raw_response)
+        
+        # Extract sources and legal terms
+        sources = self._extract_sources(context_sections)
+        legal_terms = []
+        for section in context_sections:
+            legal_terms.extend(section.get('legal_terms_found', []))
+        
+        return ContractAnalysisResponse(
+            direct_evidence=structured_response['direct_evidence'],
+            plain_explanation=structured_response['plain_explanation'],
+            implication_analysis=structured_response.get('implication_analysis'),
+            sources=sources,
+            confidence=confidence,
+            document_type=doc_type or 'Legal Document',
+            legal_terms_found=list(set(legal_terms))
+        )
+    
     def format_structured_response(self, raw_response: str) -> Dict[str, str]:
         """
         Parse AI response into structured three-part format.
@@ -356,6 +370,10 @@ class ContractAnalystEngine(QAEngine):
         
         return response_parts
     
+    @traced("contract_engine.answer_question", lambda self, question, document_id, *args, **kwargs: {"document_id": document_id})
+    @usage_scoped(lambda self, question, document_id, session_id=None: {
+        "document_id": document_id, "session_id": session_id, "operation": "answer_question"
+    })
     def answer_question(self, question: str, document_id: str, session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Enhanced answer_question that uses contract analysis for legal documents.
@@ -383,6 +401,12 @@ class ContractAnalystEngine(QAEngine):
             is_legal, doc_type, legal_confidence = self.detect_legal_document(document)
             
             if is_legal:
+                cached = self._lookup_cached_answer(question, document, kind="contract_answer")
+                if cached:
+                    if session_id:
+                        self.storage.add_qa_interaction(session_id, question, cached['answer'], cached['sources'])
+                    return cached
+                
                 # Use contract analysis mode
                 context_sections = self.find_legal_context(question, document)
                 
@@ -406,20 +430,9 @@ class ContractAnalystEngine(QAEngine):
                 if session_id:
                     self.storage.add_qa_interaction(session_id, question, formatted_answer, analysis.sources)
                 
-                return {
-                    'answer': formatted_answer,
-                    'sources': analysis.sources,
-                    'confidence': analysis.confidence,
-                    'document_title': document.title,
-                    'document_type': analysis.document_type,
-                    'analysis_mode': 'contract',
-                    'legal_terms_found': analysis.legal_terms_found,
-                    'structured_response': {
-                        'direct_evidence': analysis.direct_evidence,
-                        'plain_explanation': analysis.plain_explanation,
-                        'implication_analysis': analysis.implication_analysis
-                    }
-                }
+                result = self._contract_result(analysis, formatted_answer, document)
+                self._store_cached_answer(question, document, result, kind="contract_answer")
+                return result
             else:
                 # Fall back to standard Q&A mode
                 result = super().answer_question(question, document_id, session_id)
@@ -436,6 +449,98 @@ class ContractAnalystEngine(QAEngine):
                 'analysis_mode': 'error'
             }
     
+    @usage_scoped(lambda self, question, document_id, session_id=None: {
+        "document_id": document_id, "session_id": session_id, "operation": "answer_question"
+    })
+    def stream_answer(self, question: str, document_id: str, session_id: Optional[str] = None) -> AnswerStream:
+        """
+        Streaming counterpart of ``answer_question``.
+        
+        For legal documents the raw analysis text streams as it is generated
+        and is parsed into the structured three-part response once complete;
+        other documents use the standard streaming Q&A path.
+        """
+        try:
+            document = self.storage.get_document_with_embeddings(document_id)
+            if not document:
+                return AnswerStream.from_result({
+                    'answer': "Sorry, I couldn't find that document or it hasn't been processed yet.",
+                    'sources': [],
+                    'confidence': 0.0,
+                    'error': 'Document not found or not processed'
+                })
+            
+            is_legal, doc_type, legal_confidence = self.detect_legal_document(document)
+            if not is_legal:
+                stream = super().stream_answer(question, document_id, session_id)
+                stream.result_fields['analysis_mode'] = 'standard'
+                return stream
+            
+            cached = self._lookup_cached_answer(question, document, kind="contract_answer")
+            if cached:
+                if session_id:
+                    self.storage.add_qa_interaction(session_id, question, cached['answer'], cached['sources'])
+                return AnswerStream.from_result(cached)
+            
+            context_sections = self.find_legal_context(question, document)
+            if not context_sections:
+                return AnswerStream.from_result({
+                    'answer': "I couldn't find relevant information in the legal document to answer your question.",
+                    'sources': [],
+                    'confidence': 0.2,
+                    'error': 'No relevant context found',
+                    'analysis_mode': 'contract',
+                    'document_type': doc_type
+                })
+            
+            prompt = self._build_contract_prompt(question, context_sections, document, doc_type)
+            chunks = self._stream_gemini_api(prompt, max_tokens=800)
+            
+        except Exception as e:
+            logger.error(f"Error in contract analysis: {e}")
+            return AnswerStream.from_result({
+                'answer': "I'm sorry, I encountered an error while analyzing this legal document. Please try again.",
+                'sources': [],
+                'confidence': 0.0,
+                'error': str(e),
+                'analysis_mode': 'error'
+            })
+        
+        def finalize(raw_response: str) -> Dict[str, Any]:
+            analysis = self._build_contract_analysis(raw_response, context_sections, doc_type, legal_confidence)
+            formatted_answer = self._format_contract_response(analysis)
+            if session_id:
+                self.storage.add_qa_interaction(session_id, question, formatted_answer, analysis.sources)
+            
+            result = self._contract_result(analysis, formatted_answer, document)
+            self._store_cached_answer(question, document, result, kind="contract_answer")
+            return result
+        
+        return AnswerStream(chunks, finalize)
+    
+    def _contract_result(self, analysis: ContractAnalysisResponse, formatted_answer: str,
+                         document: Document) -> Dict[str, Any]:
+        """Result dictionary for a structured contract analysis."""
+        result = {
+            'answer': formatted_answer,
+            'sources': analysis.sources,
+            'confidence': analysis.confidence,
+            'document_title': document.title,
+            'document_type': analysis.document_type,
+            'analysis_mode': 'contract',
+            'legal_terms_found': analysis.legal_terms_found,
+            'structured_response': {
+                'direct_evidence': analysis.direct_evidence,
+                'plain_explanation': analysis.plain_explanation,
+                'implication_analysis': analysis.implication_analysis
+            }
+        }
+        if analysis.error:
+            result['error'] = analysis.error
+        return result
+    
+    @traced("contract_engine.analyze_question", lambda self, question, document_id, *args, **kwargs: {"document_id": document_id})
+    @usage_scoped(lambda self, question, document_id: {"document_id": document_id, "operation": "analyze_question"})
     def analyze_question(self, question: str, document_id: str) -> Dict[str, Any]:
         """
         Analyze a question for the enhanced response router.
@@ -459,6 +564,10 @@ class ContractAnalystEngine(QAEngine):
                     'error': 'Document not found'
                 }
             
+            cached = self._lookup_cached_answer(question, document, kind="contract_analysis")
+            if cached:
+                return cached
+            
             # Use existing contract analysis logic
             context_sections = self.find_legal_context(question, document)
             
@@ -472,7 +581,7 @@ class ContractAnalystEngine(QAEngine):
             analysis = self.generate_contract_analysis(question, context_sections, document)
             
             # Return in format expected by enhanced response router
-            return {
+            result = {
                 'response': self._format_contract_response(analysis),
                 'direct_evidence': analysis.direct_evidence,
                 'plain_explanation': analysis.plain_explanation,
@@ -482,6 +591,10 @@ class ContractAnalystEngine(QAEngine):
                 'document_type': analysis.document_type,
                 'legal_terms_found': analysis.legal_terms_found
             }
+            if analysis.error:
+                result['error'] = analysis.error
+            self._store_cached_answer(question, document, result, kind="contract_analysis")
+            return result
             
         except Exception as e:
             logger.error(f"Error in analyze_question: {e}")
@@ -4,11 +4,15 @@ Handles natural conversation flow while maintaining specialized analysis capabil
 """
 
 import re
+import threading
 import uuid
+from collections import OrderedDict
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 import logging
 
+from src.config import config
+
 from src.utils.error_handling import (
     ConversationalAIError, ContextManagementError, handle_errors, 
     graceful_degradation, ErrorType
@@ -27,10 +31,15 @@ class ConversationalAIEngine:
     Manages conversational interactions with context awareness and mode switching.
     """
     
-    def __init__(self, qa_engine: QAEngine, contract_engine: ContractAnalystEngine):
+    def __init__(self, qa_engine: QAEngine, contract_engine: ContractAnalystEngine,
+                 max_sessions: Optional[int] = None):
         self.qa_engine = qa_engine
         self.contract_engine = contract_engine
-        self.conversation_contexts: Dict[str, ConversationContext] = {}
+        # One engine is shared by every Streamlit session, so contexts are kept
+        # least recently used first, bounded, and only touched under the lock
+        self.conversation_contexts: "OrderedDict[str, ConversationContext]" = OrderedDict()
+        self.max_sessions = max(1, max_sessions or config.CONVERSATION_MAX_SESSIONS)
+        self._lock = threading.RLock()
         self.logger = logging.getLogger(__name__)
         
         # Question classification patterns
@@ -177,44 +186,66 @@ class ConversationalAIEngine:
         """
         Update conversation context with new turn information.
         """
-        if session_id not in self.conversation_contexts:
-            self.conversation_contexts[session_id] = ConversationContext(
-                session_id=session_id,
-                document_id="",
-                conversation_history=[],
-                current_topic="",
-                analysis_mode="casual",
-                user_preferences={},
-                context_summary=""
-            )
-        
-        context = self.conversation_contexts[session_id]
-        
-        # Create new conversation turn
-        turn = ConversationTurn(
-            turn_id=str(uuid.uuid4()),
-            question=question,
-            response=response,
-            question_type=self.classify_question_type(question, []),
-            analysis_mode=context.analysis_mode,
-            sources_used=[],
-            timestamp=datetime.now()
-        )
-        
-        # Add to history
-        context.conversation_history.append(turn)
-        
-        # Update current topic (simple keyword extraction)
+        question_type = self.classify_question_type(question, [])
         keywords = self._extract_keywords(question)
-        if keywords:
-            context.current_topic = keywords[0]
-        
-        # Limit history size
-        if len(context.conversation_history) > 50:
-            context.conversation_history = context.conversation_history[-50:]
         
-        # Update context summary
-        context.context_summary = self._generate_context_summary(context)
+        with self._lock:
+            context = self.get_conversation_context(session_id)
+            
+            # Create new conversation turn
+            turn = ConversationTurn(
+                turn_id=str(uuid.uuid4()),
+                question=question,
+                response=response,
+                question_type=question_type,
+                analysis_mode=context.analysis_mode,
+                sources_used=[],
+                timestamp=datetime.now()
+            )
+            
+            # Add to history
+            context.conversation_history.append(turn)
+            
+            # Update current topic (simple keyword extraction)
+            if keywords:
+                context.current_topic = keywords[0]
+            
+            # Limit history size
+            if len(context.conversation_history) > 50:
+                context.conversation_history = context.conversation_history[-50:]
+            
+            # Update context summary
+            context.context_summary = self._generate_context_summary(context)
+
+    def get_conversation_context(self, session_id: str, document_id: str = "") -> ConversationContext:
+        """
+        Get or create the context of a session, marking it most recently used.
+        The least recently used sessions are dropped beyond ``max_sessions``.
+        """
+        with self._lock:
+            context = self.conversation_contexts.get(session_id)
+            if context is None:
+                context = ConversationContext(
+                    session_id=session_id,
+                    document_id=document_id,
+                    conversation_history=[],
+                    current_topic="",
+                    analysis_mode="casual",
+                    user_preferences={},
+                    context_summary=""
+                )
+                self.conversation_contexts[session_id] = context
+                while len(self.conversation_contexts) > self.max_sessions:
+                    evicted, _ = self.conversation_contexts.popitem(last=False)
+                    self.logger.debug(f"Dropped conversation context of idle session {evicted}")
+            else:
+                self.conversation_contexts.move_to_end(session_id)
+            return context
+
+    def clear_conversation_context(self, session_id: str) -> None:
+        """Forget a session's conversation context."""
+        with self._lock:
+            self.conversation_contexts.pop(session_id, None)
 
     def generate_clarification_request(self, ambiguous_question: str) -> str:
         """
@@ -254,20 +285,10 @@ class ConversationalAIEngine:
         Main entry point for answering conversational questions.
         """
         try:
-            # Get or create conversation context
-            if session_id not in self.conversation_contexts:
-                self.conversation_contexts[session_id] = ConversationContext(
-                    session_id=session_id,
-                    document_id=document_id,
-                    conversation_history=[],
-                    current_topic="",
-                    analysis_mode="casual",
-                    user_preferences={},
-                    context_summary=""
-                )
-            
-            context = self.conversation_contexts[session_id]
-            question_type = self.classify_question_type(question, context.conversation_history)
+            # Get or create conversation context; classify against a snapshot of its history
+            with self._lock:
+                history = list(self.get_conversation_context(session_id, document_id).conversation_history)
+            question_type = self.classify_question_type(question, history)
             
             # Handle compound questions
             if question_type.primary_type == "compound":
@@ -0,0 +1,333 @@
+"""
+Structured DOCX text extraction.
+
+The document body is walked in order, so tables (where fee schedules and
+deliverable dates usually live) keep their place between the paragraphs
+around them instead of being dropped. Heading levels come from paragraph
+styles and outline levels, and list numbering is rendered from the
+document's numbering definitions ("1.2", "(a)", "iv."), the way Word shows
+it. Blocks are yielded one at a time with their character offsets in the
+joined text, and the headings (or, in documents without headings, the
+numbered clauses) are assembled into a section tree, so analysis can look up
+the section around any offset rather than re-deriving it with regexes.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple, Union
+
+from docx import Document
+from docx.enum.style import WD_STYLE_TYPE
+from docx.oxml.ns import qn
+from docx.table import Table
+from docx.text.paragraph import Paragraph
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Separator between blocks in the joined document text
+BLOCK_SEPARATOR = "\n\n"
+# Separator between the cells of a table row
+CELL_SEPARATOR = " | "
+# Longest section title kept; numbered clauses can be whole paragraphs
+MAX_TITLE_LENGTH = 120
+
+_HEADING_STYLE = re.compile(r"heading\s*(\d)", re.IGNORECASE)
+_ROMAN = ((1000, "m"), (900, "cm"), (500, "d"), (400, "cd"), (100, "c"), (90, "xc"),
+          (50, "l"), (40, "xl"), (10, "x"), (9, "ix"), (5, "v"), (4, "iv"), (1, "i"))
+
+
+@dataclass
+class DocxBlock:
+    """A paragraph or table of the document body and where it sits in the joined text."""
+    kind: str  # "paragraph" or "table"
+    text: str
+    start_offset: int
+    end_offset: int
+    heading_level: Optional[int] = None  # 1-based, for headings
+    list_level: Optional[int] = None  # 0-based, for list items
+    number: Optional[str] = None  # Rendered list number, e.g. "2.1." or "(a)"
+
+
+@dataclass
+class DocxSection:
+    """A heading or numbered clause and the span of text it governs."""
+    title: str
+    level: int
+    start_offset: int
+    end_offset: int
+    number: Optional[str] = None
+    children: List['DocxSection'] = field(default_factory=list)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'title': self.title,
+            'level': self.level,
+            'number': self.number,
+            'start_offset': self.start_offset,
+            'end_offset': self.end_offset,
+            'children': [child.to_dict() for child in self.children]
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'DocxSection':
+        return cls(
+            title=data['title'],
+            level=data['level'],
+            start_offset=data['start_offset'],
+            end_offset=data['end_offset'],
+            number=data.get('number'),
+            children=[cls.from_dict(child) for child in data.get('children', [])]
+        )
+
+
+@dataclass
+class DocxExtraction:
+    """Joined text and section tree of a DOCX file."""
+    text: str
+    sections: List[DocxSection] = field(default_factory=list)
+
+
+class _ListNumbering:
+    """Renders list numbers from the document's numbering definitions, counting as it goes."""
+
+    def __init__(self, document):
+        try:
+            self._numbering = document.part.numbering_part.element
+        except Exception:
+            self._numbering = None
+        self._levels: Dict[str, Dict[int, Tuple[int, str, str]]] = {}
+        self._counters: Dict[str, Dict[int, int]] = {}
+
+    def label(self, num_id: str, level: int) -> Optional[str]:
+        """Advance the list's counter at ``level`` and return the rendered number"""
+        levels = self._list_levels(num_id)
+        if level not in levels:
+            return None
+
+        counters = self._counters.setdefault(num_id, {})
+        counters[level] = counters.get(level, levels[level][0] - 1) + 1
+        for deeper in [key for key in counters if key > level]:
+            del counters[deeper]
+
+        start, number_format, text = levels[level]
+        if number_format == "bullet":
+            return "•"
+
+        def render(match: re.Match) -> str:
+            referenced = int(match.group(1)) - 1
+            if referenced not in levels:
+                return ""
+            value = counters.get(referenced, levels[referenced][0])
+            return _format_number(value, levels[referenced][1])
+
+        return re.sub(r"%(\d)", render, text).strip() or None
+
+    def _list_levels(self, num_id: str) -> Dict[int, Tuple[int, str, str]]:
+        """(start, format, level text) of each level of a list, by 0-based level"""
+        if num_id in self._levels:
+            return self._levels[num_id]
+
+        levels: Dict[int, Tuple[int, str, str]] = {}
+        num = self._numbering.xpath(f'./w:num[@w:numId="{num_id}"]') if self._numbering is not None else []
+        if num:
+            abstract_id = _child_val(num[0], 'w:abstractNumId')
+            abstract = self._numbering.xpath(
+                f'./w:abstractNum[@w:abstractNumId="{abstract_id}"]'
+            ) if abstract_id is not None else []
+            for lvl in abstract[0].findall(qn('w:lvl')) if abstract else []:
+                level = int(lvl.get(qn('w:ilvl'), 0))
+                levels[level] = (
+                    int(_child_val(lvl, 'w:start') or 1),
+                    _child_val(lvl, 'w:numFmt') or "decimal",
+                    _child_val(lvl, 'w:lvlText') or ""
+                )
+            for override in num[0].findall(qn('w:lvlOverride')):
+                level = int(override.get(qn('w:ilvl'), 0))
+                start = _child_val(override, 'w:startOverride')
+                if start is not None and level in levels:
+                    levels[level] = (int(start),) + levels[level][1:]
+
+        self._levels[num_id] = levels
+        return levels
+
+
+def _child_val(element, tag: str) -> Optional[str]:
+    child = element.find(qn(tag))
+    return child.get(qn('w:val')) if child is not None else None
+
+
+def _format_number(value: int, number_format: str) -> str:
+    if number_format in ("lowerLetter", "upperLetter"):
+        letters = ""
+        while value > 0:
+            value, remainder = divmod(value - 1, 26)
+            letters = chr(ord("a") + remainder) + letters
+        return letters.upper() if number_format == "upperLetter" else letters
+    if number_format in ("lowerRoman", "upperRoman"):
+        numeral = ""
+        for amount, symbol in _ROMAN:
+            count, value = divmod(value, amount)
+            numeral += symbol * count
+        return numeral.upper() if number_format == "upperRoman" else numeral
+    if number_format == "decimalZero":
+        return f"{value:02d}"
+    if number_format == "none":
+        return ""
+    return str(value)
+
+
+class _ParagraphStyles:
+    """Heading level and list numbering each paragraph style implies, following ``basedOn``."""
+
+    def __init__(self, document):
+        self._styles = document.styles.element
+        self._default = self._styles.default_for(WD_STYLE_TYPE.PARAGRAPH)
+        self._cache: Dict[Optional[str], Tuple[Optional[int], Optional[str], Optional[int]]] = {}
+
+    def resolve(self, style_id: Optional[str]) -> Tuple[Optional[int], Optional[str], Optional[int]]:
+        """(heading level, numbering id, numbering level) of a paragraph style"""
+        if style_id not in self._cache:
+            style = self._styles.get_by_id(style_id) if style_id else self._default
+            heading_level = num_id = num_level = None
+            seen = set()
+            while style is not None and style.styleId not in seen:
+                seen.add(style.styleId)
+                if heading_level is None:
+                    heading_level = _outline_level(style.pPr)
+                    match = _HEADING_STYLE.fullmatch((style.name_val or "").strip())
+                    if heading_level is None and match:
+                        heading_level = int(match.group(1))
+                if num_id is None and style.pPr is not None and style.pPr.numPr is not None:
+                    num_id, num_level = _num_pr(style.pPr.numPr)
+                style = self._styles.get_by_id(style.basedOn_val) if style.basedOn_val else None
+            self._cache[style_id] = (heading_level, num_id, num_level)
+        return self._cache[style_id]
+
+
+def _outline_level(p_pr) -> Optional[int]:
+    """1-based heading level from an outline level; body text (level 9) is not a heading"""
+    if p_pr is None or p_pr.outlineLvl is None:
+        return None
+    level = int(p_pr.outlineLvl.get(qn('w:val'), 9))
+    return level + 1 if level < 9 else None
+
+
+def _num_pr(num_pr) -> Tuple[Optional[str], Optional[int]]:
+    num_id = num_pr.numId.val if num_pr.numId is not None else None
+    num_level = num_pr.ilvl.val if num_pr.ilvl is not None else None
+    return (str(num_id) if num_id is not None else None), num_level
+
+
+def iter_docx_blocks(source: Union[str, BinaryIO]) -> Iterator[DocxBlock]:
+    """
+    Yield the paragraphs and tables that contain text, in document order.
+
+    Offsets assume the blocks are joined with ``BLOCK_SEPARATOR``. Headings
+    carry their level, list items their level and rendered number, which is
+    also prefixed to the block text.
+    """
+    document = Document(source)
+    styles = _ParagraphStyles(document)
+    numbering = _ListNumbering(document)
+    offset = 0
+    first = True
+
+    for element in document.element.body.iterchildren():
+        if element.tag == qn('w:p'):
+            block = _paragraph_block(Paragraph(element, document), styles, numbering)
+        elif element.tag == qn('w:tbl'):
+            block = _table_block(Table(element, document))
+        else:
+            continue
+        if block is None:
+            continue
+
+        if not first:
+            offset += len(BLOCK_SEPARATOR)
+        first = False
+        block.start_offset, block.end_offset = offset, offset + len(block.text)
+        offset = block.end_offset
+        yield block
+
+
+def _paragraph_block(paragraph: Paragraph, styles: _ParagraphStyles,
+                     numbering: _ListNumbering) -> Optional[DocxBlock]:
+    p_pr = paragraph._p.pPr
+    heading_level, num_id, num_level = styles.resolve(p_pr.style if p_pr is not None else None)
+    heading_level = _outline_level(p_pr) or heading_level
+    if p_pr is not None and p_pr.numPr is not None:
+        direct_id, direct_level = _num_pr(p_pr.numPr)
+        num_id = direct_id if direct_id is not None else num_id
+        num_level = direct_level if direct_level is not None else num_level
+
+    number = list_level = None
+    if num_id and num_id != "0":
+        # Empty list items still advance the count, as they do in Word
+        list_level = num_level or 0
+        number = numbering.label(num_id, list_level)
+
+    text = paragraph.text.strip()
+    if not text:
+        return None
+    if number:
+        text = f"{number} {text}"
+    return DocxBlock("paragraph", text, 0, 0, heading_level, list_level, number)
+
+
+def _table_block(table: Table) -> Optional[DocxBlock]:
+    lines = []
+    for row in table.rows:
+        cells = []
+        previous = None
+        for cell in row.cells:
+            # Horizontally merged cells repeat once per grid column they span
+            if cell._tc is previous:
+                continue
+            previous = cell._tc
+            cells.append(" ".join(cell.text.split()))
+        if any(cells):
+            lines.append(CELL_SEPARATOR.join(cells))
+    if not lines:
+        return None
+    return DocxBlock("table", "\n".join(lines), 0, 0)
+
+
+def build_section_tree(blocks: List[DocxBlock], text_length: int) -> List[DocxSection]:
+    """
+    Nest headings by level, each spanning the text up to the next heading of the same or a higher level.
+
+    Documents without headings are structured by their numbered clauses instead.
+    """
+    headings = [(block, block.heading_level) for block in blocks if block.heading_level]
+    if not headings:
+        headings = [
+            (block, block.list_level + 1) for block in blocks
+            if block.number and block.number != "•" and block.kind == "paragraph"
+        ]
+
+    roots: List[DocxSection] = []
+    open_sections: List[DocxSection] = []
+    for block, level in headings:
+        while open_sections and open_sections[-1].level >= level:
+            open_sections.pop().end_offset = block.start_offset - len(BLOCK_SEPARATOR)
+        title = block.text[len(block.number) + 1:] if block.number else block.text
+        section = DocxSection(title[:MAX_TITLE_LENGTH], level, block.start_offset, text_length, block.number)
+        (open_sections[-1].children if open_sections else roots).append(section)
+        open_sections.append(section)
+    return roots
+
+
+def extract_docx(source: Union[str, BinaryIO]) -> DocxExtraction:
+    """Extract the text of a DOCX file with its section tree"""
+    blocks = list(iter_docx_blocks(source))
+    text = BLOCK_SEPARATOR.join(block.text for block in blocks)
+    return DocxExtraction(text, build_section_tree(blocks, len(text)))
+
+
+def flatten_sections(sections: List[DocxSection]) -> Iterator[DocxSection]:
+    """Every section of a tree, parents before their children, in document order"""
+    for section in sections:
+        yield section
+        yield from flatten_sections(section.children)
@@ -0,0 +1,127 @@
+"""
+Single-pass character encoding detection for text uploads.
+
+Only the first block of a file is inspected. A byte-order mark decides
+outright. Otherwise the block is validated as UTF-8 with an incremental
+decoder, so a multi-byte character cut at the block edge is not mistaken for
+an error, then checked for the NUL pattern of BOM-less UTF-16, and finally
+classified as cp1252 or latin-1 by whether its bytes in the C1 range
+(0x80-0x9F) are ones cp1252 defines. The file is then decoded once, block by
+block, with an incremental decoder, so large text dumps are never held as
+bytes and text at the same time.
+"""
+
+import codecs
+from typing import BinaryIO, List, Tuple
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Bytes inspected to pick an encoding
+SNIFF_BYTES = 64 * 1024
+# Bytes decoded per step after the sniffed block
+DECODE_CHUNK_BYTES = 1024 * 1024
+
+# UTF-32 marks are checked first because the UTF-32-LE mark starts with the UTF-16-LE one
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+
+# The C1 bytes cp1252 leaves undefined; seeing one means the text is not cp1252
+_CP1252_UNDEFINED = frozenset(b"\x81\x8d\x8f\x90\x9d")
+
+# Encodings tried, in order, when the rest of a file contradicts its first block
+FALLBACK_ENCODINGS = ("cp1252", "latin-1")
+
+
+def detect_encoding(sample: bytes, complete: bool = False) -> str:
+    """
+    Pick the encoding of a file from its first bytes.
+
+    Args:
+        sample: The first bytes of the file
+        complete: Whether ``sample`` is the whole file
+
+    Returns:
+        str: A Python codec name
+    """
+    for bom, encoding in _BOMS:
+        if sample.startswith(bom):
+            return encoding
+
+    utf16 = _utf16_without_bom(sample)
+    if utf16:
+        return utf16
+
+    try:
+        codecs.getincrementaldecoder("utf-8")().decode(sample, final=complete)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+
+    c1_bytes = {byte for byte in sample if 0x80 <= byte <= 0x9f}
+    return "latin-1" if c1_bytes & _CP1252_UNDEFINED else "cp1252"
+
+
+def decode_stream(stream: BinaryIO) -> Tuple[str, str]:
+    """
+    Decode a binary stream once with the encoding its first block suggests.
+
+    Returns:
+        Tuple[str, str]: (text, encoding)
+    """
+    stream.seek(0)
+    sample = stream.read(SNIFF_BYTES)
+    complete = len(sample) < SNIFF_BYTES
+    encoding = detect_encoding(sample, complete)
+
+    try:
+        return _decode(sample, stream, encoding, complete), encoding
+    except UnicodeDecodeError as e:
+        # The first block looked like valid text in this encoding but a later one is not
+        logger.warning(f"Text is not valid {encoding} past its first block ({e}); decoding again")
+
+    fallbacks = FALLBACK_ENCODINGS[FALLBACK_ENCODINGS.index(encoding) + 1:] if encoding in FALLBACK_ENCODINGS \
+        else FALLBACK_ENCODINGS
+    for fallback in fallbacks[:-1]:
+        stream.seek(0)
+        try:
+            return _decode(stream.read(SNIFF_BYTES), stream, fallback, complete), fallback
+        except UnicodeDecodeError:
+            continue
+
+    # The last fallback, latin-1, decodes any byte sequence
+    stream.seek(0)
+    return _decode(stream.read(SNIFF_BYTES), stream, fallbacks[-1], complete), fallbacks[-1]
+
+
+def _decode(first_block: bytes, stream: BinaryIO, encoding: str, complete: bool) -> str:
+    decoder = codecs.getincrementaldecoder(encoding)()
+    parts: List[str] = [decoder.decode(first_block, final=complete)]
+    if not complete:
+        while True:
+            chunk = stream.read(DECODE_CHUNK_BYTES)
+            if not chunk:
+                break
+            parts.append(decoder.decode(chunk))
+        parts.append(decoder.decode(b"", final=True))
+    return "".join(parts)
+
+
+def _utf16_without_bom(sample: bytes) -> str:
+    """``utf-16-le``/``utf-16-be`` when NULs fill one byte of most pairs, as in mostly-ASCII UTF-16"""
+    pairs = len(sample) // 2
+    if pairs < 2:
+        return ""
+    even_nuls = sample[0:pairs * 2:2].count(0)
+    odd_nuls = sample[1:pairs * 2:2].count(0)
+    if odd_nuls > pairs * 0.3 and even_nuls < pairs * 0.05:
+        return "utf-16-le"
+    if even_nuls > pairs * 0.3 and odd_nuls < pairs * 0.05:
+        return "utf-16-be"
+    return ""
@@ -2,17 +2,102 @@
 Enhanced Context Manager for Contract Assistant
 
 Manages conversation context and history to provide contextually aware responses.
+
+Per-turn features (topics, word counts, complexity scores, ...) are extracted once
+when a turn is recorded and kept in a small rolling window per session, together
+with running topic counters. Flow and pattern analysis read those aggregates, so
+the per-question cost does not grow with the length of the conversation history.
 """
 
-from typing import Dict, List, Optional
+from collections import Counter, deque
+from dataclasses import dataclass, field
+from typing import Deque, Dict, FrozenSet, List, Optional
 from datetime import datetime, timedelta
 import json
-from dataclasses import asdict
+import threading
 from src.models.enhanced import (
     ConversationContext, ConversationTurn, ConversationFlow, 
     EnhancedResponse, QuestionIntent, ResponseStrategy,
     ToneType, ExpertiseLevel, FlowType, ComplexityProgression
 )
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Widest look-back window used by any analysis (topic coherence uses 10 turns)
+FEATURE_WINDOW = 10
+
+CONTRACT_TOPICS = (
+    'liability', 'indemnification', 'termination', 'intellectual property',
+    'confidentiality', 'payment', 'delivery', 'warranty', 'dispute',
+    'governing law', 'force majeure', 'assignment', 'modification'
+)
+
+MTA_TOPICS = (
+    'material transfer', 'research use', 'derivatives', 'publication',
+    'commercial use', 'provider', 'recipient', 'original material'
+)
+
+TECHNICAL_TERMS = ('liability', 'indemnification', 'derivative', 'ip', 'jurisdiction')
+FOLLOW_UP_TERMS = ('also', 'additionally', 'furthermore', 'what about')
+SATISFACTION_INDICATORS = ('thank', 'great', 'helpful', 'perfect', 'exactly', 'clear')
+FRUSTRATION_INDICATORS = ('still confused', 'not clear', 'don\'t understand', 'unclear', 'confusing')
+CASUAL_SHIFT_INDICATORS = ('thanks', 'cool', 'awesome', 'great', 'nice')
+
+
+@dataclass(frozen=True)
+class TurnFeatures:
+    """Features of a single conversation turn, extracted once when the turn is recorded."""
+    topics: FrozenSet[str]
+    words: FrozenSet[str]
+    word_count: int
+    opening: str
+    complexity: float
+    engagement: float
+    casual_tone: bool
+    satisfied: bool
+    frustrated: bool
+    is_casual_shift: bool
+
+
+@dataclass
+class ConversationAggregates:
+    """Running aggregates over the most recent turns of one conversation."""
+    context: ConversationContext
+    features: Deque[TurnFeatures] = field(default_factory=lambda: deque(maxlen=FEATURE_WINDOW))
+    topic_counts: Counter = field(default_factory=Counter)
+    topic_mentions: int = 0
+    last_turn: Optional[ConversationTurn] = None
+
+    def push(self, turn: ConversationTurn, features: TurnFeatures) -> None:
+        """Add a turn's features, evicting the oldest one from the running counters."""
+        if len(self.features) == self.features.maxlen:
+            evicted = self.features[0]
+            for topic in evicted.topics:
+                self.topic_counts[topic] -= 1
+                if self.topic_counts[topic] <= 0:
+                    del self.topic_counts[topic]
+            self.topic_mentions -= len(evicted.topics)
+        
+        self.features.append(features)
+        self.topic_counts.update(features.topics)
+        self.topic_mentions += len(features.topics)
+        self.last_turn = turn
+
+    def is_current(self, context: ConversationContext) -> bool:
+        """Whether these aggregates describe the given context as it is now."""
+        history = context.conversation_history
+        return (
+            self.context is context
+            and bool(history)
+            and history[-1] is self.last_turn
+        )
+
+    def recent(self, count: int) -> List[TurnFeatures]:
+        """Features of the last ``count`` turns, oldest first."""
+        if count >= len(self.features):
+            return list(self.features)
+        return list(self.features)[-count:]
 
 
 class EnhancedContextManager:
@@ -22,6 +107,9 @@ class EnhancedContextManager:
         self.conversations: Dict[str, ConversationContext] = {}
         self.max_history_length = max_history_length
         self.context_retention_hours = context_retention_hours
+        self._aggregates: Dict[str, ConversationAggregates] = {}
+        # Routing runs on worker threads, so guard shared session state
+        self._lock = threading.RLock()
         
     def update_conversation_context(
         self, 
@@ -43,53 +131,70 @@ class EnhancedContextManager:
             timestamp=datetime.now()
         )
         
-        # Get or create conversation context
-        if session_id not in self.conversations:
-            self.conversations[session_id] = ConversationContext(
-                session_id=session_id,
-                document_id="default",  # Default document ID, can be updated later
-                conversation_history=[],
-                current_tone=ToneType.PROFESSIONAL,
-                topic_progression=[],
-                user_expertise_level=ExpertiseLevel.INTERMEDIATE,
-                preferred_response_style="structured"
-            )
-        
-        context = self.conversations[session_id]
-        
-        # Add turn to history
-        context.conversation_history.append(turn)
-        
-        # Maintain history length limit
-        if len(context.conversation_history) > self.max_history_length:
-            context.conversation_history = context.conversation_history[-self.max_history_length:]
-        
-        # Update current tone based on response
-        if response.tone:
-            # Convert string tone to enum
-            tone_mapping = {
-                "professional": ToneType.PROFESSIONAL,
-                "conversational": ToneType.CONVERSATIONAL,
-                "playful": ToneType.PLAYFUL
-            }
-            context.current_tone = tone_mapping.get(response.tone, ToneType.PROFESSIONAL)
-        
-        # Update topic progression
-        self._update_topic_progression(context, question, response)
-        
-        # Infer user expertise level from questions
-        self._update_user_expertise_level(context, question)
-        
-        # Update preferred response style
-        self._update_response_style_preference(context, response)
-        
-        # Clean up old conversations
-        self._cleanup_old_conversations()
+        with self._lock:
+            # Get or create conversation context
+            if session_id not in self.conversations:
+                self.conversations[session_id] = ConversationContext(
+                    session_id=session_id,
+                    document_id="default",  # Default document ID, can be updated later
+                    conversation_history=[],
+                    current_tone=ToneType.PROFESSIONAL,
+                    topic_progression=[],
+                    user_expertise_level=ExpertiseLevel.INTERMEDIATE,
+                    preferred_response_style="structured"
+                )
+            
+            context = self.conversations[session_id]
+            
+            aggregates = self._aggregates.get(session_id)
+            aggregates_current = aggregates is not None and aggregates.is_current(context)
+            
+            # Add turn to history
+            context.conversation_history.append(turn)
+            
+            # Maintain history length limit
+            if len(context.conversation_history) > self.max_history_length:
+                del context.conversation_history[:-self.max_history_length]
+            
+            # Update running aggregates with this turn's features
+            features = self._compute_turn_features(turn)
+            if aggregates_current:
+                aggregates.push(turn, features)
+            else:
+                self._aggregates[session_id] = self._rebuild_aggregates(context)
+            
+            # Update current tone based on response
+            if response.tone:
+                # Convert string tone to enum
+                tone_mapping = {
+                    "professional": ToneType.PROFESSIONAL,
+                    "conversational": ToneType.CONVERSATIONAL,
+                    "playful": ToneType.PLAYFUL
+                }
+                context.current_tone = tone_mapping.get(response.tone, ToneType.PROFESSIONAL)
+            
+            # Update topic progression
+            self._update_topic_progression(context, question, response, features.topics)
+            
+            # Infer user expertise level from questions
+            self._update_user_expertise_level(context, question)
+            
+            # Update preferred response style
+            self._update_response_style_preference(context, response)
+            
+            # Clean up old conversations
+            self._cleanup_old_conversations()
     
     def get_conversation_context(self, session_id: str) -> Optional[ConversationContext]:
         """Get conversation context for a session"""
         return self.conversations.get(session_id)
     
+    def clear_conversation(self, session_id: str) -> None:
+        """Forget the context and running aggregates for a session"""
+        with self._lock:
+            self.conversations.pop(session_id, None)
+            self._aggregates.pop(session_id, None)
+    
     def analyze_conversation_flow(self, session_id: str) -> Optional[ConversationFlow]:
         """Analyze conversation flow patterns"""
         context = self.conversations.get(session_id)
@@ -121,7 +226,7 @@ class EnhancedContextManager:
         suggestions = []
         
         # Analyze recent conversation patterns
-        recent_turns = context.conversation_history[-5:] if context.conversation_history else []
+        recent_turns = self._recent_features(context, 5)
         
         # Check for repetitive patterns
         if self._detect_repetitive_questions(recent_turns, question):
@@ -157,11 +262,12 @@ class EnhancedContextManager:
             return []
         
         patterns = []
-        history = context.conversation_history
         
-        if len(history) < 2:
+        if len(context.conversation_history) < 2:
             return patterns
         
+        history = self._recent_features(context, 5)
+        
         # Pattern: Increasing question complexity
         if self._detect_complexity_increase(history[-3:]):
             patterns.append("increasing_complexity")
@@ -220,18 +326,81 @@ class EnhancedContextManager:
             # Default to professional for mixed patterns
             return "professional"
     
+    def _compute_turn_features(self, turn: ConversationTurn) -> TurnFeatures:
+        """Extract the features every analysis needs from a single turn"""
+        question = turn.question.lower()
+        words = question.split()
+        
+        # Complexity: technical terms, question length and number of clauses
+        complexity = sum(1 for term in TECHNICAL_TERMS if term in question)
+        complexity += len(words) / 10
+        complexity += question.count(',') + question.count(';')
+        
+        casual_tone = bool(turn.response) and turn.response.tone in ["conversational", "playful"]
+        
+        # Engagement: longer questions, follow-ups and casual rapport
+        engagement = 0.0
+        if len(words) > 10:
+            engagement += 0.2
+        elif len(words) > 5:
+            engagement += 0.1
+        if any(word in question for word in FOLLOW_UP_TERMS):
+            engagement += 0.1
+        if casual_tone:
+            engagement += 0.1
+        
+        return TurnFeatures(
+            topics=frozenset(self._extract_topics(turn.question)),
+            words=frozenset(words),
+            word_count=len(turn.question.split()),
+            opening=' '.join(words[:3]),
+            complexity=complexity,
+            engagement=engagement,
+            casual_tone=casual_tone,
+            satisfied=any(indicator in question for indicator in SATISFACTION_INDICATORS),
+            frustrated=any(indicator in question for indicator in FRUSTRATION_INDICATORS),
+            is_casual_shift=any(indicator in question for indicator in CASUAL_SHIFT_INDICATORS)
+        )
+    
+    def _rebuild_aggregates(self, context: ConversationContext) -> ConversationAggregates:
+        """Build aggregates from the tail of a context's history"""
+        aggregates = ConversationAggregates(context=context)
+        for turn in context.conversation_history[-FEATURE_WINDOW:]:
+            aggregates.push(turn, self._compute_turn_features(turn))
+        return aggregates
+    
+    def _get_aggregates(self, context: ConversationContext) -> ConversationAggregates:
+        """Running aggregates for a context, rebuilt if the history changed externally"""
+        with self._lock:
+            aggregates = self._aggregates.get(context.session_id)
+            if aggregates is not None and aggregates.is_current(context):
+                return aggregates
+            
+            aggregates = self._rebuild_aggregates(context)
+            if self.conversations.get(context.session_id) is context:
+                self._aggregates[context.session_id] = aggregates
+            return aggregates
+    
+    def _recent_features(self, context: ConversationContext, count: int) -> List[TurnFeatures]:
+        """Cached features of the last ``count`` turns, oldest first"""
+        if not context.conversation_history:
+            return []
+        return self._get_aggregates(context).recent(count)
+    
     def _update_topic_progression(
         self, 
         context: ConversationContext, 
         question: str, 
-        response: EnhancedResponse
+        response: EnhancedResponse,
+        question_topics: Optional[FrozenSet[str]] = None
     ) -> None:
         """Update topic progression tracking"""
         # Extract key topics from question and response
-        question_topics = self._extract_topics(question)
+        if question_topics is None:
+            question_topics = self._extract_topics(question)
         response_topics = self._extract_topics(response.content)
         
-        all_topics = list(set(question_topics + response_topics))
+        all_topics = list(set(question_topics) | set(response_topics))
         
         # Add new topics to progression
         for topic in all_topics:
@@ -292,41 +461,25 @@ class EnhancedContextManager:
                     sessions_to_remove.append(session_id)
         
         for session_id in sessions_to_remove:
-            del self.conversations[session_id]
+            self.clear_conversation(session_id)
     
     def _extract_topics(self, text: str) -> List[str]:
         """Extract key topics from text"""
         # Simple topic extraction based on keywords
-        contract_topics = [
-            'liability', 'indemnification', 'termination', 'intellectual property',
-            'confidentiality', 'payment', 'delivery', 'warranty', 'dispute',
-            'governing law', 'force majeure', 'assignment', 'modification'
-        ]
-        
-        mta_topics = [
-            'material transfer', 'research use', 'derivatives', 'publication',
-            'commercial use', 'provider', 'recipient', 'original material'
-        ]
-        
-        all_topics = contract_topics + mta_topics
         text_lower = text.lower()
         
-        found_topics = [topic for topic in all_topics if topic in text_lower]
+        found_topics = [topic for topic in CONTRACT_TOPICS + MTA_TOPICS if topic in text_lower]
         return found_topics
     
     def _determine_flow_type(self, context: ConversationContext) -> FlowType:
         """Determine the type of conversation flow"""
-        history = context.conversation_history
-        
-        if len(history) < 3:
+        if len(context.conversation_history) < 3:
             return FlowType.EXPLORATORY
         
         # Analyze topic consistency
-        topics = []
-        for turn in history[-5:]:
-            topics.extend(self._extract_topics(turn.question))
-        
-        unique_topics = set(topics)
+        unique_topics = set()
+        for features in self._recent_features(context, 5):
+            unique_topics.update(features.topics)
         
         if len(unique_topics) <= 2:
             return FlowType.FOCUSED
@@ -337,78 +490,34 @@ class EnhancedContextManager:
     
     def _calculate_topic_coherence(self, context: ConversationContext) -> float:
         """Calculate how coherent the topic progression is"""
-        history = context.conversation_history[-10:]  # Last 10 turns
-        
-        if len(history) < 2:
+        if len(context.conversation_history) < 2:
             return 1.0
         
-        # Count topic transitions
-        all_topics = []
-        for turn in history:
-            all_topics.extend(self._extract_topics(turn.question))
+        # Running topic counters cover the last FEATURE_WINDOW (10) turns
+        aggregates = self._get_aggregates(context)
         
-        if not all_topics:
+        if not aggregates.topic_mentions:
             return 0.5  # Neutral coherence for no identifiable topics
         
         # Calculate coherence as ratio of repeated topics to total topics
-        unique_topics = set(all_topics)
-        coherence = 1.0 - (len(unique_topics) / len(all_topics)) if all_topics else 0.5
+        coherence = 1.0 - (len(aggregates.topic_counts) / aggregates.topic_mentions)
         
         return max(0.0, min(1.0, coherence))
     
     def _assess_engagement_level(self, context: ConversationContext) -> float:
         """Assess user engagement level based on conversation patterns"""
-        history = context.conversation_history[-5:]  # Last 5 turns
+        history = self._recent_features(context, 5)  # Last 5 turns
         
         if not history:
             return 0.5
         
-        engagement_score = 0.0
-        
-        # Factors that increase engagement
-        for turn in history:
-            question_length = len(turn.question.split())
-            
-            # Longer questions indicate higher engagement
-            if question_length > 10:
-                engagement_score += 0.2
-            elif question_length > 5:
-                engagement_score += 0.1
-            
-            # Follow-up questions indicate engagement
-            if any(word in turn.question.lower() for word in ['also', 'additionally', 'furthermore', 'what about']):
-                engagement_score += 0.1
-            
-            # Casual elements indicate comfort/engagement
-            if turn.response and turn.response.tone in ["conversational", "playful"]:
-                engagement_score += 0.1
+        engagement_score = sum(features.engagement for features in history)
         
         return max(0.0, min(1.0, engagement_score))
     
     def _analyze_complexity_progression(self, context: ConversationContext) -> ComplexityProgression:
         """Analyze how question complexity changes over time"""
-        history = context.conversation_history[-5:]
-        
-        if len(history) < 2:
-            return ComplexityProgression.STABLE
-        
-        complexity_scores = []
-        for turn in history:
-            # Simple complexity scoring based on question characteristics
-            score = 0
-            question = turn.question.lower()
-            
-            # Technical terms increase complexity
-            technical_terms = ['liability', 'indemnification', 'derivative', 'ip', 'jurisdiction']
-            score += sum(1 for term in technical_terms if term in question)
-            
-            # Question length indicates complexity
-            score += len(question.split()) / 10
-            
-            # Multiple clauses indicate complexity
-            score += question.count(',') + question.count(';')
-            
-            complexity_scores.append(score)
+        complexity_scores = [features.complexity for features in self._recent_features(context, 5)]
         
         # Analyze trend
         if len(complexity_scores) < 2:
@@ -430,8 +539,8 @@ class EnhancedContextManager:
         
         # Based on topic progression
         recent_topics = set()
-        for turn in context.conversation_history[-3:]:
-            recent_topics.update(self._extract_topics(turn.question))
+        for features in self._recent_features(context, 3):
+            recent_topics.update(features.topics)
         
         if 'liability' in recent_topics:
             suggestions.append("Explore indemnification and risk allocation")
@@ -458,16 +567,17 @@ class EnhancedContextManager:
         
         return suggestions[:3]
     
-    def _detect_repetitive_questions(self, recent_turns: List[ConversationTurn], current_question: str) -> bool:
+    def _detect_repetitive_questions(self, recent_turns: List[TurnFeatures], current_question: str) -> bool:
         """Detect if current question is repetitive"""
         if not recent_turns:
             return False
         
         current_words = set(current_question.lower().split())
+        if not current_words:
+            return False
         
-        for turn in recent_turns:
-            turn_words = set(turn.question.lower().split())
-            overlap = len(current_words.intersection(turn_words))
+        for features in recent_turns:
+            overlap = len(current_words.intersection(features.words))
             
             # If more than 60% word overlap, consider repetitive
             if overlap / len(current_words) > 0.6:
@@ -475,26 +585,20 @@ class EnhancedContextManager:
         
         return False
     
-    def _detect_complexity_increase(self, turns: List[ConversationTurn]) -> bool:
+    def _detect_complexity_increase(self, turns: List[TurnFeatures]) -> bool:
         """Detect if questions are becoming more complex"""
         if len(turns) < 2:
             return False
         
         # Simple heuristic: later questions are longer and contain more technical terms
-        first_question = turns[0].question
-        last_question = turns[-1].question
-        
-        return len(last_question.split()) > len(first_question.split()) * 1.5
+        return turns[-1].word_count > turns[0].word_count * 1.5
     
-    def _detect_tone_shift_to_casual(self, turns: List[ConversationTurn]) -> bool:
+    def _detect_tone_shift_to_casual(self, turns: List[TurnFeatures]) -> bool:
         """Detect shift toward casual conversation"""
         if not turns:
             return False
         
-        casual_indicators = ['thanks', 'cool', 'awesome', 'great', 'nice']
-        recent_question = turns[-1].question.lower()
-        
-        return any(indicator in recent_question for indicator in casual_indicators)
+        return turns[-1].is_casual_shift
     
     def _detect_topic_shift(self, context: ConversationContext, current_question: str) -> bool:
         """Detect if there's a significant topic shift"""
@@ -502,100 +606,70 @@ class EnhancedContextManager:
             return False
         
         recent_topics = set()
-        for turn in context.conversation_history[-2:]:
-            recent_topics.update(self._extract_topics(turn.question))
+        for features in self._recent_features(context, 2):
+            recent_topics.update(features.topics)
         
         current_topics = set(self._extract_topics(current_question))
         
         # If no overlap in topics, it's a shift
         return len(recent_topics.intersection(current_topics)) == 0 and recent_topics and current_topics
     
-    def _detect_topic_jumping(self, turns: List[ConversationTurn]) -> bool:
+    def _detect_topic_jumping(self, turns: List[TurnFeatures]) -> bool:
         """Detect if user is jumping between topics"""
         if len(turns) < 3:
             return False
         
-        topics_per_turn = []
-        for turn in turns:
-            topics_per_turn.append(set(self._extract_topics(turn.question)))
-        
         # Count topic transitions
         transitions = 0
-        for i in range(1, len(topics_per_turn)):
-            if not topics_per_turn[i].intersection(topics_per_turn[i-1]):
+        for i in range(1, len(turns)):
+            if not turns[i].topics.intersection(turns[i-1].topics):
                 transitions += 1
         
         return transitions >= len(turns) - 1  # Almost every turn changes topic
     
-    def _detect_repetitive_pattern(self, turns: List[ConversationTurn]) -> bool:
+    def _detect_repetitive_pattern(self, turns: List[TurnFeatures]) -> bool:
         """Detect repetitive questioning patterns"""
         if len(turns) < 3:
             return False
         
-        # Check for similar question structures
-        question_patterns = []
-        for turn in turns:
-            # Simple pattern: first few words
-            words = turn.question.lower().split()[:3]
-            question_patterns.append(' '.join(words))
+        # Check for similar question structures (first few words)
+        question_patterns = [features.opening for features in turns]
         
         # If more than half the patterns are similar, it's repetitive
         unique_patterns = set(question_patterns)
         return len(unique_patterns) < len(question_patterns) / 2
     
-    def _detect_casual_drift(self, turns: List[ConversationTurn]) -> bool:
+    def _detect_casual_drift(self, turns: List[TurnFeatures]) -> bool:
         """Detect drift toward casual conversation"""
         if not turns:
             return False
         
-        casual_count = 0
-        for turn in turns:
-            if turn.response and turn.response.tone in ["conversational", "playful"]:
-                casual_count += 1
+        casual_count = sum(1 for features in turns if features.casual_tone)
         
         return casual_count >= len(turns) / 2
     
-    def _detect_deep_dive_pattern(self, turns: List[ConversationTurn]) -> bool:
+    def _detect_deep_dive_pattern(self, turns: List[TurnFeatures]) -> bool:
         """Detect deep dive into specific topic"""
         if len(turns) < 3:
             return False
         
         # Check if all turns focus on similar topics
-        all_topics = []
-        for turn in turns:
-            all_topics.extend(self._extract_topics(turn.question))
+        unique_topics = set()
+        topic_mentions = 0
+        for features in turns:
+            unique_topics.update(features.topics)
+            topic_mentions += len(features.topics)
         
-        if not all_topics:
+        if not topic_mentions:
             return False
         
         # If most topics are the same, it's a deep dive
-        unique_topics = set(all_topics)
-        return len(unique_topics) <= 2 and len(all_topics) >= 3
+        return len(unique_topics) <= 2 and topic_mentions >= 3
     
-    def _detect_satisfaction_pattern(self, turns: List[ConversationTurn]) -> bool:
+    def _detect_satisfaction_pattern(self, turns: List[TurnFeatures]) -> bool:
         """Detect indicators of user satisfaction"""
-        if not turns:
-            return False
-        
-        satisfaction_indicators = ['thank', 'great', 'helpful', 'perfect', 'exactly', 'clear']
-        
-        for turn in turns:
-            question_lower = turn.question.lower()
-            if any(indicator in question_lower for indicator in satisfaction_indicators):
-                return True
-        
-        return False
+        return any(features.satisfied for features in turns)
     
-    def _detect_frustration_pattern(self, turns: List[ConversationTurn]) -> bool:
+    def _detect_frustration_pattern(self, turns: List[TurnFeatures]) -> bool:
         """Detect indicators of user frustration"""
-        if not turns:
-            return False
-        
-        frustration_indicators = ['still confused', 'not clear', 'don\'t understand', 'unclear', 'confusing']
-        
-        for turn in turns:
-            question_lower = turn.question.lower()
-            if any(indicator in question_lower for indicator in frustration_indicators):
-                return True
-        
-        return False
\ No newline at end of file
+        return any(features.frustrated for features in turns)
@@ -5,11 +5,12 @@ This module integrates all enhanced components into a comprehensive system
 with quality enhancement, advanced analysis, intelligent formatting, and production monitoring.
 """
 
-from typing import Dict, List, Optional, Any, Tuple
+from typing import Dict, List, Optional, Any, Tuple, Callable, Awaitable
 from dataclasses import dataclass
 from datetime import datetime
 import time
 import asyncio
+import weakref
 from concurrent.futures import ThreadPoolExecutor
 
 from src.models.enhanced import EnhancedResponse, QuestionIntent, ResponseType, ToneType
@@ -23,10 +24,14 @@ from src.services.intelligent_response_formatter import (
     IntelligentResponseFormatter, UserProfile
 )
 from src.services.production_monitor import (
-    ProductionMonitor, PerformanceTimer, get_global_monitor
+    ProductionMonitor, PerformanceTimer, MetricType, MetricFamily, MetricSample, get_global_monitor
 )
+from src.services.response_cache import ResponseCache, SQLiteCacheTier, build_cache_key
+from src.services.latency_budget import LatencyBudget, StageCostModel
+from src.services.llm_usage import usage_scoped
 from src.storage.document_storage import DocumentStorage
 from src.utils.logging_config import get_logger
+from src.utils.tracing import get_tracer, run_in_context
 
 logger = get_logger(__name__)
 
@@ -40,9 +45,13 @@ class SystemConfiguration:
     enable_production_monitoring: bool = True
     enable_caching: bool = True
     cache_ttl_seconds: int = 3600
+    cache_max_entries: int = 1000
+    cache_max_bytes: int = 64 * 1024 * 1024
+    shared_cache_path: Optional[str] = None  # SQLite file shared between workers
     max_concurrent_requests: int = 10
     response_timeout_seconds: int = 30
     quality_enhancement_threshold: float = 0.7
+    latency_budget_seconds: float = 10.0  # optional stages are shed once this is spent
 
 
 @dataclass
@@ -53,6 +62,7 @@ class ProcessingContext:
     document_context: Optional[Document] = None
     conversation_history: List[str] = None
     processing_preferences: Dict[str, Any] = None
+    latency_budget_seconds: Optional[float] = None  # overrides the system default
 
 
 @dataclass
@@ -104,10 +114,31 @@ class EnhancedContractSystem:
         
         # Initialize caching
         if self.config.enable_caching:
-            self.response_cache: Dict[str, Tuple[EnhancedProcessingResult, datetime]] = {}
+            shared_tier = (
+                SQLiteCacheTier(self.config.shared_cache_path)
+                if self.config.shared_cache_path else None
+            )
+            self.response_cache = ResponseCache(
+                ttl_seconds=self.config.cache_ttl_seconds,
+                max_entries=self.config.cache_max_entries,
+                max_bytes=self.config.cache_max_bytes,
+                shared_tier=shared_tier
+            )
         
-        # Thread pool for concurrent processing
-        self.thread_pool = ThreadPoolExecutor(max_workers=self.config.max_concurrent_requests)
+        # Thread pool for the blocking stages (router, engines, SQLite, analyzers);
+        # each in-flight request can run a few stages at once
+        self.thread_pool = ThreadPoolExecutor(
+            max_workers=self.config.max_concurrent_requests * 2,
+            thread_name_prefix="enhanced-system"
+        )
+        
+        # Admission control per event loop so at most max_concurrent_requests run at once
+        self._request_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = (
+            weakref.WeakKeyDictionary()
+        )
+        
+        # Learned per-stage costs used to fit optional stages into the latency budget
+        self.stage_costs = StageCostModel()
         
         # Processing statistics
         self.processing_stats = {
@@ -115,11 +146,17 @@ class EnhancedContractSystem:
             'cache_hits': 0,
             'average_processing_time': 0.0,
             'quality_enhancements': 0,
-            'formatting_applications': 0
+            'formatting_applications': 0,
+            'enhancements_shed': 0
         }
         
+        self.monitor.register_collector("enhanced_contract_system", self._collect_metrics)
+        
         logger.info("Enhanced Contract System initialized")
     
+    @usage_scoped(lambda self, question, document_id, context: {
+        "document_id": document_id, "session_id": context.session_id
+    })
     async def process_question(
         self,
         question: str,
@@ -138,44 +175,79 @@ class EnhancedContractSystem:
             Enhanced processing result with comprehensive analysis
         """
         
+        # The budget starts before admission so time spent queued counts against it
+        budget = LatencyBudget(context.latency_budget_seconds or self.config.latency_budget_seconds)
+        
+        with get_tracer().start_span(
+            "enhanced_system.process_question",
+            {"document_id": document_id, "session_id": context.session_id}
+        ) as span:
+            async with self._get_request_semaphore():
+                span.set_attribute("queue_wait_ms", round(budget.elapsed * 1000, 3))
+                result = await self._process_question(question, document_id, context, budget)
+            
+            span.set_attribute("cache_hit", result.cache_hit)
+            span.set_attribute("quality_score", round(result.quality_score, 3))
+            span.set_attribute("enhancements", ",".join(result.enhancements_applied))
+            return result
+    
+    async def _process_question(
+        self,
+        question: str,
+        document_id: str,
+        context: ProcessingContext,
+        budget: LatencyBudget
+    ) -> EnhancedProcessingResult:
+        """Run the enhancement pipeline, with blocking stages offloaded to the thread pool"""
+        
         start_time = time.time()
         
         with PerformanceTimer(self.monitor, "question_processing", {"document_id": document_id}):
             try:
-                # Check cache first
-                if self.config.enable_caching:
-                    cached_result = self._check_cache(question, document_id, context)
-                    if cached_result:
-                        self.processing_stats['cache_hits'] += 1
-                        self.monitor.record_metric("cache_hit", 1)
-                        return cached_result
-                
                 # Get document
                 document = await self._get_document(document_id)
                 if not document:
                     return self._create_error_result("Document not found", start_time)
                 
-                # Assess question complexity
-                complexity = self._assess_question_complexity(question)
-                
-                # Detect user expertise
-                user_expertise = self._detect_user_expertise(question, context)
+                # Check cache (keyed on the document version, so fetch it first)
+                if self.config.enable_caching:
+                    cached_result = await self._timed_stage(
+                        "cache_lookup", self._run_blocking(self._check_cache, question, document, context)
+                    )
+                    if cached_result:
+                        self.processing_stats['cache_hits'] += 1
+                        self.monitor.record_metric("cache_hit", 1, MetricType.COUNTER)
+                        return cached_result
                 
-                # Generate base response
-                base_response = await self._generate_base_response(
-                    question, document, context
+                # Complexity and expertise assessment do not depend on the base
+                # response, so run them while the response is being generated
+                complexity, user_expertise, base_response = await asyncio.gather(
+                    self._run_blocking(self._assess_question_complexity, question),
+                    self._run_blocking(self._detect_user_expertise, question, context),
+                    self._timed_stage(
+                        "base_response", self._generate_base_response(question, document, context)
+                    )
                 )
                 
-                # Apply enhancements
+                # Apply enhancements that fit in the remaining budget
                 enhanced_response, enhancements_applied = await self._apply_enhancements(
-                    base_response, question, document, complexity, user_expertise, context
+                    base_response, question, document, complexity, user_expertise, context, budget
                 )
                 
                 # Calculate quality score
                 quality_score = await self._calculate_quality_score(
-                    enhanced_response, question, document
+                    enhanced_response, question, document, budget, enhancements_applied
                 )
                 
+                shed = [entry for entry in enhancements_applied if ":" in entry]
+                if shed:
+                    self.processing_stats['enhancements_shed'] += len(shed)
+                    self.monitor.record_metric("enhancements_shed", len(shed), MetricType.COUNTER)
+                    logger.info(
+                        f"Latency budget of {budget.total_seconds:.1f}s: {', '.join(shed)} "
+                        f"({budget.remaining():.2f}s left)"
+                    )
+                
                 # Create result
                 processing_time = time.time() - start_time
                 result = EnhancedProcessingResult(
@@ -185,13 +257,13 @@ class EnhancedContractSystem:
                     complexity_assessment=complexity,
                     user_expertise_detected=user_expertise,
                     enhancements_applied=enhancements_applied,
-                    performance_metrics=self._get_performance_metrics(),
+                    performance_metrics=await self._run_blocking(self._get_performance_metrics),
                     cache_hit=False
                 )
                 
-                # Cache result
-                if self.config.enable_caching:
-                    self._cache_result(question, document_id, context, result)
+                # Cache result; a degraded answer is not served to later requests that have time to spare
+                if self.config.enable_caching and not shed:
+                    await self._run_blocking(self._cache_result, question, document, context, result)
                 
                 # Update statistics
                 self._update_processing_stats(result)
@@ -199,7 +271,7 @@ class EnhancedContractSystem:
                 # Record metrics
                 self.monitor.record_response_time(processing_time, "question_processing")
                 self.monitor.record_metric("quality_score", quality_score)
-                self.monitor.record_metric("complexity_level", complexity.value)
+                self.monitor.record_metric(f"complexity_{complexity.value}", 1, MetricType.COUNTER)
                 
                 logger.info(f"Question processed successfully in {processing_time:.2f}s with quality score {quality_score:.2f}")
                 
@@ -253,7 +325,9 @@ class EnhancedContractSystem:
                 
                 # Advanced document analysis
                 if self.config.enable_advanced_analysis:
-                    advanced_analysis = self.document_analyzer.perform_advanced_analysis(document)
+                    advanced_analysis = await self._run_blocking(
+                        self.document_analyzer.perform_advanced_analysis, document
+                    )
                     
                     analysis_results['advanced_analysis'] = {
                         'cross_references': len(advanced_analysis.cross_references),
@@ -322,7 +396,10 @@ class EnhancedContractSystem:
                 "caching_enabled": self.config.enable_caching,
                 "monitoring_enabled": self.config.enable_production_monitoring
             },
-            "cache_statistics": self._get_cache_statistics() if self.config.enable_caching else None
+            "cache_statistics": self._get_cache_statistics() if self.config.enable_caching else None,
+            "latency_budget_seconds": self.config.latency_budget_seconds,
+            "stage_costs": self.stage_costs.get_statistics(),
+            "slowest_traces": [trace.summary() for trace in get_tracer().slowest_traces(5)]
         }
     
     async def optimize_performance(self) -> Dict[str, Any]:
@@ -360,6 +437,28 @@ class EnhancedContractSystem:
         
         return optimization_results
     
+    def update_document(self, document_id: str, updates: Dict[str, Any]) -> bool:
+        """Update a document in storage and invalidate its cached responses"""
+        
+        updated = self.storage.update_document(document_id, updates)
+        if updated:
+            self.invalidate_document_cache(document_id)
+        return updated
+    
+    def invalidate_document_cache(self, document_id: str) -> int:
+        """Drop all cached responses for a document"""
+        
+        semantic_cache = getattr(self.response_router.contract_engine, 'semantic_cache', None)
+        if semantic_cache:
+            semantic_cache.invalidate_document(document_id)
+        
+        if not self.config.enable_caching:
+            return 0
+        
+        removed = self.response_cache.invalidate_document(document_id)
+        logger.info(f"Invalidated {removed} cached responses for document {document_id}")
+        return removed
+    
     def shutdown(self) -> None:
         """Gracefully shutdown the system"""
         logger.info("Shutting down Enhanced Contract System")
@@ -372,6 +471,7 @@ class EnhancedContractSystem:
             self.response_cache.clear()
         
         # Stop monitoring if we own it
+        self.monitor.unregister_collector("enhanced_contract_system")
         if self.config.enable_production_monitoring:
             self.monitor.stop_monitoring()
         
@@ -379,10 +479,33 @@ class EnhancedContractSystem:
     
     # Private methods
     
+    async def _run_blocking(self, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run a blocking call in the system thread pool without blocking the event loop"""
+        loop = asyncio.get_running_loop()
+        # Carry the current trace span into the worker thread
+        return await loop.run_in_executor(self.thread_pool, run_in_context(func, *args, **kwargs))
+    
+    async def _timed_stage(self, stage: str, awaitable: Awaitable[Any]) -> Any:
+        """Await a pipeline stage in its own span and record its duration in the stage cost model"""
+        with get_tracer().start_span(f"pipeline.{stage}"):
+            started = time.monotonic()
+            result = await awaitable
+            self.stage_costs.record(stage, time.monotonic() - started)
+        return result
+    
+    def _get_request_semaphore(self) -> asyncio.Semaphore:
+        """Semaphore limiting concurrent requests on the running event loop"""
+        loop = asyncio.get_running_loop()
+        semaphore = self._request_semaphores.get(loop)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.config.max_concurrent_requests)
+            self._request_semaphores[loop] = semaphore
+        return semaphore
+    
     async def _get_document(self, document_id: str) -> Optional[Document]:
         """Get document from storage"""
         try:
-            return self.storage.get_document(document_id)
+            return await self._run_blocking(self.storage.get_document, document_id)
         except Exception as e:
             logger.error(f"Error retrieving document {document_id}: {e}")
             return None
@@ -416,7 +539,8 @@ class EnhancedContractSystem:
     ) -> EnhancedResponse:
         """Generate base response using the router"""
         
-        return self.response_router.route_question(
+        return await self._run_blocking(
+            self.response_router.route_question,
             question=question,
             document_id=document.id,
             session_id=context.session_id,
@@ -430,60 +554,136 @@ class EnhancedContractSystem:
         document: Document,
         complexity: QuestionComplexity,
         user_expertise: ExpertiseLevel,
-        context: ProcessingContext
+        context: ProcessingContext,
+        budget: LatencyBudget
     ) -> Tuple[EnhancedResponse, List[str]]:
-        """Apply all configured enhancements to the response"""
+        """
+        Apply the configured enhancements that fit in the latency budget
+        
+        Stages are considered in pipeline order against their learned cost.
+        Quality enhancement is skipped when it does not fit; intelligent
+        formatting is downgraded to light emphasis, or skipped once the budget
+        is spent. Shed stages are recorded as ``"<stage>:skipped"`` or
+        ``"<stage>:downgraded"``.
+        """
         
         enhanced_response = base_response
         enhancements_applied = []
         
-        # Quality enhancement
-        if (self.config.enable_quality_enhancement and 
-            base_response.confidence >= self.config.quality_enhancement_threshold):
-            
-            enhanced_response = self.quality_enhancer.enhance_response_quality(
-                response=enhanced_response,
-                document=document,
-                question=question,
-                user_expertise=user_expertise,
-                question_complexity=complexity
+        apply_quality = (
+            self.config.enable_quality_enhancement and
+            base_response.confidence >= self.config.quality_enhancement_threshold
+        )
+        if apply_quality and not budget.can_afford(self.stage_costs.estimate("quality_enhancement")):
+            apply_quality = False
+            enhancements_applied.append("quality_enhancement:skipped")
+        
+        apply_formatting = self.config.enable_intelligent_formatting
+        
+        # Quality enhancement and user profile inference are independent of each
+        # other, so run them concurrently; formatting needs both results
+        quality_stage = (
+            self._timed_stage(
+                "quality_enhancement",
+                self._run_blocking(
+                    self.quality_enhancer.enhance_response_quality,
+                    response=enhanced_response,
+                    document=document,
+                    question=question,
+                    user_expertise=user_expertise,
+                    question_complexity=complexity
+                )
             )
+            if apply_quality else None
+        )
+        profile_stage = (
+            self._run_blocking(self._build_user_profile, question, user_expertise, context)
+            if apply_formatting else None
+        )
+        stages = [stage for stage in (quality_stage, profile_stage) if stage is not None]
+        results = iter(await asyncio.gather(*stages))
+        
+        if apply_quality:
+            enhanced_response = next(results)
             enhancements_applied.append("quality_enhancement")
             self.processing_stats['quality_enhancements'] += 1
         
         # Intelligent formatting
-        if self.config.enable_intelligent_formatting:
-            user_profile = context.user_profile or UserProfile(
-                expertise_level=user_expertise,
-                preferred_structure=self.response_formatter._infer_preferred_structure(question),
-                attention_span=self.response_formatter._assess_attention_span(question),
-                technical_comfort="medium",
-                interaction_history=context.conversation_history or []
-            )
+        if apply_formatting:
+            user_profile = next(results)
             
-            enhanced_response = self.response_formatter.format_intelligent_response(
-                response=enhanced_response,
-                question=question,
-                question_complexity=complexity,
-                user_profile=user_profile,
-                context_history=context.conversation_history
-            )
-            enhancements_applied.append("intelligent_formatting")
-            self.processing_stats['formatting_applications'] += 1
+            if budget.can_afford(self.stage_costs.estimate("intelligent_formatting")):
+                enhanced_response = await self._timed_stage(
+                    "intelligent_formatting",
+                    self._run_blocking(
+                        self.response_formatter.format_intelligent_response,
+                        response=enhanced_response,
+                        question=question,
+                        question_complexity=complexity,
+                        user_profile=user_profile,
+                        context_history=context.conversation_history
+                    )
+                )
+                enhancements_applied.append("intelligent_formatting")
+                self.processing_stats['formatting_applications'] += 1
+            elif budget.can_afford(self.stage_costs.estimate("intelligent_formatting_light")):
+                enhanced_response = await self._timed_stage(
+                    "intelligent_formatting_light",
+                    self._run_blocking(self._apply_light_formatting, enhanced_response)
+                )
+                enhancements_applied.append("intelligent_formatting:downgraded")
+            else:
+                enhancements_applied.append("intelligent_formatting:skipped")
         
         return enhanced_response, enhancements_applied
     
+    def _apply_light_formatting(self, response: EnhancedResponse) -> EnhancedResponse:
+        """Cheap formatting fallback: emphasis on key terms only"""
+        
+        response.content = self.response_formatter._apply_emphasis(response.content)
+        response.context_used.append("light_formatting")
+        return response
+    
+    def _build_user_profile(
+        self,
+        question: str,
+        user_expertise: ExpertiseLevel,
+        context: ProcessingContext
+    ) -> UserProfile:
+        """Use the caller's profile or infer one from the question"""
+        
+        return context.user_profile or UserProfile(
+            expertise_level=user_expertise,
+            preferred_structure=self.response_formatter._infer_preferred_structure(question),
+            attention_span=self.response_formatter._assess_attention_span(question),
+            technical_comfort="medium",
+            interaction_history=context.conversation_history or []
+        )
+    
     async def _calculate_quality_score(
         self,
         response: EnhancedResponse,
         question: str,
-        document: Document
+        document: Document,
+        budget: LatencyBudget,
+        enhancements_applied: List[str]
     ) -> float:
-        """Calculate overall quality score for the response"""
+        """Calculate overall quality score for the response, or fall back to confidence"""
         
         if not self.config.enable_quality_enhancement:
             return response.confidence
         
+        if not budget.can_afford(self.stage_costs.estimate("quality_scoring")):
+            enhancements_applied.append("quality_scoring:downgraded")
+            return response.confidence
+        
+        return await self._timed_stage(
+            "quality_scoring", self._run_blocking(self._score_response_quality, response)
+        )
+    
+    def _score_response_quality(self, response: EnhancedResponse) -> float:
+        """Weighted quality score from the quality enhancer's assessments"""
+        
         # Use quality enhancer's assessment methods
         completeness = self.quality_enhancer._assess_completeness(response, None)
         clarity = self.quality_enhancer._assess_clarity(response)
@@ -509,7 +709,7 @@ class EnhancedContractSystem:
     def _check_cache(
         self,
         question: str,
-        document_id: str,
+        document: Document,
         context: ProcessingContext
     ) -> Optional[EnhancedProcessingResult]:
         """Check if response is cached"""
@@ -517,26 +717,19 @@ class EnhancedContractSystem:
         if not self.config.enable_caching:
             return None
         
-        cache_key = self._generate_cache_key(question, document_id, context)
+        cache_key = self._generate_cache_key(question, document, context)
+        cached_result = self.response_cache.get(cache_key)
         
-        if cache_key in self.response_cache:
-            cached_result, timestamp = self.response_cache[cache_key]
-            
-            # Check if cache entry is still valid
-            if (datetime.now() - timestamp).seconds < self.config.cache_ttl_seconds:
-                # Mark as cache hit
-                cached_result.cache_hit = True
-                return cached_result
-            else:
-                # Remove expired entry
-                del self.response_cache[cache_key]
+        if cached_result is not None:
+            # Each lookup returns a fresh copy, so flagging it does not touch the cache
+            cached_result.cache_hit = True
         
-        return None
+        return cached_result
     
     def _cache_result(
         self,
         question: str,
-        document_id: str,
+        document: Document,
         context: ProcessingContext,
         result: EnhancedProcessingResult
     ) -> None:
@@ -545,37 +738,38 @@ class EnhancedContractSystem:
         if not self.config.enable_caching:
             return
         
-        cache_key = self._generate_cache_key(question, document_id, context)
-        self.response_cache[cache_key] = (result, datetime.now())
-        
-        # Clean up old cache entries periodically
-        if len(self.response_cache) > 1000:  # Arbitrary limit
-            self._cleanup_cache()
+        cache_key = self._generate_cache_key(question, document, context)
+        try:
+            self.response_cache.put(cache_key, document.id, result)
+        except Exception as e:
+            logger.warning(f"Could not cache response for document {document.id}: {e}")
     
     def _generate_cache_key(
         self,
         question: str,
-        document_id: str,
+        document: Document,
         context: ProcessingContext
     ) -> str:
-        """Generate cache key for request"""
+        """Generate a stable cache key for request"""
+        
+        # The document version makes updates produce new keys even in other
+        # workers; user-facing context covers settings that change formatting
+        document_version = document.updated_at.isoformat() if document.updated_at else ""
+        
+        user_context: Dict[str, Any] = {}
+        if context.user_profile:
+            user_context["expertise_level"] = context.user_profile.expertise_level.value
+            user_context["preferred_structure"] = context.user_profile.preferred_structure
+            user_context["technical_comfort"] = context.user_profile.technical_comfort
+        if context.processing_preferences:
+            user_context["preferences"] = context.processing_preferences
         
-        # Simple cache key based on question and document
-        # In production, might want to include user context
-        return f"{document_id}:{hash(question.lower())}"
+        return build_cache_key(question, document.id, document_version, user_context)
     
     def _cleanup_cache(self) -> None:
         """Clean up expired cache entries"""
         
-        current_time = datetime.now()
-        expired_keys = []
-        
-        for key, (result, timestamp) in self.response_cache.items():
-            if (current_time - timestamp).seconds >= self.config.cache_ttl_seconds:
-                expired_keys.append(key)
-        
-        for key in expired_keys:
-            del self.response_cache[key]
+        self.response_cache.purge_expired()
     
     def _get_cache_statistics(self) -> Dict[str, Any]:
         """Get cache statistics"""
@@ -585,15 +779,75 @@ class EnhancedContractSystem:
         
         total_requests = self.processing_stats['total_requests']
         cache_hits = self.processing_stats['cache_hits']
+        cache_stats = self.response_cache.get_statistics()
         
         return {
-            "cache_size": len(self.response_cache),
+            "cache_size": cache_stats['entries'],
+            "cache_bytes": cache_stats['bytes'],
             "cache_hits": cache_hits,
             "total_requests": total_requests,
             "hit_rate": cache_hits / total_requests if total_requests > 0 else 0.0,
-            "cache_limit": 1000
+            "lookup_hit_rate": cache_stats['hit_rate'],
+            "evictions": cache_stats['evictions'],
+            "expirations": cache_stats['expirations'],
+            "invalidations": cache_stats['invalidations'],
+            "shared_hits": cache_stats['shared_hits'],
+            "cache_limit": cache_stats['max_entries'],
+            "cache_byte_limit": cache_stats['max_bytes']
         }
     
+    def _collect_metrics(self) -> List[MetricFamily]:
+        """Processing and response cache metrics for the monitor's exporter"""
+        
+        families = [
+            MetricFamily(
+                "enhanced_requests", MetricType.COUNTER, "Questions processed by the enhanced system",
+                [MetricSample({}, self.processing_stats['total_requests'])]
+            ),
+            MetricFamily(
+                "enhanced_enhancements", MetricType.COUNTER, "Enhancement stages applied or shed",
+                [
+                    MetricSample({"stage": "quality_enhancement", "outcome": "applied"},
+                                 self.processing_stats['quality_enhancements']),
+                    MetricSample({"stage": "intelligent_formatting", "outcome": "applied"},
+                                 self.processing_stats['formatting_applications']),
+                    MetricSample({"stage": "any", "outcome": "shed"},
+                                 self.processing_stats['enhancements_shed'])
+                ]
+            )
+        ]
+        
+        if self.config.enable_caching:
+            cache_stats = self.response_cache.get_statistics()
+            families.extend([
+                MetricFamily(
+                    "response_cache_entries", MetricType.GAUGE, "Entries in the in-process response cache",
+                    [MetricSample({}, cache_stats['entries'])]
+                ),
+                MetricFamily(
+                    "response_cache_bytes", MetricType.GAUGE, "Bytes held by the in-process response cache",
+                    [MetricSample({}, cache_stats['bytes'])]
+                ),
+                MetricFamily(
+                    "response_cache_lookups", MetricType.COUNTER, "Response cache lookups by result",
+                    [
+                        MetricSample({"result": "hit"}, cache_stats['hits']),
+                        MetricSample({"result": "shared_hit"}, cache_stats['shared_hits']),
+                        MetricSample({"result": "miss"}, cache_stats['misses'])
+                    ]
+                ),
+                MetricFamily(
+                    "response_cache_removals", MetricType.COUNTER, "Response cache entries removed by reason",
+                    [
+                        MetricSample({"reason": "eviction"}, cache_stats['evictions']),
+                        MetricSample({"reason": "expiration"}, cache_stats['expirations']),
+                        MetricSample({"reason": "invalidation"}, cache_stats['invalidations'])
+                    ]
+                )
+            ])
+        
+        return families
+    
     def _update_processing_stats(self, result: EnhancedProcessingResult) -> None:
         """Update processing statistics"""
         
@@ -754,18 +1008,10 @@ class EnhancedContractSystem:
     
     def _optimize_cache(self) -> None:
         """Optimize cache performance"""
-        # Remove least recently used entries if cache is too large
-        if len(self.response_cache) > 500:
-            # Sort by timestamp and remove oldest 25%
-            sorted_items = sorted(
-                self.response_cache.items(),
-                key=lambda x: x[1][1]  # Sort by timestamp
-            )
-            
-            items_to_remove = len(sorted_items) // 4
-            for i in range(items_to_remove):
-                key = sorted_items[i][0]
-                del self.response_cache[key]
+        # Drop expired entries, then trim least recently used entries if still large
+        self.response_cache.purge_expired()
+        if len(self.response_cache) > self.config.cache_max_entries // 2:
+            self.response_cache.shrink(0.25)
     
     def _should_optimize_memory(self) -> bool:
         """Check if memory optimization is needed"""
@@ -774,10 +1020,13 @@ class EnhancedContractSystem:
     
     def _optimize_memory_usage(self) -> None:
         """Optimize memory usage"""
-        # Clear cache if memory usage is high
+        # Under memory pressure release the colder half of the cache rather than all of it
         if self.config.enable_caching:
-            cache_size_before = len(self.response_cache)
-            self.response_cache.clear()
-            logger.info(f"Cleared cache to optimize memory usage (removed {cache_size_before} entries)")
+            bytes_before = self.response_cache.total_bytes
+            removed = self.response_cache.shrink(0.5)
+            logger.info(
+                f"Trimmed cache to optimize memory usage (removed {removed} entries, "
+                f"{bytes_before - self.response_cache.total_bytes} bytes)"
+            )
         
-        # Could also implement other memory optimizations here
\ No newline at end of file
+        # Could also implement other memory optimizations here
@@ -20,6 +20,7 @@ from src.services.mta_specialist import MTASpecialistModule
 from src.services.enhanced_context_manager import EnhancedContextManager
 from src.services.contract_analyst_engine import ContractAnalystEngine
 from src.storage.document_storage import DocumentStorage
+from src.utils.tracing import traced
 import os
 # Error handling will be done with try-catch blocks
 
@@ -45,6 +46,7 @@ class EnhancedResponseRouter:
         
         self.contract_engine = ContractAnalystEngine(storage, api_key)
         
+    @traced("router.route_question", lambda self, question, document_id, *args, **kwargs: {"document_id": document_id})
     def route_question(
         self, 
         question: str, 
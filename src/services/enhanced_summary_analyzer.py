@@ -11,6 +11,8 @@ from src.models.document import (
     Document, RiskAssessment, Commitment, DeliverableDate, 
     AnalysisTemplate, ComprehensiveAnalysis
 )
+from src.services.llm_client import GeminiClient
+from src.services.llm_usage import usage_scoped
 from src.services.template_engine import TemplateEngine
 from src.storage.document_storage import DocumentStorage
 from src.utils.logging_config import get_logger
@@ -28,10 +30,12 @@ class EnhancedSummaryAnalyzer:
     def __init__(self, storage: DocumentStorage, api_key: str):
         self.storage = storage
         self.api_key = api_key
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
+        self.llm_client = GeminiClient(api_key, component="summary_analyzer")
+        self.api_url = self.llm_client.api_url
         self.template_engine = TemplateEngine(storage)
     
     @handle_errors(ErrorType.ENHANCED_ANALYSIS_ERROR)
+    @usage_scoped(lambda self, document, *args, **kwargs: {"document_id": document.id, "operation": "comprehensive_analysis"})
     def analyze_document_comprehensive(self, document: Document, template: Optional[AnalysisTemplate] = None) -> ComprehensiveAnalysis:
         """
         Perform comprehensive analysis of a document.
@@ -140,6 +144,7 @@ class EnhancedSummaryAnalyzer:
             return fallback_result
     
     @handle_errors(ErrorType.ENHANCED_ANALYSIS_ERROR)
+    @usage_scoped(lambda self, document, *args, **kwargs: {"document_id": document.id, "operation": "risk_identification"})
     def identify_risks(self, document: Document) -> List[RiskAssessment]:
         """
         Identify and assess risks in the document.
@@ -218,6 +223,7 @@ class EnhancedSummaryAnalyzer:
             )
     
     @handle_errors(ErrorType.ENHANCED_ANALYSIS_ERROR)
+    @usage_scoped(lambda self, document, *args, **kwargs: {"document_id": document.id, "operation": "commitment_extraction"})
     def extract_commitments(self, document: Document) -> List[Commitment]:
         """
         Extract commitments and obligations from the document.
@@ -304,6 +310,7 @@ class EnhancedSummaryAnalyzer:
             )
     
     @handle_errors(ErrorType.ENHANCED_ANALYSIS_ERROR)
+    @usage_scoped(lambda self, document, *args, **kwargs: {"document_id": document.id, "operation": "date_extraction"})
     def find_deliverable_dates(self, document: Document) -> List[DeliverableDate]:
         """
         Find and extract deliverable dates from the document.
@@ -386,6 +393,7 @@ class EnhancedSummaryAnalyzer:
                 e
             )
     
+    @usage_scoped(lambda self, document, *args, **kwargs: {"document_id": document.id, "operation": "custom_template"})
     def apply_custom_template(self, document: Document, template: AnalysisTemplate) -> Dict[str, Any]:
         """
         Apply a custom template to analyze the document.
@@ -674,30 +682,8 @@ class EnhancedSummaryAnalyzer:
     
     def _call_gemini_api(self, prompt: str, max_tokens: int = 1000) -> str:
         """Make API call to Gemini."""
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {"text": prompt}
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "maxOutputTokens": max_tokens,
-                "temperature": 0.3
-            }
-        }
-
-        headers = {
-            "Content-Type": "application/json"
-        }
-
         try:
-            response = requests.post(self.api_url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
-
-            result = response.json()
-            return result["candidates"][0]["content"]["parts"][0]["text"]
+            return self.llm_client.generate(prompt, max_tokens=max_tokens, temperature=0.3)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {e}")
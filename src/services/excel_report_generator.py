@@ -5,23 +5,28 @@ Generates structured Excel reports from document analysis and chat interactions.
 
 import os
 import uuid
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Iterable, Optional, Sequence
 from datetime import datetime, timedelta
 import logging
-import pandas as pd
 
 from src.utils.error_handling import (
     ExcelGenerationError, handle_errors, alternative_formats, 
     ErrorType, graceful_degradation
 )
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment
 from openpyxl.chart import BarChart, Reference
-from openpyxl.utils.dataframe import dataframe_to_rows
 
 from src.models.conversational import ExcelReport, ExcelSheet, ReportTemplate
-from src.models.document import Document
+from src.models.document import ComprehensiveAnalysis, Document
+from src.services.excel_stream_writer import StreamingExcelWriter
 from src.storage.document_storage import DocumentStorage
+from src.storage.enhanced_storage import EnhancedDocumentStorage, enhanced_storage as default_enhanced_storage
+
+# Columns of the sheets whose rows are streamed as tuples
+QA_HISTORY_COLUMNS = ['Turn', 'Question', 'Response', 'Timestamp', 'Analysis Mode']
+PORTFOLIO_RISK_COLUMNS = ['Document', 'Risk ID', 'Description', 'Severity', 'Category']
+PORTFOLIO_COMMITMENT_COLUMNS = ['Document', 'Commitment ID', 'Description', 'Obligated Party', 'Deadline', 'Status']
+# Overview shown for documents that have no stored comprehensive analysis
+NO_ANALYSIS_OVERVIEW = "No analysis available for this document"
 
 
 class ExcelReportGenerator:
@@ -29,18 +34,18 @@ class ExcelReportGenerator:
     Generates structured Excel reports with multiple sheets and formatting.
     """
     
-    def __init__(self, document_storage: DocumentStorage, reports_dir: str = "data/reports"):
+    def __init__(self, document_storage: DocumentStorage, reports_dir: str = "data/reports",
+                 enhanced_storage: Optional[EnhancedDocumentStorage] = None):
         self.document_storage = document_storage
+        self.enhanced_storage = enhanced_storage or default_enhanced_storage
         self.reports_dir = reports_dir
         self.logger = logging.getLogger(__name__)
         
         # Ensure reports directory exists
         os.makedirs(reports_dir, exist_ok=True)
         
-        # Default formatting styles
-        self.header_font = Font(bold=True, color="FFFFFF")
-        self.header_fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        self.data_alignment = Alignment(wrap_text=True, vertical="top")
+        # Sheets are streamed to disk; header and wrap styles are named styles in the writer
+        self.excel_writer = StreamingExcelWriter()
 
     @handle_errors(ErrorType.EXCEL_GENERATION_ERROR)
     def generate_document_report(self, document_id: str, report_type: str = "comprehensive") -> ExcelReport:
@@ -53,7 +58,7 @@ class ExcelReportGenerator:
             if not document:
                 raise ValueError(f"Document {document_id} not found")
             
-            # Get analysis data (this would come from enhanced analyzer)
+            # Latest stored analysis, or the empty "no analysis" structure
             analysis_data = self._extract_document_analysis_data(document_id)
             
             # Create report structure
@@ -160,15 +165,8 @@ class ExcelReportGenerator:
             if len(document_ids) < 2:
                 raise ValueError("At least 2 documents required for comparative analysis")
             
-            # Get analysis data for all documents
-            documents_data = []
-            for doc_id in document_ids:
-                document = self.document_storage.get_document(doc_id)
-                analysis_data = self._extract_document_analysis_data(doc_id)
-                documents_data.append({
-                    'document': document,
-                    'analysis': analysis_data
-                })
+            # Get documents and analysis data for all documents in batched queries
+            documents_data = self._collect_documents_data(document_ids)
             
             # Create comparative sheets
             sheets = [
@@ -211,18 +209,8 @@ class ExcelReportGenerator:
             include_sections = data_specification.get('include_sections', ['summary'])
             custom_filters = data_specification.get('filters', {})
             
-            # Collect data based on specification
-            all_data = []
-            for doc_id in document_ids:
-                document = self.document_storage.get_document(doc_id)
-                analysis_data = self._extract_document_analysis_data(doc_id)
-                
-                # Apply filters
-                filtered_data = self._apply_custom_filters(analysis_data, custom_filters)
-                all_data.append({
-                    'document': document,
-                    'analysis': filtered_data
-                })
+            # Collect data based on specification, applying filters
+            all_data = self._collect_documents_data(document_ids, custom_filters)
             
             # Create sheets based on specification
             sheets = []
@@ -278,66 +266,123 @@ class ExcelReportGenerator:
         
         return formatted_data
 
-    def _extract_document_analysis_data(self, document_id: str) -> Dict[str, Any]:
-        """Extract analysis data for a document (placeholder - would integrate with enhanced analyzer)."""
-        # This would integrate with the enhanced summary analyzer
-        # For now, return mock data structure
+    def _collect_documents_data(self, document_ids: List[str],
+                                filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """Documents and their analysis data, fetched with a handful of batched queries."""
+        documents = self.document_storage.get_documents(document_ids)
+        analyses = self.enhanced_storage.get_document_analyses(document_ids)
+        
+        documents_data = []
+        for doc_id in document_ids:
+            document = documents.get(doc_id)
+            if document is None:
+                self.logger.warning(f"Skipping missing document {doc_id} in multi-document report")
+                continue
+            
+            analysis = analyses.get(doc_id)
+            if analysis:
+                analysis_data = self._analysis_to_report_data(analysis)
+            else:
+                self.logger.warning(f"No stored analysis for document {doc_id} in multi-document report")
+                analysis_data = self._empty_analysis_data()
+            if filters is not None:
+                analysis_data = self._apply_custom_filters(analysis_data, filters)
+            documents_data.append({
+                'document': document,
+                'analysis': analysis_data
+            })
+        
+        return documents_data
+
+    def _analysis_to_report_data(self, analysis: ComprehensiveAnalysis) -> Dict[str, Any]:
+        """Convert a stored comprehensive analysis to the report data structure."""
         return {
             'summary': {
-                'document_overview': 'Sample document overview',
-                'key_findings': ['Finding 1', 'Finding 2'],
-                'critical_information': ['Critical info 1'],
-                'recommended_actions': ['Action 1', 'Action 2'],
-                'executive_recommendation': 'Sample recommendation'
+                'document_overview': analysis.document_overview,
+                'key_findings': analysis.key_findings,
+                'critical_information': analysis.critical_information,
+                'recommended_actions': analysis.recommended_actions,
+                'executive_recommendation': analysis.executive_recommendation
             },
             'risks': [
                 {
-                    'risk_id': 'R001',
-                    'description': 'Sample risk description',
-                    'severity': 'High',
-                    'category': 'Legal',
-                    'affected_parties': ['Party A'],
-                    'mitigation_suggestions': ['Mitigation 1'],
-                    'confidence': 0.8
+                    'risk_id': risk.risk_id,
+                    'description': risk.description,
+                    'severity': risk.severity,
+                    'category': risk.category,
+                    'affected_parties': risk.affected_parties,
+                    'mitigation_suggestions': risk.mitigation_suggestions,
+                    'confidence': risk.confidence
                 }
+                for risk in analysis.risks
             ],
             'commitments': [
                 {
-                    'commitment_id': 'C001',
-                    'description': 'Sample commitment',
-                    'obligated_party': 'Party A',
-                    'beneficiary_party': 'Party B',
-                    'deadline': '2024-12-31',
-                    'status': 'Active',
-                    'commitment_type': 'Deliverable'
+                    'commitment_id': commitment.commitment_id,
+                    'description': commitment.description,
+                    'obligated_party': commitment.obligated_party,
+                    'beneficiary_party': commitment.beneficiary_party,
+                    'deadline': commitment.deadline.strftime('%Y-%m-%d') if commitment.deadline else '',
+                    'status': commitment.status,
+                    'commitment_type': commitment.commitment_type
                 }
+                for commitment in analysis.commitments
             ],
             'deliverable_dates': [
                 {
-                    'date': '2024-12-31',
-                    'description': 'Sample deliverable',
-                    'responsible_party': 'Party A',
-                    'deliverable_type': 'Report',
-                    'status': 'Pending'
+                    'date': date.date.strftime('%Y-%m-%d'),
+                    'description': date.description,
+                    'responsible_party': date.responsible_party,
+                    'deliverable_type': date.deliverable_type,
+                    'status': date.status
                 }
+                for date in analysis.deliverable_dates
             ],
-            'key_terms': ['Term 1', 'Term 2', 'Term 3']
+            'key_terms': analysis.key_legal_terms
+        }
+
+    def _extract_document_analysis_data(self, document_id: str) -> Dict[str, Any]:
+        """Report data from the document's latest stored analysis, or the empty "no analysis" structure."""
+        analysis = self.enhanced_storage.get_document_analyses([document_id]).get(document_id)
+        if not analysis:
+            self.logger.warning(f"No stored analysis for document {document_id}")
+            return self._empty_analysis_data()
+        return self._analysis_to_report_data(analysis)
+
+    @staticmethod
+    def _empty_analysis_data() -> Dict[str, Any]:
+        """Report data for a document without an analysis: a marker overview and no rows."""
+        return {
+            'summary': {
+                'document_overview': NO_ANALYSIS_OVERVIEW,
+                'key_findings': [],
+                'critical_information': [],
+                'recommended_actions': [],
+                'executive_recommendation': 'N/A'
+            },
+            'risks': [],
+            'commitments': [],
+            'deliverable_dates': [],
+            'key_terms': []
         }
 
     def _extract_conversation_data(self, session_id: str) -> Dict[str, Any]:
-        """Extract conversation data for a session (placeholder)."""
-        # This would integrate with conversation context manager
+        """Conversation data for a session; its turns are streamed from storage as the sheet is written."""
+        context = self.enhanced_storage.get_conversation_context(session_id)
         return {
-            'session_summary': 'Sample conversation summary',
-            'turns': [
+            'session_summary': (context.context_summary if context else '') or 'N/A',
+            'total_questions': self.document_storage.count_qa_interactions(session_id),
+            'turns': (
                 {
-                    'question': 'Sample question',
-                    'response': 'Sample response',
-                    'timestamp': datetime.now(),
-                    'analysis_mode': 'legal'
+                    'question': question,
+                    'response': answer,
+                    'timestamp': datetime.fromisoformat(timestamp) if timestamp else None,
+                    'analysis_mode': analysis_mode
                 }
-            ],
-            'topics': ['Topic 1', 'Topic 2']
+                for question, answer, timestamp, analysis_mode
+                in self.document_storage.iter_qa_interactions(session_id)
+            ),
+            'topics': [context.current_topic] if context and context.current_topic else []
         }
 
     def _create_summary_sheet(self, document: Document, analysis_data: Dict[str, Any]) -> ExcelSheet:
@@ -447,9 +492,14 @@ class ExcelReportGenerator:
 
     def _create_conversation_summary_sheet(self, conversation_data: Dict[str, Any]) -> ExcelSheet:
         """Create conversation summary sheet."""
+        # Streamed turns cannot be counted up front, so storage counts them
+        total_questions = conversation_data.get('total_questions')
+        if total_questions is None:
+            total_questions = len(conversation_data.get('turns', []))
+        
         data = [
             {'Metric': 'Session Summary', 'Value': conversation_data.get('session_summary', 'N/A')},
-            {'Metric': 'Total Questions', 'Value': len(conversation_data.get('turns', []))},
+            {'Metric': 'Total Questions', 'Value': total_questions},
             {'Metric': 'Topics Discussed', 'Value': ', '.join(conversation_data.get('topics', []))}
         ]
         
@@ -460,24 +510,25 @@ class ExcelReportGenerator:
             charts=[]
         )
 
-    def _create_qa_history_sheet(self, turns_data: List[Dict[str, Any]]) -> ExcelSheet:
-        """Create Q&A history sheet."""
-        data = []
-        
-        for i, turn in enumerate(turns_data, 1):
-            data.append({
-                'Turn': i,
-                'Question': turn.get('question', ''),
-                'Response': turn.get('response', ''),
-                'Timestamp': turn.get('timestamp', '').strftime('%Y-%m-%d %H:%M:%S') if turn.get('timestamp') else '',
-                'Analysis Mode': turn.get('analysis_mode', '')
-            })
+    def _create_qa_history_sheet(self, turns_data: Iterable[Dict[str, Any]]) -> ExcelSheet:
+        """Create Q&A history sheet; its rows are generated as the writer consumes them."""
+        data = (
+            (
+                i,
+                turn.get('question', ''),
+                turn.get('response', ''),
+                turn['timestamp'].strftime('%Y-%m-%d %H:%M:%S') if turn.get('timestamp') else '',
+                turn.get('analysis_mode', '')
+            )
+            for i, turn in enumerate(turns_data, 1)
+        )
         
         return ExcelSheet(
             name="Q&A History",
             data=data,
             formatting={'header_style': 'bold', 'wrap_text': True},
-            charts=[]
+            charts=[],
+            columns=QA_HISTORY_COLUMNS
         )
 
     def _create_topics_sheet(self, topics_data: List[str]) -> ExcelSheet:
@@ -519,53 +570,37 @@ class ExcelReportGenerator:
             }]
         )
 
-    def _create_comparative_risks_sheet(self, documents_data: List[Dict[str, Any]]) -> ExcelSheet:
-        """Create comparative risks sheet."""
-        data = []
-        
-        for doc_data in documents_data:
-            document = doc_data['document']
-            risks = doc_data['analysis'].get('risks', [])
-            
-            for risk in risks:
-                data.append({
-                    'Document': document.title,
-                    'Risk ID': risk.get('risk_id', ''),
-                    'Description': risk.get('description', ''),
-                    'Severity': risk.get('severity', ''),
-                    'Category': risk.get('category', '')
-                })
+    def _create_comparative_risks_sheet(self, documents_data: List[Dict[str, Any]],
+                                        severities: Optional[Sequence[str]] = None) -> ExcelSheet:
+        """Create comparative risks sheet; its rows are streamed from a storage cursor."""
+        titles = {doc_data['document'].id: doc_data['document'].title for doc_data in documents_data}
+        data = (
+            (titles[document_id], *risk)
+            for document_id, *risk in self.enhanced_storage.iter_latest_risk_rows(list(titles), severities)
+        )
         
         return ExcelSheet(
             name="All Risks",
             data=data,
             formatting={'header_style': 'bold'},
-            charts=[]
+            charts=[],
+            columns=PORTFOLIO_RISK_COLUMNS
         )
 
     def _create_comparative_commitments_sheet(self, documents_data: List[Dict[str, Any]]) -> ExcelSheet:
-        """Create comparative commitments sheet."""
-        data = []
-        
-        for doc_data in documents_data:
-            document = doc_data['document']
-            commitments = doc_data['analysis'].get('commitments', [])
-            
-            for commitment in commitments:
-                data.append({
-                    'Document': document.title,
-                    'Commitment ID': commitment.get('commitment_id', ''),
-                    'Description': commitment.get('description', ''),
-                    'Obligated Party': commitment.get('obligated_party', ''),
-                    'Deadline': commitment.get('deadline', ''),
-                    'Status': commitment.get('status', '')
-                })
+        """Create comparative commitments sheet; its rows are streamed from a storage cursor."""
+        titles = {doc_data['document'].id: doc_data['document'].title for doc_data in documents_data}
+        data = (
+            (titles[document_id], *commitment)
+            for document_id, *commitment in self.enhanced_storage.iter_latest_commitment_rows(list(titles))
+        )
         
         return ExcelSheet(
             name="All Commitments",
             data=data,
             formatting={'header_style': 'bold'},
-            charts=[]
+            charts=[],
+            columns=PORTFOLIO_COMMITMENT_COLUMNS
         )
 
     def _create_comparative_metrics_sheet(self, documents_data: List[Dict[str, Any]]) -> ExcelSheet:
@@ -610,7 +645,9 @@ class ExcelReportGenerator:
 
     def _create_custom_risks_sheet(self, all_data: List[Dict[str, Any]], specification: Dict[str, Any]) -> ExcelSheet:
         """Create custom risks sheet based on specification."""
-        return self._create_comparative_risks_sheet(all_data)
+        return self._create_comparative_risks_sheet(
+            all_data, specification.get('filters', {}).get('risk_severity')
+        )
 
     def _create_custom_commitments_sheet(self, all_data: List[Dict[str, Any]], specification: Dict[str, Any]) -> ExcelSheet:
         """Create custom commitments sheet based on specification."""
@@ -682,37 +719,14 @@ class ExcelReportGenerator:
                 charts=[]
             )],
             created_at=datetime.now(),
-            expires_at=datetime.now() + timedelta(days=7)
+            expires_at=datetime.now() + timedelta(days=7),
+            is_fallback=True
         )
     
     def _create_excel_file(self, sheets: List[ExcelSheet], file_path: str) -> None:
         """Create the actual Excel file with all sheets and formatting."""
-        workbook = Workbook()
-        
-        # Remove default sheet
-        workbook.remove(workbook.active)
-        
-        for sheet_data in sheets:
-            worksheet = workbook.create_sheet(title=sheet_data.name)
-            
-            if sheet_data.data:
-                # Convert data to DataFrame for easier handling
-                df = pd.DataFrame(sheet_data.data)
-                
-                # Write data to worksheet
-                for r in dataframe_to_rows(df, index=False, header=True):
-                    worksheet.append(r)
-                
-                # Apply formatting
-                self._apply_excel_formatting(worksheet, sheet_data.formatting)
-                
-                # Add charts if specified
-                for chart_spec in sheet_data.charts:
-                    self._add_chart_to_worksheet(worksheet, chart_spec)
-        
-        # Save workbook with error handling
         try:
-            workbook.save(file_path)
+            self.excel_writer.write(sheets, file_path, add_chart=self._add_chart_to_worksheet)
         except Exception as e:
             self.logger.error(f"Failed to save Excel file: {str(e)}")
             raise ExcelGenerationError(
@@ -721,39 +735,6 @@ class ExcelReportGenerator:
                 e
             )
 
-    def _apply_excel_formatting(self, worksheet, formatting: Dict[str, Any]) -> None:
-        """Apply formatting to Excel worksheet."""
-        if not formatting:
-            return
-        
-        # Apply header formatting
-        if formatting.get('header_style') == 'bold':
-            for cell in worksheet[1]:  # First row
-                cell.font = self.header_font
-                cell.fill = self.header_fill
-                cell.alignment = Alignment(horizontal="center")
-        
-        # Apply text wrapping
-        if formatting.get('wrap_text'):
-            for row in worksheet.iter_rows():
-                for cell in row:
-                    cell.alignment = self.data_alignment
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_letter = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-            
-            adjusted_width = min(max_length + 2, 50)  # Cap at 50 characters
-            worksheet.column_dimensions[column_letter].width = adjusted_width
-
     def _add_chart_to_worksheet(self, worksheet, chart_spec: Dict[str, Any]) -> None:
         """Add chart to worksheet based on specification."""
         if chart_spec.get('type') == 'bar':
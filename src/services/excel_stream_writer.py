@@ -0,0 +1,157 @@
+"""
+Constant-memory Excel writer for generated reports.
+
+Sheets are written with openpyxl's write-only mode, so rows go straight to
+the output file instead of being held as cell objects. Sheet data can be any
+iterable (a list, a generator or a storage cursor) of dicts, or of tuples
+when the sheet names its ``columns``. Styles are registered once per workbook
+as named styles, and column widths are measured from the leading rows while
+they are buffered, because a write-only sheet must declare its widths before
+its first row is written.
+"""
+
+from datetime import date, datetime, time
+from decimal import Decimal
+from itertools import chain, islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from openpyxl import Workbook
+from openpyxl.cell import Cell, WriteOnlyCell
+from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+from openpyxl.utils import get_column_letter
+
+from src.models.conversational import ExcelSheet
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+HEADER_STYLE = "report_header"
+WRAPPED_STYLE = "report_wrapped"
+# Leading rows buffered per sheet to size its columns
+WIDTH_SAMPLE_ROWS = 500
+MAX_COLUMN_WIDTH = 50
+
+_CELL_TYPES = (str, int, float, bool, datetime, date, time, Decimal)
+
+
+def _report_styles() -> List[NamedStyle]:
+    """Fresh named styles; a NamedStyle can only be registered with one workbook."""
+    return [
+        NamedStyle(
+            name=HEADER_STYLE,
+            font=Font(bold=True, color="FFFFFF"),
+            fill=PatternFill(start_color="366092", end_color="366092", fill_type="solid"),
+            alignment=Alignment(horizontal="center")
+        ),
+        NamedStyle(name=WRAPPED_STYLE, alignment=Alignment(wrap_text=True, vertical="top"))
+    ]
+
+
+def _cell_value(value: Any) -> Any:
+    """Values openpyxl cannot write natively (lists, dicts, objects) are written as text."""
+    if value is None or isinstance(value, _CELL_TYPES):
+        return value
+    return str(value)
+
+
+class StreamingExcelWriter:
+    """Writes report sheets to an .xlsx file without building the workbook in memory."""
+
+    def __init__(self, width_sample_rows: int = WIDTH_SAMPLE_ROWS, max_column_width: int = MAX_COLUMN_WIDTH):
+        self.width_sample_rows = max(1, width_sample_rows)
+        self.max_column_width = max_column_width
+
+    def write(self, sheets: Iterable[ExcelSheet], file_path: str,
+              add_chart: Optional[Callable[[Any, Dict[str, Any]], None]] = None) -> Dict[str, int]:
+        """
+        Write ``sheets`` to ``file_path``.
+
+        Args:
+            sheets: Sheets to write, in order
+            file_path: Destination .xlsx path
+            add_chart: Optional callback adding a chart spec to a worksheet
+
+        Returns:
+            Number of data rows written per sheet name
+        """
+        workbook = Workbook(write_only=True)
+        for style in _report_styles():
+            workbook.add_named_style(style)
+
+        row_counts = {}
+        style_arrays = None
+        for sheet in sheets:
+            worksheet = workbook.create_sheet(title=sheet.name)
+            if style_arrays is None:
+                style_arrays = self._style_arrays(worksheet)
+            row_counts[sheet.name] = self._write_sheet(worksheet, sheet, style_arrays)
+            if row_counts[sheet.name] and add_chart:
+                for chart_spec in sheet.charts:
+                    add_chart(worksheet, chart_spec)
+
+        workbook.save(file_path)
+        logger.debug(f"Wrote {sum(row_counts.values())} rows across {len(row_counts)} sheets to {file_path}")
+        return row_counts
+
+    @staticmethod
+    def _style_arrays(worksheet) -> Dict[str, Any]:
+        """Resolve each named style once; cells then copy the resolved style ids."""
+        arrays = {}
+        for name in (HEADER_STYLE, WRAPPED_STYLE):
+            cell = WriteOnlyCell(worksheet)
+            cell.style = name
+            arrays[name] = cell._style
+        return arrays
+
+    def _write_sheet(self, worksheet, sheet: ExcelSheet, style_arrays: Dict[str, Any]) -> int:
+        formatting = sheet.formatting or {}
+        rows = iter(sheet.data or ())
+        sample = list(islice(rows, self.width_sample_rows))
+        if not sample:
+            return 0
+
+        columns, to_values = self._columns_for(sheet, sample)
+        self._set_column_widths(worksheet, columns, (to_values(row) for row in sample))
+
+        if formatting.get('header_style') == 'bold':
+            header = style_arrays[HEADER_STYLE]
+            worksheet.append([Cell(worksheet, row=1, column=1, value=column, style_array=header) for column in columns])
+        else:
+            worksheet.append(list(columns))
+
+        wrapped = style_arrays[WRAPPED_STYLE] if formatting.get('wrap_text') else None
+        count = 0
+        for row in chain(sample, rows):
+            values = [_cell_value(value) for value in to_values(row)]
+            if wrapped is not None:
+                values = [Cell(worksheet, row=1, column=1, value=value, style_array=wrapped) for value in values]
+            worksheet.append(values)
+            count += 1
+        return count
+
+    def _columns_for(self, sheet: ExcelSheet,
+                     sample: List[Any]) -> Tuple[Sequence[str], Callable[[Any], Sequence[Any]]]:
+        """Header names and a function turning one row into cell values in header order"""
+        if sheet.columns:
+            columns = list(sheet.columns)
+        elif not isinstance(sample[0], dict):
+            raise ValueError(f"Sheet '{sheet.name}' has tuple rows but no columns")
+        else:
+            # Keys in first-seen order across the sampled rows, as a DataFrame would order them
+            columns = list(dict.fromkeys(key for row in sample for key in row))
+
+        def to_values(row):
+            if isinstance(row, dict):
+                return [row.get(column) for column in columns]
+            return tuple(row)
+
+        return columns, to_values
+
+    def _set_column_widths(self, worksheet, columns: Sequence[str], rows: Iterator[Sequence[Any]]) -> None:
+        widths = [len(str(column)) for column in columns]
+        for row in rows:
+            for index, value in enumerate(row[:len(widths)]):
+                if value is not None:
+                    widths[index] = max(widths[index], len(str(value)))
+        for index, width in enumerate(widths, 1):
+            worksheet.column_dimensions[get_column_letter(index)].width = min(width + 2, self.max_column_width)
@@ -0,0 +1,207 @@
+"""
+On-disk cache of extracted document text.
+
+Entries are keyed by a SHA-256 of the uploaded file bytes, the file type and
+the extractor version, so a re-uploaded or re-ingested file skips parsing
+entirely and a change to the extraction code never serves stale text. Text
+and PDF page offsets are stored zlib-compressed in a SQLite database that
+every process (Streamlit, the HTTP API and ingestion workers) can share. The
+least recently used entries are evicted once the cache exceeds its byte budget.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.config import config
+from src.services.docx_extraction import DocxSection
+from src.services.pdf_extraction import PdfPage
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+def build_extraction_key(sha256: str, file_type: str, extractor_version: int) -> str:
+    """Cache key for a file, by the hex SHA-256 of its bytes, as read by a given extractor version"""
+    return f"{sha256}:{file_type.lstrip('.').lower()}:v{extractor_version}"
+
+
+@dataclass
+class CachedExtraction:
+    """Extracted text and, for PDFs, page offsets; for text files, the detected encoding; for DOCX, sections"""
+    text: str
+    pages: List[PdfPage] = field(default_factory=list)
+    encoding: Optional[str] = None
+    sections: List[DocxSection] = field(default_factory=list)
+
+
+class ExtractionCache:
+    """SQLite-backed, size-bounded LRU cache of extraction results."""
+
+    def __init__(self, db_path: str, max_bytes: int = 256 * 1024 * 1024):
+        self.db_path = db_path
+        self.max_bytes = max_bytes
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        self._initialize()
+
+        self._lock = threading.Lock()
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'writes': 0,
+            'evictions': 0,
+            'errors': 0
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS extraction_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    last_used_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_extraction_cache_last_used ON extraction_cache (last_used_at)"
+            )
+
+    def get(self, key: str) -> Optional[CachedExtraction]:
+        """Return the cached extraction for ``key``, or None on a miss"""
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload FROM extraction_cache WHERE cache_key = ?", (key,)
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE extraction_cache SET last_used_at = ? WHERE cache_key = ?", (time.time(), key)
+                    )
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache lookup failed: {e}")
+            self._count('errors')
+            return None
+
+        if not row:
+            self._count('misses')
+            return None
+
+        try:
+            payload = json.loads(zlib.decompress(row[0]).decode("utf-8"))
+            extraction = CachedExtraction(
+                payload['text'], [PdfPage(*page) for page in payload['pages']], payload.get('encoding'),
+                [DocxSection.from_dict(section) for section in payload.get('sections', [])]
+            )
+        except (zlib.error, ValueError, KeyError, TypeError) as e:
+            logger.warning(f"Discarding unreadable extraction cache entry {key}: {e}")
+            self._count('errors')
+            return None
+
+        self._count('hits')
+        return extraction
+
+    def put(self, key: str, text: str, pages: Sequence[PdfPage] = (), encoding: Optional[str] = None,
+            sections: Sequence[DocxSection] = ()) -> None:
+        """Store an extraction, evicting least recently used entries past the byte budget"""
+        payload = zlib.compress(json.dumps({
+            'text': text,
+            'pages': [[page.page_number, page.text, page.start_offset, page.end_offset] for page in pages],
+            'encoding': encoding,
+            'sections': [section.to_dict() for section in sections]
+        }).encode("utf-8"))
+        if len(payload) > self.max_bytes:
+            logger.debug(f"Not caching extraction {key}: {len(payload)} bytes exceeds cache budget")
+            return
+
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO extraction_cache (cache_key, payload, size_bytes, created_at, last_used_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (key, payload, len(payload), now, now)
+                )
+                evicted = self._evict(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Extraction cache write failed: {e}")
+            self._count('errors')
+            return
+
+        with self._lock:
+            self.stats['writes'] += 1
+            self.stats['evictions'] += evicted
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM extraction_cache")
+
+    def get_statistics(self) -> Dict[str, Any]:
+        try:
+            with self._connect() as conn:
+                entries, total_bytes = conn.execute(
+                    "SELECT COUNT(*), COALESCE(SUM(size_bytes), 0) FROM extraction_cache"
+                ).fetchone()
+        except sqlite3.Error:
+            entries, total_bytes = 0, 0
+
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': entries,
+                'bytes': total_bytes,
+                'max_bytes': self.max_bytes,
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+            }
+
+    def _evict(self, conn: sqlite3.Connection) -> int:
+        total_bytes = conn.execute("SELECT COALESCE(SUM(size_bytes), 0) FROM extraction_cache").fetchone()[0]
+        evicted = 0
+        if total_bytes <= self.max_bytes:
+            return evicted
+
+        rows = conn.execute(
+            "SELECT cache_key, size_bytes FROM extraction_cache ORDER BY last_used_at"
+        ).fetchall()
+        for cache_key, size_bytes in rows:
+            if total_bytes <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM extraction_cache WHERE cache_key = ?", (cache_key,))
+            total_bytes -= size_bytes
+            evicted += 1
+        return evicted
+
+    def _count(self, stat: str) -> None:
+        with self._lock:
+            self.stats[stat] += 1
+
+
+# Global extraction cache instance
+_extraction_cache: Optional[ExtractionCache] = None
+_extraction_cache_lock = threading.Lock()
+
+
+def get_extraction_cache() -> Optional[ExtractionCache]:
+    """The shared extraction cache, or None when it is disabled."""
+    global _extraction_cache
+    if not config.EXTRACTION_CACHE_ENABLED:
+        return None
+    with _extraction_cache_lock:
+        if _extraction_cache is None:
+            _extraction_cache = ExtractionCache(
+                os.path.join(config.DATABASE_DIR, "extraction_cache.db"),
+                max_bytes=config.EXTRACTION_CACHE_MAX_MB * 1024 * 1024
+            )
+        return _extraction_cache
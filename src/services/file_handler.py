@@ -1,18 +1,18 @@
 """
-File upload and text extraction service for the document Q&A system.
-Handles file validation, text extraction from various formats, and error handling.
+File upload handling for the document Q&A system.
+Validates uploads against the upload page's limits and delegates text
+extraction to the framework-free ``TextExtractor``.
 """
 
 import os
 import io
 from typing import Dict, Any, Optional, Tuple
 from dataclasses import dataclass
-import streamlit as st
-import PyPDF2
-from docx import Document
 
+from src.services.extraction_cache import ExtractionCache
+from src.services.pdf_extraction import PdfExtraction, PdfPageExtractor
+from src.services.text_extraction import SUPPORTED_EXTENSIONS, ExtractionResult, TextExtractor
 from src.utils.logging_config import get_logger
-from src.utils.error_handling import FileUploadError, FileProcessingError, handle_errors
 
 logger = get_logger(__name__)
 
@@ -25,6 +25,14 @@ class FileMetadata:
     is_valid: bool
     error_message: Optional[str] = None
 
+class InMemoryUpload(io.BytesIO):
+    """File bytes with the ``name``/``size`` interface of a Streamlit ``UploadedFile``"""
+    
+    def __init__(self, data: bytes, name: str):
+        super().__init__(data)
+        self.name = name
+        self.size = len(data)
+
 class FileUploadHandler:
     """Handles file uploads, validation, and text extraction"""
     
@@ -38,9 +46,19 @@ class FileUploadHandler:
     # Maximum file size (10MB)
     MAX_FILE_SIZE = 10 * 1024 * 1024  # 10MB in bytes
     
-    def __init__(self):
+    def __init__(self, pdf_extractor: Optional[PdfPageExtractor] = None,
+                 extraction_cache: Optional[ExtractionCache] = None):
         """Initialize the file upload handler"""
-        self.supported_extensions = ['.pdf', '.txt', '.docx']
+        self.supported_extensions = list(SUPPORTED_EXTENSIONS)
+        self.extractor = TextExtractor(pdf_extractor, extraction_cache, max_file_size=self.MAX_FILE_SIZE)
+    
+    @property
+    def pdf_extractor(self) -> PdfPageExtractor:
+        return self.extractor.pdf_extractor
+    
+    @property
+    def extraction_cache(self) -> Optional[ExtractionCache]:
+        return self.extractor.extraction_cache
     
     def validate_file(self, uploaded_file) -> FileMetadata:
         """
@@ -103,115 +121,52 @@ class FileUploadHandler:
                 error_message=f"Validation error: {str(e)}"
             )
     
-    def extract_text(self, uploaded_file) -> Tuple[str, Optional[str]]:
+    def extract(self, uploaded_file) -> ExtractionResult:
         """
-        Extract text content from uploaded file
+        Extract text content and details such as the detected encoding from uploaded file
         
         Args:
             uploaded_file: Streamlit UploadedFile object
             
         Returns:
-            Tuple[str, Optional[str]]: (extracted_text, error_message)
+            ExtractionResult: Extracted text and what was read, or an error
         """
         try:
             # Validate file first
             metadata = self.validate_file(uploaded_file)
             if not metadata.is_valid:
-                return "", metadata.error_message
-            
-            file_extension = metadata.file_type
+                return ExtractionResult(file_type=metadata.file_type, error=metadata.error_message)
             
-            # Extract text based on file type
-            if file_extension == '.pdf':
-                return self._extract_pdf_text(uploaded_file)
-            elif file_extension == '.txt':
-                return self._extract_txt_text(uploaded_file)
-            elif file_extension == '.docx':
-                return self._extract_docx_text(uploaded_file)
-            else:
-                return "", f"Unsupported file format: {file_extension}"
+            return self.extractor.extract(uploaded_file, metadata.filename, metadata.file_size)
                 
         except Exception as e:
             logger.error(f"Error extracting text from file: {str(e)}")
-            return "", f"Text extraction failed: {str(e)}"
+            return ExtractionResult(error=f"Text extraction failed: {str(e)}")
     
-    def _extract_pdf_text(self, uploaded_file) -> Tuple[str, Optional[str]]:
-        """Extract text from PDF file"""
-        try:
-            # Reset file pointer
-            uploaded_file.seek(0)
-            
-            pdf_reader = PyPDF2.PdfReader(uploaded_file)
-            text_content = []
-            
-            for page_num, page in enumerate(pdf_reader.pages):
-                try:
-                    page_text = page.extract_text()
-                    if page_text.strip():
-                        text_content.append(page_text)
-                except Exception as e:
-                    logger.warning(f"Could not extract text from page {page_num + 1}: {str(e)}")
-                    continue
-            
-            if not text_content:
-                return "", "No readable text found in PDF file"
-            
-            return "\n\n".join(text_content), None
-            
-        except Exception as e:
-            logger.error(f"PDF extraction error: {str(e)}")
-            return "", f"Failed to extract text from PDF: {str(e)}"
-    
-    def _extract_txt_text(self, uploaded_file) -> Tuple[str, Optional[str]]:
-        """Extract text from TXT file"""
-        try:
-            # Reset file pointer
-            uploaded_file.seek(0)
-            
-            # Try different encodings
-            encodings = ['utf-8', 'utf-16', 'latin-1', 'cp1252']
-            
-            for encoding in encodings:
-                try:
-                    uploaded_file.seek(0)
-                    content = uploaded_file.read()
-                    if isinstance(content, bytes):
-                        text = content.decode(encoding)
-                    else:
-                        text = str(content)
-                    
-                    if text.strip():
-                        return text, None
-                except UnicodeDecodeError:
-                    continue
-            
-            return "", "Could not decode text file with any supported encoding"
+    def extract_text(self, uploaded_file) -> Tuple[str, Optional[str]]:
+        """
+        Extract text content from uploaded file
+        
+        Args:
+            uploaded_file: Streamlit UploadedFile object
             
-        except Exception as e:
-            logger.error(f"TXT extraction error: {str(e)}")
-            return "", f"Failed to extract text from TXT file: {str(e)}"
+        Returns:
+            Tuple[str, Optional[str]]: (extracted_text, error_message)
+        """
+        result = self.extract(uploaded_file)
+        return result.text, result.error
     
-    def _extract_docx_text(self, uploaded_file) -> Tuple[str, Optional[str]]:
-        """Extract text from DOCX file"""
-        try:
-            # Reset file pointer
-            uploaded_file.seek(0)
-            
-            doc = Document(uploaded_file)
-            text_content = []
-            
-            for paragraph in doc.paragraphs:
-                if paragraph.text.strip():
-                    text_content.append(paragraph.text)
-            
-            if not text_content:
-                return "", "No readable text found in DOCX file"
-            
-            return "\n\n".join(text_content), None
+    def extract_pdf(self, uploaded_file) -> PdfExtraction:
+        """
+        Extract a PDF page by page, keeping each page's offsets in the text
+        
+        Args:
+            uploaded_file: Streamlit UploadedFile object or binary file
             
-        except Exception as e:
-            logger.error(f"DOCX extraction error: {str(e)}")
-            return "", f"Failed to extract text from DOCX file: {str(e)}"
+        Returns:
+            PdfExtraction: Joined text, per-page offsets and pages/second
+        """
+        return self.extractor.extract_pdf(uploaded_file, getattr(uploaded_file, 'size', None))
     
     def get_file_metadata(self, uploaded_file) -> Dict[str, Any]:
         """
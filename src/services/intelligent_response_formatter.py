@@ -15,6 +15,7 @@ import json
 from src.models.enhanced import EnhancedResponse, ToneType
 from src.services.answer_quality_enhancer import QuestionComplexity, ExpertiseLevel
 from src.utils.logging_config import get_logger
+from src.utils.tracing import traced
 
 logger = get_logger(__name__)
 
@@ -90,6 +91,7 @@ class IntelligentResponseFormatter:
         self.expertise_indicators = self._initialize_expertise_indicators()
         self.complexity_thresholds = self._initialize_complexity_thresholds()
         
+    @traced("formatter.format_intelligent_response")
     def format_intelligent_response(
         self,
         response: EnhancedResponse,
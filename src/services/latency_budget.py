@@ -0,0 +1,123 @@
+"""
+Latency budgets for the enhanced processing pipeline.
+
+A ``LatencyBudget`` tracks the time left for one request. A ``StageCostModel``
+learns how long each pipeline stage takes from recorded timings, so optional
+stages can be skipped or downgraded when they would not fit in what is left.
+"""
+
+import math
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Dict, Optional
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Starting estimates (seconds) used until a stage has enough recorded timings
+DEFAULT_STAGE_COSTS = {
+    "base_response": 3.0,
+    "quality_enhancement": 0.5,
+    "intelligent_formatting": 0.2,
+    "intelligent_formatting_light": 0.01,
+    "quality_scoring": 0.05,
+}
+DEFAULT_UNKNOWN_STAGE_COST = 0.1
+
+
+@dataclass
+class LatencyBudget:
+    """Deadline for a single request"""
+    total_seconds: float
+    started_at: float = field(default_factory=time.monotonic)
+
+    @property
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started_at
+
+    def remaining(self) -> float:
+        return max(0.0, self.total_seconds - self.elapsed)
+
+    def can_afford(self, estimated_seconds: float) -> bool:
+        return self.remaining() >= estimated_seconds
+
+    @property
+    def exhausted(self) -> bool:
+        return self.remaining() <= 0.0
+
+
+@dataclass
+class StageTiming:
+    """Exponentially weighted mean and variance of a stage's duration"""
+    mean: float
+    variance: float = 0.0
+    samples: int = 0
+
+
+class StageCostModel:
+    """
+    Learns per-stage costs from recorded durations.
+
+    Estimates are the weighted mean plus ``deviations`` standard deviations, so
+    a stage with erratic timings is treated as more expensive than its average.
+    Until a stage has ``min_samples`` timings, the larger of the prior and the
+    learned estimate is used.
+    """
+
+    def __init__(
+        self,
+        priors: Optional[Dict[str, float]] = None,
+        smoothing: float = 0.2,
+        deviations: float = 2.0,
+        min_samples: int = 5
+    ):
+        self.priors = dict(DEFAULT_STAGE_COSTS)
+        if priors:
+            self.priors.update(priors)
+        self.smoothing = smoothing
+        self.deviations = deviations
+        self.min_samples = min_samples
+
+        self._timings: Dict[str, StageTiming] = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Fold a measured duration into the stage's estimate"""
+        with self._lock:
+            timing = self._timings.get(stage)
+            if timing is None:
+                self._timings[stage] = StageTiming(mean=seconds, samples=1)
+                return
+
+            delta = seconds - timing.mean
+            timing.mean += self.smoothing * delta
+            timing.variance = (1 - self.smoothing) * (timing.variance + self.smoothing * delta * delta)
+            timing.samples += 1
+
+    def estimate(self, stage: str) -> float:
+        """Conservative estimate of how long ``stage`` will take"""
+        with self._lock:
+            return self._estimate(stage)
+
+    def get_statistics(self) -> Dict[str, Dict[str, Optional[float]]]:
+        with self._lock:
+            return {
+                stage: {
+                    "estimate_seconds": round(self._estimate(stage), 4),
+                    "mean_seconds": round(self._timings[stage].mean, 4) if stage in self._timings else None,
+                    "samples": self._timings[stage].samples if stage in self._timings else 0
+                }
+                for stage in sorted(set(self.priors) | set(self._timings))
+            }
+
+    def _estimate(self, stage: str) -> float:
+        prior = self.priors.get(stage, DEFAULT_UNKNOWN_STAGE_COST)
+        timing = self._timings.get(stage)
+        if timing is None:
+            return prior
+        learned = timing.mean + self.deviations * math.sqrt(timing.variance)
+        if timing.samples < self.min_samples:
+            return max(prior, learned)
+        return learned
@@ -0,0 +1,251 @@
+"""
+Shared Gemini API client.
+
+Wraps the ``generateContent`` REST endpoint with a blocking ``generate`` call
+and ``streamGenerateContent`` with ``stream_generate``, which yields answer
+text as server-sent events arrive. The async pipeline runs these calls in its
+worker threads rather than on the event loop. Every call reports its token
+usage to the ``LLMUsageTracker`` for cost accounting.
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import requests
+
+from src.config import config
+from src.services.llm_usage import LLMUsageTracker, current_attribution, get_usage_tracker
+from src.services.production_monitor import ProductionMonitor, MetricType, get_global_monitor
+from src.utils.logging_config import get_logger
+from src.utils.tracing import get_tracer
+
+logger = get_logger(__name__)
+
+GEMINI_BASE_URL = "https://generativelanguage.googleapis.com/v1beta/models"
+DEFAULT_MODEL = "gemini-2.0-flash"
+
+
+class RateLimiter:
+    """
+    Spaces call start times so at most ``requests_per_minute`` begin per minute.
+    
+    ``reserve`` books the next free slot and returns how long the caller must
+    wait for it, so concurrent threads share one schedule.
+    """
+    
+    def __init__(self, requests_per_minute: int):
+        self.requests_per_minute = requests_per_minute
+        self.interval = 60.0 / requests_per_minute
+        self._next_slot = 0.0
+        self._lock = threading.Lock()
+    
+    def reserve(self) -> float:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.interval
+            return slot - now
+
+
+class GeminiClient:
+    """Client for Gemini ``generateContent`` and ``streamGenerateContent`` calls."""
+
+    def __init__(
+        self,
+        api_key: str,
+        model: str = DEFAULT_MODEL,
+        timeout_seconds: int = 30,
+        monitor: Optional[ProductionMonitor] = None,
+        component: Optional[str] = None,
+        usage_tracker: Optional[LLMUsageTracker] = None,
+        requests_per_minute: Optional[int] = None
+    ):
+        self.api_key = api_key
+        self.model = model
+        self.timeout_seconds = timeout_seconds
+        self.monitor = monitor or get_global_monitor()
+        # Default attribution for usage records when no ``usage_scope`` names one
+        self.component = component
+        self.usage_tracker = usage_tracker or get_usage_tracker()
+        
+        if requests_per_minute is None:
+            requests_per_minute = config.GEMINI_REQUESTS_PER_MINUTE
+        self.rate_limiter = RateLimiter(requests_per_minute) if requests_per_minute > 0 else None
+
+    @property
+    def api_url(self) -> str:
+        return f"{GEMINI_BASE_URL}/{self.model}:generateContent?key={self.api_key}"
+
+    @property
+    def stream_url(self) -> str:
+        return f"{GEMINI_BASE_URL}/{self.model}:streamGenerateContent?alt=sse&key={self.api_key}"
+
+    @staticmethod
+    def build_payload(prompt: str, max_tokens: int, temperature: float) -> Dict[str, Any]:
+        return {
+            "contents": [
+                {
+                    "parts": [
+                        {"text": prompt}
+                    ]
+                }
+            ],
+            "generationConfig": {
+                "maxOutputTokens": max_tokens,
+                "temperature": temperature
+            }
+        }
+
+    @staticmethod
+    def extract_text(result: Dict[str, Any]) -> str:
+        """Pull the answer text out of a ``generateContent`` response body."""
+        return result["candidates"][0]["content"]["parts"][0]["text"]
+
+    @staticmethod
+    def extract_chunk_text(result: Dict[str, Any]) -> str:
+        """Text of one streamed chunk; chunks carrying only metadata give ``""``."""
+        try:
+            parts = result["candidates"][0]["content"]["parts"]
+        except (KeyError, IndexError, TypeError):
+            return ""
+        return "".join(part.get("text", "") for part in parts)
+
+    @staticmethod
+    def parse_sse_events(lines: Iterable[Any]) -> Iterator[Dict[str, Any]]:
+        """Decode the JSON ``data:`` payloads of a server-sent event stream."""
+        data = []
+        for line in lines:
+            if isinstance(line, bytes):
+                line = line.decode("utf-8")
+            if not line:
+                # A blank line ends the event
+                if data:
+                    yield json.loads("\n".join(data))
+                    data = []
+            elif line.startswith("data:"):
+                data.append(line[5:].lstrip())
+        if data:
+            yield json.loads("\n".join(data))
+
+    def generate(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.3) -> str:
+        """
+        Blocking call to Gemini.
+
+        Raises ``requests.exceptions.RequestException`` for transport and HTTP
+        errors and ``KeyError``/``IndexError`` for unexpected response bodies,
+        matching what the existing call sites already handle.
+        """
+        self._wait_for_rate_limit()
+        started = time.perf_counter()
+        succeeded = False
+        result = None
+        text = ""
+        with get_tracer().start_span("llm.generate", self._span_attributes(prompt, max_tokens)) as span:
+            try:
+                response = requests.post(
+                    self.api_url,
+                    json=self.build_payload(prompt, max_tokens, temperature),
+                    headers={"Content-Type": "application/json"},
+                    timeout=self.timeout_seconds
+                )
+                response.raise_for_status()
+                result = response.json()
+                text = self.extract_text(result)
+                span.set_attribute("response_chars", len(text))
+                succeeded = True
+                return text
+            finally:
+                elapsed = time.perf_counter() - started
+                self._record_request(elapsed, succeeded)
+                self._record_usage(span, prompt, elapsed, result, text, succeeded)
+
+    def stream_generate(self, prompt: str, max_tokens: int = 1000, temperature: float = 0.3) -> Iterator[str]:
+        """
+        Blocking streaming call to Gemini, yielding text chunks as they arrive.
+
+        The request is sent when iteration starts. Usage is attributed to the
+        ``usage_scope`` active when this method is called, since the stream is
+        usually consumed elsewhere. Errors are raised as in ``generate``.
+        """
+        return self._stream(prompt, max_tokens, temperature, current_attribution())
+
+    def _stream(self, prompt: str, max_tokens: int, temperature: float,
+                attribution: Dict[str, Any]) -> Iterator[str]:
+        self._wait_for_rate_limit()
+        started = time.perf_counter()
+        succeeded = False
+        usage_result = None
+        parts = []
+        try:
+            with requests.post(
+                self.stream_url,
+                json=self.build_payload(prompt, max_tokens, temperature),
+                headers={"Content-Type": "application/json"},
+                timeout=self.timeout_seconds,
+                stream=True
+            ) as response:
+                response.raise_for_status()
+                for event in self.parse_sse_events(response.iter_lines(decode_unicode=True)):
+                    if "usageMetadata" in event:
+                        # Counts are cumulative; the last chunk carries the totals
+                        usage_result = event
+                    text = self.extract_chunk_text(event)
+                    if not text:
+                        continue
+                    if not parts:
+                        self._record_time_to_first_token(time.perf_counter() - started)
+                    parts.append(text)
+                    yield text
+            succeeded = True
+        except GeneratorExit:
+            # The consumer stopped reading; not a failed call
+            succeeded = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - started
+            self._record_request(elapsed, succeeded)
+            self.usage_tracker.record_call(
+                self.model, prompt, elapsed, result=usage_result, response_text="".join(parts),
+                success=succeeded, component=self.component, attribution=attribution
+            )
+
+    def _span_attributes(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
+        return {"model": self.model, "prompt_chars": len(prompt), "max_tokens": max_tokens}
+
+    def _record_request(self, seconds: float, succeeded: bool) -> None:
+        """Report call latency and failures to the production monitor"""
+        labels = {"model": self.model}
+        self.monitor.record_metric(
+            f"llm_request_{self.model}", seconds, MetricType.TIMER,
+            family="llm_request", labels=labels
+        )
+        if not succeeded:
+            self.monitor.record_metric(
+                f"llm_errors_{self.model}", 1, MetricType.COUNTER,
+                family="llm_errors", labels=labels
+            )
+
+    def _wait_for_rate_limit(self) -> None:
+        if self.rate_limiter is not None:
+            delay = self.rate_limiter.reserve()
+            if delay > 0:
+                time.sleep(delay)
+
+    def _record_time_to_first_token(self, seconds: float) -> None:
+        self.monitor.record_metric(
+            f"llm_time_to_first_token_{self.model}", seconds, MetricType.TIMER,
+            family="llm_time_to_first_token", labels={"model": self.model}
+        )
+
+    def _record_usage(self, span: Any, prompt: str, seconds: float,
+                      result: Optional[Dict[str, Any]], text: str, succeeded: bool) -> None:
+        """Store token usage for the call and tag its span with the counts"""
+        record = self.usage_tracker.record_call(
+            self.model, prompt, seconds, result=result, response_text=text,
+            success=succeeded, component=self.component
+        )
+        if record is not None:
+            span.set_attribute("prompt_tokens", record.prompt_tokens)
+            span.set_attribute("output_tokens", record.output_tokens)
@@ -0,0 +1,222 @@
+"""
+Token and cost accounting for LLM calls.
+
+Every Gemini call reports the ``usageMetadata`` token counts from its response
+to the ``LLMUsageTracker``, which stores one row per call in SQLite. Calls are
+attributed to a document, session, workflow node and operation through
+``usage_scope``: the attribution is kept in a context variable, so it reaches
+the client through nested calls, asyncio tasks and ``run_in_context`` threads
+without changing any call signatures.
+"""
+
+import contextvars
+import functools
+import inspect
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+from src.config import config
+from src.services.production_monitor import MetricType, get_global_monitor
+from src.storage.llm_usage_storage import LLMUsageRecord, LLMUsageStorage
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+ATTRIBUTION_FIELDS = ("document_id", "session_id", "workflow_node", "operation", "component")
+PROMPT_PREVIEW_CHARS = 160
+
+_usage_attribution: contextvars.ContextVar = contextvars.ContextVar("llm_usage_attribution", default={})
+
+
+@contextmanager
+def usage_scope(**attribution: Optional[str]) -> Iterator[Dict[str, Any]]:
+    """
+    Attribute LLM calls made inside the block.
+
+    Values merge over the enclosing scope; ``None`` values leave the enclosing
+    value in place.
+    """
+    unknown = set(attribution) - set(ATTRIBUTION_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown usage attribution fields: {sorted(unknown)}")
+
+    merged = dict(_usage_attribution.get())
+    merged.update({key: value for key, value in attribution.items() if value is not None})
+    token = _usage_attribution.set(merged)
+    try:
+        yield merged
+    finally:
+        _usage_attribution.reset(token)
+
+
+def current_attribution() -> Dict[str, Any]:
+    return dict(_usage_attribution.get())
+
+
+def usage_scoped(attributes: Callable[..., Dict[str, Any]]):
+    """Decorator running a function (sync or async) inside ``usage_scope``."""
+    def decorator(func):
+        def scope_attributes(args, kwargs):
+            try:
+                return attributes(*args, **kwargs)
+            except Exception:
+                return {}
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with usage_scope(**scope_attributes(args, kwargs)):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with usage_scope(**scope_attributes(args, kwargs)):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+def extract_token_usage(result: Optional[Dict[str, Any]]) -> Tuple[int, int, int]:
+    """Prompt, output and total tokens from a ``generateContent`` response body."""
+    metadata = result.get("usageMetadata") if isinstance(result, dict) else None
+    if not isinstance(metadata, dict):
+        return 0, 0, 0
+    prompt_tokens = int(metadata.get("promptTokenCount", 0) or 0)
+    output_tokens = int(metadata.get("candidatesTokenCount", 0) or 0)
+    total_tokens = int(metadata.get("totalTokenCount", 0) or 0) or prompt_tokens + output_tokens
+    return prompt_tokens, output_tokens, total_tokens
+
+
+def estimate_cost(prompt_tokens: int, output_tokens: int) -> float:
+    """Estimated USD cost of a call from the configured per-million-token prices."""
+    return (
+        prompt_tokens * config.LLM_INPUT_COST_PER_MILLION_TOKENS
+        + output_tokens * config.LLM_OUTPUT_COST_PER_MILLION_TOKENS
+    ) / 1_000_000
+
+
+class LLMUsageTracker:
+    """Records per-call LLM usage and answers cost reporting queries."""
+
+    def __init__(self, storage: Optional[LLMUsageStorage] = None, monitor=None,
+                 enabled: Optional[bool] = None):
+        self.storage = storage or LLMUsageStorage()
+        self.monitor = monitor or get_global_monitor()
+        self.enabled = config.LLM_USAGE_TRACKING_ENABLED if enabled is None else enabled
+
+    def record_call(
+        self,
+        model: str,
+        prompt: str,
+        latency_seconds: float,
+        result: Optional[Dict[str, Any]] = None,
+        response_text: str = "",
+        success: bool = True,
+        component: Optional[str] = None,
+        attribution: Optional[Dict[str, Any]] = None
+    ) -> Optional[LLMUsageRecord]:
+        """
+        Store usage for one call, attributed to the current ``usage_scope``.
+
+        ``attribution`` overrides the current scope, for calls such as streams
+        that finish outside the scope they were started in. Recording never
+        raises; accounting failures are logged and the call result is
+        unaffected.
+        """
+        if not self.enabled:
+            return None
+
+        prompt_tokens, output_tokens, total_tokens = extract_token_usage(result)
+        attribution = current_attribution() if attribution is None else attribution
+        record = LLMUsageRecord(
+            model=model,
+            prompt_tokens=prompt_tokens,
+            output_tokens=output_tokens,
+            total_tokens=total_tokens,
+            latency_ms=round(latency_seconds * 1000, 3),
+            estimated_cost=estimate_cost(prompt_tokens, output_tokens),
+            success=success,
+            component=attribution.get("component") or component,
+            operation=attribution.get("operation"),
+            workflow_node=attribution.get("workflow_node"),
+            document_id=attribution.get("document_id"),
+            session_id=attribution.get("session_id"),
+            prompt_chars=len(prompt),
+            response_chars=len(response_text or ""),
+            prompt_preview=" ".join(prompt[:PROMPT_PREVIEW_CHARS * 2].split())[:PROMPT_PREVIEW_CHARS]
+        )
+
+        try:
+            self.storage.record_usage(record)
+        except Exception as e:
+            logger.warning(f"Failed to record LLM usage: {e}")
+
+        labels = {"model": model, "component": record.component or "unknown"}
+        self.monitor.record_metric(
+            f"llm_prompt_tokens_{model}_{labels['component']}", prompt_tokens, MetricType.COUNTER,
+            family="llm_prompt_tokens", labels=labels
+        )
+        self.monitor.record_metric(
+            f"llm_output_tokens_{model}_{labels['component']}", output_tokens, MetricType.COUNTER,
+            family="llm_output_tokens", labels=labels
+        )
+        return record
+
+    # Reporting
+    def get_usage_by_document(self, limit: int = 50, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return self.storage.get_usage_summary("document_id", since=since, limit=limit)
+
+    def get_usage_by_session(self, limit: int = 50, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return self.storage.get_usage_summary("session_id", since=since, limit=limit)
+
+    def get_usage_by_workflow_node(self, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return self.storage.get_usage_summary("workflow_node", since=since)
+
+    def get_usage_by_operation(self, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return self.storage.get_usage_summary("operation", since=since)
+
+    def get_document_usage(self, document_id: str) -> Dict[str, Any]:
+        """Totals for one document plus its breakdown by operation."""
+        return {
+            "document_id": document_id,
+            "totals": self.storage.get_totals(document_id=document_id),
+            "by_operation": self.storage.get_usage_summary("operation", document_id=document_id),
+            "by_workflow_node": self.storage.get_usage_summary("workflow_node", document_id=document_id)
+        }
+
+    def get_session_usage(self, session_id: str) -> Dict[str, Any]:
+        return {
+            "session_id": session_id,
+            "totals": self.storage.get_totals(session_id=session_id),
+            "by_operation": self.storage.get_usage_summary("operation", session_id=session_id)
+        }
+
+    def get_most_expensive_calls(self, limit: int = 20, since: Optional[datetime] = None) -> List[Dict[str, Any]]:
+        return self.storage.get_most_expensive_calls(limit=limit, since=since)
+
+    def get_usage_report(self, since: Optional[datetime] = None, limit: int = 10) -> Dict[str, Any]:
+        """Totals, the costliest groups along each dimension and the costliest calls."""
+        return {
+            "totals": self.storage.get_totals(since=since),
+            "by_component": self.storage.get_usage_summary("component", since=since, limit=limit),
+            "by_operation": self.storage.get_usage_summary("operation", since=since, limit=limit),
+            "by_workflow_node": self.storage.get_usage_summary("workflow_node", since=since, limit=limit),
+            "by_document": self.storage.get_usage_summary("document_id", since=since, limit=limit),
+            "by_session": self.storage.get_usage_summary("session_id", since=since, limit=limit),
+            "most_expensive_calls": self.storage.get_most_expensive_calls(limit=limit, since=since)
+        }
+
+
+# Global usage tracker instance
+_usage_tracker: Optional[LLMUsageTracker] = None
+
+
+def get_usage_tracker() -> LLMUsageTracker:
+    """Get the global LLM usage tracker instance."""
+    global _usage_tracker
+    if _usage_tracker is None:
+        _usage_tracker = LLMUsageTracker()
+    return _usage_tracker
@@ -0,0 +1,246 @@
+"""
+OpenMetrics exposition for the production monitor
+
+Serves ``ProductionMonitor.collect()`` in the OpenMetrics text format from a
+small standard-library HTTP server on a background thread, independent of the
+Streamlit server, so Prometheus-compatible scrapers can read ``/metrics``.
+Recent request traces are served from the same server: ``/traces`` in Chrome
+Trace Event JSON and ``/traces/slowest`` as per-trace span breakdowns, and
+``/llm-usage`` reports LLM token usage and estimated cost and ``/db-queries``
+SQLite statement timings with the slow-query log.
+"""
+
+from typing import Dict, List, Optional
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import math
+import re
+import threading
+
+from src.services.llm_usage import get_usage_tracker
+from src.storage.database import db_manager
+from src.services.production_monitor import (
+    ProductionMonitor, MetricFamily, MetricType, get_global_monitor
+)
+from src.utils.logging_config import get_logger
+from src.utils.tracing import get_tracer
+
+logger = get_logger(__name__)
+
+OPENMETRICS_CONTENT_TYPE = "application/openmetrics-text; version=1.0.0; charset=utf-8"
+METRIC_NAME_PREFIX = "docqa_"
+
+_OPENMETRICS_TYPES = {
+    MetricType.COUNTER: "counter",
+    MetricType.GAUGE: "gauge",
+    MetricType.HISTOGRAM: "histogram",
+    MetricType.TIMER: "histogram",
+}
+_INVALID_NAME_CHARS = re.compile(r"[^a-zA-Z0-9_:]")
+
+
+def sanitize_metric_name(name: str) -> str:
+    """Make ``name`` a valid metric name"""
+    name = _INVALID_NAME_CHARS.sub("_", name)
+    if name and name[0].isdigit():
+        name = f"_{name}"
+    return name
+
+
+def _family_name(family: MetricFamily) -> str:
+    name = sanitize_metric_name(f"{METRIC_NAME_PREFIX}{family.name}")
+    if family.metric_type == MetricType.COUNTER and name.endswith("_total"):
+        name = name[:-len("_total")]
+    if family.unit and not name.endswith(f"_{family.unit}"):
+        name = f"{name}_{family.unit}"
+    return name
+
+
+def _escape_label_value(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    pairs = ",".join(
+        f'{sanitize_metric_name(key)}="{_escape_label_value(value)}"'
+        for key, value in labels.items()
+    )
+    return "{" + pairs + "}"
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    if float(value).is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(float(value))
+
+
+def render_openmetrics(families: List[MetricFamily]) -> str:
+    """Render metric families in the OpenMetrics text format"""
+    lines = []
+    seen = set()
+
+    for family in families:
+        name = _family_name(family)
+        if name in seen:
+            logger.debug(f"Skipping duplicate metric family {name}")
+            continue
+        seen.add(name)
+
+        lines.append(f"# TYPE {name} {_OPENMETRICS_TYPES[family.metric_type]}")
+        if family.unit:
+            lines.append(f"# UNIT {name} {family.unit}")
+        if family.help:
+            lines.append(f"# HELP {name} {_escape_label_value(family.help)}")
+
+        for sample in family.samples:
+            suffix = sample.suffix
+            if family.metric_type == MetricType.COUNTER and not suffix:
+                suffix = "_total"
+            lines.append(f"{name}{suffix}{_format_labels(sample.labels)} {_format_value(sample.value)}")
+
+    lines.append("# EOF")
+    return "\n".join(lines) + "\n"
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serves /metrics from the exporter's monitor and /traces from the global tracer"""
+
+    exporter: "MetricsExporter" = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        if path == "/metrics":
+            try:
+                body = render_openmetrics(self.exporter.monitor.collect()).encode("utf-8")
+            except Exception as e:
+                logger.error(f"Error rendering metrics: {e}")
+                self._respond(500, b"error collecting metrics\n", "text/plain; charset=utf-8")
+                return
+            self._respond(200, body, OPENMETRICS_CONTENT_TYPE)
+        elif path == "/traces":
+            body = get_tracer().export_json().encode("utf-8")
+            self._respond(200, body, "application/json")
+        elif path == "/traces/slowest":
+            slowest = [
+                {**trace.summary(), "spans": [span.to_dict() for span in trace.spans]}
+                for trace in get_tracer().slowest_traces(10)
+            ]
+            self._respond(200, json.dumps(slowest, default=str).encode("utf-8"), "application/json")
+        elif path == "/llm-usage":
+            try:
+                report = get_usage_tracker().get_usage_report()
+            except Exception as e:
+                logger.error(f"Error building LLM usage report: {e}")
+                self._respond(500, b"error building usage report\n", "text/plain; charset=utf-8")
+                return
+            self._respond(200, json.dumps(report, default=str).encode("utf-8"), "application/json")
+        elif path == "/db-queries":
+            body = json.dumps(db_manager.get_query_statistics(limit=None), default=str).encode("utf-8")
+            self._respond(200, body, "application/json")
+        elif path in ("/", "/healthz"):
+            self._respond(200, b"ok\n", "text/plain; charset=utf-8")
+        else:
+            self._respond(404, b"not found\n", "text/plain; charset=utf-8")
+
+    def _respond(self, status: int, body: bytes, content_type: str) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(f"Metrics request: {format % args}")
+
+
+class MetricsExporter:
+    """Background HTTP server exposing monitor metrics for scraping"""
+
+    def __init__(
+        self,
+        monitor: Optional[ProductionMonitor] = None,
+        host: str = "127.0.0.1",
+        port: int = 9464
+    ):
+        self.monitor = monitor or get_global_monitor()
+        self.host = host
+        self.port = port
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._server is not None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/metrics"
+
+    def start(self) -> bool:
+        """Start serving; returns False if the port could not be bound"""
+        if self._server is not None:
+            return True
+
+        handler = type("MetricsRequestHandler", (_MetricsRequestHandler,), {"exporter": self})
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), handler)
+        except OSError as e:
+            logger.warning(f"Metrics exporter could not bind {self.host}:{self.port}: {e}")
+            return False
+
+        self._server.daemon_threads = True
+        # Port 0 asks the OS for a free port
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name="metrics-exporter", daemon=True
+        )
+        self._thread.start()
+        logger.info(f"Metrics exporter listening on {self.url}")
+        return True
+
+    def stop(self) -> None:
+        if self._server is None:
+            return
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join(timeout=5)
+        self._server = None
+        self._thread = None
+        logger.info("Metrics exporter stopped")
+
+
+# Global exporter instance
+_global_exporter: Optional[MetricsExporter] = None
+_global_exporter_lock = threading.Lock()
+
+
+def start_metrics_exporter(
+    host: str = "127.0.0.1",
+    port: int = 9464,
+    monitor: Optional[ProductionMonitor] = None
+) -> Optional[MetricsExporter]:
+    """Start the global exporter once per process; returns None if it could not start"""
+    global _global_exporter
+    with _global_exporter_lock:
+        if _global_exporter is None:
+            exporter = MetricsExporter(monitor, host, port)
+            if not exporter.start():
+                return None
+            _global_exporter = exporter
+        return _global_exporter
+
+
+def stop_metrics_exporter() -> None:
+    """Stop the global exporter"""
+    global _global_exporter
+    with _global_exporter_lock:
+        if _global_exporter is not None:
+            _global_exporter.stop()
+            _global_exporter = None
@@ -0,0 +1,330 @@
+"""
+Time-bucketed metrics storage for the production monitor
+
+Each metric series is a ring buffer of fixed-resolution buckets holding
+count, sum, min, max and a mergeable quantile sketch. Recording a value
+touches only the newest bucket, and windowed queries merge the aggregates
+of the buckets in the window instead of rescanning raw samples.
+"""
+
+from typing import Any, Dict, List, Optional
+from dataclasses import dataclass
+from collections import deque
+import bisect
+import math
+import threading
+import time
+
+# Upper bounds (seconds) of the cumulative histogram kept for timer series
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+HISTOGRAM_TYPES = ("timer", "histogram")
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with bounded relative error.
+
+    Values are counted in logarithmically spaced buckets (as in DDSketch), so
+    any quantile estimate is within ``relative_accuracy`` of the true value
+    and two sketches merge by adding their bucket counts.
+    """
+
+    __slots__ = ("relative_accuracy", "_gamma", "_log_gamma", "positive", "negative", "zero_count", "count")
+
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self.positive: Dict[int, int] = {}
+        self.negative: Dict[int, int] = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        if value > 0:
+            index = self._index(value)
+            self.positive[index] = self.positive.get(index, 0) + 1
+        elif value < 0:
+            index = self._index(-value)
+            self.negative[index] = self.negative.get(index, 0) + 1
+        else:
+            self.zero_count += 1
+
+    def merge(self, other: "QuantileSketch") -> None:
+        for index, count in other.positive.items():
+            self.positive[index] = self.positive.get(index, 0) + count
+        for index, count in other.negative.items():
+            self.negative[index] = self.negative.get(index, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate the ``q`` quantile (0 <= q <= 1), or None when empty"""
+        if self.count == 0:
+            return None
+
+        # Nearest-rank definition: the smallest value with at least q of the samples at or below it
+        rank = max(0, math.ceil(q * self.count) - 1)
+        seen = 0
+
+        # Negative values in ascending order are the largest magnitudes first
+        for index in sorted(self.negative, reverse=True):
+            seen += self.negative[index]
+            if seen > rank:
+                return -self._value(index)
+
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+
+        for index in sorted(self.positive):
+            seen += self.positive[index]
+            if seen > rank:
+                return self._value(index)
+
+        return self._value(max(self.positive)) if self.positive else 0.0
+
+    def _index(self, magnitude: float) -> int:
+        return math.ceil(math.log(magnitude) / self._log_gamma)
+
+    def _value(self, index: int) -> float:
+        return 2 * self._gamma ** index / (self._gamma + 1)
+
+
+class MetricBucket:
+    """Aggregates of one metric over one time slot"""
+
+    __slots__ = ("slot", "count", "total", "minimum", "maximum", "sketch")
+
+    def __init__(self, slot: int, relative_accuracy: float):
+        self.slot = slot
+        self.count = 0
+        self.total = 0.0
+        self.minimum = math.inf
+        self.maximum = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, value: float) -> None:
+        self.count += 1
+        self.total += value
+        if value < self.minimum:
+            self.minimum = value
+        if value > self.maximum:
+            self.maximum = value
+        self.sketch.add(value)
+
+
+@dataclass
+class MetricSummary:
+    """Aggregated view of a metric over a time window"""
+    count: int
+    sum: float
+    min: float
+    max: float
+    avg: float
+    p50: float
+    p95: float
+    p99: float
+    last: float
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "avg": self.avg,
+            "min": self.min,
+            "max": self.max,
+            "p50": self.p50,
+            "p95": self.p95,
+            "p99": self.p99
+        }
+
+
+class MetricSeries:
+    """Ring buffer of buckets for a single metric, plus running totals"""
+
+    def __init__(
+        self,
+        metric_type: str,
+        max_buckets: int,
+        relative_accuracy: float,
+        family: str,
+        labels: Dict[str, str]
+    ):
+        self.metric_type = metric_type
+        self.relative_accuracy = relative_accuracy
+        self.family = family
+        self.labels = labels
+        self.buckets: "deque[MetricBucket]" = deque(maxlen=max_buckets)
+        self.total_count = 0
+        self.total_sum = 0.0
+        self.last_value = 0.0
+        self.last_updated = 0.0
+        # Lifetime per-bound counts (last slot is +Inf) for histogram exposition
+        self.histogram: Optional[List[int]] = (
+            [0] * (len(LATENCY_BUCKETS) + 1) if metric_type in HISTOGRAM_TYPES else None
+        )
+
+    def add(self, slot: int, value: float, timestamp: float) -> None:
+        bucket = self._bucket_for(slot)
+        bucket.add(value)
+
+        self.total_count += 1
+        self.total_sum += value
+        if self.histogram is not None:
+            self.histogram[bisect.bisect_left(LATENCY_BUCKETS, value)] += 1
+        if timestamp >= self.last_updated:
+            self.last_value = value
+            self.last_updated = timestamp
+
+    def _bucket_for(self, slot: int) -> MetricBucket:
+        if self.buckets and self.buckets[-1].slot == slot:
+            return self.buckets[-1]
+
+        if not self.buckets or self.buckets[-1].slot < slot:
+            bucket = MetricBucket(slot, self.relative_accuracy)
+            self.buckets.append(bucket)
+            return bucket
+
+        # Late sample for an earlier slot (a caller supplied an old timestamp)
+        for bucket in reversed(self.buckets):
+            if bucket.slot == slot:
+                return bucket
+            if bucket.slot < slot:
+                break
+        # Slot has no bucket and cannot be inserted in order; fold into the oldest newer one
+        return next(bucket for bucket in self.buckets if bucket.slot > slot)
+
+
+class MetricsStore:
+    """
+    Thread-safe time-bucketed store for monitor metrics.
+
+    Recording is O(1). A query over a window merges at most
+    ``window / resolution`` bucket aggregates, independent of how many
+    samples were recorded. Buckets older than the retention period fall off
+    the ring automatically.
+    """
+
+    def __init__(
+        self,
+        resolution_seconds: int = 10,
+        retention_seconds: int = 24 * 3600,
+        relative_accuracy: float = 0.01
+    ):
+        self.resolution_seconds = resolution_seconds
+        self.retention_seconds = retention_seconds
+        self.relative_accuracy = relative_accuracy
+        self.max_buckets = max(1, math.ceil(retention_seconds / resolution_seconds))
+
+        self._series: Dict[str, MetricSeries] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        name: str,
+        value: float,
+        metric_type: str = "gauge",
+        timestamp: Optional[float] = None,
+        family: Optional[str] = None,
+        labels: Optional[Dict[str, str]] = None
+    ) -> None:
+        """
+        Add a sample to ``name``
+
+        ``family`` and ``labels`` are fixed when the series is created; series
+        sharing a family are exposed as one metric with different labels.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        slot = int(timestamp // self.resolution_seconds)
+
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                series = MetricSeries(
+                    metric_type, self.max_buckets, self.relative_accuracy,
+                    family or name, dict(labels or {})
+                )
+                self._series[name] = series
+            series.add(slot, float(value), timestamp)
+
+    def summarize(self, name: str, window_seconds: float, now: Optional[float] = None) -> Optional[MetricSummary]:
+        """Aggregate ``name`` over the trailing window, or None if it has no samples there"""
+        now = time.time() if now is None else now
+        first_slot = int((now - window_seconds) // self.resolution_seconds)
+
+        with self._lock:
+            series = self._series.get(name)
+            if series is None:
+                return None
+
+            count = 0
+            total = 0.0
+            minimum = math.inf
+            maximum = -math.inf
+            sketch = QuantileSketch(self.relative_accuracy)
+
+            for bucket in reversed(series.buckets):
+                if bucket.slot < first_slot:
+                    break
+                count += bucket.count
+                total += bucket.total
+                minimum = min(minimum, bucket.minimum)
+                maximum = max(maximum, bucket.maximum)
+                sketch.merge(bucket.sketch)
+            last = series.last_value
+
+        if count == 0:
+            return None
+
+        def clamp(value: float) -> float:
+            return min(max(value, minimum), maximum)
+
+        return MetricSummary(
+            count=count,
+            sum=total,
+            min=minimum,
+            max=maximum,
+            avg=total / count,
+            p50=clamp(sketch.quantile(0.50)),
+            p95=clamp(sketch.quantile(0.95)),
+            p99=clamp(sketch.quantile(0.99)),
+            last=last
+        )
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._series)
+
+    def get_series_info(self) -> Dict[str, Dict[str, Any]]:
+        """Type, labels, lifetime totals and latest value of every series"""
+        with self._lock:
+            return {
+                name: {
+                    "type": series.metric_type,
+                    "family": series.family,
+                    "labels": dict(series.labels),
+                    "total_count": series.total_count,
+                    "total_sum": series.total_sum,
+                    "last_value": series.last_value,
+                    "last_updated": series.last_updated,
+                    "histogram": list(series.histogram) if series.histogram is not None else None
+                }
+                for name, series in self._series.items()
+            }
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop series with no samples inside the retention period"""
+        now = time.time() if now is None else now
+        cutoff = now - self.retention_seconds
+
+        with self._lock:
+            stale = [name for name, series in self._series.items() if series.last_updated < cutoff]
+            for name in stale:
+                del self._series[name]
+        return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._series.clear()
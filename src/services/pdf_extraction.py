@@ -0,0 +1,197 @@
+"""
+Page-level PDF text extraction.
+
+``PyPDF2`` text extraction is pure Python and spends almost all of its time
+in ``page.extract_text()``, so long PDFs are split into page ranges that are
+extracted in a process pool. Each worker parses the PDF once and then
+extracts the ranges it is given. Pages are yielded in order as soon as their
+range finishes, so callers can start chunking before the last page is read,
+and each page records its character offsets in the joined document text for
+citations. Short PDFs are extracted in-process, where a pool would cost more
+than it saves.
+"""
+
+import io
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+import PyPDF2
+
+from src.config import config
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Separator between page texts in the joined document text
+PAGE_SEPARATOR = "\n\n"
+
+
+@dataclass
+class PdfPage:
+    """Text of one PDF page and where it sits in the joined document text."""
+    page_number: int  # 1-based
+    text: str
+    start_offset: int
+    end_offset: int
+
+
+@dataclass
+class PdfExtractionStats:
+    """Throughput of one PDF extraction."""
+    page_count: int = 0
+    pages_with_text: int = 0
+    failed_pages: int = 0
+    workers: int = 1
+    seconds: float = 0.0
+
+    @property
+    def pages_per_second(self) -> float:
+        return self.page_count / self.seconds if self.seconds else 0.0
+
+
+@dataclass
+class PdfExtraction:
+    """Joined text, per-page offsets and throughput of a PDF extraction."""
+    text: str
+    pages: List[PdfPage] = field(default_factory=list)
+    stats: PdfExtractionStats = field(default_factory=PdfExtractionStats)
+
+
+# Page results are (1-based page number, text, error)
+PageResult = Tuple[int, str, Optional[str]]
+
+# The PDF a pool worker was started with, parsed once per worker process
+_worker_reader: Optional[PyPDF2.PdfReader] = None
+
+# A PDF path, its bytes or a seekable binary stream
+PdfSource = Union[str, bytes, BinaryIO]
+
+
+def _init_worker(source: Union[str, bytes]):
+    """Open the PDF by path, so large files are not copied to every worker, or from bytes."""
+    global _worker_reader
+    _worker_reader = PyPDF2.PdfReader(open(source, 'rb') if isinstance(source, str) else io.BytesIO(source))
+
+
+def _extract_range(start: int, stop: int) -> List[PageResult]:
+    """Extract pages ``[start, stop)`` of the worker's PDF; runs in the pool workers."""
+    return _extract_pages(_worker_reader, start, stop)
+
+
+def _extract_pages(reader: PyPDF2.PdfReader, start: int, stop: int) -> List[PageResult]:
+    results = []
+    for index in range(start, stop):
+        try:
+            results.append((index + 1, reader.pages[index].extract_text() or "", None))
+        except Exception as e:
+            results.append((index + 1, "", str(e)))
+    return results
+
+
+class PdfPageExtractor:
+    """Extracts PDF text page by page, in parallel for long documents."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        pages_per_task: Optional[int] = None,
+        parallel_min_pages: Optional[int] = None
+    ):
+        workers = config.PDF_EXTRACTION_WORKERS if workers is None else workers
+        self.workers = workers if workers > 0 else min(4, os.cpu_count() or 1)
+        self.pages_per_task = max(1, pages_per_task or config.PDF_PAGES_PER_TASK)
+        self.parallel_min_pages = (
+            config.PDF_PARALLEL_MIN_PAGES if parallel_min_pages is None else parallel_min_pages
+        )
+
+    def extract(self, source: PdfSource) -> PdfExtraction:
+        """Extract the whole document, keeping every page's offsets."""
+        stats = PdfExtractionStats()
+        pages = list(self.iter_pages(source, stats))
+        return PdfExtraction(PAGE_SEPARATOR.join(page.text for page in pages), pages, stats)
+
+    def iter_pages(self, source: PdfSource,
+                   stats: Optional[PdfExtractionStats] = None) -> Iterator[PdfPage]:
+        """
+        Yield the pages that contain text, in order, as they are extracted.
+
+        ``source`` is a path, the PDF bytes or a seekable binary stream.
+        Offsets assume the pages are joined with ``PAGE_SEPARATOR``. Pages that
+        fail to extract are logged and skipped. ``stats`` is filled in when the
+        generator is exhausted.
+        """
+        stats = stats if stats is not None else PdfExtractionStats()
+        started = time.perf_counter()
+
+        if isinstance(source, str):
+            stream = open(source, 'rb')
+        elif isinstance(source, (bytes, bytearray)):
+            stream = io.BytesIO(source)
+        else:
+            stream = source
+            stream.seek(0)
+
+        try:
+            reader = PyPDF2.PdfReader(stream)
+            stats.page_count = len(reader.pages)
+            parallel = self.workers > 1 and stats.page_count >= max(self.parallel_min_pages, 2)
+            stats.workers = min(self.workers, -(-stats.page_count // self.pages_per_task)) if parallel else 1
+
+            results = (
+                self._parallel_results(self._worker_source(source), stats.page_count, stats.workers) if parallel
+                else (result for index in range(stats.page_count) for result in _extract_pages(reader, index, index + 1))
+            )
+            yield from self._with_offsets(results, stats)
+        finally:
+            if stream is not source:
+                stream.close()
+
+        stats.seconds = time.perf_counter() - started
+        logger.info(
+            f"Extracted {stats.page_count} PDF pages in {stats.seconds:.2f}s "
+            f"({stats.pages_per_second:.1f} pages/s, {stats.workers} worker(s))"
+        )
+
+    @staticmethod
+    def _with_offsets(results: Iterator[PageResult], stats: PdfExtractionStats) -> Iterator[PdfPage]:
+        """Pages with text, with their offsets in the joined text."""
+        offset = 0
+        for page_number, text, error in results:
+            if error:
+                stats.failed_pages += 1
+                logger.warning(f"Could not extract text from page {page_number}: {error}")
+                continue
+            if not text.strip():
+                continue
+            if stats.pages_with_text:
+                offset += len(PAGE_SEPARATOR)
+            stats.pages_with_text += 1
+            yield PdfPage(page_number, text, offset, offset + len(text))
+            offset += len(text)
+
+    def _parallel_results(self, source: Union[str, bytes], page_count: int, workers: int) -> Iterator[PageResult]:
+        """Page results in page order, from ranges extracted across a process pool."""
+        ranges = deque(
+            (start, min(start + self.pages_per_task, page_count))
+            for start in range(0, page_count, self.pages_per_task)
+        )
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(source,)) as executor:
+            # Keep a bounded window of ranges queued so results stream back in order
+            in_flight = deque()
+            while ranges or in_flight:
+                while ranges and len(in_flight) < workers * 2:
+                    in_flight.append(executor.submit(_extract_range, *ranges.popleft()))
+                yield from in_flight.popleft().result()
+
+    @staticmethod
+    def _worker_source(source: PdfSource) -> Union[str, bytes]:
+        if isinstance(source, (str, bytes)):
+            return source
+        if isinstance(source, bytearray):
+            return bytes(source)
+        source.seek(0)
+        return source.read()
@@ -13,15 +13,20 @@ import time
 import json
 import asyncio
 import threading
-import psutil
 import logging
-from collections import deque, defaultdict
+from collections import deque
 import statistics
 
+from src.services.metrics_store import MetricsStore, MetricSummary, LATENCY_BUCKETS
+from src.services.resource_sampler import SystemResourceSampler
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
 
+# Metric families counted by the error rate in ``get_performance_metrics``
+ERROR_FAMILIES = ("errors", "llm_errors")
+REQUEST_FAMILIES = ("llm_request",)
+
 
 class HealthStatus(Enum):
     """Health check status levels"""
@@ -61,11 +66,21 @@ class HealthCheckResult:
 
 
 @dataclass
-class MetricValue:
-    """Individual metric value"""
+class MetricSample:
+    """One exposed sample of a metric family"""
+    labels: Dict[str, str]
     value: float
-    timestamp: datetime = field(default_factory=datetime.now)
-    tags: Dict[str, str] = field(default_factory=dict)
+    suffix: str = ""  # e.g. "_total", "_bucket", "_count", "_sum"
+
+
+@dataclass
+class MetricFamily:
+    """A named metric with its type, help text and labelled samples"""
+    name: str
+    metric_type: MetricType
+    help: str
+    samples: List[MetricSample] = field(default_factory=list)
+    unit: str = ""
 
 
 @dataclass
@@ -120,21 +135,32 @@ class ProductionMonitor:
     def __init__(self, 
                  metrics_retention_hours: int = 24,
                  health_check_interval_seconds: int = 30,
-                 alert_check_interval_seconds: int = 60):
+                 alert_check_interval_seconds: int = 60,
+                 metrics_resolution_seconds: int = 10,
+                 system_sampling_interval_seconds: float = 5.0):
         """Initialize the production monitor"""
         
         self.metrics_retention_hours = metrics_retention_hours
         self.health_check_interval = health_check_interval_seconds
         self.alert_check_interval = alert_check_interval_seconds
         
-        # Metrics storage
-        self.metrics: Dict[str, deque] = defaultdict(lambda: deque(maxlen=1000))
+        # Metrics storage: fixed-resolution buckets, expired by the ring buffer itself
+        self.metrics = MetricsStore(
+            resolution_seconds=metrics_resolution_seconds,
+            retention_seconds=metrics_retention_hours * 3600
+        )
         self.performance_history: deque = deque(maxlen=1000)
         
         # Health checks
         self.health_checks: List[HealthCheck] = []
         self.last_health_results: Dict[str, HealthCheckResult] = {}
         
+        # System resources are sampled in the background; readers get the cached snapshot
+        self.resource_sampler = SystemResourceSampler(system_sampling_interval_seconds)
+        
+        # Extra metric sources (caches, queues, database) polled on collection
+        self.collectors: Dict[str, Callable[[], List[MetricFamily]]] = {}
+        
         # Alerting
         self.alert_rules: List[AlertRule] = []
         self.active_alerts: Dict[str, Alert] = {}
@@ -165,6 +191,7 @@ class ProductionMonitor:
         self.monitoring_active = False
         if self.monitoring_thread:
             self.monitoring_thread.join(timeout=5)
+        self.resource_sampler.stop()
         
         logger.info("Production monitoring stopped")
     
@@ -172,18 +199,20 @@ class ProductionMonitor:
                      name: str, 
                      value: float, 
                      metric_type: MetricType = MetricType.GAUGE,
-                     tags: Optional[Dict[str, str]] = None) -> None:
-        """Record a metric value"""
+                     family: Optional[str] = None,
+                     labels: Optional[Dict[str, str]] = None) -> None:
+        """
+        Record a metric value
         
-        metric_value = MetricValue(
-            value=value,
-            tags=tags or {}
-        )
-        
-        self.metrics[name].append(metric_value)
+        ``family`` and ``labels`` name the exported metric this series belongs
+        to; keep label values low cardinality since every combination becomes
+        its own series.
+        """
         
-        # Clean up old metrics
-        self._cleanup_old_metrics()
+        try:
+            self.metrics.record(name, float(value), metric_type.value, family=family, labels=labels)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring non-numeric value {value!r} for metric {name}")
     
     def record_response_time(self, response_time: float, endpoint: str = "default") -> None:
         """Record response time metric"""
@@ -191,7 +220,8 @@ class ProductionMonitor:
             f"response_time_{endpoint}",
             response_time,
             MetricType.TIMER,
-            {"endpoint": endpoint}
+            family="response_time",
+            labels={"endpoint": endpoint}
         )
     
     def record_error(self, error_type: str, error_message: str, context: Dict[str, Any] = None) -> None:
@@ -200,7 +230,8 @@ class ProductionMonitor:
             f"error_{error_type}",
             1,
             MetricType.COUNTER,
-            {"error_type": error_type, "message": error_message[:100]}
+            family="errors",
+            labels={"error_type": error_type}
         )
         
         # Log error details
@@ -249,34 +280,25 @@ class ProductionMonitor:
     def get_performance_metrics(self, time_window_minutes: int = 60) -> Dict[str, Any]:
         """Get performance metrics for specified time window"""
         
-        cutoff_time = datetime.now() - timedelta(minutes=time_window_minutes)
-        
-        # Filter recent metrics
+        # Aggregate recent metrics from their time buckets
         recent_metrics = {}
-        for metric_name, values in self.metrics.items():
-            recent_values = [
-                v.value for v in values 
-                if v.timestamp >= cutoff_time
-            ]
-            if recent_values:
-                recent_metrics[metric_name] = {
-                    "count": len(recent_values),
-                    "avg": statistics.mean(recent_values),
-                    "min": min(recent_values),
-                    "max": max(recent_values),
-                    "p95": statistics.quantiles(recent_values, n=20)[18] if len(recent_values) > 20 else max(recent_values)
-                }
+        families = {name: info["family"] for name, info in self.metrics.get_series_info().items()}
+        for metric_name in families:
+            summary = self.metrics.summarize(metric_name, time_window_minutes * 60)
+            if summary:
+                recent_metrics[metric_name] = summary.to_dict()
         
         # System metrics
         system_metrics = self._get_system_metrics()
         
         # Calculate derived metrics
         response_time_metrics = [m for name, m in recent_metrics.items() if "response_time" in name]
-        error_metrics = [m for name, m in recent_metrics.items() if "error" in name]
+        error_metrics = [m for name, m in recent_metrics.items() if families[name] in ERROR_FAMILIES]
+        request_metrics = [m for name, m in recent_metrics.items() if families[name] in REQUEST_FAMILIES]
         
         avg_response_time = statistics.mean([m["avg"] for m in response_time_metrics]) if response_time_metrics else 0.0
         total_errors = sum(m["count"] for m in error_metrics)
-        total_requests = sum(m["count"] for name, m in recent_metrics.items() if "request" in name)
+        total_requests = sum(m["count"] for m in request_metrics)
         error_rate = (total_errors / total_requests * 100) if total_requests > 0 else 0.0
         
         return {
@@ -308,6 +330,58 @@ class ProductionMonitor:
             for alert in self.active_alerts.values()
         ]
     
+    def register_collector(self, name: str, collector: Callable[[], List[MetricFamily]]) -> None:
+        """Register (or replace) a callable that reports extra metric families"""
+        self.collectors[name] = collector
+    
+    def unregister_collector(self, name: str) -> None:
+        self.collectors.pop(name, None)
+    
+    def collect(self) -> List[MetricFamily]:
+        """
+        All metrics as families for exposition
+        
+        Recorded counters are reported as lifetime totals, gauges as their
+        latest value and timers as cumulative latency histograms, followed by
+        the families returned by registered collectors.
+        """
+        families: Dict[str, MetricFamily] = {}
+        
+        for info in self.metrics.get_series_info().values():
+            metric_type = MetricType(info["type"])
+            family = families.get(info["family"])
+            if family is None:
+                family = MetricFamily(
+                    name=info["family"],
+                    metric_type=metric_type,
+                    help=f"{info['family'].replace('_', ' ')} recorded by the production monitor",
+                    unit="seconds" if metric_type in (MetricType.TIMER, MetricType.HISTOGRAM) else ""
+                )
+                families[info["family"]] = family
+            
+            labels = info["labels"]
+            if family.metric_type == MetricType.COUNTER:
+                family.samples.append(MetricSample(labels, info["total_sum"], "_total"))
+            elif family.metric_type in (MetricType.TIMER, MetricType.HISTOGRAM) and info["histogram"]:
+                cumulative = 0
+                for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), info["histogram"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    family.samples.append(MetricSample({**labels, "le": le}, cumulative, "_bucket"))
+                family.samples.append(MetricSample(labels, info["total_count"], "_count"))
+                family.samples.append(MetricSample(labels, info["total_sum"], "_sum"))
+            else:
+                family.samples.append(MetricSample(labels, info["last_value"]))
+        
+        collected = list(families.values())
+        for name, collector in list(self.collectors.items()):
+            try:
+                collected.extend(collector())
+            except Exception as e:
+                logger.warning(f"Metrics collector {name} failed: {e}")
+        
+        return collected
+    
     def add_health_check(self, health_check: HealthCheck) -> None:
         """Add a custom health check"""
         self.health_checks.append(health_check)
@@ -364,6 +438,7 @@ class ProductionMonitor:
                 
                 # Record system metrics
                 self._record_system_metrics()
+                self._cleanup_old_metrics()
                 
                 # Sleep for a short interval
                 time.sleep(5)
@@ -426,17 +501,17 @@ class ProductionMonitor:
         
         for rule in self.alert_rules:
             try:
-                # Get recent metric values
-                metric_values = self._get_recent_metric_values(
+                # Get recent metric aggregates
+                summary = self._get_recent_metric_summary(
                     rule.metric_name, 
                     rule.duration_minutes
                 )
                 
-                if not metric_values:
+                if not summary:
                     continue
                 
                 # Calculate current value (average over duration)
-                current_value = statistics.mean(metric_values)
+                current_value = summary.avg
                 
                 # Check threshold
                 threshold_breached = self._check_threshold(
@@ -478,57 +553,25 @@ class ProductionMonitor:
                 logger.error(f"Error checking alert rule {rule.name}: {e}")
     
     def _record_system_metrics(self) -> None:
-        """Record system-level metrics"""
+        """Record system-level metrics from the latest resource snapshot"""
         try:
-            # CPU usage
-            cpu_percent = psutil.cpu_percent(interval=1)
-            self.record_metric("system_cpu_percent", cpu_percent)
-            
-            # Memory usage
-            memory = psutil.virtual_memory()
-            self.record_metric("system_memory_percent", memory.percent)
-            self.record_metric("system_memory_mb", memory.used / 1024 / 1024)
+            system_metrics = self._get_system_metrics()
             
-            # Disk usage
-            disk = psutil.disk_usage('/')
-            self.record_metric("system_disk_percent", disk.percent)
-            
-            # Network I/O (if available)
-            try:
-                network = psutil.net_io_counters()
-                self.record_metric("system_network_bytes_sent", network.bytes_sent)
-                self.record_metric("system_network_bytes_recv", network.bytes_recv)
-            except:
-                pass  # Network stats might not be available
+            for key in ("cpu_percent", "memory_percent", "memory_mb", "disk_percent",
+                        "network_bytes_sent", "network_bytes_recv"):
+                if key in system_metrics:
+                    self.record_metric(f"system_{key}", system_metrics[key])
                 
         except Exception as e:
             logger.error(f"Error recording system metrics: {e}")
     
     def _get_system_metrics(self) -> Dict[str, Any]:
-        """Get current system metrics"""
-        try:
-            return {
-                "cpu_percent": psutil.cpu_percent(),
-                "memory_percent": psutil.virtual_memory().percent,
-                "memory_mb": psutil.virtual_memory().used / 1024 / 1024,
-                "disk_percent": psutil.disk_usage('/').percent,
-                "load_average": psutil.getloadavg() if hasattr(psutil, 'getloadavg') else [0, 0, 0]
-            }
-        except Exception as e:
-            logger.error(f"Error getting system metrics: {e}")
-            return {}
+        """Get current system metrics (cached snapshot, refreshed in the background)"""
+        return self.resource_sampler.snapshot()
     
-    def _get_recent_metric_values(self, metric_name: str, duration_minutes: int) -> List[float]:
-        """Get recent metric values within time window"""
-        if metric_name not in self.metrics:
-            return []
-        
-        cutoff_time = datetime.now() - timedelta(minutes=duration_minutes)
-        
-        return [
-            value.value for value in self.metrics[metric_name]
-            if value.timestamp >= cutoff_time
-        ]
+    def _get_recent_metric_summary(self, metric_name: str, duration_minutes: int) -> Optional[MetricSummary]:
+        """Get aggregates of a metric within time window"""
+        return self.metrics.summarize(metric_name, duration_minutes * 60)
     
     def _check_threshold(self, current_value: float, threshold: float, comparison: str) -> bool:
         """Check if current value breaches threshold"""
@@ -547,19 +590,8 @@ class ProductionMonitor:
             return False
     
     def _cleanup_old_metrics(self) -> None:
-        """Clean up old metric values"""
-        cutoff_time = datetime.now() - timedelta(hours=self.metrics_retention_hours)
-        
-        for metric_name in list(self.metrics.keys()):
-            values = self.metrics[metric_name]
-            
-            # Remove old values
-            while values and values[0].timestamp < cutoff_time:
-                values.popleft()
-            
-            # Remove empty metrics
-            if not values:
-                del self.metrics[metric_name]
+        """Drop metric series with nothing recorded within the retention period"""
+        self.metrics.prune()
     
     def _initialize_default_health_checks(self) -> None:
         """Initialize default health checks"""
@@ -568,19 +600,19 @@ class ProductionMonitor:
         self.health_checks.extend([
             HealthCheck(
                 name="system_memory",
-                check_function=lambda: psutil.virtual_memory().percent < 90,
+                check_function=lambda: self._get_system_metrics().get("memory_percent", 0) < 90,
                 critical=True,
                 description="Check system memory usage"
             ),
             HealthCheck(
                 name="system_cpu",
-                check_function=lambda: psutil.cpu_percent(interval=1) < 95,
+                check_function=lambda: self._get_system_metrics().get("cpu_percent", 0) < 95,
                 critical=True,
                 description="Check system CPU usage"
             ),
             HealthCheck(
                 name="system_disk",
-                check_function=lambda: psutil.disk_usage('/').percent < 95,
+                check_function=lambda: self._get_system_metrics().get("disk_percent", 0) < 95,
                 critical=True,
                 description="Check system disk usage"
             )
@@ -646,23 +678,22 @@ class ProductionMonitor:
     
     def _check_response_time_health(self) -> bool:
         """Check if response times are healthy"""
-        recent_times = self._get_recent_metric_values("response_time_default", 10)
+        recent_times = self._get_recent_metric_summary("response_time_default", 10)
         if not recent_times:
             return True  # No data is not necessarily unhealthy
         
-        avg_time = statistics.mean(recent_times)
-        return avg_time < 10.0  # 10 second threshold
+        return recent_times.avg < 10.0  # 10 second threshold
     
     def _check_error_rate_health(self) -> bool:
         """Check if error rate is healthy"""
-        recent_errors = self._get_recent_metric_values("error_total", 10)
-        recent_requests = self._get_recent_metric_values("request_total", 10)
+        recent_errors = self._get_recent_metric_summary("error_total", 10)
+        recent_requests = self._get_recent_metric_summary("request_total", 10)
         
         if not recent_requests:
             return True  # No requests is not unhealthy
         
-        total_errors = sum(recent_errors) if recent_errors else 0
-        total_requests = sum(recent_requests)
+        total_errors = recent_errors.sum if recent_errors else 0
+        total_requests = recent_requests.sum
         
         error_rate = (total_errors / total_requests * 100) if total_requests > 0 else 0
         return error_rate < 10.0  # 10% threshold
@@ -765,8 +796,7 @@ class PerformanceTimer:
             self.monitor.record_metric(
                 self.metric_name,
                 execution_time,
-                MetricType.TIMER,
-                self.tags
+                MetricType.TIMER
             )
             
             # Record error if exception occurred
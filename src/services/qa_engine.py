@@ -2,26 +2,108 @@
 
 import json
 import re
-from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple
 import requests
 from datetime import datetime
 
+from src.config import config
 from src.models.document import Document, QASession
+from src.services.llm_client import GeminiClient
+from src.services.llm_usage import usage_scoped
+from src.services.semantic_question_cache import SemanticQuestionCache
 from src.storage.document_storage import DocumentStorage
 from src.utils.logging_config import get_logger
+from src.utils.tracing import run_in_context, traced
 from src.utils.error_handling import QAError, APIError, handle_errors
 
 logger = get_logger(__name__)
 
+GENERATION_ERROR_ANSWER = "I'm sorry, I encountered an error while generating the answer. Please try again."
+# ``error`` of results whose answer is GENERATION_ERROR_ANSWER, so they are not cached
+GENERATION_ERROR = "Answer generation failed"
+
+# Rough prompt size estimate used when packing questions into a batch call
+CHARS_PER_TOKEN = 4
+BATCH_ANSWER_TOKENS_PER_QUESTION = 300
+
+
+class AnswerStream:
+    """
+    An answer delivered in text chunks as the model produces them.
+    
+    Iterate to receive the chunks. Once iteration finishes, ``result`` holds
+    the same dictionary ``answer_question`` returns for the question.
+    """
+    
+    def __init__(self, chunks: Iterable[str], finalize: Callable[[str], Dict[str, Any]]):
+        self._chunks = chunks
+        self._finalize = finalize
+        self.result: Optional[Dict[str, Any]] = None
+        # Merged into ``result`` when the stream completes
+        self.result_fields: Dict[str, Any] = {}
+    
+    @classmethod
+    def from_result(cls, result: Dict[str, Any]) -> 'AnswerStream':
+        """A stream for an answer that is already complete (cached, not found, errors)."""
+        stream = cls([], lambda answer: result)
+        stream.result = result
+        return stream
+    
+    def __iter__(self) -> Iterator[str]:
+        if self.result is not None:
+            self.result = {**self.result, **self.result_fields}
+            yield self.result['answer']
+            return
+        
+        parts = []
+        try:
+            for chunk in self._chunks:
+                parts.append(chunk)
+                yield chunk
+            result = self._finalize("".join(parts))
+        except Exception as e:
+            logger.error(f"Error streaming answer: {e}")
+            partial = "".join(parts)
+            if not partial:
+                yield GENERATION_ERROR_ANSWER
+            result = {
+                'answer': partial or GENERATION_ERROR_ANSWER,
+                'sources': [],
+                'confidence': 0.0,
+                'error': str(e)
+            }
+        self.result = {**result, **self.result_fields}
+    
+    def consume(self) -> Dict[str, Any]:
+        """Read the whole stream and return the final result."""
+        for _ in self:
+            pass
+        return self.result
+
 
 class QAEngine:
     """Q&A Engine that uses processed document context for question answering."""
     
-    def __init__(self, storage: DocumentStorage, api_key: str):
+    def __init__(self, storage: DocumentStorage, api_key: str,
+                 semantic_cache: Optional[SemanticQuestionCache] = None):
         self.storage = storage
         self.api_key = api_key
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
+        self.llm_client = GeminiClient(api_key, component="qa_engine")
+        self.api_url = self.llm_client.api_url
+        
+        # Near-duplicate questions on the same document reuse earlier answers
+        if semantic_cache is None and config.SEMANTIC_CACHE_ENABLED:
+            semantic_cache = SemanticQuestionCache(
+                self._extract_key_terms,
+                similarity_threshold=config.SEMANTIC_CACHE_THRESHOLD
+            )
+        self.semantic_cache = semantic_cache
     
+    @traced("qa_engine.answer_question", lambda self, question, document_id, *args, **kwargs: {"document_id": document_id})
+    @usage_scoped(lambda self, question, document_id, session_id=None: {
+        "document_id": document_id, "session_id": session_id, "operation": "answer_question"
+    })
     def answer_question(self, question: str, document_id: str, session_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Answer a question about a specific document.
@@ -45,6 +127,12 @@ class QAEngine:
                     'error': 'Document not found or not processed'
                 }
             
+            cached = self._lookup_cached_answer(question, document)
+            if cached:
+                if session_id:
+                    self.storage.add_qa_interaction(session_id, question, cached['answer'], cached['sources'])
+                return cached
+            
             # Get relevant context from the document
             context_sections = self.get_relevant_context(question, document)
             
@@ -66,13 +154,17 @@ class QAEngine:
             if session_id:
                 self.storage.add_qa_interaction(session_id, question, answer, sources)
             
-            return {
+            result = {
                 'answer': answer,
                 'sources': sources,
                 'confidence': 0.8,  # Could be improved with actual confidence scoring
                 'document_title': document.title,
                 'document_type': document.document_type
             }
+            if answer == GENERATION_ERROR_ANSWER:
+                result.update(confidence=0.0, error=GENERATION_ERROR)
+            self._store_cached_answer(question, document, result)
+            return result
             
         except Exception as e:
             logger.error(f"Error answering question: {e}")
@@ -83,6 +175,192 @@ class QAEngine:
                 'error': str(e)
             }
     
+    @usage_scoped(lambda self, question, document_id, session_id=None: {
+        "document_id": document_id, "session_id": session_id, "operation": "answer_question"
+    })
+    def stream_answer(self, question: str, document_id: str, session_id: Optional[str] = None) -> AnswerStream:
+        """
+        Answer a question with the answer text streamed as it is generated.
+        
+        Retrieval runs before this returns; the model call starts when the
+        stream is iterated. The interaction is stored once the stream ends.
+        
+        Args:
+            question: The user's question
+            document_id: ID of the document to query
+            session_id: Optional session ID for conversation tracking
+            
+        Returns:
+            AnswerStream of answer text; its ``result`` matches ``answer_question``
+        """
+        try:
+            document = self.storage.get_document_with_embeddings(document_id)
+            if not document:
+                return AnswerStream.from_result({
+                    'answer': "Sorry, I couldn't find that document or it hasn't been processed yet.",
+                    'sources': [],
+                    'confidence': 0.0,
+                    'error': 'Document not found or not processed'
+                })
+            
+            cached = self._lookup_cached_answer(question, document)
+            if cached:
+                if session_id:
+                    self.storage.add_qa_interaction(session_id, question, cached['answer'], cached['sources'])
+                return AnswerStream.from_result(cached)
+            
+            context_sections = self.get_relevant_context(question, document)
+            if not context_sections:
+                return AnswerStream.from_result({
+                    'answer': "I couldn't find relevant information in the document to answer your question.",
+                    'sources': [],
+                    'confidence': 0.2,
+                    'error': 'No relevant context found'
+                })
+            
+            prompt = self._build_answer_prompt(question, context_sections, document)
+            chunks = self._stream_gemini_api(prompt, max_tokens=500)
+            
+        except Exception as e:
+            logger.error(f"Error answering question: {e}")
+            return AnswerStream.from_result({
+                'answer': "I'm sorry, I encountered an error while processing your question. Please try again.",
+                'sources': [],
+                'confidence': 0.0,
+                'error': str(e)
+            })
+        
+        def finalize(answer: str) -> Dict[str, Any]:
+            answer = answer.strip()
+            sources = self._extract_sources(context_sections)
+            if session_id:
+                self.storage.add_qa_interaction(session_id, question, answer, sources)
+            
+            result = {
+                'answer': answer,
+                'sources': sources,
+                'confidence': 0.8,
+                'document_title': document.title,
+                'document_type': document.document_type
+            }
+            self._store_cached_answer(question, document, result)
+            return result
+        
+        return AnswerStream(chunks, finalize)
+    
+    @traced("qa_engine.answer_questions_batch",
+            lambda self, document_id, questions, *args, **kwargs: {"document_id": document_id,
+                                                                  "questions": len(questions)})
+    @usage_scoped(lambda self, document_id, questions, session_id=None: {
+        "document_id": document_id, "session_id": session_id, "operation": "answer_questions_batch"
+    })
+    def answer_questions_batch(self, document_id: str, questions: List[str],
+                               session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Answer several questions about one document with as few LLM calls as possible.
+        
+        The document is loaded and split into sentences once, and every question
+        is retrieved against that index. Questions are then packed, several per
+        call, into prompts that fit ``BATCH_QA_MAX_PROMPT_TOKENS`` and the calls
+        run concurrently (paced by the client's rate limit). Questions whose
+        answer is missing from a batch response are retried individually. All
+        interactions are stored in a single transaction.
+        
+        Args:
+            document_id: ID of the document to query
+            questions: The questions, in the order answers should be returned
+            session_id: Optional session ID for conversation tracking
+            
+        Returns:
+            One result per question, each shaped like ``answer_question``'s
+        """
+        if not questions:
+            return []
+        
+        try:
+            document = self.storage.get_document_with_embeddings(document_id)
+            if not document:
+                return [{
+                    'answer': "Sorry, I couldn't find that document or it hasn't been processed yet.",
+                    'sources': [],
+                    'confidence': 0.0,
+                    'error': 'Document not found or not processed'
+                } for _ in questions]
+            
+            results: List[Optional[Dict[str, Any]]] = [None] * len(questions)
+            contexts: Dict[int, List[Dict[str, Any]]] = {}
+            index = None
+            
+            for position, question in enumerate(questions):
+                cached = self._lookup_cached_answer(question, document)
+                if cached:
+                    results[position] = cached
+                    continue
+                
+                if index is None:
+                    index = self._index_document(document)
+                context_sections = self._rank_context(question, index)
+                if not context_sections:
+                    results[position] = {
+                        'answer': "I couldn't find relevant information in the document to answer your question.",
+                        'sources': [],
+                        'confidence': 0.2,
+                        'error': 'No relevant context found'
+                    }
+                    continue
+                contexts[position] = context_sections
+            
+            batches = self._pack_question_batches(questions, contexts)
+            if batches:
+                logger.info(f"Answering {len(contexts)} questions in {len(batches)} LLM calls")
+            
+            answers: Dict[int, str] = {}
+            if len(batches) > 1 and config.BATCH_QA_MAX_CONCURRENT_CALLS > 1:
+                with ThreadPoolExecutor(max_workers=min(len(batches), config.BATCH_QA_MAX_CONCURRENT_CALLS),
+                                        thread_name_prefix="batch-qa") as executor:
+                    futures = [
+                        executor.submit(run_in_context(self._answer_question_batch, batch, questions, contexts, document))
+                        for batch in batches
+                    ]
+                    for future in futures:
+                        answers.update(future.result())
+            else:
+                for batch in batches:
+                    answers.update(self._answer_question_batch(batch, questions, contexts, document))
+            
+            for position, context_sections in contexts.items():
+                result = {
+                    'answer': answers[position],
+                    'sources': self._extract_sources(context_sections),
+                    'confidence': 0.8,
+                    'document_title': document.title,
+                    'document_type': document.document_type
+                }
+                if answers[position] == GENERATION_ERROR_ANSWER:
+                    result.update(confidence=0.0, error=GENERATION_ERROR)
+                self._store_cached_answer(questions[position], document, result)
+                results[position] = result
+            
+            if session_id:
+                # Failed generations and unanswerable questions are not recorded
+                self.storage.add_qa_interactions(session_id, [
+                    (question, result['answer'], result['sources'])
+                    for question, result in zip(questions, results)
+                    if not result.get('error')
+                ])
+            
+            return results
+            
+        except Exception as e:
+            logger.error(f"Error answering question batch: {e}")
+            return [{
+                'answer': "I'm sorry, I encountered an error while processing your question. Please try again.",
+                'sources': [],
+                'confidence': 0.0,
+                'error': str(e)
+            } for _ in questions]
+    
+    @traced("retrieval.get_relevant_context")
     def get_relevant_context(self, question: str, document: Document) -> List[Dict[str, Any]]:
         """
         Find relevant document sections for the question.
@@ -94,11 +372,10 @@ class QAEngine:
         Returns:
             List of relevant context sections with metadata
         """
-        context_sections = []
-        
-        # Extract key terms from the question
-        question_terms = self._extract_key_terms(question.lower())
-        
+        return self._rank_context(question, self._index_document(document))
+    
+    def _index_document(self, document: Document) -> List[Tuple[str, List[str], List[str]]]:
+        """Split each searchable part of a document into sentences once, for reuse across questions."""
         # Search in different parts of the document
         sections_to_search = [
             ('original_text', document.original_text, 'Document Content'),
@@ -107,18 +384,33 @@ class QAEngine:
             ('summary', document.summary, 'Summary')
         ]
         
+        index = []
         for section_name, content, display_name in sections_to_search:
             if not content:
                 continue
-                
-            # Find relevant passages
-            relevant_passages = self._find_relevant_passages(question_terms, content, display_name)
-            context_sections.extend(relevant_passages)
+            sentences = re.split(r'[.!?]\s+', content)
+            index.append((display_name, sentences, [sentence.lower() for sentence in sentences]))
+        return index
+    
+    def _rank_context(self, question: str, index: List[Tuple[str, List[str], List[str]]]) -> List[Dict[str, Any]]:
+        """Score indexed sentences against a question and return the top sections."""
+        context_sections = []
+        
+        # Extract key terms from the question
+        question_terms = self._extract_key_terms(question.lower())
+        if not question_terms:
+            return []
+        
+        for display_name, sentences, sentences_lower in index:
+            context_sections.extend(
+                self._score_sentences(question_terms, sentences, sentences_lower, display_name)
+            )
         
         # Sort by relevance score and return top sections
         context_sections.sort(key=lambda x: x['relevance_score'], reverse=True)
         return context_sections[:5]  # Return top 5 most relevant sections
     
+    @traced("qa_engine.generate_answer")
     def generate_answer(self, question: str, context_sections: List[Dict[str, Any]], document: Document) -> str:
         """
         Generate an answer using Gemini API with the provided context.
@@ -131,6 +423,18 @@ class QAEngine:
         Returns:
             Generated answer string
         """
+        prompt = self._build_answer_prompt(question, context_sections, document)
+        
+        try:
+            response = self._call_gemini_api(prompt, max_tokens=500)
+            return response.strip()
+            
+        except Exception as e:
+            logger.error(f"Error generating answer: {e}")
+            return GENERATION_ERROR_ANSWER
+    
+    def _build_answer_prompt(self, question: str, context_sections: List[Dict[str, Any]], document: Document) -> str:
+        """Build the answer prompt from the question and retrieved context."""
         # Prepare context for the prompt
         context_text = "\n\n".join([
             f"**{section['source']}:**\n{section['text']}"
@@ -157,14 +461,120 @@ class QAEngine:
 
         Answer:
         """
+        return prompt
+    
+    def _pack_question_batches(self, questions: List[str],
+                               contexts: Dict[int, List[Dict[str, Any]]]) -> List[List[int]]:
+        """
+        Greedily group question positions into batches that fit the prompt budget.
         
-        try:
-            response = self._call_gemini_api(prompt, max_tokens=500)
-            return response.strip()
+        Questions are ordered by their best passage first, so questions about
+        the same part of the document share a call and its context.
+        """
+        max_chars = config.BATCH_QA_MAX_PROMPT_TOKENS * CHARS_PER_TOKEN
+        max_questions = max(1, config.BATCH_QA_MAX_QUESTIONS_PER_CALL)
+        ordered = sorted(contexts, key=lambda position: (contexts[position][0]['source'],
+                                                         contexts[position][0]['text'], position))
+        
+        batches: List[List[int]] = []
+        batch: List[int] = []
+        batch_passages: set = set()
+        batch_chars = 0
+        for position in ordered:
+            passages = {(section['source'], section['text']) for section in contexts[position]}
+            new_passages = passages - batch_passages
+            added_chars = len(questions[position]) + sum(len(source) + len(text) for source, text in new_passages)
+            
+            if batch and (len(batch) >= max_questions or batch_chars + added_chars > max_chars):
+                batches.append(batch)
+                batch, batch_passages, batch_chars = [], set(), 0
+                new_passages = passages
+                added_chars = len(questions[position]) + sum(len(source) + len(text) for source, text in passages)
             
+            batch.append(position)
+            batch_passages |= new_passages
+            batch_chars += added_chars
+        
+        if batch:
+            batches.append(batch)
+        return batches
+    
+    def _answer_question_batch(self, batch: List[int], questions: List[str],
+                               contexts: Dict[int, List[Dict[str, Any]]], document: Document) -> Dict[int, str]:
+        """Answer one packed batch, falling back to single-question calls for anything unanswered."""
+        if len(batch) == 1:
+            position = batch[0]
+            return {position: self.generate_answer(questions[position], contexts[position], document)}
+        
+        answers: Dict[int, str] = {}
+        prompt = self._build_batch_prompt(batch, questions, contexts, document)
+        try:
+            response = self._call_gemini_api(prompt, max_tokens=BATCH_ANSWER_TOKENS_PER_QUESTION * len(batch))
+            parsed = self._parse_batch_answers(response)
+            for number, position in enumerate(batch, start=1):
+                answer = parsed.get(str(number))
+                if isinstance(answer, str) and answer.strip():
+                    answers[position] = answer.strip()
         except Exception as e:
-            logger.error(f"Error generating answer: {e}")
-            return "I'm sorry, I encountered an error while generating the answer. Please try again."
+            logger.error(f"Error generating batch answer: {e}")
+        
+        missing = [position for position in batch if position not in answers]
+        if missing:
+            logger.warning(f"Batch response missing {len(missing)} of {len(batch)} answers; retrying individually")
+        for position in missing:
+            answers[position] = self.generate_answer(questions[position], contexts[position], document)
+        return answers
+    
+    def _build_batch_prompt(self, batch: List[int], questions: List[str],
+                            contexts: Dict[int, List[Dict[str, Any]]], document: Document) -> str:
+        """Build one prompt for several questions, listing shared context passages once."""
+        passages: List[Tuple[str, str]] = []
+        for position in batch:
+            for section in contexts[position]:
+                passage = (section['source'], section['text'])
+                if passage not in passages:
+                    passages.append(passage)
+        
+        context_text = "\n\n".join(f"**{source}:**\n{text}" for source, text in passages)
+        questions_text = "\n".join(
+            f"{number}. {questions[position]}" for number, position in enumerate(batch, start=1)
+        )
+        
+        prompt = f"""
+        You are a helpful assistant that answers questions about documents. Use only the provided context to answer the questions. If the context doesn't contain enough information to answer a question, say so clearly.
+
+        Document Title: {document.title}
+        Document Type: {document.document_type or 'Unknown'}
+
+        Context from the document:
+        {context_text}
+
+        Questions:
+        {questions_text}
+
+        Instructions:
+        1. Answer each question based only on the provided context
+        2. Be specific and cite relevant parts of the context
+        3. If the context doesn't contain the answer, say "The document doesn't contain enough information to answer this question"
+        4. Keep each answer concise but complete
+        5. Use a helpful, professional tone
+        6. Respond with only a JSON object mapping each question number to its answer, for example {{"1": "...", "2": "..."}}
+
+        JSON:
+        """
+        return prompt
+    
+    def _parse_batch_answers(self, response: str) -> Dict[str, Any]:
+        """Parse the JSON object of numbered answers from a batch response."""
+        start = response.find('{')
+        end = response.rfind('}')
+        if start == -1 or end <= start:
+            return {}
+        try:
+            parsed = json.loads(response[start:end + 1])
+        except json.JSONDecodeError:
+            return {}
+        return parsed if isinstance(parsed, dict) else {}
     
     def create_qa_session(self, document_id: str) -> str:
         """
@@ -195,6 +605,25 @@ class QAEngine:
         """Get all Q&A sessions for a document."""
         return self.storage.list_qa_sessions(document_id)
     
+    def _document_version(self, document: Document) -> str:
+        """Version marker used to invalidate cached answers when a document changes."""
+        updated_at = getattr(document, 'updated_at', None)
+        return updated_at.isoformat() if isinstance(updated_at, datetime) else str(updated_at)
+    
+    def _lookup_cached_answer(self, question: str, document: Document,
+                              kind: str = "answer") -> Optional[Dict[str, Any]]:
+        """Return a cached answer to a near-duplicate question, if any."""
+        if not self.semantic_cache:
+            return None
+        return self.semantic_cache.lookup(document.id, self._document_version(document), question, kind)
+    
+    def _store_cached_answer(self, question: str, document: Document, result: Dict[str, Any],
+                             kind: str = "answer") -> None:
+        """Cache a successful answer for reuse by near-duplicate questions."""
+        if not self.semantic_cache or result.get('error'):
+            return
+        self.semantic_cache.store(document.id, self._document_version(document), question, result, kind)
+    
     def _extract_key_terms(self, question: str) -> List[str]:
         """Extract key terms from a question for context matching."""
         # Remove common stop words and extract meaningful terms
@@ -223,17 +652,20 @@ class QAEngine:
         if not content or not question_terms:
             return []
         
-        content_lower = content.lower()
-        passages = []
-        
         # Split content into sentences/paragraphs
         sentences = re.split(r'[.!?]\s+', content)
+        return self._score_sentences(question_terms, sentences, [sentence.lower() for sentence in sentences], source_name)
+    
+    def _score_sentences(self, question_terms: List[str], sentences: List[str],
+                         sentences_lower: List[str], source_name: str) -> List[Dict[str, Any]]:
+        """Score pre-split sentences against question terms."""
+        passages = []
         
         for i, sentence in enumerate(sentences):
             if len(sentence.strip()) < 20:  # Skip very short sentences
                 continue
                 
-            sentence_lower = sentence.lower()
+            sentence_lower = sentences_lower[i]
             
             # Calculate relevance score based on term matches
             matches = sum(1 for term in question_terms if term in sentence_lower)
@@ -269,30 +701,9 @@ class QAEngine:
     
     def _call_gemini_api(self, prompt: str, max_tokens: int = 500) -> str:
         """Make API call to Gemini."""
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {"text": prompt}
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "maxOutputTokens": max_tokens,
-                "temperature": 0.3  # Lower temperature for more focused answers
-            }
-        }
-
-        headers = {
-            "Content-Type": "application/json"
-        }
-
         try:
-            response = requests.post(self.api_url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
-
-            result = response.json()
-            return result["candidates"][0]["content"]["parts"][0]["text"]
+            # Lower temperature for more focused answers
+            return self.llm_client.generate(prompt, max_tokens=max_tokens, temperature=0.3)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {e}")
@@ -300,6 +711,10 @@ class QAEngine:
         except (KeyError, IndexError) as e:
             logger.error(f"Unexpected response format: {e}")
             raise Exception(f"Unexpected API response format: {str(e)}")
+    
+    def _stream_gemini_api(self, prompt: str, max_tokens: int = 500) -> Iterator[str]:
+        """Stream answer text chunks from Gemini."""
+        return self.llm_client.stream_generate(prompt, max_tokens=max_tokens, temperature=0.3)
 
 
 def create_qa_engine(api_key: str, storage: Optional[DocumentStorage] = None) -> QAEngine:
@@ -14,6 +14,7 @@ from collections import Counter
 from src.models.enhanced import QuestionIntent, IntentType, ConversationContext
 from src.models.document import Document
 from src.utils.logging_config import get_logger
+from src.utils.tracing import traced
 
 logger = get_logger(__name__)
 
@@ -142,6 +143,7 @@ class QuestionClassifier:
             for pattern in self.OFF_TOPIC_PATTERNS
         ]
     
+    @traced("classifier.classify_intent")
     def classify_intent(self, question: str, context: Optional[ConversationContext] = None) -> QuestionIntent:
         """
         Classify the intent of a question.
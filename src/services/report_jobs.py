@@ -0,0 +1,187 @@
+"""
+Background Excel report generation.
+
+Report requests are queued on a small thread pool and tracked as rows in the
+``report_jobs`` table, so the UI can poll for status instead of blocking a
+Streamlit run while a workbook is written. Each request is fingerprinted from
+the inputs the report is built from (the document version and latest
+analysis, or the conversation's interactions, plus the report type). An
+unexpired report with the same fingerprint is served from ``data/reports``
+instead of being regenerated, and a request matching a job still in flight
+joins that job. Fallback CSV reports are not fingerprinted, so they are
+never reused. Several processes may share the table, so a queued or running
+job is only failed as lost once it is older than ``REPORT_JOB_TIMEOUT_SECONDS``.
+"""
+
+import hashlib
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Callable, Optional
+
+from src.config import config
+from src.models.conversational import ExcelReport, ReportJob
+from src.services.excel_report_generator import ExcelReportGenerator
+from src.storage.document_storage import DocumentStorage
+from src.storage.enhanced_storage import EnhancedDocumentStorage
+from src.utils.logging_config import get_logger
+from src.utils.tracing import run_in_context, traced
+
+logger = get_logger(__name__)
+
+
+def report_fingerprint(*parts: Optional[str]) -> str:
+    """Stable hash of the inputs a report is built from"""
+    return hashlib.sha256("\x1f".join(part or "" for part in parts).encode("utf-8")).hexdigest()
+
+
+class ReportJobManager:
+    """Runs report generation in the background and reuses identical unexpired reports."""
+
+    def __init__(
+        self,
+        report_generator: Optional[ExcelReportGenerator] = None,
+        document_storage: Optional[DocumentStorage] = None,
+        enhanced_storage: Optional[EnhancedDocumentStorage] = None,
+        max_workers: Optional[int] = None,
+        job_timeout_seconds: Optional[int] = None
+    ):
+        self.document_storage = document_storage or DocumentStorage()
+        self.enhanced_storage = enhanced_storage or EnhancedDocumentStorage()
+        self.report_generator = report_generator or ExcelReportGenerator(self.document_storage)
+        self.executor = ThreadPoolExecutor(
+            max_workers=max(1, max_workers or config.REPORT_MAX_CONCURRENT_JOBS),
+            thread_name_prefix="report-job"
+        )
+        self.job_timeout_seconds = job_timeout_seconds or config.REPORT_JOB_TIMEOUT_SECONDS
+        # Serializes the reuse check and job creation so concurrent identical requests share one job
+        self._submit_lock = threading.Lock()
+
+    def document_fingerprint(self, document_id: str, report_type: str) -> str:
+        document = self.document_storage.get_document(document_id)
+        if not document:
+            raise ValueError(f"Document {document_id} not found")
+        return report_fingerprint(
+            "document", document_id, document.updated_at.isoformat(),
+            self.enhanced_storage.get_latest_analysis_id(document_id), report_type
+        )
+
+    def conversation_fingerprint(self, session_id: str) -> str:
+        return report_fingerprint(
+            "conversation", session_id, self.document_storage.get_qa_session_version(session_id), "conversation"
+        )
+
+    def submit_document_report(self, document_id: str, report_type: str = "comprehensive") -> ReportJob:
+        """Queue (or reuse) a document analysis report."""
+        return self._submit(
+            self.document_fingerprint(document_id, report_type), "document", document_id, report_type,
+            lambda: self.report_generator.generate_document_report(document_id, report_type)
+        )
+
+    def submit_conversation_report(self, session_id: str) -> ReportJob:
+        """Queue (or reuse) a conversation history report."""
+        return self._submit(
+            self.conversation_fingerprint(session_id), "conversation", session_id, "conversation",
+            lambda: self.report_generator.generate_conversation_report(session_id)
+        )
+
+    def get_job(self, job_id: str) -> Optional[ReportJob]:
+        return self.enhanced_storage.get_report_job(job_id)
+
+    def get_report(self, job: ReportJob) -> Optional[ExcelReport]:
+        """The report a completed job produced or reused."""
+        if job.status != "completed" or not job.report_id:
+            return None
+        return self.enhanced_storage.get_excel_report(job.report_id)
+
+    def fail_stale_jobs(self) -> int:
+        """Fail queued or running jobs that outlived the timeout; their worker is gone."""
+        created_before = datetime.now() - timedelta(seconds=self.job_timeout_seconds)
+        failed = self.enhanced_storage.fail_unfinished_report_jobs("Timed out before finishing", created_before)
+        if failed:
+            logger.warning(f"Failed {failed} report job(s) older than {self.job_timeout_seconds}s")
+        return failed
+
+    def shutdown(self, wait: bool = True):
+        self.executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _submit(self, fingerprint: str, subject_type: str, subject_id: str, report_type: str,
+                generate: Callable[[], ExcelReport]) -> ReportJob:
+        job = ReportJob(
+            job_id=str(uuid.uuid4()),
+            fingerprint=fingerprint,
+            subject_type=subject_type,
+            subject_id=subject_id,
+            report_type=report_type
+        )
+
+        with self._submit_lock:
+            report = self.enhanced_storage.find_reusable_report(fingerprint)
+            if report:
+                job.status = "completed"
+                job.report_id = report.report_id
+                job.reused = True
+                job.completed_at = datetime.now()
+                self.enhanced_storage.create_report_job(job)
+                logger.info(f"Reusing report {report.report_id} for {subject_type} {subject_id} ({report_type})")
+                return job
+
+            # A stale job would never finish, so it is failed rather than joined
+            self.fail_stale_jobs()
+            active = self.enhanced_storage.find_active_report_job(fingerprint)
+            if active:
+                logger.info(f"Joining report job {active.job_id} for {subject_type} {subject_id} ({report_type})")
+                return active
+
+            self.enhanced_storage.create_report_job(job)
+
+        self.executor.submit(run_in_context(self._run_job, job, generate))
+        logger.info(f"Queued report job {job.job_id} for {subject_type} {subject_id} ({report_type})")
+        return job
+
+    @traced("report_jobs.run", lambda self, job, generate: {
+        "subject_type": job.subject_type, "subject_id": job.subject_id, "report_type": job.report_type
+    })
+    def _run_job(self, job: ReportJob, generate: Callable[[], ExcelReport]):
+        try:
+            self.enhanced_storage.update_report_job(job.job_id, "running")
+            report = generate()
+            # A fallback CSV is served to this request only; the next one retries the workbook
+            report.fingerprint = None if report.is_fallback else job.fingerprint
+            report.report_type = job.report_type
+            self.enhanced_storage.save_excel_report(report)
+            self.enhanced_storage.update_report_job(job.job_id, "completed", report_id=report.report_id)
+            logger.info(f"Report job {job.job_id} completed: {report.filename}")
+
+        except Exception as e:
+            logger.error(f"Report job {job.job_id} failed: {e}", exc_info=True)
+            try:
+                self.enhanced_storage.update_report_job(job.job_id, "failed", error_message=str(e))
+            except Exception:
+                pass
+
+
+# Global report job manager instance
+_report_job_manager: Optional[ReportJobManager] = None
+_report_job_manager_lock = threading.Lock()
+
+
+def get_report_job_manager() -> ReportJobManager:
+    """Get the global report job manager instance."""
+    global _report_job_manager
+    with _report_job_manager_lock:
+        if _report_job_manager is None:
+            _report_job_manager = ReportJobManager()
+            # Jobs left by a previous run have no worker; younger ones may belong to another process
+            _report_job_manager.fail_stale_jobs()
+        return _report_job_manager
+
+
+def shutdown_report_job_manager():
+    """Shutdown the global report job manager."""
+    global _report_job_manager
+    with _report_job_manager_lock:
+        if _report_job_manager:
+            _report_job_manager.shutdown()
+            _report_job_manager = None
@@ -0,0 +1,101 @@
+"""
+Background system resource sampling for the production monitor
+
+psutil calls such as ``virtual_memory()`` and ``disk_usage()`` cost tens of
+microseconds each and ``cpu_percent(interval=...)`` blocks, so request paths
+must not make them. A sampler thread refreshes one shared snapshot at a fixed
+interval and readers get the latest snapshot without touching psutil.
+"""
+
+from typing import Any, Dict, Optional
+import threading
+import time
+
+import psutil
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+class SystemResourceSampler:
+    """
+    Samples CPU, memory, disk and load at a fixed interval on a daemon thread.
+
+    The snapshot is replaced as a whole on every sample, so readers never see
+    a partially updated one and need no lock. The thread starts on first use.
+    """
+
+    def __init__(self, interval_seconds: float = 5.0, disk_path: str = "/"):
+        self.interval_seconds = interval_seconds
+        self.disk_path = disk_path
+
+        self._snapshot: Dict[str, Any] = {}
+        self._sampled_at = 0.0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._start_lock = threading.Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def age_seconds(self) -> float:
+        """Seconds since the current snapshot was taken"""
+        return time.time() - self._sampled_at if self._sampled_at else float("inf")
+
+    def start(self) -> None:
+        with self._start_lock:
+            if self.running:
+                return
+            if not self._sampled_at:
+                self.sample()
+            self._stop_event.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="system-resource-sampler", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self) -> None:
+        with self._start_lock:
+            self._stop_event.set()
+            if self._thread is not None:
+                self._thread.join(timeout=self.interval_seconds + 1)
+            self._thread = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest system metrics; starts the sampler on first call"""
+        if not self.running:
+            self.start()
+        return dict(self._snapshot)
+
+    def sample(self) -> Dict[str, Any]:
+        """Take a sample now and publish it as the current snapshot"""
+        try:
+            memory = psutil.virtual_memory()
+            snapshot = {
+                # Non-blocking: utilisation since the previous call on this process
+                "cpu_percent": psutil.cpu_percent(interval=None),
+                "memory_percent": memory.percent,
+                "memory_mb": memory.used / 1024 / 1024,
+                "disk_percent": psutil.disk_usage(self.disk_path).percent,
+                "load_average": psutil.getloadavg() if hasattr(psutil, 'getloadavg') else [0, 0, 0]
+            }
+            try:
+                network = psutil.net_io_counters()
+                snapshot["network_bytes_sent"] = network.bytes_sent
+                snapshot["network_bytes_recv"] = network.bytes_recv
+            except Exception:
+                pass  # Network stats might not be available
+        except Exception as e:
+            logger.error(f"Error sampling system metrics: {e}")
+            return dict(self._snapshot)
+
+        self._snapshot = snapshot
+        self._sampled_at = time.time()
+        return dict(snapshot)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_seconds):
+            self.sample()
@@ -0,0 +1,340 @@
+"""
+Response Cache for the Enhanced Contract Assistant
+
+Provides an LRU/TTL cache for processed answers with stable, process-independent
+keys, byte-size accounting and an optional SQLite-backed tier that can be shared
+between application workers.
+"""
+
+from typing import Any, Dict, Optional
+from collections import OrderedDict
+from dataclasses import dataclass
+import hashlib
+import json
+import os
+import pickle
+import sqlite3
+import threading
+import time
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Bump when the layout of cached payloads changes so old entries are never reused
+CACHE_KEY_VERSION = 1
+
+
+def build_cache_key(
+    question: str,
+    document_id: str,
+    document_version: str = "",
+    user_context: Optional[Dict[str, Any]] = None
+) -> str:
+    """
+    Build a stable cache key for a question.
+
+    The key is a SHA-256 over the normalized question, the document id and
+    version, and the user-facing context that changes how an answer is
+    presented, so it is identical across processes and restarts.
+    """
+    normalized_question = " ".join(question.lower().split())
+    payload = json.dumps(
+        {
+            "v": CACHE_KEY_VERSION,
+            "question": normalized_question,
+            "document_id": document_id,
+            "document_version": document_version,
+            "user_context": user_context or {}
+        },
+        sort_keys=True,
+        default=str
+    )
+    digest = hashlib.sha256(payload.encode("utf-8")).hexdigest()
+    return f"{document_id}:{digest}"
+
+
+@dataclass
+class CacheEntry:
+    """A single cached value with its bookkeeping"""
+    key: str
+    document_id: str
+    payload: bytes
+    size_bytes: int
+    created_at: float
+    expires_at: float
+
+
+class SQLiteCacheTier:
+    """Shared second-level cache tier stored in a SQLite database"""
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir and not os.path.exists(db_dir):
+            os.makedirs(db_dir, exist_ok=True)
+        self._initialize()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.db_path, timeout=5)
+
+    def _initialize(self) -> None:
+        with self._connect() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    document_id TEXT NOT NULL,
+                    payload BLOB NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL
+                )
+            """)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_document ON response_cache (document_id)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_response_cache_expires ON response_cache (expires_at)"
+            )
+
+    def get(self, key: str, now: float) -> Optional[CacheEntry]:
+        """Fetch an unexpired entry"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT cache_key, document_id, payload, size_bytes, created_at, expires_at "
+                "FROM response_cache WHERE cache_key = ? AND expires_at > ?",
+                (key, now)
+            ).fetchone()
+        return CacheEntry(*row) if row else None
+
+    def put(self, entry: CacheEntry) -> None:
+        """Insert or replace an entry"""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache "
+                "(cache_key, document_id, payload, size_bytes, created_at, expires_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (entry.key, entry.document_id, entry.payload, entry.size_bytes,
+                 entry.created_at, entry.expires_at)
+            )
+
+    def delete_document(self, document_id: str) -> int:
+        """Remove every entry for a document"""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM response_cache WHERE document_id = ?", (document_id,))
+            return cursor.rowcount
+
+    def purge_expired(self, now: float) -> int:
+        """Remove expired entries"""
+        with self._connect() as conn:
+            cursor = conn.execute("DELETE FROM response_cache WHERE expires_at <= ?", (now,))
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._connect() as conn:
+            conn.execute("DELETE FROM response_cache")
+
+
+class ResponseCache:
+    """
+    Thread-safe in-process LRU cache with TTL and byte budget.
+
+    Entries are stored pickled so their size can be accounted for exactly and
+    they can be written through to an optional shared SQLite tier. Lookups,
+    inserts and evictions are O(1); a per-document key index makes document
+    invalidation proportional to that document's entries only.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: int = 3600,
+        max_entries: int = 1000,
+        max_bytes: int = 64 * 1024 * 1024,
+        shared_tier: Optional[SQLiteCacheTier] = None
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.shared_tier = shared_tier
+
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        self._document_keys: Dict[str, set] = {}
+        self._total_bytes = 0
+        self._lock = threading.RLock()
+
+        self.stats = {
+            'hits': 0,
+            'shared_hits': 0,
+            'misses': 0,
+            'evictions': 0,
+            'expirations': 0,
+            'invalidations': 0
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total_bytes
+
+    def get(self, key: str) -> Optional[Any]:
+        """Return the cached value for ``key`` or None if missing or expired"""
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry.expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return pickle.loads(entry.payload)
+                self._remove(key)
+                self.stats['expirations'] += 1
+
+        if self.shared_tier is not None:
+            try:
+                entry = self.shared_tier.get(key, now)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared response cache lookup failed: {e}")
+                entry = None
+
+            if entry is not None:
+                with self._lock:
+                    self._store(entry)
+                    self.stats['shared_hits'] += 1
+                return pickle.loads(entry.payload)
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def put(self, key: str, document_id: str, value: Any, ttl_seconds: Optional[int] = None) -> None:
+        """Cache ``value`` under ``key``, evicting least recently used entries as needed"""
+        payload = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        now = time.time()
+        entry = CacheEntry(
+            key=key,
+            document_id=document_id,
+            payload=payload,
+            size_bytes=len(payload),
+            created_at=now,
+            expires_at=now + (ttl_seconds if ttl_seconds is not None else self.ttl_seconds)
+        )
+
+        if entry.size_bytes > self.max_bytes:
+            logger.debug(f"Not caching {key}: {entry.size_bytes} bytes exceeds cache budget")
+            return
+
+        with self._lock:
+            self._store(entry)
+
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.put(entry)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared response cache write failed: {e}")
+
+    def invalidate_document(self, document_id: str) -> int:
+        """Drop every cached entry for a document from all tiers"""
+        with self._lock:
+            keys = list(self._document_keys.get(document_id, ()))
+            for key in keys:
+                self._remove(key)
+            self.stats['invalidations'] += len(keys)
+
+        removed = len(keys)
+        if self.shared_tier is not None:
+            try:
+                removed = max(removed, self.shared_tier.delete_document(document_id))
+            except sqlite3.Error as e:
+                logger.warning(f"Shared response cache invalidation failed: {e}")
+
+        return removed
+
+    def purge_expired(self) -> int:
+        """Remove expired entries from the LRU end; cost is proportional to the number removed"""
+        now = time.time()
+        removed = 0
+
+        with self._lock:
+            # Entries are kept in LRU order, not expiry order, so this stops at the
+            # first live entry; any expired entries behind it are dropped on lookup
+            while self._entries:
+                key = next(iter(self._entries))
+                if self._entries[key].expires_at > now:
+                    break
+                self._remove(key)
+                removed += 1
+            self.stats['expirations'] += removed
+
+        if self.shared_tier is not None:
+            try:
+                self.shared_tier.purge_expired(now)
+            except sqlite3.Error as e:
+                logger.warning(f"Shared response cache purge failed: {e}")
+
+        return removed
+
+    def shrink(self, fraction: float) -> int:
+        """Evict the least recently used ``fraction`` of in-process entries"""
+        with self._lock:
+            count = int(len(self._entries) * fraction)
+            for _ in range(count):
+                self._evict_oldest()
+            return count
+
+    def clear(self) -> None:
+        """Clear the in-process tier"""
+        with self._lock:
+            self._entries.clear()
+            self._document_keys.clear()
+            self._total_bytes = 0
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['shared_hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'max_entries': self.max_entries,
+                'max_bytes': self.max_bytes,
+                'hit_rate': (self.stats['hits'] + self.stats['shared_hits']) / lookups if lookups else 0.0,
+                'shared_tier_enabled': self.shared_tier is not None
+            }
+
+    # Internal helpers (callers hold the lock)
+
+    def _store(self, entry: CacheEntry) -> None:
+        if entry.key in self._entries:
+            self._remove(entry.key)
+
+        self._entries[entry.key] = entry
+        self._document_keys.setdefault(entry.document_id, set()).add(entry.key)
+        self._total_bytes += entry.size_bytes
+
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._total_bytes > self.max_bytes
+        ):
+            self._evict_oldest()
+
+    def _evict_oldest(self) -> None:
+        key = next(iter(self._entries))
+        self._remove(key)
+        self.stats['evictions'] += 1
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+
+        self._total_bytes -= entry.size_bytes
+        document_keys = self._document_keys.get(entry.document_id)
+        if document_keys is not None:
+            document_keys.discard(key)
+            if not document_keys:
+                del self._document_keys[entry.document_id]
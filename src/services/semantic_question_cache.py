@@ -0,0 +1,288 @@
+"""Semantic answer cache that matches near-duplicate questions per document."""
+
+import copy
+import math
+import re
+import threading
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Conversational filler that carries no meaning for matching questions,
+# on top of the stop words removed by the key-term extractor
+QUESTION_FILLER_WORDS = {
+    'much', 'many', 'please', 'tell', 'explain', 'give', 'know', 'need',
+    'want', 'like', 'does', 'there', 'any', 'which', 'whats', 'document',
+    'contract', 'agreement'
+}
+
+# Words that flip a question's meaning; together with any numbers they must
+# match exactly, since "30 days" / "60 days" or "publish" / "not publish"
+# otherwise look near-identical to the similarity measure
+NEGATION_WORDS = {'not', 'no', 'never', 'without', 'none', 'nor', 'neither', 'nothing', 'unless', 'except'}
+# Words whose "n't" contraction is a negation once apostrophes are dropped ("dont", "isnt")
+_CONTRACTED = {
+    'do', 'does', 'did', 'is', 'are', 'was', 'were', 'has', 'have', 'had', 'ca', 'wo',
+    'should', 'would', 'could', 'must', 'need', 'ai'
+}
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)*")
+_WORD = re.compile(r"[a-z]+")
+
+# Suffixes stripped by the light stemmer, longest first
+_SUFFIXES = (
+    'ational', 'ization', 'ations', 'ation', 'ities', 'ments', 'ement', 'ness',
+    'ment', 'ings', 'ions', 'able', 'ible', 'ated', 'ates', 'ing', 'ion', 'ity',
+    'ies', 'ive', 'ate', 'ers', 'ed', 'er', 'es', 'ly', 's', 'e'
+)
+_MIN_STEM_LENGTH = 4
+
+
+def stem_term(term: str) -> str:
+    """Reduce a term to a crude stem ("termination", "terminate" -> "termin")."""
+    for suffix in _SUFFIXES:
+        if suffix == 's' and term.endswith('ss'):
+            continue
+        if term.endswith(suffix) and len(term) - len(suffix) >= _MIN_STEM_LENGTH:
+            return term[:-len(suffix)]
+    return term
+
+
+def question_guard(question: str) -> Tuple[str, ...]:
+    """Numbers and negations of a question, which a cached question must share exactly."""
+    text = question.lower().replace("'", "")
+    negations = []
+    for word in _WORD.findall(text):
+        if word in NEGATION_WORDS:
+            negations.append(word)
+        elif word == 'cannot' or (word.endswith('nt') and word[:-2] in _CONTRACTED):
+            negations.append('not')
+    return tuple(sorted(_NUMBER.findall(text))) + tuple(sorted(negations))
+
+
+@dataclass
+class CachedAnswer:
+    """An answer cached for one question on one document."""
+    question: str
+    kind: str
+    vector: Dict[str, float]
+    norm: float
+    result: Dict[str, Any]
+    guard: Tuple[str, ...] = ()
+    created_at: float = field(default_factory=time.time)
+
+
+class SemanticQuestionCache:
+    """
+    Per-document cache of answers keyed by the meaning of the question.
+
+    Questions are reduced to stemmed key terms and compared with cosine
+    similarity over term and character-shingle features, so paraphrases such
+    as "what's the termination notice?" and "how much notice to terminate?"
+    share one answer. Numbers and negations are not scored but must match
+    exactly, so "notice after 30 days" never reuses the answer for 60 days.
+    Entries are dropped when the document version changes.
+    """
+
+    def __init__(
+        self,
+        term_extractor: Callable[[str], List[str]],
+        similarity_threshold: float = 0.92,
+        max_entries_per_document: int = 200,
+        ttl_seconds: int = 24 * 3600
+    ):
+        self.term_extractor = term_extractor
+        self.similarity_threshold = similarity_threshold
+        self.max_entries_per_document = max_entries_per_document
+        self.ttl_seconds = ttl_seconds
+
+        self._entries: Dict[str, "OrderedDict[int, CachedAnswer]"] = {}
+        self._term_index: Dict[str, Dict[str, Set[int]]] = {}
+        self._document_versions: Dict[str, str] = {}
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'invalidations': 0}
+
+    def normalize_question(self, question: str) -> List[str]:
+        """Stemmed key terms of a question, with stop words and filler removed."""
+        terms = self.term_extractor(question.lower().replace("'", ""))
+        return [stem_term(term) for term in terms if term not in QUESTION_FILLER_WORDS]
+
+    def lookup(
+        self,
+        document_id: str,
+        document_version: str,
+        question: str,
+        kind: str = "answer"
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Find a cached answer for a near-duplicate question.
+
+        ``kind`` separates result shapes produced by different call sites for
+        the same document. Returns a copy of the cached result annotated with
+        ``cache_hit``, ``cached_question`` and ``similarity``, or None on a miss.
+        """
+        stems = self.normalize_question(question)
+        if not stems:
+            return None
+
+        vector = self._vectorize(stems)
+        norm = self._norm(vector)
+        guard = question_guard(question)
+        now = time.time()
+
+        with self._lock:
+            self._check_version(document_id, document_version)
+            entries = self._entries.get(document_id)
+            if not entries:
+                self.stats['misses'] += 1
+                return None
+
+            # Only entries sharing at least one stem can be similar enough
+            candidate_ids: Set[int] = set()
+            term_index = self._term_index.get(document_id, {})
+            for stem in set(stems):
+                candidate_ids.update(term_index.get(stem, ()))
+
+            best_id, best_score = None, 0.0
+            for entry_id in candidate_ids:
+                entry = entries.get(entry_id)
+                if entry is None or entry.kind != kind or entry.guard != guard:
+                    continue
+                if now - entry.created_at > self.ttl_seconds:
+                    self._remove(document_id, entry_id)
+                    continue
+                score = self._cosine(vector, norm, entry.vector, entry.norm)
+                if score > best_score:
+                    best_id, best_score = entry_id, score
+
+            if best_id is None or best_score < self.similarity_threshold:
+                self.stats['misses'] += 1
+                return None
+
+            entries.move_to_end(best_id)
+            entry = entries[best_id]
+            self.stats['hits'] += 1
+            result = copy.deepcopy(entry.result)
+
+        result['cache_hit'] = True
+        result['cached_question'] = entry.question
+        result['similarity'] = round(best_score, 3)
+        logger.debug(f"Semantic cache hit for document {document_id} (similarity {best_score:.2f})")
+        return result
+
+    def store(
+        self,
+        document_id: str,
+        document_version: str,
+        question: str,
+        result: Dict[str, Any],
+        kind: str = "answer"
+    ) -> None:
+        """Cache an answer (including its sources) for a question on a document."""
+        stems = self.normalize_question(question)
+        if not stems:
+            return
+
+        vector = self._vectorize(stems)
+        entry = CachedAnswer(
+            question=question,
+            kind=kind,
+            vector=vector,
+            norm=self._norm(vector),
+            result=copy.deepcopy(result),
+            guard=question_guard(question)
+        )
+
+        with self._lock:
+            self._check_version(document_id, document_version)
+            entries = self._entries.setdefault(document_id, OrderedDict())
+            term_index = self._term_index.setdefault(document_id, {})
+
+            entry_id = self._next_id
+            self._next_id += 1
+            entries[entry_id] = entry
+            for stem in set(stems):
+                term_index.setdefault(stem, set()).add(entry_id)
+
+            while len(entries) > self.max_entries_per_document:
+                self._remove(document_id, next(iter(entries)))
+
+            self.stats['stores'] += 1
+
+    def invalidate_document(self, document_id: str) -> None:
+        """Drop all cached answers for a document."""
+        with self._lock:
+            self._drop_document(document_id)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._term_index.clear()
+            self._document_versions.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'documents': len(self._entries),
+                'entries': sum(len(entries) for entries in self._entries.values()),
+                'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+                'similarity_threshold': self.similarity_threshold
+            }
+
+    # Internal helpers (callers hold the lock)
+
+    def _check_version(self, document_id: str, document_version: str) -> None:
+        known_version = self._document_versions.get(document_id)
+        if known_version is not None and known_version != document_version:
+            self._drop_document(document_id)
+        self._document_versions[document_id] = document_version
+
+    def _drop_document(self, document_id: str) -> None:
+        if self._entries.pop(document_id, None):
+            self.stats['invalidations'] += 1
+        self._term_index.pop(document_id, None)
+        self._document_versions.pop(document_id, None)
+
+    def _remove(self, document_id: str, entry_id: int) -> None:
+        entry = self._entries[document_id].pop(entry_id, None)
+        if entry is None:
+            return
+        term_index = self._term_index.get(document_id, {})
+        for feature in entry.vector:
+            ids = term_index.get(feature)
+            if ids is not None:
+                ids.discard(entry_id)
+                if not ids:
+                    del term_index[feature]
+
+    @staticmethod
+    def _vectorize(stems: List[str]) -> Dict[str, float]:
+        """Weighted features: whole stems plus character trigrams for near-spellings."""
+        vector: Counter = Counter()
+        for stem in stems:
+            vector[stem] += 1.0
+            padded = f"#{stem}#"
+            for i in range(len(padded) - 2):
+                vector[f"~{padded[i:i + 3]}"] += 0.25
+        return dict(vector)
+
+    @staticmethod
+    def _norm(vector: Dict[str, float]) -> float:
+        return math.sqrt(sum(value * value for value in vector.values()))
+
+    @staticmethod
+    def _cosine(a: Dict[str, float], a_norm: float, b: Dict[str, float], b_norm: float) -> float:
+        if not a_norm or not b_norm:
+            return 0.0
+        if len(a) > len(b):
+            a, b = b, a
+        dot = sum(value * b.get(feature, 0.0) for feature, value in a.items())
+        return dot / (a_norm * b_norm)
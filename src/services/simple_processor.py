@@ -6,9 +6,11 @@ No queues, no background processing - just direct Gemini API calls.
 import json
 import uuid
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 
 from src.models.document import Document
+from src.services.llm_client import GeminiClient
+from src.services.llm_usage import usage_scope
 from src.storage.document_storage import DocumentStorage
 from src.utils.logging_config import get_logger
 from src.utils.error_handling import DocumentQAError, ErrorType
@@ -22,10 +24,13 @@ class SimpleDocumentProcessor:
     def __init__(self, api_key: str, storage: Optional[DocumentStorage] = None):
         self.api_key = api_key
         self.storage = storage or DocumentStorage()
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
+        self.llm_client = GeminiClient(api_key, component="simple_processor")
+        self.api_url = self.llm_client.api_url
     
     def process_document_immediately(self, filename: str, file_type: str, 
-                                   file_size: int, extracted_text: str) -> Document:
+                                   file_size: int, extracted_text: str,
+                                   text_encoding: Optional[str] = None,
+                                   sections: Optional[List[Dict[str, Any]]] = None) -> Document:
         """
         Process a document immediately and return a fully processed Document object.
         
@@ -34,6 +39,8 @@ class SimpleDocumentProcessor:
             file_type: File extension (pdf, txt, docx)
             file_size: Size of the file in bytes
             extracted_text: Extracted text content
+            text_encoding: Detected encoding of TXT uploads
+            sections: Section tree of DOCX uploads
             
         Returns:
             Document: Fully processed document ready for Q&A
@@ -48,6 +55,8 @@ class SimpleDocumentProcessor:
             file_size=file_size,
             upload_timestamp=datetime.now(),
             original_text=extracted_text,
+            text_encoding=text_encoding,
+            sections=sections,
             processing_status='processing'
         )
         
@@ -58,7 +67,8 @@ class SimpleDocumentProcessor:
             # Single comprehensive processing call (reduces from 4 calls to 1)
             logger.info("Processing document with comprehensive AI analysis...")
             try:
-                result = self._process_document_comprehensive(extracted_text)
+                with usage_scope(document_id=document.id, operation="document_ingestion"):
+                    result = self._process_document_comprehensive(extracted_text)
                 document.document_type = result.get('document_type', 'Unknown')
                 document.extracted_info = result.get('extracted_info', {})
                 document.analysis = result.get('analysis', '')
@@ -121,34 +131,12 @@ class SimpleDocumentProcessor:
         import requests
         import time
         
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {"text": prompt}
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "maxOutputTokens": max_tokens,
-                "temperature": 0.7
-            }
-        }
-        
-        headers = {
-            "Content-Type": "application/json"
-        }
-        
         last_error = None
         
         for attempt in range(max_retries):
             try:
                 logger.debug(f"Gemini API attempt {attempt + 1}/{max_retries}")
-                response = requests.post(self.api_url, json=payload, headers=headers, timeout=30)
-                response.raise_for_status()
-                
-                result = response.json()
-                return result["candidates"][0]["content"]["parts"][0]["text"]
+                return self.llm_client.generate(prompt, max_tokens=max_tokens, temperature=0.7)
                 
             except requests.exceptions.RequestException as e:
                 last_error = e
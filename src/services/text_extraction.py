@@ -0,0 +1,262 @@
+"""
+Framework-free text extraction core.
+
+``TextExtractor`` reads PDF, TXT and DOCX files from a path, a binary
+file-like object, ``bytes`` or a memory-mapped buffer, without any UI
+dependency, so the HTTP API and bulk ingestion can accept large data-room
+bundles that the upload page would reject. Files are hashed in chunks rather
+than read whole. Streams that cannot seek, and PDFs too large to hand to page
+workers in memory, are spooled to a temporary file, and only one copy of the
+file is ever held in memory. The Streamlit upload page goes through the thin
+``FileUploadHandler`` adapter.
+"""
+
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from src.config import config
+from src.services.docx_extraction import DocxSection, extract_docx
+from src.services.encoding_detection import decode_stream
+from src.services.extraction_cache import ExtractionCache, build_extraction_key, get_extraction_cache
+from src.services.pdf_extraction import PdfExtraction, PdfExtractionStats, PdfPage, PdfPageExtractor
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+SUPPORTED_EXTENSIONS = ('.pdf', '.txt', '.docx')
+
+# Bump when extraction output changes so cached extractions are never reused
+EXTRACTOR_VERSION = 3
+
+# Read size for hashing and spooling
+CHUNK_SIZE = 1024 * 1024
+
+ExtractionSource = Union[str, os.PathLike, bytes, bytearray, memoryview, mmap.mmap, BinaryIO]
+
+
+@dataclass
+class ExtractionResult:
+    """Extracted text, or the reason there is none, plus what was read."""
+    text: str = ""
+    error: Optional[str] = None
+    pages: List[PdfPage] = field(default_factory=list)
+    file_type: str = ""
+    size: int = 0
+    sha256: str = ""
+    encoding: Optional[str] = None  # Detected encoding of TXT files
+    sections: List[DocxSection] = field(default_factory=list)  # Section tree of DOCX files
+
+
+class TextExtractor:
+    """Extracts text from PDF, TXT and DOCX sources of up to ``max_file_size`` bytes."""
+
+    def __init__(
+        self,
+        pdf_extractor: Optional[PdfPageExtractor] = None,
+        extraction_cache: Optional[ExtractionCache] = None,
+        max_file_size: Optional[int] = None,
+        spool_threshold: Optional[int] = None
+    ):
+        self.pdf_extractor = pdf_extractor or PdfPageExtractor()
+        self.extraction_cache = extraction_cache if extraction_cache is not None else get_extraction_cache()
+        self.max_file_size = max_file_size or config.MAX_INGEST_FILE_SIZE_MB * 1024 * 1024
+        self.spool_threshold = spool_threshold or config.EXTRACTION_SPOOL_THRESHOLD_MB * 1024 * 1024
+
+    def check(self, filename: str, size: int) -> Optional[str]:
+        """Why a file of this name and size cannot be extracted, or None"""
+        if size > self.max_file_size:
+            return (f"File size ({size / (1024 * 1024):.1f}MB) exceeds maximum limit of "
+                    f"{self.max_file_size / (1024 * 1024):.0f}MB")
+        file_extension = os.path.splitext(filename)[1].lower()
+        if file_extension not in SUPPORTED_EXTENSIONS:
+            return f"Unsupported file format '{file_extension}'. Supported formats: {', '.join(SUPPORTED_EXTENSIONS)}"
+        return None
+
+    def extract(self, source: ExtractionSource, filename: Optional[str] = None,
+                size: Optional[int] = None) -> ExtractionResult:
+        """
+        Extract text from a file.
+
+        Args:
+            source: Path, binary file-like object, bytes or memory-mapped buffer
+            filename: Name used to pick the format; defaults to the path or ``source.name``
+            size: Size in bytes when the caller already knows it
+
+        Returns:
+            ExtractionResult: Text, PDF page offsets, size and SHA-256, or an error
+        """
+        filename = filename or self._source_name(source)
+        file_type = os.path.splitext(filename)[1].lower()
+        try:
+            with self._open(source, size, file_type) as (stream, path, size):
+                result = ExtractionResult(file_type=file_type, size=size)
+                result.error = self.check(filename, size)
+                if result.error:
+                    return result
+
+                result.sha256 = self._sha256(stream, size)
+                cache_key = (
+                    build_extraction_key(result.sha256, file_type, EXTRACTOR_VERSION)
+                    if self.extraction_cache is not None else None
+                )
+                cached = self.extraction_cache.get(cache_key) if cache_key else None
+                if cached is not None:
+                    result.text, result.pages = cached.text, cached.pages
+                    result.encoding, result.sections = cached.encoding, cached.sections
+                    return result
+
+                if file_type == '.txt':
+                    result.text, result.encoding, result.error = self._extract_txt(stream)
+                elif file_type == '.docx':
+                    result.text, result.sections, result.error = self._extract_docx(path or stream)
+                else:
+                    result.text, result.pages, result.error = self._extract_pdf(stream, path)
+                if cache_key and not result.error:
+                    self.extraction_cache.put(cache_key, result.text, result.pages, result.encoding, result.sections)
+                return result
+
+        except OSError as e:
+            return ExtractionResult(file_type=file_type, error=f"Could not read file: {e}")
+        except Exception as e:
+            logger.error(f"Error extracting text from {filename}: {str(e)}")
+            return ExtractionResult(file_type=file_type, error=f"Text extraction failed: {str(e)}")
+
+    def extract_pdf(self, source: ExtractionSource, size: Optional[int] = None) -> PdfExtraction:
+        """Extract a PDF page by page, keeping each page's offsets in the text"""
+        with self._open(source, size, '.pdf') as (stream, path, size):
+            cache_key = (
+                build_extraction_key(self._sha256(stream, size), '.pdf', EXTRACTOR_VERSION)
+                if self.extraction_cache is not None else None
+            )
+            cached = self.extraction_cache.get(cache_key) if cache_key else None
+            if cached is not None:
+                return PdfExtraction(cached.text, cached.pages, PdfExtractionStats(pages_with_text=len(cached.pages)))
+
+            extraction = self.pdf_extractor.extract(path or stream)
+            if cache_key and extraction.pages:
+                self.extraction_cache.put(cache_key, extraction.text, extraction.pages)
+            return extraction
+
+    def _extract_pdf(self, stream: BinaryIO, path: Optional[str]) -> Tuple[str, List[PdfPage], Optional[str]]:
+        """Extract text from PDF file, returning the text, its pages and any error"""
+        try:
+            extraction = self.pdf_extractor.extract(path or stream)
+        except Exception as e:
+            logger.error(f"PDF extraction error: {str(e)}")
+            return "", [], f"Failed to extract text from PDF: {str(e)}"
+        if not extraction.pages:
+            return "", [], "No readable text found in PDF file"
+        return extraction.text, extraction.pages, None
+
+    @staticmethod
+    def _extract_txt(stream: BinaryIO) -> Tuple[str, Optional[str], Optional[str]]:
+        """Extract text from TXT file, returning the text, its detected encoding and any error"""
+        try:
+            text, encoding = decode_stream(stream)
+            if not text.strip():
+                return "", encoding, "No readable text found in TXT file"
+            return text, encoding, None
+
+        except Exception as e:
+            logger.error(f"TXT extraction error: {str(e)}")
+            return "", None, f"Failed to extract text from TXT file: {str(e)}"
+
+    @staticmethod
+    def _extract_docx(source: Union[str, BinaryIO]) -> Tuple[str, List[DocxSection], Optional[str]]:
+        """Extract text, tables and section tree from DOCX file, returning them and any error"""
+        try:
+            if not isinstance(source, str):
+                source.seek(0)
+            extraction = extract_docx(source)
+
+            if not extraction.text:
+                return "", [], "No readable text found in DOCX file"
+
+            return extraction.text, extraction.sections, None
+
+        except Exception as e:
+            logger.error(f"DOCX extraction error: {str(e)}")
+            return "", [], f"Failed to extract text from DOCX file: {str(e)}"
+
+    @contextmanager
+    def _open(self, source: ExtractionSource, size: Optional[int],
+              file_type: str) -> Iterator[Tuple[BinaryIO, Optional[str], int]]:
+        """
+        The source as a seekable binary stream, its path when it has one, and its size.
+
+        Non-seekable streams are spooled (in memory up to the spool threshold,
+        on disk past it), and large in-memory PDFs are written to a temporary
+        file so page workers can open it instead of each receiving a copy.
+        """
+        if isinstance(source, (str, os.PathLike)):
+            path = os.fspath(source)
+            with open(path, 'rb') as stream:
+                yield stream, path, os.fstat(stream.fileno()).st_size
+            return
+
+        if isinstance(source, bytes):
+            stream, size = io.BytesIO(source), len(source)
+        elif isinstance(source, mmap.mmap):
+            stream, size = source, len(source)
+        elif isinstance(source, (bytearray, memoryview)):
+            stream = io.BytesIO(source)
+            size = len(stream.getbuffer())
+        elif self._seekable(source):
+            stream = source
+            if size is None:
+                stream.seek(0, os.SEEK_END)
+                size = stream.tell()
+        else:
+            with tempfile.SpooledTemporaryFile(max_size=self.spool_threshold) as spooled:
+                shutil.copyfileobj(source, spooled, CHUNK_SIZE)
+                size = spooled.tell()
+                with self._open(spooled, size, file_type) as opened:
+                    yield opened
+            return
+
+        if file_type == '.pdf' and size > self.spool_threshold:
+            with tempfile.NamedTemporaryFile(suffix=file_type) as spooled:
+                stream.seek(0)
+                shutil.copyfileobj(stream, spooled, CHUNK_SIZE)
+                spooled.flush()
+                spooled.seek(0)
+                yield spooled, spooled.name, size
+            return
+
+        stream.seek(0)
+        yield stream, None, size
+
+    @staticmethod
+    def _sha256(stream: BinaryIO, size: int) -> str:
+        """Hash ``size`` bytes of the stream in chunks"""
+        digest = hashlib.sha256()
+        stream.seek(0)
+        remaining = size
+        while remaining > 0:
+            chunk = stream.read(min(CHUNK_SIZE, remaining))
+            if not chunk:
+                break
+            digest.update(chunk)
+            remaining -= len(chunk)
+        stream.seek(0)
+        return digest.hexdigest()
+
+    @staticmethod
+    def _seekable(stream) -> bool:
+        try:
+            return bool(stream.seekable())
+        except (AttributeError, ValueError):
+            return hasattr(stream, 'seek') and hasattr(stream, 'tell')
+
+    @staticmethod
+    def _source_name(source: ExtractionSource) -> str:
+        if isinstance(source, (str, os.PathLike)):
+            return os.path.basename(os.fspath(source))
+        return str(getattr(source, 'name', '') or '')
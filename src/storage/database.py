@@ -5,14 +5,18 @@ import os
 from datetime import datetime
 from typing import Optional, Dict, Any, List
 from src.config import config
+from src.storage.query_instrumentation import InstrumentedConnection, QueryStatistics
 
 
 class DatabaseManager:
     """Manages database connections and schema setup."""
     
-    def __init__(self, db_path: Optional[str] = None):
+    def __init__(self, db_path: Optional[str] = None, instrument_queries: Optional[bool] = None):
         """Initialize database manager."""
         self.db_path = db_path or config.DATABASE_PATH
+        if instrument_queries is None:
+            instrument_queries = config.DB_QUERY_INSTRUMENTATION_ENABLED
+        self.query_stats = QueryStatistics(config.DB_SLOW_QUERY_THRESHOLD_MS) if instrument_queries else None
         self._ensure_database_directory()
         self._initialize_database()
     
@@ -31,7 +35,11 @@ class DatabaseManager:
     
     def get_connection(self) -> sqlite3.Connection:
         """Get database connection with row factory."""
-        conn = sqlite3.connect(self.db_path)
+        if self.query_stats is None:
+            conn = sqlite3.connect(self.db_path)
+        else:
+            conn = sqlite3.connect(self.db_path, factory=InstrumentedConnection)
+            conn.query_stats = self.query_stats
         conn.row_factory = sqlite3.Row
         return conn
     
@@ -96,11 +104,43 @@ class DatabaseManager:
             )
         """)
         
+        # LLM call accounting (tokens, latency and estimated cost per call)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS llm_usage (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                created_at DATETIME NOT NULL,
+                model TEXT NOT NULL,
+                component TEXT,
+                operation TEXT,
+                workflow_node TEXT,
+                document_id TEXT,
+                session_id TEXT,
+                prompt_tokens INTEGER NOT NULL DEFAULT 0,
+                output_tokens INTEGER NOT NULL DEFAULT 0,
+                total_tokens INTEGER NOT NULL DEFAULT 0,
+                latency_ms REAL NOT NULL DEFAULT 0,
+                estimated_cost REAL NOT NULL DEFAULT 0,
+                success BOOLEAN NOT NULL DEFAULT TRUE,
+                prompt_chars INTEGER DEFAULT 0,
+                response_chars INTEGER DEFAULT 0,
+                prompt_preview TEXT
+            )
+        """)
+        
         # Create basic indexes for better performance
         conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_status ON documents (processing_status)")
+        # Keyset pagination of the document list, one index per sort order
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_uploaded ON documents (upload_timestamp, id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_documents_title ON documents (title COLLATE NOCASE, id)")
+        conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_documents_status_uploaded ON documents (processing_status, upload_timestamp, id)"
+        )
         conn.execute("CREATE INDEX IF NOT EXISTS idx_processing_jobs_document ON processing_jobs (document_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_qa_sessions_document ON qa_sessions (document_id)")
         conn.execute("CREATE INDEX IF NOT EXISTS idx_qa_interactions_session ON qa_interactions (session_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_document ON llm_usage (document_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_session ON llm_usage (session_id)")
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_llm_usage_created ON llm_usage (created_at)")
         
         conn.commit()
     
@@ -112,6 +152,7 @@ class DatabaseManager:
         """Reset database by dropping and recreating all tables."""
         with self.get_connection() as conn:
             # Drop all tables
+            conn.execute("DROP TABLE IF EXISTS llm_usage")
             conn.execute("DROP TABLE IF EXISTS qa_interactions")
             conn.execute("DROP TABLE IF EXISTS qa_sessions")
             conn.execute("DROP TABLE IF EXISTS processing_jobs")
@@ -120,6 +161,17 @@ class DatabaseManager:
             # Recreate tables
             self._create_tables(conn)
     
+    def get_query_statistics(self, limit: Optional[int] = 20) -> Dict[str, Any]:
+        """Statement timings per SQL shape and recent slow queries."""
+        if self.query_stats is None:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'summary': self.query_stats.get_summary(),
+            'statements': self.query_stats.get_statistics(limit=limit),
+            'slow_queries': self.query_stats.get_slow_queries()
+        }
+    
     def get_database_info(self) -> Dict[str, Any]:
         """Get database information and statistics."""
         with self.get_connection() as conn:
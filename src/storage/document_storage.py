@@ -3,16 +3,43 @@
 import json
 import pickle
 from datetime import datetime
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Tuple
 import sqlite3
 
-from src.models.document import Document, ProcessingJob, QASession, QAInteraction
+from src.models.document import Document, DocumentPage, ProcessingJob, QASession, QAInteraction
 from src.storage.database import db_manager
 from src.utils.logging_config import get_logger
+from src.utils.tracing import traced
 from src.utils.error_handling import DatabaseError, StorageError, handle_errors
 
 logger = get_logger(__name__)
 
+# Bound on ids per IN (...) clause, well under SQLite's host parameter limit
+IN_CLAUSE_CHUNK_SIZE = 500
+
+# Document columns written on insert
+DOCUMENT_COLUMNS = (
+    'id', 'title', 'file_type', 'file_size', 'upload_timestamp',
+    'processing_status', 'original_text', 'document_type',
+    'extracted_info', 'analysis', 'summary', 'created_at', 'updated_at'
+)
+# Document columns added by migrations, written once the database has them
+MIGRATED_DOCUMENT_COLUMNS = ('text_encoding', 'sections')
+# Document columns listed in document summaries; text, analysis and embeddings are left for get_document
+SUMMARY_COLUMNS = (
+    'id', 'title', 'file_type', 'file_size', 'upload_timestamp',
+    'processing_status', 'document_type', 'created_at', 'updated_at'
+)
+# Legal columns added by migration 001, listed in summaries once the database has them
+MIGRATED_SUMMARY_COLUMNS = ('is_legal_document', 'legal_document_type', 'legal_analysis_confidence')
+# Sort key -> (ORDER BY expression, direction) for paged document listings; id breaks ties
+DOCUMENT_SORTS = {
+    'newest': ('upload_timestamp', 'DESC'),
+    'oldest': ('upload_timestamp', 'ASC'),
+    'title_asc': ('title COLLATE NOCASE', 'ASC'),
+    'title_desc': ('title COLLATE NOCASE', 'DESC')
+}
+
 
 class DocumentStorage:
     """Document storage service managing documents, processing jobs, and Q&A sessions."""
@@ -21,28 +48,12 @@ class DocumentStorage:
         self.db_manager = db_manager
     
     # Document operations
+    @traced("storage.create_document")
     def create_document(self, document: Document) -> str:
         """Create a new document record."""
         try:
             with self.db_manager.get_connection() as conn:
-                cursor = conn.cursor()
-                
-                doc_data = document.to_dict()
-                
-                cursor.execute("""
-                    INSERT INTO documents (
-                        id, title, file_type, file_size, upload_timestamp,
-                        processing_status, original_text, document_type,
-                        extracted_info, analysis, summary, created_at, updated_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    doc_data['id'], doc_data['title'], doc_data['file_type'],
-                    doc_data['file_size'], doc_data['upload_timestamp'],
-                    doc_data['processing_status'], doc_data['original_text'],
-                    doc_data['document_type'], doc_data['extracted_info'],
-                    doc_data['analysis'], doc_data['summary'],
-                    doc_data['created_at'], doc_data['updated_at']
-                ))
+                self._insert_documents(conn, [document])
                 
                 conn.commit()
                 logger.info(f"Created document record: {document.id}")
@@ -52,6 +63,45 @@ class DocumentStorage:
             logger.error(f"Error creating document: {e}")
             raise
     
+    @traced("storage.create_documents", lambda self, documents: {"documents": len(documents)})
+    def create_documents(self, documents: List[Document]) -> int:
+        """Create several document records in one transaction."""
+        if not documents:
+            return 0
+        try:
+            with self.db_manager.get_connection() as conn:
+                self._insert_documents(conn, documents)
+                
+                conn.commit()
+                logger.info(f"Created {len(documents)} document records")
+                return len(documents)
+                
+        except Exception as e:
+            logger.error(f"Error creating documents: {e}")
+            raise
+    
+    @staticmethod
+    def _insert_documents(conn: sqlite3.Connection, documents: List[Document]) -> None:
+        """
+        Insert document rows in one batch.
+        
+        Columns added by migrations are only written once the database has
+        them, so documents can still be stored before it is migrated.
+        """
+        table_columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)").fetchall()}
+        columns = DOCUMENT_COLUMNS + tuple(
+            column for column in MIGRATED_DOCUMENT_COLUMNS if column in table_columns
+        )
+        rows = []
+        for document in documents:
+            doc_data = document.to_dict()
+            rows.append(tuple(doc_data[column] for column in columns))
+        
+        conn.executemany(f"""
+            INSERT INTO documents ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})
+        """, rows)
+    
+    @traced("storage.get_document", lambda self, document_id: {"document_id": document_id})
     def get_document(self, document_id: str) -> Optional[Document]:
         """Retrieve a document by ID."""
         try:
@@ -64,16 +114,7 @@ class DocumentStorage:
                 
                 row = cursor.fetchone()
                 if row:
-                    doc_dict = dict(row)
-                    
-                    # Handle embeddings separately if they exist
-                    if doc_dict.get('embeddings'):
-                        try:
-                            doc_dict['embeddings'] = pickle.loads(doc_dict['embeddings'])
-                        except:
-                            doc_dict['embeddings'] = None
-                    
-                    return Document.from_dict(doc_dict)
+                    return self._document_from_row(dict(row))
                 
                 return None
                 
@@ -81,6 +122,36 @@ class DocumentStorage:
             logger.error(f"Error retrieving document {document_id}: {e}")
             raise
     
+    @traced("storage.get_documents", lambda self, document_ids: {"documents": len(document_ids)})
+    def get_documents(self, document_ids: List[str]) -> Dict[str, Document]:
+        """Retrieve many documents by ID with chunked IN (...) queries; missing IDs are absent."""
+        documents = {}
+        try:
+            with self.db_manager.get_connection() as conn:
+                for start in range(0, len(document_ids), IN_CLAUSE_CHUNK_SIZE):
+                    chunk = document_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+                    rows = conn.execute(f"""
+                        SELECT * FROM documents WHERE id IN ({', '.join('?' * len(chunk))})
+                    """, chunk).fetchall()
+                    documents.update({row['id']: self._document_from_row(dict(row)) for row in rows})
+            return documents
+                
+        except Exception as e:
+            logger.error(f"Error retrieving documents: {e}")
+            raise
+    
+    @staticmethod
+    def _document_from_row(doc_dict: Dict[str, Any]) -> Document:
+        # Handle embeddings separately if they exist
+        if doc_dict.get('embeddings'):
+            try:
+                doc_dict['embeddings'] = pickle.loads(doc_dict['embeddings'])
+            except:
+                doc_dict['embeddings'] = None
+        
+        return Document.from_dict(doc_dict)
+    
+    @traced("storage.update_document", lambda self, document_id, updates: {"document_id": document_id})
     def update_document(self, document_id: str, updates: Dict[str, Any]) -> bool:
         """Update document fields."""
         try:
@@ -154,6 +225,7 @@ class DocumentStorage:
             logger.error(f"Error deleting document {document_id}: {e}")
             raise
     
+    @traced("storage.list_documents")
     def list_documents(self, status_filter: Optional[str] = None) -> List[Document]:
         """List all documents, optionally filtered by status."""
         try:
@@ -191,6 +263,102 @@ class DocumentStorage:
             logger.error(f"Error listing documents: {e}")
             raise
     
+    @traced("storage.list_document_summaries", lambda self, sort='newest', after=None, limit=25, **filters: {
+        "sort": sort, "limit": limit, "first_page": after is None
+    })
+    def list_document_summaries(self, sort: str = 'newest', after: Optional[Tuple[Any, str]] = None,
+                                limit: int = 25, statuses: Optional[List[str]] = None,
+                                file_type: Optional[str] = None,
+                                title_query: Optional[str] = None) -> DocumentPage:
+        """
+        List one page of documents without their text, analysis or embeddings.
+        
+        Pages are read with keyset queries: ``after`` is the ``next_cursor``
+        of the previous page, so each page seeks straight to its first row
+        through the sort index instead of skipping every row before it.
+        Filters are applied in SQL.
+        """
+        if sort not in DOCUMENT_SORTS:
+            raise ValueError(f"Unknown document sort: {sort}")
+        expression, direction = DOCUMENT_SORTS[sort]
+        try:
+            with self.db_manager.get_connection() as conn:
+                table_columns = {row[1] for row in conn.execute("PRAGMA table_info(documents)").fetchall()}
+                columns = SUMMARY_COLUMNS + tuple(
+                    column for column in MIGRATED_SUMMARY_COLUMNS if column in table_columns
+                )
+                where, params = self._document_filters(statuses, file_type, title_query)
+                if after is not None:
+                    # Written so SQLite seeks the sort index to the cursor rather than scanning up to it
+                    comparison = '<' if direction == 'DESC' else '>'
+                    where.append(f"{expression} {comparison}= ? AND ({expression} {comparison} ? OR id {comparison} ?)")
+                    params.extend([after[0], after[0], after[1]])
+                
+                # One extra row tells whether there is a next page
+                rows = conn.execute(f"""
+                    SELECT {', '.join(columns)}, {expression} AS sort_value FROM documents
+                    {'WHERE ' + ' AND '.join(where) if where else ''}
+                    ORDER BY {expression} {direction}, id {direction}
+                    LIMIT ?
+                """, params + [limit + 1]).fetchall()
+                
+                page_rows = rows[:limit]
+                documents = [Document.from_dict(dict(row)) for row in page_rows]
+                next_cursor = None
+                if len(rows) > limit:
+                    next_cursor = (page_rows[-1]['sort_value'], page_rows[-1]['id'])
+                return DocumentPage(documents, next_cursor)
+                
+        except Exception as e:
+            logger.error(f"Error listing document summaries: {e}")
+            raise
+    
+    @traced("storage.count_documents")
+    def count_documents(self, statuses: Optional[List[str]] = None, file_type: Optional[str] = None,
+                        title_query: Optional[str] = None) -> int:
+        """Count the documents matching the same filters as ``list_document_summaries``."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                where, params = self._document_filters(statuses, file_type, title_query)
+                return conn.execute(f"""
+                    SELECT COUNT(*) FROM documents {'WHERE ' + ' AND '.join(where) if where else ''}
+                """, params).fetchone()[0]
+                
+        except Exception as e:
+            logger.error(f"Error counting documents: {e}")
+            raise
+    
+    @traced("storage.get_document_status_counts")
+    def get_document_status_counts(self) -> Dict[str, int]:
+        """Number of documents in each processing status."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                return dict(conn.execute("""
+                    SELECT processing_status, COUNT(*) FROM documents GROUP BY processing_status
+                """).fetchall())
+                
+        except Exception as e:
+            logger.error(f"Error counting documents by status: {e}")
+            raise
+    
+    @staticmethod
+    def _document_filters(statuses: Optional[List[str]], file_type: Optional[str],
+                          title_query: Optional[str]) -> Tuple[List[str], List[Any]]:
+        """WHERE conditions and parameters for the document listing filters"""
+        where: List[str] = []
+        params: List[Any] = []
+        if statuses:
+            where.append(f"processing_status IN ({', '.join('?' * len(statuses))})")
+            params.extend(statuses)
+        if file_type:
+            where.append("file_type = ?")
+            params.append(file_type)
+        if title_query:
+            escaped = title_query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            where.append("title LIKE ? ESCAPE '\\'")
+            params.append(f"%{escaped}%")
+        return where, params
+    
     # Processing job operations
     def create_processing_job(self, job: ProcessingJob) -> str:
         """Create a new processing job record."""
@@ -219,6 +387,36 @@ class DocumentStorage:
             logger.error(f"Error creating processing job: {e}")
             raise
     
+    def create_processing_jobs(self, jobs: List[ProcessingJob]) -> int:
+        """Create several processing job records in one transaction."""
+        if not jobs:
+            return 0
+        try:
+            with self.db_manager.get_connection() as conn:
+                rows = []
+                for job in jobs:
+                    job_data = job.to_dict()
+                    rows.append((
+                        job_data['job_id'], job_data['document_id'], job_data['status'],
+                        job_data['current_step'], job_data['progress_percentage'],
+                        job_data['error_message'], job_data['created_at'], job_data['completed_at']
+                    ))
+                
+                conn.executemany("""
+                    INSERT INTO processing_jobs (
+                        job_id, document_id, status, current_step,
+                        progress_percentage, error_message, created_at, completed_at
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                
+                conn.commit()
+                logger.info(f"Created {len(rows)} processing jobs")
+                return len(rows)
+                
+        except Exception as e:
+            logger.error(f"Error creating processing jobs: {e}")
+            raise
+    
     def get_processing_job(self, job_id: str) -> Optional[ProcessingJob]:
         """Retrieve a processing job by ID."""
         try:
@@ -297,6 +495,24 @@ class DocumentStorage:
             logger.error(f"Error updating processing job {job_id}: {e}")
             raise
     
+    def get_processing_statuses(self, document_ids: List[str]) -> Dict[str, str]:
+        """Processing status of each existing document among ``document_ids``."""
+        statuses = {}
+        try:
+            with self.db_manager.get_connection() as conn:
+                for start in range(0, len(document_ids), IN_CLAUSE_CHUNK_SIZE):
+                    chunk = document_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+                    rows = conn.execute(f"""
+                        SELECT id, processing_status FROM documents
+                        WHERE id IN ({', '.join('?' * len(chunk))})
+                    """, chunk).fetchall()
+                    statuses.update({row['id']: row['processing_status'] for row in rows})
+            return statuses
+                
+        except Exception as e:
+            logger.error(f"Error retrieving processing statuses: {e}")
+            raise
+    
     def list_processing_jobs(self, document_id: Optional[str] = None) -> List[ProcessingJob]:
         """List processing jobs, optionally filtered by document ID."""
         try:
@@ -326,6 +542,7 @@ class DocumentStorage:
             raise
     
     # Q&A session operations
+    @traced("storage.create_qa_session")
     def create_qa_session(self, session: QASession) -> str:
         """Create a new Q&A session."""
         try:
@@ -350,6 +567,7 @@ class DocumentStorage:
             logger.error(f"Error creating Q&A session: {e}")
             raise
     
+    @traced("storage.get_qa_session")
     def get_qa_session(self, session_id: str) -> Optional[QASession]:
         """Retrieve a Q&A session by ID."""
         try:
@@ -390,6 +608,7 @@ class DocumentStorage:
             logger.error(f"Error retrieving Q&A session {session_id}: {e}")
             raise
     
+    @traced("storage.add_qa_interaction")
     def add_qa_interaction(self, session_id: str, question: str, answer: str, 
                           sources: Optional[List[str]] = None) -> int:
         """Add a Q&A interaction to a session."""
@@ -415,6 +634,78 @@ class DocumentStorage:
             logger.error(f"Error adding Q&A interaction: {e}")
             raise
     
+    @traced("storage.add_qa_interactions")
+    def add_qa_interactions(self, session_id: str, interactions: List[Tuple[str, str, Optional[List[str]]]]) -> int:
+        """Add several (question, answer, sources) interactions to a session in one transaction."""
+        if not interactions:
+            return 0
+        try:
+            with self.db_manager.get_connection() as conn:
+                timestamp = datetime.now().isoformat()
+                conn.executemany("""
+                    INSERT INTO qa_interactions (session_id, question, answer, sources, timestamp)
+                    VALUES (?, ?, ?, ?, ?)
+                """, [
+                    (session_id, question, answer, json.dumps(sources) if sources else None, timestamp)
+                    for question, answer, sources in interactions
+                ])
+                
+                conn.commit()
+                logger.info(f"Added {len(interactions)} Q&A interactions to session {session_id}")
+                return len(interactions)
+                
+        except Exception as e:
+            logger.error(f"Error adding Q&A interactions: {e}")
+            raise
+    
+    def get_qa_session_version(self, session_id: str) -> str:
+        """Cheap marker that changes whenever an interaction is added to the session."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                count, last_id = conn.execute("""
+                    SELECT COUNT(*), MAX(id) FROM qa_interactions WHERE session_id = ?
+                """, (session_id,)).fetchone()
+                return f"{count}:{last_id or 0}"
+                
+        except Exception as e:
+            logger.error(f"Error getting Q&A session version {session_id}: {e}")
+            raise
+    
+    def count_qa_interactions(self, session_id: str) -> int:
+        """Number of interactions in a session, counted without loading them."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                return conn.execute("""
+                    SELECT COUNT(*) FROM qa_interactions WHERE session_id = ?
+                """, (session_id,)).fetchone()[0]
+                
+        except Exception as e:
+            logger.error(f"Error counting Q&A interactions for session {session_id}: {e}")
+            raise
+    
+    def iter_qa_interactions(self, session_id: str) -> Iterator[Tuple[str, str, str, str]]:
+        """
+        Stream a session's interactions oldest first as (question, answer,
+        timestamp, analysis_mode) rows read off the cursor, so a long session
+        is never held in memory at once.
+        """
+        try:
+            with self.db_manager.get_connection() as conn:
+                table_columns = {row[1] for row in conn.execute("PRAGMA table_info(qa_interactions)").fetchall()}
+                # analysis_mode is added by migration 003
+                mode = 'analysis_mode' if 'analysis_mode' in table_columns else "'standard'"
+                cursor = conn.execute(f"""
+                    SELECT question, answer, timestamp, {mode} FROM qa_interactions
+                    WHERE session_id = ?
+                    ORDER BY timestamp ASC, id ASC
+                """, (session_id,))
+                for row in cursor:
+                    yield tuple(row)
+                
+        except Exception as e:
+            logger.error(f"Error streaming Q&A interactions for session {session_id}: {e}")
+            raise
+    
     def list_qa_sessions(self, document_id: Optional[str] = None) -> List[QASession]:
         """List Q&A sessions, optionally filtered by document ID."""
         try:
@@ -451,6 +742,7 @@ class DocumentStorage:
             return document
         return None
     
+    @traced("storage.search_documents_by_content")
     def search_documents_by_content(self, query: str, limit: int = 10) -> List[Document]:
         """Search documents by content (simple text search)."""
         try:
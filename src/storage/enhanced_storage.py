@@ -1,18 +1,20 @@
 """Enhanced storage service for new Q&A capabilities."""
 
 import json
+import os
 import uuid
 from datetime import datetime, timedelta
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, Iterator, List, Optional, Sequence, Tuple
 import sqlite3
 
 from src.models.document import (
     ComprehensiveAnalysis, RiskAssessment, Commitment, DeliverableDate, AnalysisTemplate
 )
 from src.models.conversational import (
-    ConversationContext, ConversationTurn, ExcelReport, ExcelSheet
+    ConversationContext, ConversationTurn, ExcelReport, ExcelSheet, ReportJob
 )
 from src.storage.database import db_manager
+from src.storage.document_storage import IN_CLAUSE_CHUNK_SIZE
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -82,35 +84,175 @@ class EnhancedDocumentStorage:
                 if not row:
                     return None
                 
-                analysis_dict = dict(row)
-                
-                # Get related data
-                risks = self._get_risks_for_analysis(cursor, analysis_id)
-                commitments = self._get_commitments_for_analysis(cursor, analysis_id)
-                dates = self._get_dates_for_analysis(cursor, analysis_id)
-                
-                # Reconstruct analysis object
-                return ComprehensiveAnalysis(
-                    document_id=analysis_dict['document_id'],
-                    analysis_id=analysis_dict['analysis_id'],
-                    document_overview=analysis_dict['document_overview'],
-                    key_findings=json.loads(analysis_dict['key_findings'] or '[]'),
-                    critical_information=json.loads(analysis_dict['critical_information'] or '[]'),
-                    recommended_actions=json.loads(analysis_dict['recommended_actions'] or '[]'),
-                    executive_recommendation=analysis_dict['executive_recommendation'],
-                    key_legal_terms=json.loads(analysis_dict['key_legal_terms'] or '[]'),
-                    risks=risks,
-                    commitments=commitments,
-                    deliverable_dates=dates,
-                    template_used=analysis_dict['template_used'],
-                    confidence_score=analysis_dict['confidence_score'],
-                    created_at=datetime.fromisoformat(analysis_dict['created_at'])
+                # Get related data and reconstruct analysis object
+                return self._analysis_from_row(
+                    dict(row),
+                    self._get_risks_for_analysis(cursor, analysis_id),
+                    self._get_commitments_for_analysis(cursor, analysis_id),
+                    self._get_dates_for_analysis(cursor, analysis_id)
                 )
                 
         except Exception as e:
             logger.error(f"Error retrieving comprehensive analysis: {e}")
             return None
     
+    def get_document_analyses(self, document_ids: List[str]) -> Dict[str, ComprehensiveAnalysis]:
+        """
+        Latest comprehensive analysis for each of many documents.
+        
+        Analyses and their risks, commitments and dates are fetched with one
+        ``IN (...)`` query per table for every chunk of documents, instead of
+        a lookup plus three child queries per document. Documents without an
+        analysis are absent from the result.
+        """
+        analyses: Dict[str, ComprehensiveAnalysis] = {}
+        unique_ids = list(dict.fromkeys(document_ids))
+        try:
+            with self.db_manager.get_connection() as conn:
+                for start in range(0, len(unique_ids), IN_CLAUSE_CHUNK_SIZE):
+                    chunk = unique_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+                    placeholders = ", ".join("?" for _ in chunk)
+                    rows = conn.execute(f"""
+                        SELECT * FROM (
+                            SELECT *, ROW_NUMBER() OVER (
+                                PARTITION BY document_id ORDER BY created_at DESC
+                            ) AS analysis_rank
+                            FROM comprehensive_analysis
+                            WHERE document_id IN ({placeholders})
+                        ) WHERE analysis_rank = 1
+                    """, chunk).fetchall()
+                    if not rows:
+                        continue
+                    
+                    analysis_ids = [row['analysis_id'] for row in rows]
+                    risks = self._group_by_analysis(conn, "risk_assessments", analysis_ids, "", self._risk_from_row)
+                    commitments = self._group_by_analysis(conn, "commitments", analysis_ids, "", self._commitment_from_row)
+                    dates = self._group_by_analysis(conn, "deliverable_dates", analysis_ids, "ORDER BY date ASC",
+                                                    self._date_from_row)
+                    
+                    for row in rows:
+                        analysis_id = row['analysis_id']
+                        analyses[row['document_id']] = self._analysis_from_row(
+                            dict(row), risks.get(analysis_id, []), commitments.get(analysis_id, []),
+                            dates.get(analysis_id, [])
+                        )
+                
+                return analyses
+                
+        except Exception as e:
+            logger.error(f"Error retrieving document analyses: {e}")
+            return analyses
+    
+    def _group_by_analysis(self, conn: sqlite3.Connection, table: str, analysis_ids: List[str],
+                           order_by: str, from_row) -> Dict[str, List[Any]]:
+        """Child rows of ``table`` for the given analyses, grouped by analysis ID."""
+        placeholders = ", ".join("?" for _ in analysis_ids)
+        grouped: Dict[str, List[Any]] = {}
+        for row in conn.execute(
+            f"SELECT * FROM {table} WHERE analysis_id IN ({placeholders}) {order_by}", analysis_ids
+        ):
+            grouped.setdefault(row['analysis_id'], []).append(from_row(dict(row)))
+        return grouped
+    
+    @staticmethod
+    def _analysis_from_row(analysis_dict: Dict[str, Any], risks: List[RiskAssessment],
+                           commitments: List[Commitment], dates: List[DeliverableDate]) -> ComprehensiveAnalysis:
+        return ComprehensiveAnalysis(
+            document_id=analysis_dict['document_id'],
+            analysis_id=analysis_dict['analysis_id'],
+            document_overview=analysis_dict['document_overview'],
+            key_findings=json.loads(analysis_dict['key_findings'] or '[]'),
+            critical_information=json.loads(analysis_dict['critical_information'] or '[]'),
+            recommended_actions=json.loads(analysis_dict['recommended_actions'] or '[]'),
+            executive_recommendation=analysis_dict['executive_recommendation'],
+            key_legal_terms=json.loads(analysis_dict['key_legal_terms'] or '[]'),
+            risks=risks,
+            commitments=commitments,
+            deliverable_dates=dates,
+            template_used=analysis_dict['template_used'],
+            confidence_score=analysis_dict['confidence_score'],
+            created_at=datetime.fromisoformat(analysis_dict['created_at'])
+        )
+    
+    def iter_latest_risk_rows(self, document_ids: List[str],
+                              severities: Optional[Sequence[str]] = None) -> Iterator[Tuple[Any, ...]]:
+        """
+        Stream (document_id, risk_id, description, severity, category) rows of
+        each document's latest analysis, in ``document_ids`` order, optionally
+        keeping only the given severities.
+        """
+        yield from self._iter_latest_analysis_rows(
+            "risk_assessments", "child.risk_id, child.description, child.severity, child.category",
+            document_ids, "severity", severities
+        )
+    
+    def iter_latest_commitment_rows(self, document_ids: List[str]) -> Iterator[Tuple[Any, ...]]:
+        """
+        Stream (document_id, commitment_id, description, obligated_party,
+        deadline, status) rows of each document's latest analysis, in
+        ``document_ids`` order; deadlines are ``YYYY-MM-DD`` or empty.
+        """
+        yield from self._iter_latest_analysis_rows(
+            "commitments",
+            "child.commitment_id, child.description, child.obligated_party, "
+            "COALESCE(substr(child.deadline, 1, 10), ''), child.status",
+            document_ids
+        )
+    
+    def _iter_latest_analysis_rows(self, table: str, columns: str, document_ids: List[str],
+                                   filter_column: Optional[str] = None,
+                                   allowed: Optional[Sequence[str]] = None) -> Iterator[Tuple[Any, ...]]:
+        """Child rows of ``table`` for the latest analysis of each document, read off the cursor."""
+        unique_ids = list(dict.fromkeys(document_ids))
+        try:
+            with self.db_manager.get_connection() as conn:
+                for start in range(0, len(unique_ids), IN_CLAUSE_CHUNK_SIZE):
+                    chunk = unique_ids[start:start + IN_CLAUSE_CHUNK_SIZE]
+                    # Positions keep the rows in the caller's document order
+                    wanted = ", ".join("(?, ?)" for _ in chunk)
+                    params: List[Any] = [value for position, doc_id in enumerate(chunk) for value in (doc_id, position)]
+                    condition = ""
+                    if allowed is not None:
+                        condition = f"AND child.{filter_column} IN ({', '.join('?' for _ in allowed)})"
+                        params.extend(allowed)
+                    cursor = conn.execute(f"""
+                        WITH wanted (document_id, position) AS (VALUES {wanted}),
+                        latest AS (
+                            SELECT analysis.document_id, analysis.analysis_id, wanted.position,
+                                   ROW_NUMBER() OVER (
+                                       PARTITION BY analysis.document_id ORDER BY analysis.created_at DESC
+                                   ) AS analysis_rank
+                            FROM comprehensive_analysis analysis
+                            JOIN wanted ON wanted.document_id = analysis.document_id
+                        )
+                        SELECT latest.document_id, {columns}
+                        FROM latest JOIN {table} child ON child.analysis_id = latest.analysis_id
+                        WHERE latest.analysis_rank = 1 {condition}
+                        ORDER BY latest.position, child.rowid
+                    """, params)
+                    for row in cursor:
+                        yield tuple(row)
+                
+        except Exception as e:
+            # Like the other analysis readers, a failed lookup yields no further rows
+            logger.error(f"Error streaming {table} rows: {e}")
+    
+    def get_latest_analysis_id(self, document_id: str) -> Optional[str]:
+        """ID of the latest comprehensive analysis for a document, without loading it."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                row = conn.execute("""
+                    SELECT analysis_id FROM comprehensive_analysis
+                    WHERE document_id = ?
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                """, (document_id,)).fetchone()
+                return row[0] if row else None
+                
+        except Exception as e:
+            logger.error(f"Error getting latest analysis id: {e}")
+            return None
+    
     def get_document_analysis(self, document_id: str) -> Optional[ComprehensiveAnalysis]:
         """Get the latest comprehensive analysis for a document."""
         try:
@@ -155,21 +297,20 @@ class EnhancedDocumentStorage:
             SELECT * FROM risk_assessments WHERE analysis_id = ?
         """, (analysis_id,))
         
-        risks = []
-        for row in cursor.fetchall():
-            risk_dict = dict(row)
-            risks.append(RiskAssessment(
-                risk_id=risk_dict['risk_id'],
-                description=risk_dict['description'],
-                severity=risk_dict['severity'],
-                category=risk_dict['category'],
-                affected_parties=json.loads(risk_dict['affected_parties'] or '[]'),
-                mitigation_suggestions=json.loads(risk_dict['mitigation_suggestions'] or '[]'),
-                source_text=risk_dict['source_text'],
-                confidence=risk_dict['confidence']
-            ))
-        
-        return risks
+        return [self._risk_from_row(dict(row)) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _risk_from_row(risk_dict: Dict[str, Any]) -> RiskAssessment:
+        return RiskAssessment(
+            risk_id=risk_dict['risk_id'],
+            description=risk_dict['description'],
+            severity=risk_dict['severity'],
+            category=risk_dict['category'],
+            affected_parties=json.loads(risk_dict['affected_parties'] or '[]'),
+            mitigation_suggestions=json.loads(risk_dict['mitigation_suggestions'] or '[]'),
+            source_text=risk_dict['source_text'],
+            confidence=risk_dict['confidence']
+        )
     
     def get_document_risks(self, document_id: str, severity_filter: Optional[str] = None) -> List[RiskAssessment]:
         """Get all risks for a document, optionally filtered by severity."""
@@ -232,21 +373,20 @@ class EnhancedDocumentStorage:
             SELECT * FROM commitments WHERE analysis_id = ?
         """, (analysis_id,))
         
-        commitments = []
-        for row in cursor.fetchall():
-            commitment_dict = dict(row)
-            commitments.append(Commitment(
-                commitment_id=commitment_dict['commitment_id'],
-                description=commitment_dict['description'],
-                obligated_party=commitment_dict['obligated_party'],
-                beneficiary_party=commitment_dict['beneficiary_party'],
-                deadline=datetime.fromisoformat(commitment_dict['deadline']) if commitment_dict['deadline'] else None,
-                status=commitment_dict['status'],
-                source_text=commitment_dict['source_text'],
-                commitment_type=commitment_dict['commitment_type']
-            ))
-        
-        return commitments
+        return [self._commitment_from_row(dict(row)) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _commitment_from_row(commitment_dict: Dict[str, Any]) -> Commitment:
+        return Commitment(
+            commitment_id=commitment_dict['commitment_id'],
+            description=commitment_dict['description'],
+            obligated_party=commitment_dict['obligated_party'],
+            beneficiary_party=commitment_dict['beneficiary_party'],
+            deadline=datetime.fromisoformat(commitment_dict['deadline']) if commitment_dict['deadline'] else None,
+            status=commitment_dict['status'],
+            source_text=commitment_dict['source_text'],
+            commitment_type=commitment_dict['commitment_type']
+        )
     
     def get_document_commitments(self, document_id: str, status_filter: Optional[str] = None) -> List[Commitment]:
         """Get all commitments for a document, optionally filtered by status."""
@@ -308,19 +448,18 @@ class EnhancedDocumentStorage:
             SELECT * FROM deliverable_dates WHERE analysis_id = ? ORDER BY date ASC
         """, (analysis_id,))
         
-        dates = []
-        for row in cursor.fetchall():
-            date_dict = dict(row)
-            dates.append(DeliverableDate(
-                date=datetime.fromisoformat(date_dict['date']),
-                description=date_dict['description'],
-                responsible_party=date_dict['responsible_party'],
-                deliverable_type=date_dict['deliverable_type'],
-                status=date_dict['status'],
-                source_text=date_dict['source_text']
-            ))
-        
-        return dates
+        return [self._date_from_row(dict(row)) for row in cursor.fetchall()]
+    
+    @staticmethod
+    def _date_from_row(date_dict: Dict[str, Any]) -> DeliverableDate:
+        return DeliverableDate(
+            date=datetime.fromisoformat(date_dict['date']),
+            description=date_dict['description'],
+            responsible_party=date_dict['responsible_party'],
+            deliverable_type=date_dict['deliverable_type'],
+            status=date_dict['status'],
+            source_text=date_dict['source_text']
+        )
     
     def get_document_dates(self, document_id: str, upcoming_only: bool = False) -> List[DeliverableDate]:
         """Get all deliverable dates for a document."""
@@ -530,12 +669,12 @@ class EnhancedDocumentStorage:
                 cursor.execute("""
                     INSERT INTO excel_reports (
                         report_id, filename, file_path, download_url, report_type,
-                        document_ids, created_at, expires_at
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                        document_ids, created_at, expires_at, fingerprint
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     report.report_id, report.filename, report.file_path,
-                    report.download_url, "comprehensive", json.dumps(document_ids),
-                    report.created_at.isoformat(), report.expires_at.isoformat()
+                    report.download_url, report.report_type or "comprehensive", json.dumps(document_ids),
+                    report.created_at.isoformat(), report.expires_at.isoformat(), report.fingerprint
                 ))
                 
                 conn.commit()
@@ -557,16 +696,7 @@ class EnhancedDocumentStorage:
                 
                 row = cursor.fetchone()
                 if row:
-                    report_dict = dict(row)
-                    return ExcelReport(
-                        report_id=report_dict['report_id'],
-                        filename=report_dict['filename'],
-                        file_path=report_dict['file_path'],
-                        download_url=report_dict['download_url'],
-                        sheets=[],  # Would need to reconstruct from file
-                        created_at=datetime.fromisoformat(report_dict['created_at']),
-                        expires_at=datetime.fromisoformat(report_dict['expires_at'])
-                    )
+                    return self._row_to_excel_report(dict(row))
                 
                 return None
                 
@@ -574,6 +704,121 @@ class EnhancedDocumentStorage:
             logger.error(f"Error retrieving Excel report: {e}")
             return None
     
+    def find_reusable_report(self, fingerprint: str) -> Optional[ExcelReport]:
+        """Latest unexpired report built from the same inputs whose file still exists."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                
+                cursor.execute("""
+                    SELECT * FROM excel_reports
+                    WHERE fingerprint = ? AND expires_at > ?
+                    ORDER BY created_at DESC
+                """, (fingerprint, datetime.now().isoformat()))
+                
+                for row in cursor.fetchall():
+                    report = self._row_to_excel_report(dict(row))
+                    if os.path.exists(report.file_path):
+                        return report
+                
+                return None
+                
+        except Exception as e:
+            logger.error(f"Error finding reusable Excel report: {e}")
+            return None
+    
+    def _row_to_excel_report(self, report_dict: Dict[str, Any]) -> ExcelReport:
+        return ExcelReport(
+            report_id=report_dict['report_id'],
+            filename=report_dict['filename'],
+            file_path=report_dict['file_path'],
+            download_url=report_dict['download_url'],
+            sheets=[],  # Would need to reconstruct from file
+            created_at=datetime.fromisoformat(report_dict['created_at']),
+            expires_at=datetime.fromisoformat(report_dict['expires_at']),
+            fingerprint=report_dict.get('fingerprint'),
+            report_type=report_dict.get('report_type')
+        )
+    
+    # Report Job Operations
+    
+    def create_report_job(self, job: ReportJob) -> str:
+        """Record a new background report job."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                job_dict = job.to_dict()
+                conn.execute(f"""
+                    INSERT INTO report_jobs ({', '.join(job_dict)})
+                    VALUES ({', '.join('?' for _ in job_dict)})
+                """, list(job_dict.values()))
+                conn.commit()
+                return job.job_id
+                
+        except Exception as e:
+            logger.error(f"Error creating report job: {e}")
+            raise
+    
+    def update_report_job(self, job_id: str, status: str, report_id: Optional[str] = None,
+                          error_message: Optional[str] = None) -> bool:
+        """Move a report job to a new status."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                completed_at = datetime.now().isoformat() if status in ('completed', 'failed') else None
+                cursor = conn.execute("""
+                    UPDATE report_jobs
+                    SET status = ?, report_id = COALESCE(?, report_id),
+                        error_message = ?, completed_at = COALESCE(?, completed_at)
+                    WHERE job_id = ?
+                """, (status, report_id, error_message, completed_at, job_id))
+                conn.commit()
+                return cursor.rowcount > 0
+                
+        except Exception as e:
+            logger.error(f"Error updating report job {job_id}: {e}")
+            raise
+    
+    def get_report_job(self, job_id: str) -> Optional[ReportJob]:
+        """Retrieve a report job by ID."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                row = conn.execute("SELECT * FROM report_jobs WHERE job_id = ?", (job_id,)).fetchone()
+                return ReportJob.from_dict(dict(row)) if row else None
+                
+        except Exception as e:
+            logger.error(f"Error retrieving report job {job_id}: {e}")
+            return None
+    
+    def find_active_report_job(self, fingerprint: str) -> Optional[ReportJob]:
+        """A queued or running job for the same inputs, if any."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                row = conn.execute("""
+                    SELECT * FROM report_jobs
+                    WHERE fingerprint = ? AND status IN ('queued', 'running')
+                    ORDER BY created_at DESC
+                    LIMIT 1
+                """, (fingerprint,)).fetchone()
+                return ReportJob.from_dict(dict(row)) if row else None
+                
+        except Exception as e:
+            logger.error(f"Error finding active report job: {e}")
+            return None
+    
+    def fail_unfinished_report_jobs(self, message: str, created_before: datetime) -> int:
+        """Mark queued or running jobs created before ``created_before`` as failed."""
+        try:
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.execute("""
+                    UPDATE report_jobs SET status = 'failed', error_message = ?, completed_at = ?
+                    WHERE status IN ('queued', 'running') AND created_at < ?
+                """, (message, datetime.now().isoformat(), created_before.isoformat()))
+                conn.commit()
+                return cursor.rowcount
+                
+        except Exception as e:
+            logger.error(f"Error failing unfinished report jobs: {e}")
+            return 0
+    
     def cleanup_expired_reports(self) -> int:
         """Clean up expired Excel reports."""
         try:
@@ -589,7 +834,6 @@ class EnhancedDocumentStorage:
                 expired_reports = cursor.fetchall()
                 
                 # Delete files and database records
-                import os
                 deleted_count = 0
                 
                 for report_id, file_path in expired_reports:
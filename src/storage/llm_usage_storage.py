@@ -0,0 +1,165 @@
+"""SQLite storage and reporting queries for LLM token and cost accounting."""
+
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+from src.storage.database import db_manager
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+# Columns usage can be aggregated by; used to build GROUP BY clauses safely
+GROUPABLE_COLUMNS = ("document_id", "session_id", "workflow_node", "component", "operation", "model")
+
+
+@dataclass
+class LLMUsageRecord:
+    """Token usage, latency and estimated cost of a single LLM call."""
+    model: str
+    prompt_tokens: int
+    output_tokens: int
+    total_tokens: int
+    latency_ms: float
+    estimated_cost: float
+    success: bool = True
+    component: Optional[str] = None
+    operation: Optional[str] = None
+    workflow_node: Optional[str] = None
+    document_id: Optional[str] = None
+    session_id: Optional[str] = None
+    prompt_chars: int = 0
+    response_chars: int = 0
+    prompt_preview: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.now)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'created_at': self.created_at.isoformat(),
+            'model': self.model,
+            'component': self.component,
+            'operation': self.operation,
+            'workflow_node': self.workflow_node,
+            'document_id': self.document_id,
+            'session_id': self.session_id,
+            'prompt_tokens': self.prompt_tokens,
+            'output_tokens': self.output_tokens,
+            'total_tokens': self.total_tokens,
+            'latency_ms': self.latency_ms,
+            'estimated_cost': self.estimated_cost,
+            'success': self.success,
+            'prompt_chars': self.prompt_chars,
+            'response_chars': self.response_chars,
+            'prompt_preview': self.prompt_preview
+        }
+
+
+class LLMUsageStorage:
+    """Persists LLM usage records and aggregates them for reporting."""
+
+    def __init__(self, database_manager=None):
+        self.db_manager = database_manager or db_manager
+
+    def record_usage(self, record: LLMUsageRecord) -> int:
+        """Insert a usage record and return its row id."""
+        data = record.to_dict()
+        columns = list(data)
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.execute(
+                f"INSERT INTO llm_usage ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+                [data[column] for column in columns]
+            )
+            conn.commit()
+            return cursor.lastrowid
+
+    def get_usage_summary(self, group_by: str, since: Optional[datetime] = None,
+                          limit: int = 50, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Aggregate calls, tokens, latency and cost by one attribution column.
+
+        Args:
+            group_by: One of ``GROUPABLE_COLUMNS``
+            since: Only include calls made at or after this time
+            limit: Maximum number of groups, most expensive first
+            **filters: Equality filters on ``GROUPABLE_COLUMNS``
+
+        Returns:
+            One dictionary per group, ordered by estimated cost
+        """
+        if group_by not in GROUPABLE_COLUMNS:
+            raise ValueError(f"Cannot group LLM usage by '{group_by}'")
+        where, params = self._where_clause(since, filters)
+
+        with self.db_manager.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT {group_by} AS "key",
+                       COUNT(*) AS calls,
+                       SUM(CASE WHEN success THEN 0 ELSE 1 END) AS failed_calls,
+                       SUM(prompt_tokens) AS prompt_tokens,
+                       SUM(output_tokens) AS output_tokens,
+                       SUM(total_tokens) AS total_tokens,
+                       SUM(estimated_cost) AS estimated_cost,
+                       AVG(latency_ms) AS avg_latency_ms,
+                       MAX(latency_ms) AS max_latency_ms
+                FROM llm_usage
+                {where}
+                GROUP BY {group_by}
+                ORDER BY estimated_cost DESC, total_tokens DESC
+                LIMIT ?
+            """, params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def get_totals(self, since: Optional[datetime] = None, **filters: Any) -> Dict[str, Any]:
+        """Overall call count, tokens, cost and latency."""
+        where, params = self._where_clause(since, filters)
+
+        with self.db_manager.get_connection() as conn:
+            row = conn.execute(f"""
+                SELECT COUNT(*) AS calls,
+                       COALESCE(SUM(CASE WHEN success THEN 0 ELSE 1 END), 0) AS failed_calls,
+                       COALESCE(SUM(prompt_tokens), 0) AS prompt_tokens,
+                       COALESCE(SUM(output_tokens), 0) AS output_tokens,
+                       COALESCE(SUM(total_tokens), 0) AS total_tokens,
+                       COALESCE(SUM(estimated_cost), 0) AS estimated_cost,
+                       COALESCE(AVG(latency_ms), 0) AS avg_latency_ms
+                FROM llm_usage
+                {where}
+            """, params).fetchone()
+        return dict(row)
+
+    def get_most_expensive_calls(self, limit: int = 20, since: Optional[datetime] = None,
+                                 **filters: Any) -> List[Dict[str, Any]]:
+        """Individual calls ordered by estimated cost, then total tokens."""
+        where, params = self._where_clause(since, filters)
+
+        with self.db_manager.get_connection() as conn:
+            rows = conn.execute(f"""
+                SELECT * FROM llm_usage
+                {where}
+                ORDER BY estimated_cost DESC, total_tokens DESC
+                LIMIT ?
+            """, params + [limit]).fetchall()
+        return [dict(row) for row in rows]
+
+    def delete_usage_before(self, cutoff: datetime) -> int:
+        """Delete records older than ``cutoff`` and return how many were removed."""
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.execute("DELETE FROM llm_usage WHERE created_at < ?", (cutoff.isoformat(),))
+            conn.commit()
+            return cursor.rowcount
+
+    def _where_clause(self, since: Optional[datetime], filters: Dict[str, Any]):
+        clauses = []
+        params: List[Any] = []
+        if since is not None:
+            clauses.append("created_at >= ?")
+            params.append(since.isoformat())
+        for column, value in filters.items():
+            if column not in GROUPABLE_COLUMNS:
+                raise ValueError(f"Cannot filter LLM usage by '{column}'")
+            if value is None:
+                clauses.append(f"{column} IS NULL")
+            else:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        return ("WHERE " + " AND ".join(clauses)) if clauses else "", params
@@ -2,6 +2,7 @@
 
 import sqlite3
 import logging
+import threading
 from typing import List, Dict, Any
 from src.storage.database import db_manager
 from src.utils.logging_config import get_logger
@@ -14,6 +15,17 @@ class DatabaseMigrator:
     
     def __init__(self):
         self.db_manager = db_manager
+        self._migrated_paths = set()
+        self._lock = threading.Lock()
+    
+    def ensure_migrated(self) -> bool:
+        """Run pending migrations once per database per process; later calls return immediately."""
+        with self._lock:
+            if self.db_manager.db_path not in self._migrated_paths:
+                if not self.run_migrations():
+                    return False
+                self._migrated_paths.add(self.db_manager.db_path)
+            return True
     
     def run_migrations(self) -> bool:
         """Run all pending migrations."""
@@ -46,6 +58,26 @@ class DatabaseMigrator:
                         'id': '004_create_enhanced_tables',
                         'description': 'Create new tables for enhanced analysis',
                         'sql': self._migration_004_create_enhanced_tables()
+                    },
+                    {
+                        'id': '005_report_fingerprints_and_jobs',
+                        'description': 'Add report fingerprints and background report jobs',
+                        'sql': self._migration_005_report_fingerprints_and_jobs()
+                    },
+                    {
+                        'id': '006_index_analysis_children',
+                        'description': 'Index analysis child tables for batched lookups',
+                        'sql': self._migration_006_index_analysis_children()
+                    },
+                    {
+                        'id': '007_document_text_encoding',
+                        'description': 'Record the detected encoding of text uploads',
+                        'sql': self._migration_007_document_text_encoding()
+                    },
+                    {
+                        'id': '008_document_sections',
+                        'description': 'Store the section tree of structured uploads',
+                        'sql': self._migration_008_document_sections()
                     }
                 ]
                 
@@ -294,6 +326,69 @@ class DatabaseMigrator:
             CREATE INDEX IF NOT EXISTS idx_excel_reports_expires ON excel_reports (expires_at)
             """
         ]
+    
+    def _migration_005_report_fingerprints_and_jobs(self) -> List[str]:
+        """Add report fingerprints for reuse and a table for background report jobs."""
+        return [
+            """
+            ALTER TABLE excel_reports ADD COLUMN fingerprint TEXT
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_excel_reports_fingerprint ON excel_reports (fingerprint, expires_at)
+            """,
+            """
+            CREATE TABLE IF NOT EXISTS report_jobs (
+                job_id TEXT PRIMARY KEY,
+                fingerprint TEXT NOT NULL,
+                subject_type TEXT NOT NULL,
+                subject_id TEXT NOT NULL,
+                report_type TEXT NOT NULL,
+                status TEXT DEFAULT 'queued',
+                report_id TEXT,
+                reused BOOLEAN DEFAULT FALSE,
+                error_message TEXT,
+                created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                completed_at DATETIME
+            )
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_report_jobs_fingerprint ON report_jobs (fingerprint, status)
+            """
+        ]
+    
+    def _migration_006_index_analysis_children(self) -> List[str]:
+        """Index risks, commitments and dates by analysis for batched IN (...) lookups."""
+        return [
+            """
+            CREATE INDEX IF NOT EXISTS idx_risk_assessments_analysis ON risk_assessments (analysis_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_commitments_analysis ON commitments (analysis_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_deliverable_dates_analysis ON deliverable_dates (analysis_id)
+            """,
+            """
+            CREATE INDEX IF NOT EXISTS idx_comprehensive_analysis_document_created
+            ON comprehensive_analysis (document_id, created_at)
+            """
+        ]
+    
+    def _migration_007_document_text_encoding(self) -> List[str]:
+        """Add the encoding text uploads were decoded with."""
+        return [
+            """
+            ALTER TABLE documents ADD COLUMN text_encoding TEXT
+            """
+        ]
+    
+    def _migration_008_document_sections(self) -> List[str]:
+        """Add the JSON section tree extracted from DOCX headings and numbering."""
+        return [
+            """
+            ALTER TABLE documents ADD COLUMN sections TEXT
+            """
+        ]
 
 
 # Global migrator instance
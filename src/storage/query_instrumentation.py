@@ -0,0 +1,327 @@
+"""SQLite statement timing, per-shape aggregation and slow-query logging.
+
+``DatabaseManager`` opens connections with ``InstrumentedConnection``, whose
+cursors time every statement from ``execute`` until its rows are fully
+fetched (SQLite produces rows lazily, so fetch time is part of the query).
+Timings are aggregated per normalized SQL shape, with literals and ``IN``
+lists collapsed, and statements slower than a threshold are logged together
+with their ``EXPLAIN QUERY PLAN`` output.
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional
+
+from src.services.metrics_store import QuantileSketch
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+OVERFLOW_SHAPE = "<other statements>"
+EXPLAINABLE_PREFIXES = ("SELECT", "WITH", "UPDATE", "DELETE", "INSERT", "REPLACE")
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?![\w.])")
+_IN_LIST = re.compile(r"\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_VALUES_LIST = re.compile(r"\bVALUES\s*\(\s*\?(?:\s*,\s*\?)*\s*\)", re.IGNORECASE)
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=2048)
+def normalize_sql(sql: str) -> str:
+    """Reduce a statement to its shape: literals become ``?`` and lists collapse."""
+    shape = _STRING_LITERAL.sub("?", sql)
+    shape = _NUMBER_LITERAL.sub("?", shape)
+    shape = _IN_LIST.sub("IN (?...)", shape)
+    shape = _VALUES_LIST.sub("VALUES (?...)", shape)
+    return _WHITESPACE.sub(" ", shape).strip().rstrip(";")
+
+
+class QueryShapeStats:
+    """Aggregated timings for one statement shape"""
+
+    __slots__ = ("count", "errors", "total_seconds", "max_seconds", "rows", "sketch", "last_seen")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total_seconds = 0.0
+        self.max_seconds = 0.0
+        self.rows = 0
+        self.sketch = QuantileSketch()
+        self.last_seen = 0.0
+
+    def add(self, seconds: float, rows: int, error: bool) -> None:
+        self.count += 1
+        self.errors += int(error)
+        self.total_seconds += seconds
+        self.max_seconds = max(self.max_seconds, seconds)
+        self.rows += rows
+        self.sketch.add(seconds)
+        self.last_seen = time.time()
+
+    def to_dict(self, shape: str) -> Dict[str, Any]:
+        return {
+            "shape": shape,
+            "count": self.count,
+            "errors": self.errors,
+            "total_ms": round(self.total_seconds * 1000, 3),
+            "avg_ms": round(self.total_seconds / self.count * 1000, 3) if self.count else 0.0,
+            "p95_ms": round(min(self.sketch.quantile(0.95) or 0.0, self.max_seconds) * 1000, 3),
+            "max_ms": round(self.max_seconds * 1000, 3),
+            "rows": self.rows,
+            "avg_rows": round(self.rows / self.count, 2) if self.count else 0.0
+        }
+
+
+class QueryStatistics:
+    """
+    Thread-safe per-shape statement statistics and a log of slow statements.
+
+    The number of distinct shapes is capped; statements beyond the cap are
+    counted under a single overflow shape so dynamically built SQL cannot grow
+    the table without bound.
+    """
+
+    def __init__(
+        self,
+        slow_query_threshold_ms: float = 100.0,
+        max_shapes: int = 500,
+        max_slow_queries: int = 100,
+        explain_interval_seconds: float = 300.0
+    ):
+        self.slow_query_threshold_ms = slow_query_threshold_ms
+        self.max_shapes = max_shapes
+        self.explain_interval_seconds = explain_interval_seconds
+
+        self._shapes: Dict[str, QueryShapeStats] = {}
+        self._slow_queries: "deque[Dict[str, Any]]" = deque(maxlen=max_slow_queries)
+        self._last_explained: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql: str, seconds: float, rows: int = 0, error: bool = False,
+               connection: Optional[sqlite3.Connection] = None, parameters: Any = ()) -> None:
+        """Fold one statement into its shape; log it when it is slow"""
+        shape = normalize_sql(sql)
+        with self._lock:
+            stats = self._shapes.get(shape)
+            if stats is None:
+                if len(self._shapes) >= self.max_shapes:
+                    shape = OVERFLOW_SHAPE
+                    stats = self._shapes.setdefault(shape, QueryShapeStats())
+                else:
+                    stats = self._shapes[shape] = QueryShapeStats()
+            stats.add(seconds, rows, error)
+
+        if seconds * 1000 >= self.slow_query_threshold_ms:
+            self._record_slow_query(shape, sql, seconds, rows, connection, parameters)
+
+    def get_statistics(self, sort_by: str = "total_ms", limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Per-shape statistics, most expensive first"""
+        with self._lock:
+            rows = [stats.to_dict(shape) for shape, stats in self._shapes.items()]
+        rows.sort(key=lambda row: row[sort_by], reverse=True)
+        return rows[:limit] if limit else rows
+
+    def get_summary(self) -> Dict[str, Any]:
+        with self._lock:
+            count = sum(stats.count for stats in self._shapes.values())
+            total_seconds = sum(stats.total_seconds for stats in self._shapes.values())
+            errors = sum(stats.errors for stats in self._shapes.values())
+            shapes = len(self._shapes)
+            slow = len(self._slow_queries)
+        return {
+            "statements": count,
+            "total_ms": round(total_seconds * 1000, 3),
+            "errors": errors,
+            "shapes": shapes,
+            "slow_queries": slow,
+            "slow_query_threshold_ms": self.slow_query_threshold_ms
+        }
+
+    def get_slow_queries(self, limit: int = 20) -> List[Dict[str, Any]]:
+        """Most recent slow statements, newest first"""
+        with self._lock:
+            return list(self._slow_queries)[-limit:][::-1]
+
+    def reset(self) -> None:
+        with self._lock:
+            self._shapes.clear()
+            self._slow_queries.clear()
+            self._last_explained.clear()
+
+    def _record_slow_query(self, shape: str, sql: str, seconds: float, rows: int,
+                           connection: Optional[sqlite3.Connection], parameters: Any) -> None:
+        now = time.time()
+        with self._lock:
+            explain = now - self._last_explained.get(shape, 0.0) >= self.explain_interval_seconds
+            if explain:
+                self._last_explained[shape] = now
+
+        plan = explain_query_plan(connection, sql, parameters) if explain and connection is not None else []
+        entry = {
+            "timestamp": datetime.now().isoformat(),
+            "shape": shape,
+            "sql": sql.strip()[:1000],
+            "duration_ms": round(seconds * 1000, 3),
+            "rows": rows,
+            "plan": plan
+        }
+        with self._lock:
+            self._slow_queries.append(entry)
+
+        plan_text = ("\n    " + "\n    ".join(plan)) if plan else ""
+        logger.warning(f"Slow query ({entry['duration_ms']:.1f} ms, {rows} rows): {shape}{plan_text}")
+
+
+def explain_query_plan(connection: sqlite3.Connection, sql: str, parameters: Any = ()) -> List[str]:
+    """``EXPLAIN QUERY PLAN`` lines for a statement, or an empty list if it cannot be explained"""
+    if not sql.lstrip().upper().startswith(EXPLAINABLE_PREFIXES):
+        return []
+    try:
+        # A plain cursor, so the EXPLAIN itself is not instrumented
+        cursor = sqlite3.Cursor(connection)
+        rows = cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+        cursor.close()
+    except sqlite3.Error as e:
+        logger.debug(f"Could not explain query: {e}")
+        return []
+    return [str(row[-1]) for row in rows]
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor that reports each statement's time and row count when it completes"""
+
+    def __init__(self, connection: sqlite3.Connection):
+        super().__init__(connection)
+        self._statement: Optional[str] = None
+        self._parameters: Any = ()
+        self._seconds = 0.0
+        self._rows = 0
+
+    def execute(self, sql: str, parameters: Any = ()):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            super().execute(sql, parameters)
+        except Exception:
+            self._report(sql, time.perf_counter() - started, 0, True, parameters)
+            raise
+        self._begin(sql, parameters, time.perf_counter() - started)
+        return self
+
+    def executemany(self, sql: str, seq_of_parameters):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            super().executemany(sql, seq_of_parameters)
+        except Exception:
+            self._report(sql, time.perf_counter() - started, 0, True)
+            raise
+        self._report(sql, time.perf_counter() - started, max(self.rowcount, 0), False)
+        return self
+
+    def executescript(self, sql_script: str):
+        self._finish()
+        started = time.perf_counter()
+        try:
+            super().executescript(sql_script)
+        except Exception:
+            self._report(sql_script, time.perf_counter() - started, 0, True)
+            raise
+        self._report(sql_script, time.perf_counter() - started, 0, False)
+        return self
+
+    def fetchone(self):
+        started = time.perf_counter()
+        row = super().fetchone()
+        self._seconds += time.perf_counter() - started
+        if row is None:
+            self._finish()
+        else:
+            self._rows += 1
+        return row
+
+    def fetchmany(self, size: Optional[int] = None):
+        size = self.arraysize if size is None else size
+        started = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._seconds += time.perf_counter() - started
+        self._rows += len(rows)
+        if len(rows) < size:
+            self._finish()
+        return rows
+
+    def fetchall(self):
+        started = time.perf_counter()
+        rows = super().fetchall()
+        self._seconds += time.perf_counter() - started
+        self._rows += len(rows)
+        self._finish()
+        return rows
+
+    def __next__(self):
+        started = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._seconds += time.perf_counter() - started
+            self._finish()
+            raise
+        self._seconds += time.perf_counter() - started
+        self._rows += 1
+        return row
+
+    def close(self):
+        self._finish()
+        super().close()
+
+    def __del__(self):
+        try:
+            self._finish()
+        except Exception:
+            pass
+
+    def _begin(self, sql: str, parameters: Any, seconds: float) -> None:
+        if self.description is None:
+            # Not a row-returning statement; it is complete already
+            self._report(sql, seconds, max(self.rowcount, 0), False, parameters)
+            return
+        self._statement = sql
+        self._parameters = parameters
+        self._seconds = seconds
+        self._rows = 0
+
+    def _finish(self) -> None:
+        if self._statement is None:
+            return
+        sql, self._statement = self._statement, None
+        self._report(sql, self._seconds, self._rows, False, self._parameters)
+
+    def _report(self, sql: str, seconds: float, rows: int, error: bool, parameters: Any = ()) -> None:
+        stats = getattr(self.connection, "query_stats", None)
+        if stats is not None:
+            stats.record(sql, seconds, rows, error, connection=self.connection, parameters=parameters)
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Connection whose cursors, including those behind ``execute``, are instrumented"""
+
+    query_stats: Optional[QueryStatistics] = None
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or InstrumentedCursor)
+
+    def execute(self, sql: str, parameters: Any = ()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script: str):
+        return self.cursor().executescript(sql_script)
@@ -2,27 +2,46 @@
 
 import streamlit as st
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 
 from src.storage.document_storage import DocumentStorage
 from src.models.document import Document, ProcessingJob
 from src.services.contract_analyst_engine import create_contract_analyst_engine
 from src.ui.qa_interface import render_qa_for_document
 from src.ui.styling import UIStyler
+from src.utils.component_registry import get_component
 from src.config import config
 
+# Status filter label -> processing statuses (None for all)
+STATUS_FILTERS = {
+    "All": None,
+    "Completed": ["completed"],
+    "Processing": ["pending", "processing"],
+    "Failed": ["failed"],
+    "Pending": ["pending"]
+}
+# Sort label -> DocumentStorage sort key
+SORT_OPTIONS = {
+    "Upload Date (Newest)": "newest",
+    "Upload Date (Oldest)": "oldest",
+    "Title (A-Z)": "title_asc",
+    "Title (Z-A)": "title_desc"
+}
+
 
 class DocumentManager:
     """Document management interface for Streamlit."""
     
     def __init__(self):
-        self.storage = DocumentStorage()
+        self.storage = get_component("document_storage", DocumentStorage)
         self.contract_engine = None
         
-        # Initialize contract engine for legal document detection
+        # Use the shared contract engine for legal document detection
         api_key = config.get_gemini_api_key()
         if api_key:
-            self.contract_engine = create_contract_analyst_engine(api_key, self.storage)
+            self.contract_engine = get_component(
+                ("contract_engine", api_key), lambda: create_contract_analyst_engine(api_key, self.storage)
+            )
         
         # Initialize session state
         if 'selected_doc_for_qa' not in st.session_state:
@@ -31,31 +50,34 @@ class DocumentManager:
             st.session_state.show_delete_confirmation = {}
         if 'legal_document_cache' not in st.session_state:
             st.session_state.legal_document_cache = {}
+        if 'document_page_query' not in st.session_state:
+            st.session_state.document_page_query = None
+            st.session_state.document_page_cursors = [None]
     
     def render_document_management(self) -> None:
         """Render the main document management interface."""
         st.subheader(f"{UIStyler.get_icon('documents')} Document Management")
         
-        # Get all documents
-        documents = self.storage.list_documents()
+        # Counted in SQL; documents themselves are loaded a page at a time
+        status_counts = self.storage.get_document_status_counts()
         
-        if not documents:
+        if not status_counts:
             st.info(f"{UIStyler.get_icon('documents')} No documents found. Upload some documents to get started!")
             return
         
         # Document statistics
-        self._render_document_stats(documents)
+        self._render_document_stats(status_counts)
         
         # Document list
-        self._render_document_list(documents)
+        self._render_document_list()
     
-    def _render_document_stats(self, documents: List[Document]) -> None:
+    def _render_document_stats(self, status_counts: Dict[str, int]) -> None:
         """Render document statistics with enhanced visual indicators."""
         # Calculate stats
-        total_docs = len(documents)
-        completed_docs = len([d for d in documents if d.processing_status == 'completed'])
-        processing_docs = len([d for d in documents if d.processing_status in ['pending', 'processing']])
-        failed_docs = len([d for d in documents if d.processing_status == 'failed'])
+        total_docs = sum(status_counts.values())
+        completed_docs = status_counts.get('completed', 0)
+        processing_docs = status_counts.get('pending', 0) + status_counts.get('processing', 0)
+        failed_docs = status_counts.get('failed', 0)
         
         # Display enhanced stats with icons and colors
         col1, col2, col3, col4 = st.columns(4)
@@ -74,67 +96,88 @@ class DocumentManager:
         
         st.markdown("---")
     
-    def _render_document_list(self, documents: List[Document]) -> None:
-        """Render the list of documents with management options."""
+    def _render_document_list(self) -> None:
+        """Render one page of documents with filter, sort and paging controls."""
         # Filter options
-        col1, col2 = st.columns([2, 1])
+        col1, col2, col3, col4 = st.columns([2, 1, 1, 1])
         
         with col1:
+            title_query = st.text_input("Search titles:", key="title_query").strip()
+        
+        with col2:
             status_filter = st.selectbox(
                 "Filter by status:",
-                options=["All", "Completed", "Processing", "Failed", "Pending"],
+                options=list(STATUS_FILTERS),
                 key="status_filter"
             )
         
-        with col2:
+        with col3:
+            file_type = st.selectbox(
+                "File type:",
+                options=["All"] + [file_type.upper() for file_type in config.ALLOWED_FILE_TYPES],
+                key="file_type_filter"
+            )
+        
+        with col4:
             sort_by = st.selectbox(
                 "Sort by:",
-                options=["Upload Date (Newest)", "Upload Date (Oldest)", "Title (A-Z)", "Title (Z-A)"],
+                options=list(SORT_OPTIONS),
                 key="sort_by"
             )
         
-        # Apply filters and sorting
-        filtered_docs = self._filter_and_sort_documents(documents, status_filter, sort_by)
-        
-        if not filtered_docs:
-            st.info(f"No documents found with status: {status_filter}")
+        filters = {
+            'statuses': STATUS_FILTERS[status_filter],
+            'file_type': None if file_type == "All" else file_type.lower(),
+            'title_query': title_query or None
+        }
+        
+        # Cursors of the pages visited so far; changing the query starts again from the first page
+        query = (title_query, status_filter, file_type, sort_by)
+        if st.session_state.document_page_query != query:
+            st.session_state.document_page_query = query
+            st.session_state.document_page_cursors = [None]
+        cursors = st.session_state.document_page_cursors
+        page_size = config.DOCUMENT_PAGE_SIZE
+        
+        page = self.storage.list_document_summaries(
+            SORT_OPTIONS[sort_by], cursors[-1], page_size, **filters
+        )
+        
+        if not page.documents:
+            if len(cursors) > 1:
+                # The rest of the last page was deleted
+                cursors.pop()
+                st.rerun()
+            st.info("No documents match these filters.")
             return
         
-        # Display documents with legal document detection
-        for doc in filtered_docs:
-            self._detect_legal_document_if_needed(doc)
+        first = (len(cursors) - 1) * page_size + 1
+        total = self.storage.count_documents(**filters)
+        st.caption(f"Showing {first}–{first + len(page.documents) - 1} of {total} documents")
+        
+        # Summaries only; text, analysis and legal detection wait until a document's details are opened
+        for doc in page.documents:
             self._render_document_card(doc)
+        
+        self._render_page_navigation(cursors, page.next_cursor)
     
-    def _filter_and_sort_documents(self, documents: List[Document], status_filter: str, sort_by: str) -> List[Document]:
-        """Filter and sort documents based on user selection."""
-        # Apply status filter
-        if status_filter != "All":
-            status_map = {
-                "Completed": "completed",
-                "Processing": ["pending", "processing"],
-                "Failed": "failed",
-                "Pending": "pending"
-            }
-            
-            filter_status = status_map[status_filter]
-            if isinstance(filter_status, list):
-                filtered_docs = [d for d in documents if d.processing_status in filter_status]
-            else:
-                filtered_docs = [d for d in documents if d.processing_status == filter_status]
-        else:
-            filtered_docs = documents.copy()
-        
-        # Apply sorting
-        if sort_by == "Upload Date (Newest)":
-            filtered_docs.sort(key=lambda d: d.upload_timestamp, reverse=True)
-        elif sort_by == "Upload Date (Oldest)":
-            filtered_docs.sort(key=lambda d: d.upload_timestamp)
-        elif sort_by == "Title (A-Z)":
-            filtered_docs.sort(key=lambda d: d.title.lower())
-        elif sort_by == "Title (Z-A)":
-            filtered_docs.sort(key=lambda d: d.title.lower(), reverse=True)
-        
-        return filtered_docs
+    def _render_page_navigation(self, cursors: List[Optional[Tuple[Any, str]]],
+                                next_cursor: Optional[Tuple[Any, str]]) -> None:
+        """Render previous/next page buttons."""
+        col1, col2, col3 = st.columns([1, 2, 1])
+        
+        with col1:
+            if st.button("← Previous", key="documents_previous_page", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun()
+        
+        with col2:
+            st.caption(f"Page {len(cursors)}")
+        
+        with col3:
+            if st.button("Next →", key="documents_next_page", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun()
     
     def _detect_legal_document_if_needed(self, document: Document) -> None:
         """Detect legal document type if not already cached."""
@@ -213,9 +256,14 @@ class DocumentManager:
                     st.session_state.show_delete_confirmation[document.id] = True
                     st.rerun()
             
-            # Document details (expandable) with enhanced icon
-            with st.expander(f"{UIStyler.get_icon('info')} Document Details", expanded=False):
-                self._render_document_details(document)
+            # Document details, loaded only while shown
+            if st.toggle(f"{UIStyler.get_icon('info')} Document Details", key=f"details_{document.id}"):
+                full_document = self.storage.get_document(document.id)
+                if full_document:
+                    self._detect_legal_document_if_needed(full_document)
+                    self._render_document_details(full_document)
+                else:
+                    st.warning("Document not found!")
             
             # Delete confirmation dialog
             if st.session_state.show_delete_confirmation.get(document.id, False):
@@ -6,11 +6,11 @@ import os
 from datetime import datetime
 from typing import Optional, List, Dict, Any
 
-from src.services.qa_engine import QAEngine, create_qa_engine
-from src.services.contract_analyst_engine import ContractAnalystEngine, create_contract_analyst_engine
+from src.services.qa_engine import create_qa_engine
+from src.services.contract_analyst_engine import create_contract_analyst_engine
 from src.services.enhanced_summary_analyzer import EnhancedSummaryAnalyzer
 from src.services.conversational_ai_engine import ConversationalAIEngine
-from src.services.excel_report_generator import ExcelReportGenerator
+from src.services.report_jobs import get_report_job_manager
 from src.services.template_engine import TemplateEngine
 from src.services.enhanced_response_router import EnhancedResponseRouter
 from src.storage.document_storage import DocumentStorage
@@ -20,6 +20,7 @@ from src.models.document import Document, QASession, AnalysisTemplate
 from src.models.conversational import ConversationContext
 from src.config import config
 from src.ui.styling import UIStyler
+from src.utils.component_registry import get_component
 from src.utils.logging_config import get_logger
 
 logger = get_logger(__name__)
@@ -29,17 +30,17 @@ class EnhancedQAInterface:
     """Enhanced Streamlit interface for document Q&A with comprehensive analysis capabilities."""
     
     def __init__(self):
-        self.storage = DocumentStorage()
+        self.storage = get_component("document_storage", DocumentStorage)
         self.enhanced_storage = enhanced_storage
         self.qa_engine = None
         self.contract_engine = None
         self.enhanced_analyzer = None
         self.conversational_engine = None
-        self.excel_generator = None
+        self.report_jobs = None
         self.template_engine = None
         self.enhanced_router = None
         
-        # Run database migrations on initialization
+        # Make sure database migrations have run in this process
         self._ensure_database_ready()
         
         # Initialize session state
@@ -61,6 +62,8 @@ class EnhancedQAInterface:
             st.session_state.conversation_context = {}
         if 'excel_reports' not in st.session_state:
             st.session_state.excel_reports = []
+        if 'report_jobs' not in st.session_state:
+            st.session_state.report_jobs = []
         if 'enhanced_mode_enabled' not in st.session_state:
             st.session_state.enhanced_mode_enabled = True  # Enable enhanced mode by default
         if 'conversation_context_persistence' not in st.session_state:
@@ -69,39 +72,35 @@ class EnhancedQAInterface:
     def _ensure_database_ready(self):
         """Ensure database schema is up to date."""
         try:
-            migrator.run_migrations()
+            if not migrator.ensure_migrated():
+                raise RuntimeError("see the logs for details")
         except Exception as e:
             st.error(f"Database migration failed: {e}")
             st.stop()
     
+    def _initialize_engines(self, api_key: str) -> None:
+        """Attach the process-wide engines for this API key, building them on first use."""
+        self.qa_engine = get_component(("qa_engine", api_key), lambda: create_qa_engine(api_key, self.storage))
+        self.contract_engine = get_component(
+            ("contract_engine", api_key), lambda: create_contract_analyst_engine(api_key, self.storage)
+        )
+        self.enhanced_analyzer = get_component(
+            ("enhanced_summary_analyzer", api_key), lambda: EnhancedSummaryAnalyzer(self.storage, api_key)
+        )
+        self.conversational_engine = get_component(
+            ("conversational_engine", api_key), lambda: ConversationalAIEngine(self.qa_engine, self.contract_engine)
+        )
+        self.report_jobs = get_report_job_manager()
+        self.template_engine = get_component("template_engine", lambda: TemplateEngine(self.storage))
+        self.enhanced_router = get_component(
+            ("enhanced_router", api_key), lambda: EnhancedResponseRouter(self.storage, api_key)
+        )
+    
     def _ensure_engines_initialized(self):
         """Ensure all engines are properly initialized."""
         try:
-            # Initialize QA engine if needed
-            if not self.qa_engine:
-                from src.services.qa_engine import QAEngine
-                import os
-                api_key = os.getenv('GEMINI_API_KEY', 'test_key')
-                self.qa_engine = QAEngine(self.storage, api_key)
-            
-            # Initialize contract engine if needed
-            if not self.contract_engine:
-                from src.services.contract_analyst_engine import ContractAnalystEngine
-                import os
-                api_key = os.getenv('GEMINI_API_KEY', 'test_key')
-                self.contract_engine = ContractAnalystEngine(self.storage, api_key)
-            
-            # Initialize enhanced router if needed and enhanced mode is enabled
-            if st.session_state.enhanced_mode_enabled and not self.enhanced_router:
-                try:
-                    from src.services.enhanced_response_router import EnhancedResponseRouter
-                    import os
-                    api_key = os.getenv('GEMINI_API_KEY', 'test_key')
-                    self.enhanced_router = EnhancedResponseRouter(self.storage, api_key)
-                except Exception as e:
-                    logger.warning(f"Could not initialize enhanced router: {e}")
-                    # Disable enhanced mode if initialization fails
-                    st.session_state.enhanced_mode_enabled = False
+            if not (self.qa_engine and self.contract_engine and self.enhanced_router):
+                self._initialize_engines(os.getenv('GEMINI_API_KEY', 'test_key'))
                     
         except Exception as e:
             logger.error(f"Error initializing engines: {e}")
@@ -122,21 +121,8 @@ class EnhancedQAInterface:
             st.info(f"{UIStyler.get_icon('info')} You can get an API key from: https://makersuite.google.com/app/apikey")
             return
         
-        # Initialize all engines
-        if not self.qa_engine:
-            self.qa_engine = create_qa_engine(api_key, self.storage)
-        if not self.contract_engine:
-            self.contract_engine = create_contract_analyst_engine(api_key, self.storage)
-        if not self.enhanced_analyzer:
-            self.enhanced_analyzer = EnhancedSummaryAnalyzer(self.storage, api_key)
-        if not self.conversational_engine:
-            self.conversational_engine = ConversationalAIEngine(self.qa_engine, self.contract_engine)
-        if not self.excel_generator:
-            self.excel_generator = ExcelReportGenerator(self.storage)
-        if not self.template_engine:
-            self.template_engine = TemplateEngine(self.storage)
-        if not self.enhanced_router:
-            self.enhanced_router = EnhancedResponseRouter(self.storage, api_key)
+        # Attach the shared engines, built on the first render in this process
+        self._initialize_engines(api_key)
         
         # Ensure backward compatibility
         self._ensure_backward_compatibility()
@@ -449,7 +435,7 @@ class EnhancedQAInterface:
             self._process_standard_question(question, document, session_id)
     
     def _process_standard_question(self, question: str, document: Document, session_id: str) -> None:
-        """Process question using standard contract analysis."""
+        """Process question using standard contract analysis, streaming the answer as it is generated."""
         analysis_mode = st.session_state.analysis_mode
         spinner_text = "🏛️ Analyzing legal document..." if analysis_mode == 'contract' else "🤔 Thinking about your question..."
         
@@ -465,62 +451,71 @@ class EnhancedQAInterface:
                     st.error("❌ Analysis engine not available. Please try again.")
                     return
                 
-                result = engine.answer_question(question, document.id, session_id)
-                
-                # Display the answer
-                if result.get('error'):
-                    st.error(f"❌ {result['answer']}")
-                else:
-                    success_text = "✅ Contract analysis complete!" if analysis_mode == 'contract' else "✅ Answer generated!"
-                    st.success(success_text)
-                    
-                    # Show answer in chat format
-                    with st.chat_message("user"):
-                        st.write(question)
-                    
-                    with st.chat_message("assistant"):
-                        # Display structured response for contract analysis
-                        if result.get('structured_response'):
-                            self._render_structured_response(result['structured_response'])
-                        else:
-                            st.write(result['answer'])
-                        
-                        # Show sources
-                        if result.get('sources'):
-                            with st.expander("📚 Sources", expanded=True):
-                                for source in result['sources']:
-                                    st.write(f"• {source}")
-                        
-                        # Show legal terms found (for contract analysis)
-                        if result.get('legal_terms_found'):
-                            with st.expander("🏛️ Legal Terms Identified", expanded=False):
-                                st.write(", ".join(result['legal_terms_found']))
-                        
-                        # Show document type for contract analysis
-                        if result.get('document_type') and analysis_mode == 'contract':
-                            st.caption(f"🏛️ Document Type: {result['document_type']}")
-                        
-                        # Show analysis mode
-                        mode_icon = "🏛️" if analysis_mode == 'contract' else "💬"
-                        mode_text = "Contract Analysis" if analysis_mode == 'contract' else "Standard Q&A"
-                        st.caption(f"{mode_icon} {mode_text}")
-                        
-                        # Show confidence if available
-                        if 'confidence' in result:
-                            confidence = result['confidence']
-                            if confidence > 0.7:
-                                st.success(f"Confidence: {confidence:.1%}")
-                            elif confidence > 0.4:
-                                st.warning(f"Confidence: {confidence:.1%}")
-                            else:
-                                st.error(f"Low confidence: {confidence:.1%}")
-                
-                # Refresh to show updated conversation
-                st.rerun()
+                # Retrieval happens here; the answer itself streams below
+                answer_stream = engine.stream_answer(question, document.id, session_id)
                 
             except Exception as e:
                 logger.error(f"Error in standard question processing: {e}")
                 st.error(f"❌ Error processing question: {str(e)}")
+                return
+        
+        try:
+            if answer_stream.result is not None and answer_stream.result.get('error'):
+                st.error(f"❌ {answer_stream.result['answer']}")
+            else:
+                self._display_immediate_response(question, {
+                    'answer_stream': answer_stream,
+                    'analysis_mode': analysis_mode
+                })
+        except Exception as e:
+            logger.error(f"Error in standard question processing: {e}")
+            st.error(f"❌ Error processing question: {str(e)}")
+            return
+        
+        # Refresh to show updated conversation
+        st.rerun()
+    
+    def _render_answer_stream(self, answer_stream) -> Dict[str, Any]:
+        """Render answer text as it streams, then its final form; returns the final result."""
+        placeholder = st.empty()
+        with placeholder.container():
+            st.write_stream(answer_stream)
+        
+        result = answer_stream.result or {}
+        if result.get('structured_response'):
+            # Replace the raw streamed text with the parsed three-part analysis
+            with placeholder.container():
+                self._render_structured_response(result['structured_response'])
+        return result
+    
+    def _render_answer_details(self, result: Dict[str, Any], analysis_mode: str) -> None:
+        """Legal terms, document type, analysis mode and confidence of a standard answer."""
+        if result.get('error'):
+            st.warning("⚠️ The answer may be incomplete because generation was interrupted.")
+        
+        # Show legal terms found (for contract analysis)
+        if result.get('legal_terms_found'):
+            with st.expander("🏛️ Legal Terms Identified", expanded=False):
+                st.write(", ".join(result['legal_terms_found']))
+        
+        # Show document type for contract analysis
+        if result.get('document_type') and analysis_mode == 'contract':
+            st.caption(f"🏛️ Document Type: {result['document_type']}")
+        
+        # Show analysis mode
+        mode_icon = "🏛️" if analysis_mode == 'contract' else "💬"
+        mode_text = "Contract Analysis" if analysis_mode == 'contract' else "Standard Q&A"
+        st.caption(f"{mode_icon} {mode_text}")
+        
+        # Show confidence if available
+        if 'confidence' in result:
+            confidence = result['confidence']
+            if confidence > 0.7:
+                st.success(f"Confidence: {confidence:.1%}")
+            elif confidence > 0.4:
+                st.warning(f"Confidence: {confidence:.1%}")
+            else:
+                st.error(f"Low confidence: {confidence:.1%}")
     
     def _show_example_questions(self, document: Document) -> None:
         """Show example questions based on document type and analysis mode."""
@@ -1090,9 +1085,8 @@ class EnhancedQAInterface:
         """Clear conversation context for enhanced mode."""
         try:
             # Clear enhanced context manager
-            if self.enhanced_router and hasattr(self.enhanced_router.context_manager, 'conversations'):
-                if session_id in self.enhanced_router.context_manager.conversations:
-                    del self.enhanced_router.context_manager.conversations[session_id]
+            if self.enhanced_router and hasattr(self.enhanced_router, 'context_manager'):
+                self.enhanced_router.context_manager.clear_conversation(session_id)
             
             # Clear session state context
             if session_id in st.session_state.conversation_context_persistence:
@@ -1332,7 +1326,13 @@ class EnhancedQAInterface:
             logger.error(f"Error saving enhanced interaction: {e}")
     
     def _display_immediate_response(self, question: str, response_data: Dict[str, Any]) -> None:
-        """Display immediate response in chat format."""
+        """
+        Display immediate response in chat format.
+        
+        ``response_data`` may carry an ``answer_stream`` instead of a finished
+        answer; its text is rendered as it arrives and its final result then
+        supplies the sources.
+        """
         with st.chat_message("user"):
             st.write(question)
         
@@ -1358,8 +1358,16 @@ class EnhancedQAInterface:
                 response_type_text = response_type_str.replace('_', ' ').title()
                 st.caption(f"{tone_icon} Enhanced {response_type_text}")
             
-            # Display main answer
-            if response_data.get('structured_format'):
+            # Display main answer, incrementally when it is still being generated
+            if response_data.get('answer_stream') is not None:
+                result = self._render_answer_stream(response_data['answer_stream'])
+                response_data.update({
+                    'answer': result.get('answer', ''),
+                    'sources': result.get('sources', [])
+                })
+                if response_data.get('analysis_mode'):
+                    self._render_answer_details(result, response_data['analysis_mode'])
+            elif response_data.get('structured_format'):
                 self._render_structured_response(response_data['structured_format'])
             else:
                 st.write(response_data['answer'])
@@ -1411,27 +1419,11 @@ class EnhancedQAInterface:
                 # Save interaction
                 self._save_enhanced_interaction(session_id, question, response, document)
                 
-                # Generate Excel report
-                excel_report = self.excel_generator.generate_conversation_report(session_id)
-                
-                # Save report metadata
-                self.enhanced_storage.save_excel_report(excel_report)
-                st.session_state.excel_reports.append(excel_report)
+                # Generate the Excel report in the background
+                self._track_report_job(self.report_jobs.submit_conversation_report(session_id))
                 
-                st.success("✅ Response generated and Excel report created!")
-                
-                # Show download link
-                col1, col2 = st.columns(2)
-                with col1:
-                    st.write(response.answer)
-                
-                with col2:
-                    st.download_button(
-                        label="📊 Download Excel Report",
-                        data=open(excel_report.file_path, 'rb').read(),
-                        file_name=excel_report.filename,
-                        mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                    )
+                st.success("✅ Response generated; the Excel report is being prepared below")
+                st.write(response.answer)
                 
                 st.rerun()
                 
@@ -1472,9 +1464,8 @@ class EnhancedQAInterface:
             del st.session_state.conversation_context[session_id]
         
         # Clear from conversational engine
-        if hasattr(self.conversational_engine, 'conversation_contexts'):
-            if session_id in self.conversational_engine.conversation_contexts:
-                del self.conversational_engine.conversation_contexts[session_id]
+        if hasattr(self.conversational_engine, 'clear_conversation_context'):
+            self.conversational_engine.clear_conversation_context(session_id)
         
         st.success("🔄 Conversation context cleared!")
         st.rerun()
@@ -1519,25 +1510,11 @@ class EnhancedQAInterface:
                 self._generate_conversation_excel(session_id)
     
     def _generate_conversation_excel(self, session_id: str) -> None:
-        """Generate Excel report from conversation."""
-        with st.spinner("📊 Generating Excel report from conversation..."):
-            try:
-                excel_report = self.excel_generator.generate_conversation_report(session_id)
-                self.enhanced_storage.save_excel_report(excel_report)
-                st.session_state.excel_reports.append(excel_report)
-                
-                st.success("✅ Excel report generated!")
-                
-                # Show download button
-                st.download_button(
-                    label="📊 Download Conversation Report",
-                    data=open(excel_report.file_path, 'rb').read(),
-                    file_name=excel_report.filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-                
-            except Exception as e:
-                st.error(f"❌ Error generating Excel report: {str(e)}")
+        """Queue an Excel report of the conversation."""
+        try:
+            self._track_report_job(self.report_jobs.submit_conversation_report(session_id))
+        except Exception as e:
+            st.error(f"❌ Error generating Excel report: {str(e)}")
     
     def _render_excel_generation_section(self, document: Document) -> None:
         """Render Excel report generation section."""
@@ -1558,6 +1535,9 @@ class EnhancedQAInterface:
             if st.button("📝 Commitments Report", help="Generate report focusing on commitments"):
                 self._generate_document_excel(document.id, "commitments_only")
         
+        # Reports still being generated
+        self._render_report_jobs()
+        
         # Show existing reports
         if st.session_state.excel_reports:
             st.write("**📊 Generated Reports:**")
@@ -1581,25 +1561,46 @@ class EnhancedQAInterface:
                         )
     
     def _generate_document_excel(self, document_id: str, report_type: str) -> None:
-        """Generate Excel report for document analysis."""
-        with st.spinner(f"📊 Generating {report_type} Excel report..."):
-            try:
-                excel_report = self.excel_generator.generate_document_report(document_id, report_type)
-                self.enhanced_storage.save_excel_report(excel_report)
-                st.session_state.excel_reports.append(excel_report)
-                
-                st.success(f"✅ {report_type.title()} report generated!")
-                
-                # Show immediate download
-                st.download_button(
-                    label=f"📊 Download {report_type.title()} Report",
-                    data=open(excel_report.file_path, 'rb').read(),
-                    file_name=excel_report.filename,
-                    mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                )
-                
-            except Exception as e:
-                st.error(f"❌ Error generating {report_type} report: {str(e)}")
+        """Queue an Excel report for document analysis."""
+        try:
+            self._track_report_job(self.report_jobs.submit_document_report(document_id, report_type))
+        except Exception as e:
+            st.error(f"❌ Error generating {report_type} report: {str(e)}")
+    
+    def _track_report_job(self, job) -> None:
+        """Remember a report job so its status is polled on the following reruns."""
+        if job.job_id not in st.session_state.report_jobs:
+            st.session_state.report_jobs.append(job.job_id)
+        if job.reused:
+            st.info("♻️ An identical report was generated recently; reusing it.")
+    
+    def _render_report_jobs(self) -> None:
+        """Poll background report jobs, moving finished reports to the download list."""
+        pending = []
+        for job_id in st.session_state.report_jobs:
+            job = self.report_jobs.get_job(job_id)
+            if not job:
+                continue
+            
+            if job.status == "completed":
+                report = self.report_jobs.get_report(job)
+                known_ids = {existing.report_id for existing in st.session_state.excel_reports}
+                if report and report.report_id not in known_ids:
+                    st.session_state.excel_reports.append(report)
+            elif job.status == "failed":
+                st.error(f"❌ Error generating {job.report_type} report: {job.error_message}")
+            else:
+                pending.append(job)
+        
+        st.session_state.report_jobs = [job.job_id for job in pending]
+        if pending:
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                for job in pending:
+                    st.info(f"⏳ {job.report_type.replace('_', ' ').title()} report {job.status}...")
+            with col2:
+                # Clicking triggers a rerun, which polls the jobs again
+                st.button("🔄 Refresh", key="refresh_report_jobs")
     
     def _show_template_creation_dialog(self) -> None:
         """Show template creation dialog."""
@@ -8,13 +8,14 @@ from typing import Optional, Dict, Any
 import time
 from src.services.file_handler import FileUploadHandler, FileMetadata
 from src.ui.styling import UIStyler
+from src.utils.component_registry import get_component
 
 class UploadInterface:
     """Streamlit interface for file upload and processing"""
     
     def __init__(self):
         """Initialize the upload interface"""
-        self.file_handler = FileUploadHandler()
+        self.file_handler = get_component("file_handler", FileUploadHandler)
         
         # Initialize session state
         if 'uploaded_files' not in st.session_state:
@@ -117,7 +118,8 @@ class UploadInterface:
             progress_bar.progress(50)
             status_text.text(f"{UIStyler.get_icon('processing')} Extracting text content...")
             
-            extracted_text, error_message = self.file_handler.extract_text(uploaded_file)
+            extraction = self.file_handler.extract(uploaded_file)
+            extracted_text, error_message = extraction.text, extraction.error
             
             if error_message:
                 progress_bar.progress(0)
@@ -140,14 +142,18 @@ class UploadInterface:
                 try:
                     # Use simple processor for immediate results
                     from src.services.simple_processor import SimpleDocumentProcessor
-                    processor = SimpleDocumentProcessor(api_key)
+                    processor = get_component(
+                        ("simple_processor", api_key), lambda: SimpleDocumentProcessor(api_key)
+                    )
                     
                     # Process document immediately
                     document = processor.process_document_immediately(
                         filename=metadata['filename'],
                         file_type=metadata['file_type'].lstrip('.'),
                         file_size=metadata['file_size'],
-                        extracted_text=extracted_text
+                        extracted_text=extracted_text,
+                        text_encoding=extraction.encoding,
+                        sections=[section.to_dict() for section in extraction.sections] or None
                     )
                     
                     progress_bar.progress(100)
@@ -339,7 +345,7 @@ class UploadInterface:
         with st.expander("📊 Processing Results Preview", expanded=False):
             try:
                 from src.storage.document_storage import DocumentStorage
-                storage = DocumentStorage()
+                storage = get_component("document_storage", DocumentStorage)
                 document = storage.get_document(document_id)
                 
                 if document:
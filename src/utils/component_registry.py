@@ -0,0 +1,70 @@
+"""Process-wide registry of shared application components.
+
+Streamlit re-executes the page script on every interaction, so storage,
+engines and analyzers built in a page's constructor were rebuilt on every
+click, along with everything they build in turn (classifiers, specialist
+modules, compiled pattern sets, LLM clients). Components are instead built
+once per process, on first use, and shared by every rerun and session. Each
+is keyed by a name plus whatever it was built from, such as the API key, so
+a changed key builds a new component rather than reusing a stale one.
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, TypeVar
+
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class ComponentRegistry:
+    """Builds each keyed component once and returns the same instance afterwards."""
+
+    def __init__(self):
+        self._components: Dict[Hashable, Any] = {}
+        # Reentrant, so a factory can fetch the components it depends on
+        self._lock = threading.RLock()
+        self.stats = {
+            'hits': 0,
+            'builds': 0,
+            'build_seconds': 0.0
+        }
+
+    def get(self, key: Hashable, factory: Callable[[], T]) -> T:
+        """Return the component for ``key``, building it with ``factory`` the first time"""
+        with self._lock:
+            if key in self._components:
+                self.stats['hits'] += 1
+                return self._components[key]
+
+            started = time.perf_counter()
+            component = factory()
+            elapsed = time.perf_counter() - started
+            self._components[key] = component
+            self.stats['builds'] += 1
+            self.stats['build_seconds'] += elapsed
+
+        name = key[0] if isinstance(key, tuple) else key
+        logger.debug(f"Built shared component {name} in {elapsed * 1000:.1f}ms")
+        return component
+
+    def clear(self) -> None:
+        """Forget every component, so the next use builds it again"""
+        with self._lock:
+            self._components.clear()
+
+    def get_statistics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.stats, 'components': len(self._components)}
+
+
+# Global component registry instance
+component_registry = ComponentRegistry()
+
+
+def get_component(key: Hashable, factory: Callable[[], T]) -> T:
+    """The process-wide component for ``key``, built with ``factory`` on first use."""
+    return component_registry.get(key, factory)
@@ -0,0 +1,283 @@
+"""Lightweight request tracing for the Document Q&A System.
+
+Spans are propagated through ``contextvars``, so nested calls, asyncio tasks
+and thread pool work submitted with ``run_in_context`` attach to the request
+that caused them. Sampling is decided once per trace at the root span;
+unsampled traces cost one context-variable lookup per span. Finished traces
+are kept in an in-process ring buffer and can be exported as Chrome Trace
+Event JSON, which chrome://tracing, Perfetto and speedscope can open.
+"""
+
+import contextvars
+import functools
+import inspect
+import json
+import os
+import random
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from src.config import config
+from src.utils.logging_config import get_logger
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: Optional[str]
+    start_time: float
+    end_time: Optional[float] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: str = "ok"
+    error: Optional[str] = None
+    thread_id: int = field(default_factory=threading.get_ident)
+
+    @property
+    def duration(self) -> float:
+        end = self.end_time if self.end_time is not None else time.time()
+        return end - self.start_time
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "attributes": self.attributes,
+            "status": self.status,
+            "error": self.error
+        }
+
+
+@dataclass
+class Trace:
+    """All spans recorded for one root operation."""
+    trace_id: str
+    root: Span
+    spans: List[Span] = field(default_factory=list)
+
+    @property
+    def duration(self) -> float:
+        return self.root.duration
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "name": self.root.name,
+            "start_time": self.root.start_time,
+            "duration_ms": round(self.duration * 1000, 3),
+            "span_count": len(self.spans),
+            "status": self.root.status,
+            "attributes": self.root.attributes
+        }
+
+
+class _NonRecordingSpan:
+    """Stand-in yielded for unsampled traces; attribute writes are dropped."""
+
+    __slots__ = ("trace_id",)
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+
+# The span (or non-recording marker) the current code runs under
+_current_span: contextvars.ContextVar = contextvars.ContextVar("current_span", default=None)
+
+
+class Tracer:
+    """Creates spans and keeps recently finished traces."""
+
+    def __init__(self, sample_rate: float = 1.0, max_traces: int = 200, enabled: bool = True):
+        self.sample_rate = sample_rate
+        self.max_traces = max_traces
+        self.enabled = enabled
+
+        self._traces: "deque[Trace]" = deque(maxlen=max_traces)
+        self._active: Dict[str, List[Span]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def start_span(self, name: str, attributes: Optional[Dict[str, Any]] = None) -> Iterator[Any]:
+        """Run the block inside a span; a root span starts a new trace."""
+        parent = _current_span.get()
+
+        if not self.enabled or isinstance(parent, _NonRecordingSpan):
+            yield parent or _NonRecordingSpan("")
+            return
+
+        if parent is None and random.random() >= self.sample_rate:
+            token = _current_span.set(_NonRecordingSpan(uuid.uuid4().hex))
+            try:
+                yield _current_span.get()
+            finally:
+                _current_span.reset(token)
+            return
+
+        span = Span(
+            name=name,
+            trace_id=parent.trace_id if parent else uuid.uuid4().hex,
+            span_id=uuid.uuid4().hex[:16],
+            parent_id=parent.span_id if parent else None,
+            start_time=time.time(),
+            attributes=dict(attributes or {})
+        )
+        if parent is None:
+            with self._lock:
+                self._active[span.trace_id] = []
+
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "error"
+            span.error = f"{type(e).__name__}: {e}"
+            raise
+        finally:
+            span.end_time = time.time()
+            _current_span.reset(token)
+            self._finish(span, is_root=parent is None)
+
+    def current_span(self) -> Optional[Span]:
+        span = _current_span.get()
+        return span if isinstance(span, Span) else None
+
+    def recent_traces(self, limit: int = 20) -> List[Trace]:
+        with self._lock:
+            return list(self._traces)[-limit:][::-1]
+
+    def slowest_traces(self, limit: int = 10) -> List[Trace]:
+        with self._lock:
+            traces = list(self._traces)
+        return sorted(traces, key=lambda trace: trace.duration, reverse=True)[:limit]
+
+    def get_trace(self, trace_id: str) -> Optional[Trace]:
+        with self._lock:
+            for trace in self._traces:
+                if trace.trace_id == trace_id:
+                    return trace
+        return None
+
+    def export_chrome_trace(self, traces: Optional[List[Trace]] = None) -> Dict[str, Any]:
+        """Traces as Chrome Trace Event format (complete "X" events, microseconds)."""
+        traces = self.recent_traces(self.max_traces) if traces is None else traces
+        pid = os.getpid()
+        events = []
+        for trace in traces:
+            for span in trace.spans:
+                events.append({
+                    "name": span.name,
+                    "cat": span.name.split(".", 1)[0],
+                    "ph": "X",
+                    "ts": int(span.start_time * 1_000_000),
+                    "dur": int(span.duration * 1_000_000),
+                    "pid": pid,
+                    "tid": span.thread_id,
+                    "args": {
+                        **{key: _json_safe(value) for key, value in span.attributes.items()},
+                        "trace_id": span.trace_id,
+                        "span_id": span.span_id,
+                        "parent_id": span.parent_id,
+                        "status": span.status,
+                        **({"error": span.error} if span.error else {})
+                    }
+                })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def export_json(self, traces: Optional[List[Trace]] = None) -> str:
+        return json.dumps(self.export_chrome_trace(traces))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._traces.clear()
+            self._active.clear()
+
+    def _finish(self, span: Span, is_root: bool) -> None:
+        with self._lock:
+            spans = self._active.get(span.trace_id)
+            if spans is None:
+                return  # Root already finished (e.g. a detached background task)
+            spans.append(span)
+            if is_root:
+                del self._active[span.trace_id]
+                spans.sort(key=lambda s: s.start_time)
+                self._traces.append(Trace(trace_id=span.trace_id, root=span, spans=spans))
+
+
+def _json_safe(value: Any) -> Any:
+    if isinstance(value, (str, int, float, bool)) or value is None:
+        return value
+    return str(value)
+
+
+def run_in_context(func: Callable[..., Any], *args, **kwargs) -> Callable[[], Any]:
+    """Bind ``func`` to the current context so spans propagate into executor threads."""
+    context = contextvars.copy_context()
+    return functools.partial(context.run, func, *args, **kwargs)
+
+
+def traced(name: Optional[str] = None, attributes: Optional[Callable[..., Dict[str, Any]]] = None):
+    """
+    Decorator running a function (sync or async) inside a span.
+
+    ``attributes`` may compute span attributes from the call arguments.
+    """
+    def decorator(func):
+        span_name = name or f"{func.__module__.rsplit('.', 1)[-1]}.{func.__qualname__}"
+
+        def span_attributes(args, kwargs):
+            if attributes is None:
+                return None
+            try:
+                return attributes(*args, **kwargs)
+            except Exception:
+                return None
+
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with get_tracer().start_span(span_name, span_attributes(args, kwargs)):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with get_tracer().start_span(span_name, span_attributes(args, kwargs)):
+                return func(*args, **kwargs)
+        return wrapper
+
+    return decorator
+
+
+# Global tracer instance
+_tracer: Optional[Tracer] = None
+
+
+def get_tracer() -> Tracer:
+    """Get the global tracer instance."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(
+            sample_rate=config.TRACING_SAMPLE_RATE,
+            max_traces=config.TRACING_MAX_TRACES,
+            enabled=config.TRACING_ENABLED
+        )
+    return _tracer
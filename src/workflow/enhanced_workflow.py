@@ -17,6 +17,8 @@ except ImportError:
     END = "END"
 
 from src.models.document import Document, ProcessingJob
+from src.services.llm_client import GeminiClient
+from src.services.llm_usage import usage_scope
 from src.storage.document_storage import DocumentStorage
 from src.config import config
 
@@ -48,34 +50,13 @@ class GeminiDocumentProcessor:
     
     def __init__(self, api_key: str):
         self.api_key = api_key
-        self.api_url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash:generateContent?key={api_key}"
+        self.llm_client = GeminiClient(api_key, component="document_workflow")
+        self.api_url = self.llm_client.api_url
 
     def call_gemini(self, prompt: str, max_tokens: int = 1000) -> str:
         """Make API call to Gemini."""
-        payload = {
-            "contents": [
-                {
-                    "parts": [
-                        {"text": prompt}
-                    ]
-                }
-            ],
-            "generationConfig": {
-                "maxOutputTokens": max_tokens,
-                "temperature": 0.7
-            }
-        }
-
-        headers = {
-            "Content-Type": "application/json"
-        }
-
         try:
-            response = requests.post(self.api_url, json=payload, headers=headers, timeout=30)
-            response.raise_for_status()
-
-            result = response.json()
-            return result["candidates"][0]["content"]["parts"][0]["text"]
+            return self.llm_client.generate(prompt, max_tokens=max_tokens, temperature=0.7)
 
         except requests.exceptions.RequestException as e:
             logger.error(f"API request failed: {e}")
@@ -91,16 +72,28 @@ class EnhancedDocumentWorkflow:
     def __init__(self, storage: DocumentStorage):
         self.storage = storage
         self.nodes = {
-            "document_intake": self.document_intake_node,
-            "classification": self.classification_node,
-            "extraction": self.extraction_node,
-            "analysis": self.analysis_node,
-            "embedding_generation": self.embedding_generation_node,
-            "storage": self.storage_node,
-            "summary_generation": self.summary_generation_node,
-            "error_handler": self.error_handler_node
+            name: self._with_usage_attribution(name, node)
+            for name, node in {
+                "document_intake": self.document_intake_node,
+                "classification": self.classification_node,
+                "extraction": self.extraction_node,
+                "analysis": self.analysis_node,
+                "embedding_generation": self.embedding_generation_node,
+                "storage": self.storage_node,
+                "summary_generation": self.summary_generation_node,
+                "error_handler": self.error_handler_node
+            }.items()
         }
         self.workflow = self._create_langgraph_workflow() if LANGGRAPH_AVAILABLE else None
+    
+    @staticmethod
+    def _with_usage_attribution(node_name: str, node):
+        """Wrap a node so its LLM calls are attributed to the document and node."""
+        def run_node(state: WorkflowState) -> WorkflowState:
+            with usage_scope(document_id=state.get("document_id"), workflow_node=node_name,
+                             operation="document_workflow"):
+                return node(state)
+        return run_node
         
     def document_intake_node(self, state: WorkflowState) -> WorkflowState:
         """Initial document intake and validation."""
@@ -487,14 +480,14 @@ class EnhancedDocumentWorkflow:
         workflow = StateGraph(WorkflowState)
         
         # Add nodes
-        workflow.add_node("document_intake", self.document_intake_node)
-        workflow.add_node("classification", self.classification_node)
-        workflow.add_node("extraction", self.extraction_node)
-        workflow.add_node("analysis", self.analysis_node)
-        workflow.add_node("embedding_generation", self.embedding_generation_node)
-        workflow.add_node("storage", self.storage_node)
-        workflow.add_node("summary_generation", self.summary_generation_node)
-        workflow.add_node("error_handler", self.error_handler_node)
+        workflow.add_node("document_intake", self.nodes["document_intake"])
+        workflow.add_node("classification", self.nodes["classification"])
+        workflow.add_node("extraction", self.nodes["extraction"])
+        workflow.add_node("analysis", self.nodes["analysis"])
+        workflow.add_node("embedding_generation", self.nodes["embedding_generation"])
+        workflow.add_node("storage", self.nodes["storage"])
+        workflow.add_node("summary_generation", self.nodes["summary_generation"])
+        workflow.add_node("error_handler", self.nodes["error_handler"])
         
         # Set entry point
         workflow.set_entry_point("document_intake")
@@ -20,27 +20,35 @@ logger = get_logger(__name__)
 class WorkflowManager:
     """Manages document processing workflows and job queues."""
     
-    def __init__(self, storage: Optional[DocumentStorage] = None):
+    def __init__(self, storage: Optional[DocumentStorage] = None, max_workers: int = 1):
         self.storage = storage or DocumentStorage()
         self.workflow = EnhancedDocumentWorkflow(self.storage)
         self.job_queue = queue.Queue()
         self.active_jobs = {}
+        # Number of documents processed concurrently
+        self.max_workers = max(1, max_workers)
+        self.worker_threads: List[threading.Thread] = []
         self.worker_thread = None
         self.running = False
         
     def start(self):
-        """Start the workflow manager and worker thread."""
+        """Start the workflow manager and its worker threads."""
         if not self.running:
             self.running = True
-            self.worker_thread = threading.Thread(target=self._worker_loop, daemon=True)
-            self.worker_thread.start()
-            logger.info("Workflow manager started")
+            self.worker_threads = [
+                threading.Thread(target=self._worker_loop, name=f"workflow-worker-{index}", daemon=True)
+                for index in range(self.max_workers)
+            ]
+            for thread in self.worker_threads:
+                thread.start()
+            self.worker_thread = self.worker_threads[0]
+            logger.info(f"Workflow manager started with {self.max_workers} worker(s)")
     
     def stop(self):
         """Stop the workflow manager."""
         self.running = False
-        if self.worker_thread:
-            self.worker_thread.join(timeout=5)
+        for thread in self.worker_threads:
+            thread.join(timeout=5)
         logger.info("Workflow manager stopped")
     
     def shutdown(self):
@@ -82,6 +90,40 @@ class WorkflowManager:
             logger.error(f"Error submitting document for processing: {e}")
             raise
     
+    def submit_documents_for_processing(self, documents: List[Document], api_key: str) -> List[str]:
+        """Create documents in one transaction, then queue them for processing; returns job IDs."""
+        self.storage.create_documents(documents)
+        return self.resubmit_documents(documents, api_key)
+    
+    def resubmit_documents(self, documents: List[Document], api_key: str) -> List[str]:
+        """Queue already stored documents for processing with one job each; returns job IDs."""
+        jobs = [
+            ProcessingJob(
+                job_id=str(uuid.uuid4()),
+                document_id=document.id,
+                status="queued",
+                current_step="queued"
+            )
+            for document in documents
+        ]
+        self.storage.create_processing_jobs(jobs)
+        
+        for document, job in zip(documents, jobs):
+            self.job_queue.put({
+                'job_id': job.job_id,
+                'document_id': document.id,
+                'document_text': document.original_text,
+                'api_key': api_key,
+                'submitted_at': datetime.now()
+            })
+        
+        logger.info(f"Submitted {len(jobs)} documents for processing")
+        return [job.job_id for job in jobs]
+    
+    def is_idle(self) -> bool:
+        """Whether every queued job has finished."""
+        return self.job_queue.unfinished_tasks == 0
+    
     def get_job_status(self, job_id: str) -> Optional[ProcessingJob]:
         """Get the current status of a processing job."""
         return self.storage.get_processing_job(job_id)
@@ -121,16 +163,19 @@ class WorkflowManager:
                 except queue.Empty:
                     continue
                 
-                job_id = job_data['job_id']
-                
-                # Check if job was cancelled
-                job = self.storage.get_processing_job(job_id)
-                if not job or job.status == 'cancelled':
-                    logger.info(f"Skipping cancelled job {job_id}")
-                    continue
-                
-                # Process the job
-                self._process_job(job_data)
+                try:
+                    job_id = job_data['job_id']
+                    
+                    # Check if job was cancelled
+                    job = self.storage.get_processing_job(job_id)
+                    if not job or job.status == 'cancelled':
+                        logger.info(f"Skipping cancelled job {job_id}")
+                        continue
+                    
+                    # Process the job
+                    self._process_job(job_data)
+                finally:
+                    self.job_queue.task_done()
                 
             except Exception as e:
                 logger.error(f"Error in worker loop: {e}")
@@ -161,6 +206,17 @@ class WorkflowManager:
                 api_key=job_data['api_key']
             )
             
+            # The workflow records its own failures on the document rather than raising
+            document = self.storage.get_document(document_id)
+            workflow_failed = document is not None and document.processing_status == 'failed'
+            self.storage.update_processing_job(
+                job_id,
+                status="failed" if workflow_failed else "completed",
+                current_step="complete",
+                progress_percentage=100,
+                error_message="Document workflow failed" if workflow_failed else None,
+                completed_at=datetime.now()
+            )
             logger.info(f"Completed processing for job {job_id}")
             
         except Exception as e:
@@ -73,8 +73,8 @@ def test_engine_initialization_logic():
             interface.storage = Mock()
             
             # Test engine initialization
-            with patch('src.ui.qa_interface.QAEngine') as mock_qa_engine, \
-                 patch('src.ui.qa_interface.ContractAnalystEngine') as mock_contract_engine, \
+            with patch('src.ui.qa_interface.create_qa_engine') as mock_qa_engine, \
+                 patch('src.ui.qa_interface.create_contract_analyst_engine') as mock_contract_engine, \
                  patch('src.ui.qa_interface.EnhancedResponseRouter') as mock_enhanced_router, \
                  patch.dict(os.environ, {'GEMINI_API_KEY': 'test_key'}):
                 
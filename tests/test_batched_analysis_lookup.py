@@ -0,0 +1,125 @@
+"""Tests for batched document and analysis lookups used by multi-document reports."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+
+from openpyxl import load_workbook
+
+from benchmarks.comparative_reports import build_storage, populate
+from src.models.document import ComprehensiveAnalysis, RiskAssessment
+from src.services.excel_report_generator import NO_ANALYSIS_OVERVIEW, ExcelReportGenerator
+from src.storage import document_storage
+
+
+class TestBatchedAnalysisLookup(unittest.TestCase):
+    """Test cases for get_documents and get_document_analyses."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db, self.storage, self.enhanced_storage = build_storage(os.path.join(self.temp_dir, "test.db"))
+        self.document_ids = populate(self.storage, self.enhanced_storage, 5)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_get_documents_skips_missing_ids(self):
+        """Test that documents are returned by ID and unknown IDs are absent."""
+        documents = self.storage.get_documents(self.document_ids + ["missing"])
+
+        self.assertEqual(set(documents), set(self.document_ids))
+        self.assertEqual(documents["doc3"].title, self.storage.get_document("doc3").title)
+        self.assertEqual(self.storage.get_documents([]), {})
+
+    def test_batched_analyses_match_per_document_lookup(self):
+        """Test that batched analyses equal the single-document lookup, children included."""
+        analyses = self.enhanced_storage.get_document_analyses(self.document_ids)
+
+        self.assertEqual(set(analyses), set(self.document_ids))
+        for document_id in self.document_ids:
+            self.assertEqual(analyses[document_id], self.enhanced_storage.get_document_analysis(document_id))
+
+    def test_latest_analysis_wins_and_unanalysed_documents_are_absent(self):
+        """Test latest-analysis selection and documents without an analysis."""
+        self.enhanced_storage.save_comprehensive_analysis(ComprehensiveAnalysis(
+            document_id="doc0", analysis_id="doc0_rerun", document_overview="Re-run",
+            key_findings=[], critical_information=[], recommended_actions=[],
+            executive_recommendation="Renegotiate", key_legal_terms=[],
+            risks=[RiskAssessment("rerun_risk", "New risk", "High", "Legal", [], [], "source", 0.7)],
+            commitments=[], deliverable_dates=[], template_used=None, confidence_score=0.8,
+            created_at=datetime.now() + timedelta(seconds=1)
+        ))
+        with self.db.get_connection() as conn:
+            conn.execute("DELETE FROM comprehensive_analysis WHERE document_id = 'doc4'")
+            conn.commit()
+
+        analyses = self.enhanced_storage.get_document_analyses(self.document_ids)
+
+        self.assertNotIn("doc4", analyses)
+        self.assertEqual(analyses["doc0"].analysis_id, "doc0_rerun")
+        self.assertEqual([risk.risk_id for risk in analyses["doc0"].risks], ["rerun_risk"])
+        self.assertEqual(analyses["doc0"], self.enhanced_storage.get_document_analysis("doc0"))
+
+    def test_lookups_are_chunked(self):
+        """Test that a chunk size smaller than the ID list still returns every row."""
+        original = document_storage.IN_CLAUSE_CHUNK_SIZE
+        document_storage.IN_CLAUSE_CHUNK_SIZE = 2
+        try:
+            self.assertEqual(len(self.storage.get_documents(self.document_ids)), 5)
+        finally:
+            document_storage.IN_CLAUSE_CHUNK_SIZE = original
+
+    def test_query_count_does_not_grow_with_documents(self):
+        """Test that the batched path issues a fixed number of statements."""
+        self.db.query_stats.reset()
+        self.storage.get_documents(self.document_ids)
+        self.enhanced_storage.get_document_analyses(self.document_ids)
+
+        statements = sum(row['count'] for row in self.db.query_stats.get_statistics())
+        self.assertEqual(statements, 5)
+
+    def test_comparative_report_uses_stored_analyses(self):
+        """Test that the comparative report is built from real analyses."""
+        generator = ExcelReportGenerator(self.storage, os.path.join(self.temp_dir, "reports"),
+                                         self.enhanced_storage)
+
+        report = generator.generate_comparative_report(self.document_ids + ["missing"])
+
+        workbook = load_workbook(report.file_path, read_only=True)
+        rows = list(workbook[workbook.sheetnames[0]].values)
+        self.assertEqual(len(rows), len(self.document_ids) + 1)
+
+    def test_reports_without_an_analysis_show_no_sample_data(self):
+        """Test unanalysed documents get the "no analysis" structure instead of mock rows."""
+        with self.db.get_connection() as conn:
+            conn.execute("DELETE FROM comprehensive_analysis WHERE document_id = 'doc4'")
+            conn.commit()
+        generator = ExcelReportGenerator(self.storage, os.path.join(self.temp_dir, "reports"),
+                                         self.enhanced_storage)
+
+        documents_data = generator._collect_documents_data(["doc3", "doc4"])
+        report = generator.generate_document_report("doc4")
+
+        self.assertEqual(documents_data[0]['analysis']['risks'],
+                         generator._analysis_to_report_data(self.enhanced_storage.get_document_analysis("doc3"))['risks'])
+        self.assertEqual(documents_data[1]['analysis'], generator._empty_analysis_data())
+        summary = dict(load_workbook(report.file_path, read_only=True)["Summary"].values)
+        self.assertEqual(summary['Document Overview'], NO_ANALYSIS_OVERVIEW)
+        self.assertEqual(len(list(load_workbook(report.file_path, read_only=True)["Risks"].values)), 0)
+
+    def test_benchmark_reports_fewer_statements(self):
+        """Test that the benchmark shows the batched path issuing fewer statements."""
+        from benchmarks.comparative_reports import run_benchmark
+
+        results = run_benchmark((10,))
+
+        self.assertEqual(results[0]["per_document_statements"], 60)
+        self.assertLess(results[0]["batched_statements"], results[0]["per_document_statements"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,162 @@
+"""Tests for offline bulk ingestion."""
+
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import Mock
+
+from src.models.document import Document
+from src.services.bulk_ingestion import MANIFEST_FILENAME, BulkIngestor, IngestionManifest, extract_file
+from src.storage.database import DatabaseManager
+from src.storage.document_storage import DocumentStorage
+
+
+class TestBulkIngestion(unittest.TestCase):
+    """Test cases for BulkIngestor."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.source_dir = os.path.join(self.temp_dir, "source")
+        os.makedirs(os.path.join(self.source_dir, "nested"))
+        self.storage = DocumentStorage()
+        self.storage.db_manager = DatabaseManager(os.path.join(self.temp_dir, "test.db"))
+        self.ingestor = BulkIngestor(self.storage, extraction_workers=1, batch_size=2, progress=lambda message: None)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _write(self, relative_path, content):
+        path = os.path.join(self.source_dir, relative_path)
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(content)
+        return path
+
+    def _manifest(self):
+        return IngestionManifest(os.path.join(self.source_dir, MANIFEST_FILENAME))
+
+    def test_extract_file(self):
+        """Test that a worker extracts text and hashes the raw bytes."""
+        result = extract_file(self._write("a.txt", "Lease agreement text."))
+        self.assertIsNone(result.error)
+        self.assertEqual(result.text, "Lease agreement text.")
+        self.assertEqual(len(result.sha256), 64)
+
+        result = extract_file(self._write("empty.txt", ""))
+        self.assertIsNotNone(result.error)
+
+    def test_ingest_stores_deduplicates_and_records_manifest(self):
+        """Test storing, deduplication by bytes and by normalized text, and failures."""
+        self._write("a.txt", "First contract body.")
+        self._write("b.txt", "Second contract body.")
+        self._write("nested/copy.txt", "First contract body.")
+        self._write("nested/spaced.txt", "First   contract\nbody.")
+        self._write("nested/empty.txt", "")
+        self._write("notes.exe", "ignored")
+
+        stats = self.ingestor.ingest(self.source_dir, process=False)
+
+        self.assertEqual(stats.files_found, 5)
+        self.assertEqual((stats.stored, stats.duplicates, stats.failed), (2, 2, 1))
+        self.assertEqual(len(self.storage.list_documents()), 2)
+
+        entries = self._manifest().entries
+        self.assertEqual(len(entries), 5)
+        copy = entries[os.path.join(self.source_dir, "nested", "copy.txt")]
+        original = entries[os.path.join(self.source_dir, "a.txt")]
+        self.assertEqual(copy["status"], "duplicate")
+        self.assertEqual(copy["duplicate_of"], original["document_id"])
+        self.assertEqual(entries[os.path.join(self.source_dir, "nested", "empty.txt")]["status"], "failed")
+
+    def test_rerun_resumes_from_manifest(self):
+        """Test that unchanged files are skipped and new or failed files are retried."""
+        self._write("a.txt", "First contract body.")
+        failed = self._write("b.txt", "")
+        self.ingestor.ingest(self.source_dir, process=False)
+
+        with open(failed, "w", encoding="utf-8") as file:
+            file.write("Now it has content.")
+        self._write("c.txt", "First contract body.")
+
+        stats = self.ingestor.ingest(self.source_dir, process=False)
+
+        self.assertEqual(stats.already_ingested, 1)
+        self.assertEqual((stats.stored, stats.duplicates, stats.failed), (1, 1, 0))
+        self.assertEqual(len(self.storage.list_documents()), 2)
+
+    def test_processing_queues_batches_and_resubmits_unfinished(self):
+        """Test that documents are queued in batches and interrupted ones are re-queued."""
+        for index in range(3):
+            self._write(f"doc{index}.txt", f"Contract number {index}.")
+        workflow_manager = Mock()
+        workflow_manager.max_workers = 2
+        workflow_manager.is_idle.return_value = True
+        workflow_manager.submit_documents_for_processing.side_effect = (
+            lambda documents, api_key: [self.storage.create_documents(documents)] * len(documents)
+        )
+        self.ingestor.workflow_manager = workflow_manager
+
+        stats = self.ingestor.ingest(self.source_dir, api_key="test_api_key")
+
+        batches = [call[0][0] for call in workflow_manager.submit_documents_for_processing.call_args_list]
+        self.assertEqual([len(batch) for batch in batches], [2, 1])
+        self.assertEqual(stats.queued, 3)
+
+        # The documents were never processed, so a rerun queues them again
+        stats = self.ingestor.ingest(self.source_dir, api_key="test_api_key")
+        self.assertEqual(stats.resubmitted, 3)
+        self.assertEqual(stats.stored, 0)
+        workflow_manager.resubmit_documents.assert_called()
+
+    def test_processing_requires_api_key(self):
+        """Test that processing without a workflow manager or key is rejected."""
+        with self.assertRaises(ValueError):
+            self.ingestor.ingest(self.source_dir)
+
+    def test_manifest_tolerates_truncated_line(self):
+        """Test that a partial final line from an interrupted run is ignored."""
+        path = os.path.join(self.temp_dir, "manifest.jsonl")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(json.dumps({"path": "/a.txt", "size": 1, "mtime_ns": 2, "status": "ingested"}) + "\n")
+            file.write('{"path": "/b.t')
+
+        manifest = IngestionManifest(path)
+
+        self.assertTrue(manifest.is_done("/a.txt", 1, 2))
+        self.assertFalse(manifest.is_done("/a.txt", 1, 3))
+        self.assertFalse(manifest.is_done("/b.txt", 1, 2))
+
+
+class TestBatchedDocumentStorage(unittest.TestCase):
+    """Test cases for the batched storage operations used by ingestion."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage = DocumentStorage()
+        self.storage.db_manager = DatabaseManager(os.path.join(self.temp_dir, "test.db"))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_create_documents_and_statuses(self):
+        """Test bulk inserts and chunked status lookups."""
+        documents = [
+            Document(id=f"doc-{index}", title=f"Doc {index}", file_type="txt", file_size=1,
+                     upload_timestamp=datetime.now(), original_text="text")
+            for index in range(3)
+        ]
+
+        self.assertEqual(self.storage.create_documents(documents), 3)
+
+        statuses = self.storage.get_processing_statuses(["doc-0", "doc-2", "missing"])
+        self.assertEqual(statuses, {"doc-0": "pending", "doc-2": "pending"})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+"""Tests for the process-wide component registry and one-time migrations."""
+
+import os
+import shutil
+import tempfile
+import threading
+import unittest
+from unittest.mock import Mock, patch
+
+from benchmarks.streamlit_reruns import run_benchmark
+from src.storage.database import DatabaseManager
+from src.storage.migrations import DatabaseMigrator
+from src.utils.component_registry import ComponentRegistry
+
+
+class TestComponentRegistry(unittest.TestCase):
+    """Test cases for ComponentRegistry."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.registry = ComponentRegistry()
+
+    def test_components_are_built_once_per_key(self):
+        """Test repeated lookups reuse the instance and new keys build new ones."""
+        factory = Mock(side_effect=lambda: object())
+
+        first = self.registry.get(("qa_engine", "key-1"), factory)
+
+        self.assertIs(self.registry.get(("qa_engine", "key-1"), factory), first)
+        self.assertIsNot(self.registry.get(("qa_engine", "key-2"), factory), first)
+        self.assertEqual(factory.call_count, 2)
+        stats = self.registry.get_statistics()
+        self.assertEqual((stats['builds'], stats['hits'], stats['components']), (2, 1, 2))
+
+        self.registry.clear()
+        self.assertIsNot(self.registry.get(("qa_engine", "key-1"), factory), first)
+
+    def test_factories_can_use_other_components(self):
+        """Test a factory may look up the components it depends on."""
+        storage = self.registry.get("storage", object)
+
+        engine = self.registry.get("engine", lambda: {"storage": self.registry.get("storage", object)})
+
+        self.assertIs(engine["storage"], storage)
+
+    def test_concurrent_sessions_share_one_build(self):
+        """Test sessions racing on first use build the component once."""
+        factory = Mock(side_effect=lambda: object())
+        results = []
+        threads = [
+            threading.Thread(target=lambda: results.append(self.registry.get("router", factory)))
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(factory.call_count, 1)
+        self.assertEqual(len({id(result) for result in results}), 1)
+
+
+class TestEnsureMigrated(unittest.TestCase):
+    """Test cases for DatabaseMigrator.ensure_migrated."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.migrator = DatabaseMigrator()
+        self.migrator.db_manager = DatabaseManager(os.path.join(self.temp_dir, "test.db"))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_migrations_run_once_per_database(self):
+        """Test later calls skip the migration check for a migrated database."""
+        with patch.object(self.migrator, 'run_migrations', wraps=self.migrator.run_migrations) as run:
+            self.assertTrue(self.migrator.ensure_migrated())
+            self.assertTrue(self.migrator.ensure_migrated())
+            self.assertEqual(run.call_count, 1)
+
+            self.migrator.db_manager = DatabaseManager(os.path.join(self.temp_dir, "other.db"))
+            self.assertTrue(self.migrator.ensure_migrated())
+            self.assertEqual(run.call_count, 2)
+
+    def test_failed_migrations_are_retried(self):
+        """Test a failure is not remembered as success."""
+        with patch.object(self.migrator, 'run_migrations', side_effect=[False, True]) as run:
+            self.assertFalse(self.migrator.ensure_migrated())
+            self.assertTrue(self.migrator.ensure_migrated())
+            self.assertEqual(run.call_count, 2)
+
+
+class TestStreamlitRerunBenchmark(unittest.TestCase):
+    """Smoke test for the rerun benchmark."""
+
+    def test_shared_components_are_not_rebuilt(self):
+        """Test the benchmark runs and reruns with shared components build nothing."""
+        rebuilt, shared = run_benchmark(reruns=3)
+
+        self.assertEqual((rebuilt['mode'], shared['mode']), ("rebuilt", "shared"))
+        self.assertGreater(rebuilt['builds'], 0)
+        self.assertEqual(shared['builds'], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
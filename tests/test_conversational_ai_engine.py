@@ -349,4 +349,34 @@ class TestConversationalAIEngine:
         # Test casual follow-ups
         casual_suggestions = conversational_engine._generate_casual_follow_ups(question)
         assert isinstance(casual_suggestions, list)
-        assert len(casual_suggestions) > 0
\ No newline at end of file
+        assert len(casual_suggestions) > 0
+
+    def test_conversation_contexts_are_bounded_lru(self, mock_qa_engine, mock_contract_engine):
+        """Test the least recently used session is dropped once max_sessions is reached."""
+        engine = ConversationalAIEngine(mock_qa_engine, mock_contract_engine, max_sessions=2)
+        engine.manage_conversation_context("a", "Hello", "Hi")
+        engine.manage_conversation_context("b", "Hello", "Hi")
+        engine.manage_conversation_context("a", "Thanks", "Welcome")
+
+        engine.manage_conversation_context("c", "Hello", "Hi")
+
+        assert list(engine.conversation_contexts) == ["a", "c"]
+        assert len(engine.conversation_contexts["a"].conversation_history) == 2
+        engine.clear_conversation_context("a")
+        assert list(engine.conversation_contexts) == ["c"]
+
+    def test_concurrent_sessions_keep_every_turn(self, mock_qa_engine, mock_contract_engine):
+        """Test turns recorded from many threads are neither lost nor over the bound."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        engine = ConversationalAIEngine(mock_qa_engine, mock_contract_engine, max_sessions=8)
+
+        def converse(index):
+            for turn in range(20):
+                engine.manage_conversation_context(f"session_{index % 8}", f"Question {turn}", "Answer")
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            list(executor.map(converse, range(16)))
+
+        assert len(engine.conversation_contexts) == 8
+        assert all(len(context.conversation_history) == 40 for context in engine.conversation_contexts.values())
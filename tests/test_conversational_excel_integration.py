@@ -232,8 +232,9 @@ class TestConversationalExcelIntegration:
         
         # Verify the conversation report captures the risk focus
         qa_history_sheet = next(sheet for sheet in conversation_report.sheets if sheet.name == "Q&A History")
-        assert len(qa_history_sheet.data) == 3
-        assert all('risk' in turn['Question'].lower() for turn in qa_history_sheet.data)
+        turns = [dict(zip(qa_history_sheet.columns, row)) for row in qa_history_sheet.data]
+        assert len(turns) == 3
+        assert all('risk' in turn['Question'].lower() for turn in turns)
 
     def test_mode_switching_during_excel_workflow(self, conversational_engine, excel_generator):
         """Test analysis mode switching during Excel generation workflow."""
@@ -448,4 +449,4 @@ class TestConversationalExcelIntegration:
         
         # Verify Q&A history sheet handles large dataset
         qa_sheet = next(sheet for sheet in conversation_report.sheets if sheet.name == "Q&A History")
-        assert len(qa_sheet.data) == 50
\ No newline at end of file
+        assert len(list(qa_sheet.data)) == 50
\ No newline at end of file
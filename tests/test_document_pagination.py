@@ -0,0 +1,196 @@
+"""Tests for keyset-paged document listings and the paged Document Management page."""
+
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, Mock, patch
+
+from benchmarks.document_pages import run_benchmark
+from src.models.document import Document
+from src.storage.database import DatabaseManager
+from src.storage.document_storage import DocumentStorage
+from src.ui import document_manager
+
+
+def _all_pages(storage, sort, limit, **filters):
+    ids, cursor = [], None
+    while True:
+        page = storage.list_document_summaries(sort, cursor, limit, **filters)
+        ids.extend(document.id for document in page.documents)
+        if page.next_cursor is None:
+            return ids
+        cursor = page.next_cursor
+
+
+class TestDocumentSummaries(unittest.TestCase):
+    """Test cases for DocumentStorage.list_document_summaries and the counts beside it."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.storage = DocumentStorage()
+        self.storage.db_manager = DatabaseManager(os.path.join(self.temp_dir, "test.db"))
+        started = datetime(2025, 1, 1)
+        # Uploads share timestamps in pairs and titles repeat, so pages split ties
+        self.documents = [
+            Document(id=f"doc{index:02d}", title=["beta", "Alpha", "gamma_1", "delta%"][index % 4],
+                     file_type="pdf" if index % 3 else "docx", file_size=100,
+                     upload_timestamp=started + timedelta(minutes=index // 2),
+                     processing_status=["completed", "completed", "pending", "failed"][index % 4],
+                     original_text="Full text")
+            for index in range(23)
+        ]
+        self.storage.create_documents(self.documents)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_pages_cover_every_document_once_in_sort_order(self):
+        """Test walking the cursors returns each document once, in the requested order."""
+        by_upload = sorted(self.documents, key=lambda d: (d.upload_timestamp, d.id))
+        by_title = sorted(self.documents, key=lambda d: (d.title.lower(), d.id))
+
+        self.assertEqual(_all_pages(self.storage, 'newest', 5), [d.id for d in reversed(by_upload)])
+        self.assertEqual(_all_pages(self.storage, 'oldest', 4), [d.id for d in by_upload])
+        self.assertEqual(_all_pages(self.storage, 'title_asc', 3), [d.id for d in by_title])
+        self.assertEqual(_all_pages(self.storage, 'title_desc', 7), [d.id for d in reversed(by_title)])
+
+    def test_last_page_has_no_cursor(self):
+        """Test an exactly full last page does not point at an empty one."""
+        page = self.storage.list_document_summaries('newest', limit=23)
+
+        self.assertEqual(len(page.documents), 23)
+        self.assertIsNone(page.next_cursor)
+
+    def test_filters_and_counts_agree(self):
+        """Test status, file type and title filters run in SQL and match the count."""
+        filters = {'statuses': ['completed', 'pending'], 'file_type': 'pdf'}
+        expected = [d.id for d in self.documents
+                    if d.processing_status in ('completed', 'pending') and d.file_type == 'pdf']
+
+        self.assertEqual(sorted(_all_pages(self.storage, 'oldest', 4, **filters)), expected)
+        self.assertEqual(self.storage.count_documents(**filters), len(expected))
+        # LIKE wildcards in the search are matched literally
+        self.assertEqual(self.storage.count_documents(title_query='a_'), 6)
+        self.assertEqual(self.storage.count_documents(title_query='%'), 5)
+        self.assertEqual(self.storage.count_documents(title_query='ALPHA'), 6)
+
+    def test_summaries_leave_out_heavy_columns(self):
+        """Test summaries carry the card fields but not the text."""
+        summary = self.storage.list_document_summaries('oldest', limit=1).documents[0]
+
+        self.assertEqual((summary.id, summary.title, summary.processing_status), ("doc00", "beta", "completed"))
+        self.assertIsNone(summary.original_text)
+        self.assertEqual(self.storage.get_document(summary.id).original_text, "Full text")
+
+    def test_status_counts(self):
+        """Test documents are counted per status with one GROUP BY."""
+        self.assertEqual(self.storage.get_document_status_counts(),
+                         {'completed': 12, 'pending': 6, 'failed': 5})
+
+    def test_unknown_sort_is_rejected(self):
+        """Test sort keys are not interpolated unchecked."""
+        with self.assertRaises(ValueError):
+            self.storage.list_document_summaries('id; DROP TABLE documents')
+
+
+class _SessionState(dict):
+    """Attribute-style dict standing in for ``st.session_state`` outside ``streamlit run``."""
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name)
+
+    def __setattr__(self, name, value):
+        self[name] = value
+
+
+class TestPagedDocumentManager(unittest.TestCase):
+    """Test cases for the paged DocumentManager page."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.st = MagicMock()
+        self.st.session_state = _SessionState()
+        self.st.columns.side_effect = lambda spec: [MagicMock() for _ in range(spec if isinstance(spec, int) else len(spec))]
+        self.st.text_input.return_value = ""
+        self.st.selectbox.side_effect = lambda label, options, key: options[0]
+        self.st.button.return_value = False
+        self.st.toggle.return_value = False
+
+        self.storage = Mock()
+        self.storage.get_document_status_counts.return_value = {'completed': 2}
+        self.storage.count_documents.return_value = 2
+        self.summaries = [
+            Document(id=f"doc{index}", title=f"Contract {index}", file_type="pdf", file_size=100,
+                     upload_timestamp=datetime(2025, 1, 1), processing_status="completed")
+            for index in range(2)
+        ]
+        self.storage.list_document_summaries.return_value = Mock(documents=self.summaries, next_cursor=None)
+        self.contract_engine = Mock()
+        self.contract_engine.detect_legal_document.return_value = (False, None, 0.0)
+
+        with patch.object(document_manager, 'st', self.st), \
+             patch.object(document_manager, 'get_component', side_effect=[self.storage, self.contract_engine]), \
+             patch.object(document_manager.config, 'get_gemini_api_key', return_value='test_key'):
+            self.manager = document_manager.DocumentManager()
+
+    def _render(self):
+        with patch.object(document_manager, 'st', self.st):
+            self.manager.render_document_management()
+
+    def test_page_loads_summaries_only(self):
+        """Test a render reads one page and no document text until details are opened."""
+        self._render()
+
+        self.storage.list_document_summaries.assert_called_once_with(
+            'newest', None, document_manager.config.DOCUMENT_PAGE_SIZE,
+            statuses=None, file_type=None, title_query=None
+        )
+        self.storage.list_documents.assert_not_called()
+        self.storage.get_document.assert_not_called()
+        self.contract_engine.detect_legal_document.assert_not_called()
+
+    def test_details_are_loaded_when_opened(self):
+        """Test opening a card's details loads that document and runs legal detection."""
+        self.st.toggle.side_effect = lambda label, key: key == "details_doc1"
+        self.storage.get_document.return_value = self.summaries[1]
+
+        self._render()
+
+        self.storage.get_document.assert_called_once_with("doc1")
+        self.contract_engine.detect_legal_document.assert_called_once_with(self.summaries[1])
+
+    def test_changing_the_query_returns_to_the_first_page(self):
+        """Test the cursor stack is kept across reruns and reset by a new filter."""
+        self._render()
+        self.st.session_state.document_page_cursors.append(("2025-01-01T00:00:00", "doc1"))
+        self._render()
+        self.assertEqual(self.storage.list_document_summaries.call_args[0][1], ("2025-01-01T00:00:00", "doc1"))
+
+        self.st.text_input.return_value = "contract"
+        self._render()
+
+        self.assertEqual(self.st.session_state.document_page_cursors, [None])
+        self.assertEqual(self.storage.list_document_summaries.call_args[0][1], None)
+        self.assertEqual(self.storage.list_document_summaries.call_args[1]['title_query'], "contract")
+
+
+class TestDocumentPagesBenchmark(unittest.TestCase):
+    """Smoke test for the document pages benchmark."""
+
+    def test_benchmark_runs(self):
+        """Test the benchmark runs on a small library."""
+        (row,) = run_benchmark(document_counts=(60,), text_size=100)
+
+        self.assertEqual(row['documents'], 60)
+        self.assertEqual(row['deep_page'], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
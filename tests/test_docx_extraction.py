@@ -0,0 +1,174 @@
+"""
+Tests for structured DOCX extraction.
+"""
+
+import os
+import tempfile
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from docx import Document as DocxDocument
+from docx.oxml import parse_xml
+from docx.oxml.ns import nsdecls
+
+from src.models.document import Document
+from src.services.advanced_document_analyzer import AdvancedDocumentAnalyzer
+from src.services.docx_extraction import extract_docx, flatten_sections
+from src.services.extraction_cache import ExtractionCache
+from src.services.text_extraction import TextExtractor
+
+
+def _add_legal_numbering(document, num_id: int = 90) -> int:
+    """Add a two-level "1." / "1.1." list to the document's numbering definitions."""
+    numbering = document.part.numbering_part.element
+    numbering.append(parse_xml(
+        f'<w:abstractNum {nsdecls("w")} w:abstractNumId="{num_id}">'
+        '<w:lvl w:ilvl="0"><w:start w:val="1"/><w:numFmt w:val="decimal"/><w:lvlText w:val="%1."/></w:lvl>'
+        '<w:lvl w:ilvl="1"><w:start w:val="1"/><w:numFmt w:val="decimal"/><w:lvlText w:val="%1.%2."/></w:lvl>'
+        '<w:lvl w:ilvl="2"><w:start w:val="1"/><w:numFmt w:val="lowerLetter"/><w:lvlText w:val="(%3)"/></w:lvl>'
+        '</w:abstractNum>'
+    ))
+    numbering.append(parse_xml(
+        f'<w:num {nsdecls("w")} w:numId="{num_id}"><w:abstractNumId w:val="{num_id}"/></w:num>'
+    ))
+    return num_id
+
+
+def _numbered(document, text: str, num_id: int, level: int):
+    paragraph = document.add_paragraph(text)
+    paragraph._p.get_or_add_pPr().append(parse_xml(
+        f'<w:numPr {nsdecls("w")}><w:ilvl w:val="{level}"/><w:numId w:val="{num_id}"/></w:numPr>'
+    ))
+    return paragraph
+
+
+class TestDocxExtraction:
+    """Test suite for the structured DOCX reader."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Scratch directory for documents and the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    def test_tables_keep_their_place_between_paragraphs(self, temp_dir):
+        """Test table rows are emitted in body order, with merged cells once."""
+        document = DocxDocument()
+        document.add_paragraph("Fees are set out below.")
+        table = document.add_table(rows=3, cols=3)
+        for row, values in zip(table.rows, [("Milestone", "Date", "Fee"),
+                                            ("Kickoff", "March 1, 2025", "$10,000"),
+                                            ("", "", "")]):
+            for cell, value in zip(row.cells, values):
+                cell.text = value
+        table.cell(0, 1).merge(table.cell(0, 2)).text = "Schedule"
+        document.add_paragraph("Payment is due in 30 days.")
+        path = os.path.join(temp_dir, "fees.docx")
+        document.save(path)
+
+        extraction = extract_docx(path)
+
+        assert extraction.text == (
+            "Fees are set out below.\n\n"
+            "Milestone | Schedule\n"
+            "Kickoff | March 1, 2025 | $10,000\n\n"
+            "Payment is due in 30 days."
+        )
+        assert extraction.sections == []
+
+    def test_headings_form_a_section_tree(self, temp_dir):
+        """Test heading levels nest and each section spans the text up to the next one."""
+        document = DocxDocument()
+        document.add_paragraph("Master Services Agreement", style="Title")
+        document.add_heading("Fees", level=1)
+        document.add_paragraph("Fees are payable monthly.")
+        document.add_heading("Late payment", level=2)
+        document.add_paragraph("Interest accrues at 1%.")
+        document.add_heading("Term", level=1)
+        document.add_paragraph("Two years.")
+        path = os.path.join(temp_dir, "msa.docx")
+        document.save(path)
+
+        extraction = extract_docx(path)
+        fees, term = extraction.sections
+
+        assert [section.title for section in flatten_sections(extraction.sections)] == [
+            "Fees", "Late payment", "Term"
+        ]
+        assert (fees.level, fees.children[0].level) == (1, 2)
+        assert extraction.text[fees.start_offset:fees.end_offset] == (
+            "Fees\n\nFees are payable monthly.\n\nLate payment\n\nInterest accrues at 1%."
+        )
+        assert extraction.text[term.start_offset:term.end_offset] == "Term\n\nTwo years."
+
+    def test_list_numbering_is_rendered_and_structures_clauses(self, temp_dir):
+        """Test multi-level numbers as Word shows them, used as sections when there are no headings."""
+        document = DocxDocument()
+        num_id = _add_legal_numbering(document)
+        _numbered(document, "Definitions", num_id, 0)
+        _numbered(document, "Services means the work.", num_id, 1)
+        _numbered(document, "Fees", num_id, 0)
+        _numbered(document, "Monthly invoices.", num_id, 1)
+        _numbered(document, "Within 30 days.", num_id, 2)
+        _numbered(document, "Net of taxes.", num_id, 2)
+        _numbered(document, "Audit rights.", num_id, 1)
+        path = os.path.join(temp_dir, "clauses.docx")
+        document.save(path)
+
+        extraction = extract_docx(path)
+
+        assert extraction.text.split("\n\n") == [
+            "1. Definitions", "1.1. Services means the work.", "2. Fees", "2.1. Monthly invoices.",
+            "(a) Within 30 days.", "(b) Net of taxes.", "2.2. Audit rights."
+        ]
+        fees = extraction.sections[1]
+        assert (fees.number, fees.title) == ("2.", "Fees")
+        assert [child.number for child in fees.children] == ["2.1.", "2.2."]
+        assert [child.title for child in fees.children[0].children] == ["Within 30 days.", "Net of taxes."]
+
+    def test_sections_are_cached_and_used_by_analysis(self, temp_dir):
+        """Test the section tree survives the extraction cache and locates text for the analyzer."""
+        document = DocxDocument()
+        document.add_heading("Confidentiality", level=1)
+        document.add_paragraph("Each party keeps the other's information secret.")
+        document.add_heading("Termination", level=1)
+        document.add_paragraph("Either party may terminate for breach.")
+        path = os.path.join(temp_dir, "nda.docx")
+        document.save(path)
+        extractor = TextExtractor(extraction_cache=ExtractionCache(os.path.join(temp_dir, "cache.db")))
+
+        first = extractor.extract(path)
+        cached = extractor.extract(path)
+
+        assert extractor.extraction_cache.get_statistics()['hits'] == 1
+        assert cached.sections == first.sections
+        stored = Document(
+            id="doc-1", title="nda.docx", file_type="docx", file_size=first.size,
+            upload_timestamp=datetime.now(), original_text=first.text,
+            sections=[section.to_dict() for section in first.sections]
+        )
+        analyzer = AdvancedDocumentAnalyzer()
+        structure = analyzer._parse_document_structure(stored)
+
+        assert [section['title'] for section in structure['sections']] == ["Confidentiality", "Termination"]
+        assert analyzer._find_containing_section(first.text.index("breach"), structure['sections']) == "Termination"
+
+    def test_analysis_flattens_the_section_tree_once(self):
+        """Test every match of one analysis is located in a single flattened section list."""
+        text = "Confidentiality\n\nThe party shall pay fees. Liability for breach. GDPR personal data. See Exhibit A."
+        stored = Document(
+            id="doc-1", title="nda.docx", file_type="docx", file_size=len(text),
+            upload_timestamp=datetime.now(), original_text=text,
+            sections=[{'number': None, 'title': "Confidentiality", 'level': 1,
+                       'start_offset': 0, 'end_offset': len(text), 'children': []}]
+        )
+        analyzer = AdvancedDocumentAnalyzer()
+        flatten = analyzer._document_sections
+
+        with patch.object(analyzer, '_document_sections', side_effect=flatten) as sections:
+            result = analyzer.perform_advanced_analysis(stored)
+
+        assert sections.call_count == 1
+        assert result.risk_matrix
+        assert all(entry.section_references == ["Confidentiality"] for entry in result.risk_matrix)
@@ -0,0 +1,118 @@
+"""
+Tests for single-pass encoding detection of text uploads.
+"""
+
+import io
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import datetime
+from unittest.mock import patch
+
+from src.models.document import Document
+from src.services import encoding_detection
+from src.services.encoding_detection import decode_stream, detect_encoding
+from src.services.extraction_cache import ExtractionCache
+from src.services.text_extraction import TextExtractor
+from src.storage.database import DatabaseManager
+from src.storage.document_storage import DocumentStorage
+from src.storage.migrations import DatabaseMigrator
+
+
+class TestEncodingDetection(unittest.TestCase):
+    """Test cases for detect_encoding and decode_stream."""
+
+    def test_byte_order_marks_decide(self):
+        """Test UTF-8, UTF-16 and UTF-32 byte-order marks."""
+        text = "Clause 1 – “Term”"
+        for encoding, expected in (("utf-8-sig", "utf-8-sig"), ("utf-16", "utf-16"), ("utf-32", "utf-32")):
+            with self.subTest(encoding=encoding):
+                self.assertEqual(decode_stream(io.BytesIO(text.encode(encoding))), (text, expected))
+
+    def test_windows_quotes_are_not_read_as_latin1(self):
+        """Test that cp1252 smart quotes and dashes decode to the characters meant."""
+        text = "The “Licensee” shall pay – within 30 days – the fees."
+
+        self.assertEqual(decode_stream(io.BytesIO(text.encode("cp1252"))), (text, "cp1252"))
+
+    def test_bytes_cp1252_leaves_undefined_mean_latin1(self):
+        """Test a C1 byte cp1252 does not define selects latin-1."""
+        data = "Caf\xe9 \x81 terms".encode("latin-1")
+
+        self.assertEqual(decode_stream(io.BytesIO(data)), ("Caf\xe9 \x81 terms", "latin-1"))
+
+    def test_utf16_without_bom(self):
+        """Test mostly-ASCII UTF-16 without a byte-order mark."""
+        text = "Governing law: Delaware"
+
+        self.assertEqual(detect_encoding(text.encode("utf-16-le"), complete=True), "utf-16-le")
+        self.assertEqual(detect_encoding(text.encode("utf-16-be"), complete=True), "utf-16-be")
+
+    def test_multibyte_character_cut_at_block_edge(self):
+        """Test UTF-8 whose first block ends inside a character is still UTF-8."""
+        data = ("x" * 9 + "é" * 10).encode("utf-8")
+
+        self.assertEqual(detect_encoding(data[:10]), "utf-8")
+        self.assertEqual(detect_encoding(data[:10], complete=True), "cp1252")
+        with patch.object(encoding_detection, "SNIFF_BYTES", 10), \
+                patch.object(encoding_detection, "DECODE_CHUNK_BYTES", 3):
+            self.assertEqual(decode_stream(io.BytesIO(data)), ("x" * 9 + "é" * 10, "utf-8"))
+
+    def test_invalid_bytes_after_first_block_fall_back(self):
+        """Test that a file which stops being UTF-8 after its first block is decoded again."""
+        data = b"a" * 20 + "“end”".encode("cp1252")
+
+        with patch.object(encoding_detection, "SNIFF_BYTES", 8):
+            self.assertEqual(decode_stream(io.BytesIO(data)), ("a" * 20 + "“end”", "cp1252"))
+
+
+class TestTextEncodingOnDocuments(unittest.TestCase):
+    """Test cases for recording the detected encoding."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.temp_dir, "test.db"))
+        self.storage = DocumentStorage()
+        self.storage.db_manager = self.db
+        self.extractor = TextExtractor(extraction_cache=ExtractionCache(os.path.join(self.temp_dir, "cache.db")))
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _document(self, document_id: str, text_encoding=None) -> Document:
+        return Document(
+            id=document_id, title=f"{document_id}.txt", file_type="txt", file_size=10,
+            upload_timestamp=datetime.now(), original_text="Text", text_encoding=text_encoding
+        )
+
+    def test_extraction_reports_encoding_from_cache_too(self):
+        """Test the encoding is returned on first extraction and on a cache hit."""
+        data = "“Term” – two years".encode("cp1252")
+
+        first = self.extractor.extract(data, "notes.txt")
+        cached = self.extractor.extract(data, "copy.txt")
+
+        self.assertEqual((first.text, first.encoding), ("“Term” – two years", "cp1252"))
+        self.assertEqual((cached.text, cached.encoding), (first.text, "cp1252"))
+        self.assertEqual(self.extractor.extraction_cache.get_statistics()['hits'], 1)
+        self.assertEqual(self.extractor.extract(b" \n ", "blank.txt").error, "No readable text found in TXT file")
+
+    def test_encoding_is_stored_after_migration(self):
+        """Test documents keep their encoding once migrated, and store without it before."""
+        self.storage.create_document(self._document("plain", "utf-8"))
+
+        migrator = DatabaseMigrator()
+        migrator.db_manager = self.db
+        self.assertTrue(migrator.run_migrations())
+        self.storage.create_documents([self._document("notice", "cp1252"), self._document("exhibit")])
+
+        self.assertIsNone(self.storage.get_document("plain").text_encoding)
+        self.assertEqual(self.storage.get_document("notice").text_encoding, "cp1252")
+        self.assertIsNone(self.storage.get_document("exhibit").text_encoding)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -776,4 +776,57 @@ class TestEnhancedContextManager:
             session_id = f"session_{thread_id}"
             context = self.context_manager.get_conversation_context(session_id)
             assert context is not None
-            assert len(context.conversation_history) == 10
\ No newline at end of file
+            assert len(context.conversation_history) == 10
+
+    def test_running_topic_counters_match_recent_window(self):
+        """Test that incremental topic counters track only the rolling window"""
+        questions = [
+            "What are the liability terms?",
+            "How does payment work?",
+            "What about termination and liability?",
+        ] * 6
+        
+        for question in questions:
+            self.context_manager.update_conversation_context(
+                self.session_id, question, self.mock_response, self.mock_intent, self.mock_strategy
+            )
+        
+        context = self.context_manager.get_conversation_context(self.session_id)
+        aggregates = self.context_manager._get_aggregates(context)
+        
+        expected_topics = []
+        for turn in context.conversation_history[-10:]:
+            expected_topics.extend(self.context_manager._extract_topics(turn.question))
+        
+        assert aggregates.topic_mentions == len(expected_topics)
+        assert set(aggregates.topic_counts) == set(expected_topics)
+        assert len(aggregates.features) == 10
+        
+        coherence = self.context_manager._calculate_topic_coherence(context)
+        assert coherence == pytest.approx(1.0 - len(set(expected_topics)) / len(expected_topics))
+    
+    def test_turn_features_computed_once_per_turn(self):
+        """Test that analysis reuses cached turn features instead of re-extracting topics"""
+        for i in range(20):
+            self.context_manager.update_conversation_context(
+                self.session_id, f"Liability question {i}", self.mock_response,
+                self.mock_intent, self.mock_strategy
+            )
+        
+        with patch.object(self.context_manager, '_extract_topics') as mock_extract:
+            self.context_manager.detect_conversation_patterns(self.session_id)
+            self.context_manager.analyze_conversation_flow(self.session_id)
+        
+        mock_extract.assert_not_called()
+    
+    def test_clear_conversation_drops_aggregates(self):
+        """Test that clearing a session also forgets its running aggregates"""
+        self.context_manager.update_conversation_context(
+            self.session_id, "What are the liability terms?", self.mock_response,
+            self.mock_intent, self.mock_strategy
+        )
+        
+        self.context_manager.clear_conversation(self.session_id)
+        
+        assert self.context_manager.get_conversation_context(self.session_id) is None
+        assert self.session_id not in self.context_manager._aggregates
@@ -471,5 +471,26 @@ class TestStressTests:
             assert total_growth < 100, f"Potential memory leak: {total_growth:.1f}MB growth"
 
 
+class TestAsyncPipelineThroughput:
+    """Throughput of the asynchronous EnhancedContractSystem pipeline."""
+    
+    def test_concurrent_questions_do_not_block_each_other(self):
+        """Blocking LLM calls for concurrent questions should be in flight together."""
+        from benchmarks.async_pipeline import run_benchmark
+        
+        results = run_benchmark(questions=8, llm_latency=0.05, max_concurrent_requests=8)
+        
+        assert results["sequential_peak_in_flight"] == 1
+        assert results["concurrent_peak_in_flight"] > 1
+    
+    def test_max_concurrent_requests_bounds_parallelism(self):
+        """Requests beyond max_concurrent_requests should wait for a free slot."""
+        from benchmarks.async_pipeline import run_benchmark
+        
+        results = run_benchmark(questions=8, llm_latency=0.05, max_concurrent_requests=2)
+        
+        assert results["concurrent_peak_in_flight"] <= 2
+
+
 if __name__ == "__main__":
-    pytest.main([__file__, "-v"])
\ No newline at end of file
+    pytest.main([__file__, "-v"])
@@ -0,0 +1,158 @@
+"""
+Tests for the streaming Excel report writer.
+"""
+
+import os
+import tempfile
+from datetime import datetime
+
+import pytest
+from openpyxl import load_workbook
+
+from src.models.conversational import ExcelSheet
+from src.models.document import Commitment, ComprehensiveAnalysis, Document, QASession, RiskAssessment
+from src.services.excel_report_generator import ExcelReportGenerator
+from src.services.excel_stream_writer import HEADER_STYLE, WRAPPED_STYLE, StreamingExcelWriter
+from src.storage.database import DatabaseManager
+from src.storage.document_storage import DocumentStorage
+from src.storage.enhanced_storage import EnhancedDocumentStorage
+from src.storage.migrations import DatabaseMigrator
+
+
+class TestStreamingExcelWriter:
+    """Test suite for StreamingExcelWriter."""
+
+    @pytest.fixture
+    def file_path(self):
+        """Path for the generated workbook."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield os.path.join(temp_dir, "report.xlsx")
+
+    def test_writes_dict_rows_with_styles_and_widths(self, file_path):
+        """Test headers, named styles, value conversion and column widths."""
+        sheets = [ExcelSheet(
+            name="Risks",
+            data=[
+                {'Risk ID': 'R001', 'Description': 'x' * 80, 'Parties': ['A', 'B']},
+                {'Risk ID': 'R002', 'Description': 'Short', 'Confidence': 0.5}
+            ],
+            formatting={'header_style': 'bold', 'wrap_text': True},
+            charts=[]
+        )]
+
+        counts = StreamingExcelWriter().write(sheets, file_path)
+
+        assert counts == {"Risks": 2}
+        worksheet = load_workbook(file_path)["Risks"]
+        rows = list(worksheet.values)
+        assert rows[0] == ('Risk ID', 'Description', 'Parties', 'Confidence')
+        assert rows[1] == ('R001', 'x' * 80, "['A', 'B']", None)
+        assert rows[2] == ('R002', 'Short', None, 0.5)
+        assert worksheet["A1"].style == HEADER_STYLE
+        assert worksheet["A1"].font.bold
+        assert worksheet["B2"].style == WRAPPED_STYLE
+        assert worksheet["B2"].alignment.wrap_text
+        assert worksheet.column_dimensions["A"].width == len('Risk ID') + 2
+        assert worksheet.column_dimensions["B"].width == 50
+
+    def test_streams_tuple_rows_from_a_generator(self, file_path):
+        """Test cursor-style tuple rows beyond the width sample."""
+        rows = ((index, f"Question {index}") for index in range(1, 1001))
+        sheets = [
+            ExcelSheet(name="Q&A History", data=rows, formatting={}, charts=[], columns=['Turn', 'Question']),
+            ExcelSheet(name="Empty", data=[], formatting={'header_style': 'bold'}, charts=[])
+        ]
+
+        counts = StreamingExcelWriter(width_sample_rows=10).write(sheets, file_path)
+
+        assert counts == {"Q&A History": 1000, "Empty": 0}
+        workbook = load_workbook(file_path, read_only=True)
+        values = list(workbook["Q&A History"].values)
+        assert values[0] == ('Turn', 'Question')
+        assert values[-1] == (1000, 'Question 1000')
+        assert workbook.sheetnames == ["Q&A History", "Empty"]
+
+    def test_tuple_rows_need_columns(self, file_path):
+        """Test that tuple rows without a header are rejected."""
+        sheets = [ExcelSheet(name="Bad", data=[(1, 2)], formatting={}, charts=[])]
+
+        with pytest.raises(ValueError):
+            StreamingExcelWriter().write(sheets, file_path)
+
+
+class TestStreamedReportSheets:
+    """Test suite for report sheets streamed from storage cursors."""
+
+    @pytest.fixture
+    def generator(self):
+        """Report generator over a migrated scratch database."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            db = DatabaseManager(os.path.join(temp_dir, "test.db"))
+            migrator = DatabaseMigrator()
+            migrator.db_manager = db
+            assert migrator.run_migrations()
+            storage = DocumentStorage()
+            storage.db_manager = db
+            enhanced_storage = EnhancedDocumentStorage()
+            enhanced_storage.db_manager = db
+            yield ExcelReportGenerator(storage, os.path.join(temp_dir, "reports"), enhanced_storage)
+
+    def _analyse(self, generator, document_id, created_at, severities):
+        if generator.document_storage.get_document(document_id) is None:
+            generator.document_storage.create_document(Document(
+                id=document_id, title=f"{document_id}.pdf", file_type="pdf", file_size=10,
+                upload_timestamp=datetime(2025, 1, 1), processing_status="completed", original_text="Text"
+            ))
+        generator.enhanced_storage.save_comprehensive_analysis(ComprehensiveAnalysis(
+            document_id=document_id, analysis_id=f"{document_id}-{created_at:%H%M}", document_overview="Overview",
+            key_findings=[], critical_information=[], recommended_actions=[], executive_recommendation="",
+            key_legal_terms=[],
+            risks=[RiskAssessment(f"{document_id}_r{index}_{created_at:%H%M}", f"Risk {index}", severity, "Legal",
+                                  [], [], "", 0.8)
+                   for index, severity in enumerate(severities)],
+            commitments=[Commitment(f"{document_id}_c_{created_at:%H%M}", "Deliver", "Supplier", "Buyer",
+                                    datetime(2025, 3, 1, 12), "Active", "", "Deliverable")],
+            deliverable_dates=[], template_used=None, confidence_score=0.9, created_at=created_at
+        ))
+
+    def test_conversation_history_is_streamed_from_storage(self, generator):
+        """Test Q&A History rows come from the session's stored interactions."""
+        generator.document_storage.create_qa_session(QASession(session_id="s1", document_id="doc1"))
+        generator.document_storage.add_qa_interactions("s1", [(f"Question {i}", f"Answer {i}", None) for i in range(30)])
+
+        report = generator.generate_conversation_report("s1")
+
+        history = next(sheet for sheet in report.sheets if sheet.name == "Q&A History")
+        assert history.columns == ['Turn', 'Question', 'Response', 'Timestamp', 'Analysis Mode']
+        assert not isinstance(history.data, list)
+        values = list(load_workbook(report.file_path, read_only=True)["Q&A History"].values)
+        assert len(values) == 31
+        assert values[1][:3] == (1, "Question 0", "Answer 0")
+        assert values[30][:3] == (30, "Question 29", "Answer 29")
+        summary = list(load_workbook(report.file_path, read_only=True)["Conversation Summary"].values)
+        assert ('Total Questions', 30) in summary
+
+    def test_portfolio_rows_come_from_latest_analyses(self, generator):
+        """Test risk and commitment rows follow document order and use each latest analysis."""
+        self._analyse(generator, "docb", datetime(2025, 1, 2, 9), ["High", "Low"])
+        self._analyse(generator, "doca", datetime(2025, 1, 2, 9), ["Medium"])
+        self._analyse(generator, "doca", datetime(2025, 1, 2, 10), ["High", "Low"])
+
+        report = generator.create_custom_report({
+            'document_ids': ["doca", "docb"],
+            'include_sections': ['risks', 'commitments'],
+            'filters': {'risk_severity': ['High']}
+        })
+
+        workbook = load_workbook(report.file_path, read_only=True)
+        risks = list(workbook["All Risks"].values)
+        assert risks[0] == ('Document', 'Risk ID', 'Description', 'Severity', 'Category')
+        assert risks[1:] == [
+            ("doca.pdf", "doca_r0_1000", "Risk 0", "High", "Legal"),
+            ("docb.pdf", "docb_r0_0900", "Risk 0", "High", "Legal")
+        ]
+        commitments = list(workbook["All Commitments"].values)
+        assert commitments[1:] == [
+            ("doca.pdf", "doca_c_1000", "Deliver", "Supplier", "2025-03-01", "Active"),
+            ("docb.pdf", "docb_c_0900", "Deliver", "Supplier", "2025-03-01", "Active")
+        ]
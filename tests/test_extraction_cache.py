@@ -0,0 +1,98 @@
+"""
+Tests for the on-disk extraction cache.
+"""
+
+import os
+import tempfile
+from unittest.mock import patch
+
+import pytest
+
+from benchmarks.pdf_extraction import build_sample_pdf
+from src.services.extraction_cache import ExtractionCache, build_extraction_key
+from src.services.file_handler import FileUploadHandler, InMemoryUpload
+from src.services.pdf_extraction import PdfPage, PdfPageExtractor
+
+
+class TestExtractionCache:
+    """Test suite for ExtractionCache and its use by FileUploadHandler."""
+
+    @pytest.fixture
+    def cache(self):
+        """Cache in a temporary database."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield ExtractionCache(os.path.join(temp_dir, "extraction_cache.db"))
+
+    def test_round_trip_and_hit_rate(self, cache):
+        """Test stored text and page offsets come back and lookups are counted."""
+        pages = [PdfPage(1, "First", 0, 5), PdfPage(3, "Third", 7, 12)]
+        cache.put("key", "First\n\nThird", pages)
+
+        assert cache.get("missing") is None
+        cached = cache.get("key")
+
+        assert cached.text == "First\n\nThird"
+        assert cached.pages == pages
+        stats = cache.get_statistics()
+        assert (stats['hits'], stats['misses'], stats['writes'], stats['entries']) == (1, 1, 1, 1)
+        assert stats['hit_rate'] == 0.5
+
+    def test_key_depends_on_bytes_type_and_version(self):
+        """Test that changed bytes, file type or extractor version produce a new key."""
+        key = build_extraction_key("abc123", ".pdf", 1)
+
+        assert key == build_extraction_key("abc123", "pdf", 1)
+        assert key != build_extraction_key("abc124", ".pdf", 1)
+        assert key != build_extraction_key("abc123", ".docx", 1)
+        assert key != build_extraction_key("abc123", ".pdf", 2)
+
+    def test_least_recently_used_entries_are_evicted(self, cache):
+        """Test size-bounded eviction keeps recently read entries."""
+        cache.put("old", os.urandom(2000).hex())
+        cache.put("recent", os.urandom(2000).hex())
+        cache.max_bytes = cache.get_statistics()['bytes'] + 100
+        cache.get("old")
+
+        cache.put("new", os.urandom(2000).hex())
+
+        assert cache.get("recent") is None
+        assert cache.get("old") is not None
+        assert cache.get("new") is not None
+        assert cache.get_statistics()['evictions'] == 1
+
+    def test_unreadable_entries_are_misses(self, cache):
+        """Test that a corrupt payload is not returned."""
+        with cache._connect() as conn:
+            conn.execute("INSERT INTO extraction_cache VALUES ('bad', x'00', 1, 0, 0)")
+
+        assert cache.get("bad") is None
+        assert cache.get_statistics()['errors'] == 1
+
+    def test_repeat_uploads_skip_parsing(self, cache):
+        """Test that a re-uploaded PDF or TXT is served from the cache."""
+        handler = FileUploadHandler(PdfPageExtractor(workers=1), extraction_cache=cache)
+        pdf_bytes = build_sample_pdf(3, lines_per_page=2)
+        first_text, _ = handler.extract_text(InMemoryUpload(pdf_bytes, "exhibit.pdf"))
+
+        with patch.object(handler.pdf_extractor, "extract") as extract:
+            text, error = handler.extract_text(InMemoryUpload(pdf_bytes, "copy.pdf"))
+            extraction = handler.extract_pdf(InMemoryUpload(pdf_bytes, "copy.pdf"))
+
+        extract.assert_not_called()
+        assert (text, error) == (first_text, None)
+        assert [page.page_number for page in extraction.pages] == [1, 2, 3]
+
+        assert handler.extract_text(InMemoryUpload(b"Plain text", "notes.txt")) == ("Plain text", None)
+        with patch.object(handler.extractor, "_extract_txt") as extract_txt:
+            assert handler.extract_text(InMemoryUpload(b"Plain text", "notes.txt")) == ("Plain text", None)
+        extract_txt.assert_not_called()
+        assert cache.get_statistics()['hits'] == 3
+
+    def test_failed_extractions_are_not_cached(self, cache):
+        """Test that errors are retried rather than cached."""
+        handler = FileUploadHandler(PdfPageExtractor(workers=1), extraction_cache=cache)
+        blank = InMemoryUpload(build_sample_pdf(1, lines_per_page=0), "blank.pdf")
+
+        handler.extract_text(blank)
+
+        assert cache.get_statistics()['entries'] == 0
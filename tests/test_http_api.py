@@ -0,0 +1,194 @@
+"""Tests for the headless HTTP API."""
+
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from src.api.server import APIServices, DocumentQAAPI
+from src.models.conversational import ExcelReport
+from src.models.document import Document, ProcessingJob
+from src.services.qa_engine import AnswerStream
+from src.services.text_extraction import TextExtractor
+
+
+def _call(app, method, path, body=b"", query=b"", headers=None):
+    """Drive one HTTP request through the ASGI app and collect the response."""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "query_string": query,
+        "headers": [(key.encode(), value.encode()) for key, value in (headers or {}).items()]
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = sent[0]
+    return start["status"], dict(start["headers"]), b"".join(m.get("body", b"") for m in sent[1:])
+
+
+class TestDocumentQAAPI(unittest.TestCase):
+    """Test cases for the ASGI application."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.document = Document(
+            id="doc-1", title="contract.txt", file_type="txt", file_size=10,
+            upload_timestamp=datetime(2024, 1, 1), processing_status="completed",
+            original_text="The agreement term is two years."
+        )
+        self.services = Mock(spec=APIServices)
+        for name in ("storage", "qa_engine", "contract_engine", "workflow_manager",
+                     "contract_system", "summary_analyzer", "enhanced_storage", "report_generator"):
+            setattr(self.services, name, Mock())
+        self.services.text_extractor = TextExtractor()
+        self.services.storage.get_document.side_effect = (
+            lambda document_id: self.document if document_id == "doc-1" else None
+        )
+        self.app = DocumentQAAPI(self.services, api_key="test_api_key", max_upload_bytes=1024)
+
+    def test_health(self):
+        """Test the health endpoint."""
+        self.services.workflow_manager.get_queue_status.return_value = {"queue_size": 0}
+        status, _, body = _call(self.app, "GET", "/api/health")
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["status"], "ok")
+
+    def test_upload_queues_document(self):
+        """Test that an upload is extracted and submitted to the workflow manager."""
+        self.services.workflow_manager.submit_document_for_processing.return_value = "job-1"
+
+        status, _, body = _call(self.app, "POST", "/api/documents", b"Plain text contract body.",
+                                query=b"filename=contract.txt")
+
+        self.assertEqual(status, 202)
+        self.assertEqual(json.loads(body)["job_id"], "job-1")
+        document, api_key = self.services.workflow_manager.submit_document_for_processing.call_args[0]
+        self.assertEqual(document.original_text, "Plain text contract body.")
+        self.assertEqual(document.file_type, "txt")
+        self.assertEqual(api_key, "test_api_key")
+
+    def test_upload_validation(self):
+        """Test missing names, unsupported types and oversized bodies."""
+        self.assertEqual(_call(self.app, "POST", "/api/documents", b"data")[0], 400)
+        self.assertEqual(_call(self.app, "POST", "/api/documents", b"data", query=b"filename=a.exe")[0], 400)
+        self.assertEqual(_call(self.app, "POST", "/api/documents", b"x" * 2048, query=b"filename=a.txt")[0], 413)
+
+    def test_job_status(self):
+        """Test job lookup and unknown jobs."""
+        self.services.workflow_manager.get_job_status.side_effect = (
+            lambda job_id: ProcessingJob(job_id="job-1", document_id="doc-1", status="processing")
+            if job_id == "job-1" else None
+        )
+        status, _, body = _call(self.app, "GET", "/api/jobs/job-1")
+        self.assertEqual((status, json.loads(body)["status"]), (200, "processing"))
+        self.assertEqual(_call(self.app, "GET", "/api/jobs/missing")[0], 404)
+
+    def test_unknown_routes_and_methods(self):
+        """Test 404 and 405 responses."""
+        self.assertEqual(_call(self.app, "GET", "/api/nothing")[0], 404)
+        self.assertEqual(_call(self.app, "DELETE", "/api/documents")[0], 405)
+        self.assertEqual(_call(self.app, "GET", "/api/documents/missing")[0], 404)
+
+    def test_question(self):
+        """Test a non-streaming answer from the selected engine."""
+        self.services.contract_engine.answer_question.return_value = {"answer": "Two years.", "sources": []}
+
+        status, _, body = _call(self.app, "POST", "/api/documents/doc-1/questions",
+                                json.dumps({"question": "What is the term?", "mode": "contract"}).encode())
+
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(body)["answer"], "Two years.")
+        self.services.contract_engine.answer_question.assert_called_once_with("What is the term?", "doc-1", None)
+
+    def test_question_validation(self):
+        """Test malformed question requests."""
+        path = "/api/documents/doc-1/questions"
+        self.assertEqual(_call(self.app, "POST", path, b"{not json")[0], 400)
+        self.assertEqual(_call(self.app, "POST", path, json.dumps({"question": ""}).encode())[0], 400)
+        self.assertEqual(_call(self.app, "POST", path, json.dumps({"question": "Q?", "mode": "x"}).encode())[0], 400)
+
+    def test_streamed_question(self):
+        """Test that streamed answers arrive as text events followed by the result."""
+        self.services.qa_engine.stream_answer.return_value = AnswerStream(
+            iter(["Two ", "years."]), lambda answer: {"answer": answer, "sources": ["Document Content"]}
+        )
+
+        status, headers, body = _call(self.app, "POST", "/api/documents/doc-1/questions",
+                                      json.dumps({"question": "What is the term?", "stream": True}).encode())
+
+        self.assertEqual(status, 200)
+        self.assertEqual(headers[b"content-type"], b"text/event-stream")
+        events = body.decode().strip().split("\n\n")
+        self.assertEqual(events[0], 'data: {"text": "Two "}')
+        self.assertEqual(events[1], 'data: {"text": "years."}')
+        self.assertTrue(events[2].startswith("event: result\n"))
+        self.assertEqual(json.loads(events[2].split("data: ", 1)[1])["answer"], "Two years.")
+
+    def test_batch_questions(self):
+        """Test the batch endpoint."""
+        self.services.qa_engine.answer_questions_batch.return_value = [{"answer": "A"}, {"answer": "B"}]
+
+        status, _, body = _call(self.app, "POST", "/api/documents/doc-1/questions/batch",
+                                json.dumps({"questions": ["One?", "Two?"], "session_id": "s-1"}).encode())
+
+        self.assertEqual(status, 200)
+        self.assertEqual(len(json.loads(body)["results"]), 2)
+        self.services.qa_engine.answer_questions_batch.assert_called_once_with("doc-1", ["One?", "Two?"], "s-1")
+
+    def test_report_creation_and_download(self):
+        """Test that a generated report is stored and downloadable by id."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            file_path = os.path.join(temp_dir, "report.xlsx")
+            with open(file_path, "wb") as file:
+                file.write(b"xlsx-bytes")
+            report = ExcelReport(
+                report_id="r-1", filename="report.xlsx", file_path=file_path,
+                download_url="/api/reports/download/r-1", sheets=[],
+                created_at=datetime.now(), expires_at=datetime.now() + timedelta(days=7)
+            )
+            self.services.report_generator.generate_document_report.return_value = report
+            self.services.enhanced_storage.get_excel_report.side_effect = (
+                lambda report_id: report if report_id == "r-1" else None
+            )
+
+            status, _, body = _call(self.app, "POST", "/api/documents/doc-1/reports", b"")
+            self.assertEqual(status, 201)
+            self.services.enhanced_storage.save_excel_report.assert_called_once_with(report)
+
+            status, headers, body = _call(self.app, "GET", json.loads(body)["download_url"])
+            self.assertEqual((status, body), (200, b"xlsx-bytes"))
+            self.assertIn(b"report.xlsx", headers[b"content-disposition"])
+
+        self.assertEqual(_call(self.app, "GET", "/api/reports/download/missing")[0], 404)
+
+    def test_lifespan_keeps_injected_services(self):
+        """Test that startup and shutdown leave injected services alone."""
+        messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+        sent = []
+
+        async def receive():
+            return messages.pop(0)
+
+        async def send(message):
+            sent.append(message["type"])
+
+        asyncio.run(self.app({"type": "lifespan"}, receive, send))
+
+        self.assertEqual(sent, ["lifespan.startup.complete", "lifespan.shutdown.complete"])
+        self.services.shutdown.assert_not_called()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,136 @@
+"""
+Tests for latency budgets and enhancement shedding
+"""
+
+import asyncio
+import time
+from unittest.mock import patch
+
+import pytest
+
+from src.services.latency_budget import LatencyBudget, StageCostModel, DEFAULT_STAGE_COSTS
+from src.services.enhanced_contract_system import ProcessingContext
+from src.services.response_cache import ResponseCache
+from benchmarks.async_pipeline import build_system
+
+
+class TestLatencyBudget:
+    """Test deadline bookkeeping"""
+
+    def test_remaining_never_negative(self):
+        """Test that an overrun budget reports zero time left"""
+        budget = LatencyBudget(total_seconds=1.0, started_at=time.monotonic() - 5)
+
+        assert budget.remaining() == 0.0
+        assert budget.exhausted
+        assert not budget.can_afford(0.01)
+
+    def test_can_afford(self):
+        """Test affordability against the remaining time"""
+        budget = LatencyBudget(total_seconds=10.0)
+
+        assert budget.can_afford(1.0)
+        assert not budget.can_afford(20.0)
+
+
+class TestStageCostModel:
+    """Test learned stage costs"""
+
+    def test_prior_used_without_timings(self):
+        """Test that unknown stages fall back to the prior"""
+        model = StageCostModel()
+
+        assert model.estimate("quality_enhancement") == DEFAULT_STAGE_COSTS["quality_enhancement"]
+
+    def test_estimate_tracks_recorded_timings(self):
+        """Test that enough fast timings replace a pessimistic prior"""
+        model = StageCostModel(priors={"stage": 5.0}, min_samples=3)
+        for _ in range(10):
+            model.record("stage", 0.1)
+
+        assert model.estimate("stage") == pytest.approx(0.1, abs=0.01)
+        assert model.get_statistics()["stage"]["samples"] == 10
+
+    def test_prior_floor_until_min_samples(self):
+        """Test that a single fast sample does not override the prior"""
+        model = StageCostModel(priors={"stage": 5.0}, min_samples=3)
+        model.record("stage", 0.1)
+
+        assert model.estimate("stage") == 5.0
+
+    def test_erratic_stage_is_estimated_conservatively(self):
+        """Test that variance raises the estimate above the mean"""
+        model = StageCostModel(min_samples=1)
+        for seconds in [0.1, 1.0] * 10:
+            model.record("stage", seconds)
+
+        statistics = model.get_statistics()["stage"]
+        assert statistics["estimate_seconds"] > statistics["mean_seconds"]
+
+
+class TestEnhancementShedding:
+    """Test that the enhanced system sheds optional stages to meet its budget"""
+
+    def _process(self, system, budget_seconds):
+        context = ProcessingContext(session_id="budget", latency_budget_seconds=budget_seconds)
+        return asyncio.run(system.process_question("Who bears liability?", "bench_doc", context))
+
+    def test_all_enhancements_applied_with_ample_budget(self):
+        """Test the full pipeline when time allows"""
+        system = build_system(llm_latency=0.0, max_concurrent_requests=2)
+
+        result = self._process(system, 30.0)
+
+        assert "quality_enhancement" in result.enhancements_applied
+        assert "intelligent_formatting" in result.enhancements_applied
+        assert not any(":" in entry for entry in result.enhancements_applied)
+        system.shutdown()
+
+    def test_slow_base_response_sheds_optional_stages(self):
+        """Test that a slow LLM call leaves no room for the expensive stages"""
+        system = build_system(llm_latency=0.3, max_concurrent_requests=2)
+
+        result = self._process(system, 0.5)
+
+        assert "quality_enhancement:skipped" in result.enhancements_applied
+        assert "intelligent_formatting:downgraded" in result.enhancements_applied
+        assert "quality_enhancement" not in result.enhancements_applied
+        assert result.response.content
+        assert system.processing_stats['enhancements_shed'] >= 2
+        system.shutdown()
+
+    def test_exhausted_budget_skips_formatting(self):
+        """Test that nothing optional runs once the budget is spent"""
+        system = build_system(llm_latency=0.2, max_concurrent_requests=2)
+
+        result = self._process(system, 0.1)
+
+        assert "intelligent_formatting:skipped" in result.enhancements_applied
+        assert "quality_scoring:downgraded" in result.enhancements_applied
+        assert result.quality_score == result.response.confidence
+        system.shutdown()
+
+    def test_stage_timings_are_recorded(self):
+        """Test that executed stages feed the cost model"""
+        system = build_system(llm_latency=0.05, max_concurrent_requests=2)
+
+        self._process(system, 30.0)
+
+        statistics = system.stage_costs.get_statistics()
+        assert statistics["base_response"]["samples"] == 1
+        assert statistics["quality_enhancement"]["samples"] == 1
+        system.shutdown()
+
+    def test_shed_results_are_not_cached(self):
+        """Test that only answers with every enhancement applied are cached"""
+        system = build_system(llm_latency=0.3, max_concurrent_requests=2)
+        system.config.enable_caching = True
+        system.response_cache = ResponseCache()
+
+        with patch.object(system, '_cache_result') as cache_result:
+            self._process(system, 0.5)
+            cache_result.assert_not_called()
+
+            self._process(system, 30.0)
+            cache_result.assert_called_once()
+        system.shutdown()
@@ -0,0 +1,123 @@
+"""Tests for the shared Gemini client."""
+
+import json
+import unittest
+from unittest.mock import MagicMock, Mock, patch
+
+import requests
+
+from src.services import llm_client
+from src.services.llm_client import GeminiClient
+
+
+def _gemini_body(text):
+    return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+
+
+def _sse_response(*events):
+    """Streaming response whose body is the given events as server-sent events."""
+    lines = []
+    for event in events:
+        lines.extend([f"data: {json.dumps(event)}", ""])
+    response = MagicMock()
+    response.__enter__.return_value = response
+    response.raise_for_status.return_value = None
+    response.iter_lines.return_value = lines
+    return response
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for RateLimiter."""
+    
+    def test_reservations_are_evenly_spaced(self):
+        """Test that each reservation waits one interval longer than the previous."""
+        limiter = llm_client.RateLimiter(requests_per_minute=60)
+        with patch('time.monotonic', return_value=100.0):
+            delays = [limiter.reserve() for _ in range(3)]
+        self.assertEqual(delays, [0.0, 1.0, 2.0])
+    
+    @patch('requests.post')
+    def test_client_waits_for_rate_limit(self, mock_post):
+        """Test that generate sleeps for the reserved delay."""
+        client = GeminiClient("test_api_key", requests_per_minute=60)
+        mock_post.return_value.json.return_value = _gemini_body("ok")
+        with patch.object(client.rate_limiter, 'reserve', return_value=0.5), \
+                patch('src.services.llm_client.time.sleep') as mock_sleep:
+            client.generate("Prompt")
+        mock_sleep.assert_called_once_with(0.5)
+
+
+class TestGeminiClient(unittest.TestCase):
+    """Test cases for GeminiClient."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.client = GeminiClient("test_api_key")
+    
+    def test_api_url_includes_model_and_key(self):
+        """Test endpoint construction."""
+        self.assertIn("gemini-2.0-flash:generateContent", self.client.api_url)
+        self.assertTrue(self.client.api_url.endswith("key=test_api_key"))
+    
+    @patch('requests.post')
+    def test_generate_returns_text(self, mock_post):
+        """Test blocking generation."""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = _gemini_body("Answer")
+        mock_post.return_value = mock_response
+        
+        self.assertEqual(self.client.generate("Prompt", max_tokens=50, temperature=0.1), "Answer")
+        
+        payload = mock_post.call_args.kwargs["json"]
+        self.assertEqual(payload["generationConfig"], {"maxOutputTokens": 50, "temperature": 0.1})
+    
+    @patch('requests.post')
+    def test_generate_propagates_request_errors(self, mock_post):
+        """Test that transport errors surface as requests exceptions."""
+        mock_post.side_effect = requests.exceptions.ConnectionError("down")
+        
+        with self.assertRaises(requests.exceptions.RequestException):
+            self.client.generate("Prompt")
+    
+    def test_parse_sse_events(self):
+        """Test decoding of multi-line and trailing server-sent events."""
+        lines = ['data: {"a": 1}', '', ': keep-alive', 'data: {"b":', 'data: 2}', '', b'data: {"c": 3}']
+        self.assertEqual(list(GeminiClient.parse_sse_events(lines)), [{"a": 1}, {"b": 2}, {"c": 3}])
+    
+    @patch('requests.post')
+    def test_stream_generate_yields_chunks_and_records_usage(self, mock_post):
+        """Test streaming text, time-to-first-token and usage from the final chunk."""
+        monitor = Mock()
+        tracker = Mock()
+        client = GeminiClient("test_api_key", monitor=monitor, usage_tracker=tracker, component="qa_engine")
+        final = _gemini_body(" world")
+        final["usageMetadata"] = {"promptTokenCount": 12, "candidatesTokenCount": 2, "totalTokenCount": 14}
+        mock_post.return_value = _sse_response(_gemini_body("Hello"), final)
+        
+        chunks = client.stream_generate("Prompt", max_tokens=20)
+        mock_post.assert_not_called()
+        self.assertEqual(list(chunks), ["Hello", " world"])
+        
+        self.assertIn("streamGenerateContent?alt=sse", mock_post.call_args.args[0])
+        self.assertTrue(mock_post.call_args.kwargs["stream"])
+        metric_names = [call.args[0] for call in monitor.record_metric.call_args_list]
+        self.assertIn("llm_time_to_first_token_gemini-2.0-flash", metric_names)
+        usage = tracker.record_call.call_args.kwargs
+        self.assertEqual(usage["result"], final)
+        self.assertEqual(usage["response_text"], "Hello world")
+        self.assertTrue(usage["success"])
+    
+    @patch('requests.post')
+    def test_stream_generate_propagates_http_errors(self, mock_post):
+        """Test that HTTP errors surface when the stream is read."""
+        response = _sse_response()
+        response.raise_for_status.side_effect = requests.exceptions.HTTPError("429")
+        mock_post.return_value = response
+        
+        with self.assertRaises(requests.exceptions.RequestException):
+            list(self.client.stream_generate("Prompt"))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,179 @@
+"""Tests for LLM token and cost accounting."""
+
+import asyncio
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import Mock, patch
+
+import requests
+
+from src.services.llm_client import GeminiClient
+from src.services.llm_usage import (
+    LLMUsageTracker, current_attribution, estimate_cost, extract_token_usage,
+    usage_scope, usage_scoped
+)
+from src.storage.database import DatabaseManager
+from src.storage.llm_usage_storage import LLMUsageStorage
+from src.workflow.enhanced_workflow import EnhancedDocumentWorkflow
+
+
+def _gemini_body(text, prompt_tokens=120, output_tokens=30):
+    return {
+        "candidates": [{"content": {"parts": [{"text": text}]}}],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens
+        }
+    }
+
+
+class TestUsageAttribution(unittest.TestCase):
+    """Test cases for usage scopes and token parsing."""
+
+    def test_scopes_merge_and_restore(self):
+        """Test that nested scopes override fields and unwind on exit."""
+        with usage_scope(document_id="doc-1", operation="comprehensive_analysis"):
+            with usage_scope(operation="risk_identification", session_id=None):
+                self.assertEqual(current_attribution(), {
+                    "document_id": "doc-1", "operation": "risk_identification"
+                })
+            self.assertEqual(current_attribution()["operation"], "comprehensive_analysis")
+        self.assertEqual(current_attribution(), {})
+
+    def test_unknown_field_rejected(self):
+        """Test that typos in attribution fields fail loudly."""
+        with self.assertRaises(ValueError):
+            with usage_scope(doc_id="doc-1"):
+                pass
+
+    def test_scoped_decorator_on_coroutine(self):
+        """Test that attribution follows awaited calls."""
+        @usage_scoped(lambda document_id: {"document_id": document_id})
+        async def handler(document_id):
+            await asyncio.sleep(0)
+            return current_attribution()
+
+        self.assertEqual(asyncio.run(handler("doc-2")), {"document_id": "doc-2"})
+
+    def test_extract_token_usage(self):
+        """Test parsing of usageMetadata, including missing fields."""
+        self.assertEqual(extract_token_usage(_gemini_body("x", 10, 5)), (10, 5, 15))
+        self.assertEqual(extract_token_usage({"usageMetadata": {"promptTokenCount": 7}}), (7, 0, 7))
+        self.assertEqual(extract_token_usage({"candidates": []}), (0, 0, 0))
+        self.assertEqual(extract_token_usage(None), (0, 0, 0))
+
+    @patch('src.services.llm_usage.config')
+    def test_estimate_cost(self, mock_config):
+        """Test cost from per-million-token prices."""
+        mock_config.LLM_INPUT_COST_PER_MILLION_TOKENS = 0.10
+        mock_config.LLM_OUTPUT_COST_PER_MILLION_TOKENS = 0.40
+        self.assertAlmostEqual(estimate_cost(1_000_000, 500_000), 0.30)
+
+
+class TestLLMUsageTracker(unittest.TestCase):
+    """Test cases for recording and reporting usage."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.temp_dir, "usage.db"))
+        self.tracker = LLMUsageTracker(storage=LLMUsageStorage(self.db), monitor=Mock(), enabled=True)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def test_client_records_attributed_usage(self):
+        """Test that a Gemini call stores tokens under the active scope."""
+        client = GeminiClient("test_api_key", component="qa_engine",
+                              monitor=Mock(), usage_tracker=self.tracker)
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = _gemini_body("Answer", 200, 40)
+
+        with patch('requests.post', return_value=mock_response):
+            with usage_scope(document_id="doc-1", session_id="s-1", operation="answer_question"):
+                client.generate("What is the term?")
+
+        calls = self.tracker.get_most_expensive_calls()
+        self.assertEqual(len(calls), 1)
+        call = calls[0]
+        self.assertEqual((call["prompt_tokens"], call["output_tokens"], call["total_tokens"]), (200, 40, 240))
+        self.assertEqual(call["component"], "qa_engine")
+        self.assertEqual(call["document_id"], "doc-1")
+        self.assertEqual(call["session_id"], "s-1")
+        self.assertEqual(call["operation"], "answer_question")
+        self.assertEqual(call["prompt_preview"], "What is the term?")
+        self.assertGreater(call["estimated_cost"], 0)
+
+    def test_failed_call_is_recorded(self):
+        """Test that failures are counted without tokens."""
+        client = GeminiClient("test_api_key", monitor=Mock(), usage_tracker=self.tracker)
+        with patch('requests.post', side_effect=requests.exceptions.ConnectionError("down")):
+            with self.assertRaises(requests.exceptions.RequestException):
+                client.generate("Prompt")
+
+        totals = self.tracker.storage.get_totals()
+        self.assertEqual(totals["calls"], 1)
+        self.assertEqual(totals["failed_calls"], 1)
+        self.assertEqual(totals["total_tokens"], 0)
+
+    def test_reports_aggregate_by_dimension(self):
+        """Test per-document, per-node and report aggregation."""
+        for document_id, node, tokens in (("doc-1", "analysis", 1000), ("doc-1", "extraction", 400),
+                                          ("doc-2", "analysis", 100)):
+            with usage_scope(document_id=document_id, workflow_node=node):
+                self.tracker.record_call("gemini-2.0-flash", "prompt", 0.5,
+                                         result=_gemini_body("x", tokens, 10))
+
+        by_document = self.tracker.get_usage_by_document()
+        self.assertEqual([row["key"] for row in by_document], ["doc-1", "doc-2"])
+        self.assertEqual(by_document[0]["calls"], 2)
+        self.assertEqual(by_document[0]["prompt_tokens"], 1400)
+
+        by_node = {row["key"]: row for row in self.tracker.get_usage_by_workflow_node()}
+        self.assertEqual(by_node["analysis"]["total_tokens"], 1120)
+
+        document_usage = self.tracker.get_document_usage("doc-2")
+        self.assertEqual(document_usage["totals"]["calls"], 1)
+
+        report = self.tracker.get_usage_report(limit=1)
+        self.assertEqual(report["totals"]["calls"], 3)
+        self.assertEqual(report["most_expensive_calls"][0]["prompt_tokens"], 1000)
+
+    def test_invalid_group_rejected(self):
+        """Test that only whitelisted columns can be grouped on."""
+        with self.assertRaises(ValueError):
+            self.tracker.storage.get_usage_summary("prompt_preview")
+
+    def test_disabled_tracker_records_nothing(self):
+        """Test the configuration switch."""
+        self.tracker.enabled = False
+        self.assertIsNone(self.tracker.record_call("gemini-2.0-flash", "prompt", 0.1))
+        self.assertEqual(self.tracker.storage.get_totals()["calls"], 0)
+
+
+class TestWorkflowAttribution(unittest.TestCase):
+    """Test that workflow nodes attribute their LLM calls."""
+
+    def test_nodes_run_inside_usage_scope(self):
+        """Test document and node attribution for workflow nodes."""
+        workflow = EnhancedDocumentWorkflow(Mock())
+        seen = {}
+
+        def fake_node(state):
+            seen.update(current_attribution())
+            return state
+
+        wrapped = workflow._with_usage_attribution("classification", fake_node)
+        wrapped({"document_id": "doc-9"})
+
+        self.assertEqual(seen["document_id"], "doc-9")
+        self.assertEqual(seen["workflow_node"], "classification")
+
+
+if __name__ == '__main__':
+    unittest.main()
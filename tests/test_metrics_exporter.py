@@ -0,0 +1,100 @@
+"""
+Tests for the OpenMetrics exporter
+"""
+
+import urllib.request
+import urllib.error
+
+import pytest
+
+from src.services.metrics_exporter import MetricsExporter, render_openmetrics, OPENMETRICS_CONTENT_TYPE
+from src.services.production_monitor import (
+    ProductionMonitor, MetricFamily, MetricSample, MetricType
+)
+
+
+class TestRenderOpenMetrics:
+    """Test the text exposition format"""
+
+    def test_recorded_metrics_are_exposed(self):
+        """Test counters, gauges and latency histograms from recorded values"""
+        monitor = ProductionMonitor()
+        monitor.record_response_time(0.2, "question_processing")
+        monitor.record_response_time(3.0, "question_processing")
+        monitor.record_error("timeout", "LLM call timed out")
+        monitor.record_error("timeout", "LLM call timed out")
+        monitor.record_metric("system_cpu_percent", 12.5)
+
+        text = render_openmetrics(monitor.collect())
+
+        assert "# TYPE docqa_errors counter" in text
+        assert 'docqa_errors_total{error_type="timeout"} 2' in text
+        assert "# TYPE docqa_system_cpu_percent gauge" in text
+        assert "docqa_system_cpu_percent 12.5" in text
+        assert "# TYPE docqa_response_time_seconds histogram" in text
+        assert 'docqa_response_time_seconds_bucket{endpoint="question_processing",le="0.25"} 1' in text
+        assert 'docqa_response_time_seconds_bucket{endpoint="question_processing",le="+Inf"} 2' in text
+        assert 'docqa_response_time_seconds_count{endpoint="question_processing"} 2' in text
+        assert 'docqa_response_time_seconds_sum{endpoint="question_processing"} 3.2' in text
+        assert text.endswith("# EOF\n")
+
+    def test_collector_families_and_label_escaping(self):
+        """Test collector output and escaping of label values"""
+        monitor = ProductionMonitor()
+        monitor.register_collector("queue", lambda: [
+            MetricFamily("workflow_queue_size", MetricType.GAUGE, "Queued documents",
+                         [MetricSample({"queue": 'docs "main"\n'}, 4)])
+        ])
+
+        text = render_openmetrics(monitor.collect())
+
+        assert "# HELP docqa_workflow_queue_size Queued documents" in text
+        assert 'docqa_workflow_queue_size{queue="docs \\"main\\"\\n"} 4' in text
+
+    def test_failing_collector_is_skipped(self):
+        """Test that one broken collector does not break the scrape"""
+        monitor = ProductionMonitor()
+        monitor.record_metric("requests", 1, MetricType.COUNTER)
+
+        def broken():
+            raise RuntimeError("database locked")
+
+        monitor.register_collector("broken", broken)
+
+        assert "docqa_requests_total 1" in render_openmetrics(monitor.collect())
+
+
+class TestMetricsExporter:
+    """Test the background HTTP endpoint"""
+
+    @pytest.fixture
+    def exporter(self):
+        monitor = ProductionMonitor()
+        monitor.record_metric("request_total", 3, MetricType.COUNTER)
+        exporter = MetricsExporter(monitor, host="127.0.0.1", port=0)
+        assert exporter.start()
+        yield exporter
+        exporter.stop()
+
+    def test_scrape_metrics(self, exporter):
+        """Test that /metrics serves OpenMetrics text"""
+        with urllib.request.urlopen(exporter.url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+
+        assert content_type == OPENMETRICS_CONTENT_TYPE
+        assert "docqa_request_total 3" in body
+
+    def test_unknown_path_returns_404(self, exporter):
+        """Test that only the metrics and health paths are served"""
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(f"http://127.0.0.1:{exporter.port}/other", timeout=5)
+
+        assert error.value.code == 404
+
+    def test_port_in_use_does_not_raise(self, exporter):
+        """Test that a second exporter on the same port fails gracefully"""
+        second = MetricsExporter(exporter.monitor, host="127.0.0.1", port=exporter.port)
+
+        assert second.start() is False
+        assert not second.running
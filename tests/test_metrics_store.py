@@ -0,0 +1,169 @@
+"""
+Tests for the time-bucketed metrics store
+"""
+
+import random
+import threading
+
+import pytest
+
+from src.services.metrics_store import MetricsStore, QuantileSketch
+from src.services.production_monitor import ProductionMonitor, MetricType
+
+
+class TestQuantileSketch:
+    """Test the mergeable quantile sketch"""
+
+    def test_quantiles_within_relative_accuracy(self):
+        """Test percentile estimates against exact values"""
+        rng = random.Random(7)
+        values = [rng.lognormvariate(0, 1) for _ in range(5000)]
+        sketch = QuantileSketch(relative_accuracy=0.01)
+        for value in values:
+            sketch.add(value)
+
+        ordered = sorted(values)
+        for q in (0.5, 0.95, 0.99):
+            exact = ordered[int(q * (len(ordered) - 1))]
+            assert sketch.quantile(q) == pytest.approx(exact, rel=0.02)
+
+    def test_merge_matches_single_sketch(self):
+        """Test that merged sketches answer like one sketch over all values"""
+        combined, first, second = QuantileSketch(), QuantileSketch(), QuantileSketch()
+        for i in range(1, 201):
+            combined.add(i)
+            (first if i % 2 else second).add(i)
+
+        first.merge(second)
+
+        assert first.count == 200
+        assert first.quantile(0.95) == combined.quantile(0.95)
+
+    def test_zero_and_negative_values(self):
+        """Test ordering across negative, zero and positive values"""
+        sketch = QuantileSketch()
+        for value in (-10, -1, 0, 0, 1, 10):
+            sketch.add(value)
+
+        assert sketch.quantile(0.0) == pytest.approx(-10, rel=0.02)
+        assert sketch.quantile(0.5) == 0.0
+        assert sketch.quantile(1.0) == pytest.approx(10, rel=0.02)
+
+
+class TestMetricsStore:
+    """Test bucketed recording and windowed queries"""
+
+    def test_summary_aggregates(self):
+        """Test count, sum, min, max and average over a window"""
+        store = MetricsStore(resolution_seconds=10)
+        for i, value in enumerate([1.0, 2.0, 3.0, 4.0]):
+            store.record("latency", value, timestamp=1000 + i * 10)
+
+        summary = store.summarize("latency", 60, now=1040)
+
+        assert summary.count == 4
+        assert summary.sum == 10.0
+        assert summary.min == 1.0
+        assert summary.max == 4.0
+        assert summary.avg == 2.5
+        assert summary.last == 4.0
+
+    def test_window_excludes_old_buckets(self):
+        """Test that only buckets inside the window are merged"""
+        store = MetricsStore(resolution_seconds=10)
+        store.record("latency", 100.0, timestamp=1000)
+        store.record("latency", 1.0, timestamp=1500)
+
+        summary = store.summarize("latency", 60, now=1500)
+
+        assert summary.count == 1
+        assert summary.max == 1.0
+        assert store.summarize("latency", 60, now=5000) is None
+
+    def test_ring_buffer_bounds_memory(self):
+        """Test that buckets beyond the retention period are dropped"""
+        store = MetricsStore(resolution_seconds=1, retention_seconds=10)
+        for second in range(100):
+            store.record("requests", 1, timestamp=second)
+
+        assert len(store._series["requests"].buckets) == 10
+        assert store.summarize("requests", 1000, now=99).count == 10
+        assert store.get_series_info()["requests"]["total_count"] == 100
+
+    def test_prune_drops_stale_series(self):
+        """Test that series idle for the retention period are removed"""
+        store = MetricsStore(resolution_seconds=1, retention_seconds=10)
+        store.record("old", 1, timestamp=0)
+        store.record("new", 1, timestamp=100)
+
+        assert store.prune(now=100) == 1
+        assert store.names() == ["new"]
+
+    def test_concurrent_recording(self):
+        """Test that recording from many threads loses no samples"""
+        store = MetricsStore()
+
+        def worker():
+            for _ in range(1000):
+                store.record("hits", 1, "counter")
+
+        threads = [threading.Thread(target=worker) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert store.summarize("hits", 3600).sum == 8000
+
+
+class TestProductionMonitorMetrics:
+    """Test the monitor's use of the bucketed store"""
+
+    def test_performance_metrics_from_buckets(self):
+        """Test windowed performance metrics and derived summary"""
+        monitor = ProductionMonitor()
+        for value in (0.5, 1.0, 1.5):
+            monitor.record_response_time(value)
+        monitor.record_metric("request_total", 1, MetricType.COUNTER)
+        monitor.record_error("timeout", "LLM call timed out")
+
+        metrics = monitor.get_performance_metrics(time_window_minutes=5)
+
+        response_times = metrics["metrics"]["response_time_default"]
+        assert response_times["count"] == 3
+        assert response_times["avg"] == pytest.approx(1.0)
+        assert 1.0 <= response_times["p95"] <= 1.5
+        assert metrics["summary"]["total_errors"] == 1
+
+    def test_error_rate_counts_request_and_error_families(self):
+        """Test that only the request and error families feed the error rate"""
+        monitor = ProductionMonitor()
+        for _ in range(4):
+            monitor.record_metric("llm_request_flash", 0.2, MetricType.TIMER, family="llm_request")
+        monitor.record_metric("llm_errors_flash", 1, MetricType.COUNTER, family="llm_errors")
+        monitor.record_metric("llm_request_bytes", 512)
+        monitor.record_metric("error_free_streak", 10)
+
+        summary = monitor.get_performance_metrics(time_window_minutes=5)["summary"]
+
+        assert summary["total_requests"] == 4
+        assert summary["total_errors"] == 1
+        assert summary["error_rate_percent"] == pytest.approx(25.0)
+
+    def test_non_numeric_values_are_ignored(self):
+        """Test that a bad value does not raise into the caller"""
+        monitor = ProductionMonitor()
+
+        monitor.record_metric("complexity_level", "moderate")
+
+        assert "complexity_level" not in monitor.metrics.names()
+
+    def test_alerts_use_window_average(self):
+        """Test alert evaluation against bucket aggregates"""
+        monitor = ProductionMonitor()
+        for _ in range(5):
+            monitor.record_metric("system_memory_percent", 95.0)
+
+        monitor._check_alerts()
+
+        assert any(alert["rule_name"] == "high_memory_usage" for alert in monitor.get_active_alerts())
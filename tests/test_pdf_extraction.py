@@ -0,0 +1,77 @@
+"""
+Tests for page-level PDF text extraction.
+"""
+
+import pytest
+
+from benchmarks.pdf_extraction import build_sample_pdf
+from src.services.file_handler import FileUploadHandler, InMemoryUpload
+from src.services.pdf_extraction import PAGE_SEPARATOR, PdfExtractionStats, PdfPageExtractor
+
+
+class TestPdfPageExtractor:
+    """Test suite for PdfPageExtractor."""
+
+    @pytest.fixture
+    def pdf_bytes(self):
+        """A 12-page text PDF."""
+        return build_sample_pdf(12, lines_per_page=3)
+
+    def test_pages_carry_offsets_into_joined_text(self, pdf_bytes):
+        """Test page numbers, offsets and throughput stats for in-process extraction."""
+        extraction = PdfPageExtractor(workers=1).extract(pdf_bytes)
+
+        assert [page.page_number for page in extraction.pages] == list(range(1, 13))
+        for page in extraction.pages:
+            assert extraction.text[page.start_offset:page.end_offset] == page.text
+        assert "Section 7.2" in extraction.pages[6].text
+        assert extraction.text == PAGE_SEPARATOR.join(page.text for page in extraction.pages)
+        assert extraction.stats.page_count == 12
+        assert extraction.stats.workers == 1
+        assert extraction.stats.pages_per_second > 0
+
+    def test_parallel_extraction_matches_sequential(self, pdf_bytes):
+        """Test that page ranges from the process pool come back complete and in order."""
+        sequential = PdfPageExtractor(workers=1).extract(pdf_bytes)
+        stats = PdfExtractionStats()
+
+        pages = list(PdfPageExtractor(workers=2, pages_per_task=5, parallel_min_pages=0).iter_pages(pdf_bytes, stats))
+
+        assert pages == sequential.pages
+        assert stats.workers == 2
+        assert stats.pages_with_text == 12
+
+    def test_short_documents_stay_in_process(self, pdf_bytes):
+        """Test that documents below the page threshold skip the pool."""
+        extraction = PdfPageExtractor(workers=4, parallel_min_pages=40).extract(pdf_bytes)
+
+        assert extraction.stats.workers == 1
+
+    def test_file_handler_uses_page_extraction(self, pdf_bytes):
+        """Test PDF uploads through FileUploadHandler."""
+        handler = FileUploadHandler(PdfPageExtractor(workers=1))
+
+        text, error = handler.extract_text(InMemoryUpload(pdf_bytes, "exhibit.pdf"))
+
+        assert error is None
+        assert text.startswith("Section 1.1")
+        assert len(handler.extract_pdf(InMemoryUpload(pdf_bytes, "exhibit.pdf")).pages) == 12
+
+    def test_pdf_without_text_is_reported(self):
+        """Test the error for a PDF whose pages have no text."""
+        handler = FileUploadHandler(PdfPageExtractor(workers=1))
+
+        text, error = handler.extract_text(InMemoryUpload(build_sample_pdf(2, lines_per_page=0), "blank.pdf"))
+
+        assert text == ""
+        assert error == "No readable text found in PDF file"
+
+    def test_benchmark_runs(self):
+        """Test that the benchmark reports both modes."""
+        from benchmarks.pdf_extraction import run_benchmark
+
+        results = run_benchmark(pages=20, workers=2, pages_per_task=5)
+
+        assert results["sequential"]["workers"] == 1
+        assert results["parallel"]["workers"] == 2
+        assert results["parallel"]["pages_per_second"] > 0
@@ -182,6 +182,185 @@ class TestQAEngine(unittest.TestCase):
         self.assertGreater(result["confidence"], 0)
         self.assertEqual(result["document_title"], "Test Document")
     
+    @patch('requests.post')
+    def test_answer_question_reuses_answer_for_paraphrase(self, mock_post):
+        """Test that a paraphrased question is served from the semantic cache."""
+        self.mock_storage.get_document_with_embeddings.return_value = self.test_document
+        
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "It covers machine learning algorithms."}]}}]
+        }
+        mock_post.return_value = mock_response
+        
+        first = self.qa_engine.answer_question("Which algorithms are discussed?", "test_doc_1")
+        second = self.qa_engine.answer_question("What algorithms does it discuss?", "test_doc_1", "session_1")
+        
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertTrue(second["cache_hit"])
+        self.assertEqual(second["answer"], first["answer"])
+        self.assertEqual(second["sources"], first["sources"])
+        self.mock_storage.add_qa_interaction.assert_called_once_with(
+            "session_1", "What algorithms does it discuss?", first["answer"], first["sources"]
+        )
+    
+    @patch('requests.post')
+    def test_answer_question_cache_invalidated_when_document_changes(self, mock_post):
+        """Test that cached answers are not reused after the document is updated."""
+        self.mock_storage.get_document_with_embeddings.return_value = self.test_document
+        
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = {
+            "candidates": [{"content": {"parts": [{"text": "It covers machine learning algorithms."}]}}]
+        }
+        mock_post.return_value = mock_response
+        
+        self.qa_engine.answer_question("Which algorithms are discussed?", "test_doc_1")
+        self.test_document.updated_at = datetime(2030, 1, 1)
+        result = self.qa_engine.answer_question("Which algorithms are discussed?", "test_doc_1")
+        
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertNotIn("cache_hit", result)
+    
+    def _mock_stream(self, mock_post, *texts):
+        response = MagicMock()
+        response.__enter__.return_value = response
+        response.raise_for_status.return_value = None
+        response.iter_lines.return_value = [
+            line for text in texts
+            for line in ("data: " + json.dumps({"candidates": [{"content": {"parts": [{"text": text}]}}]}), "")
+        ]
+        mock_post.return_value = response
+    
+    @patch('requests.post')
+    def test_stream_answer_yields_chunks_then_result(self, mock_post):
+        """Test that the streamed answer is stored and matches answer_question's result."""
+        self.mock_storage.get_document_with_embeddings.return_value = self.test_document
+        self._mock_stream(mock_post, "It covers ", "machine learning.")
+        
+        stream = self.qa_engine.stream_answer("Which algorithms are discussed?", "test_doc_1", "session_1")
+        
+        self.assertEqual(list(stream), ["It covers ", "machine learning."])
+        self.assertEqual(stream.result["answer"], "It covers machine learning.")
+        self.assertEqual(stream.result["document_title"], "Test Document")
+        self.mock_storage.add_qa_interaction.assert_called_once_with(
+            "session_1", "Which algorithms are discussed?", "It covers machine learning.", stream.result["sources"]
+        )
+    
+    def test_stream_answer_document_not_found(self):
+        """Test that lookups that fail complete immediately."""
+        self.mock_storage.get_document_with_embeddings.return_value = None
+        
+        stream = self.qa_engine.stream_answer("Test question?", "missing")
+        
+        self.assertIn("error", stream.result)
+        self.assertEqual(list(stream), [stream.result["answer"]])
+    
+    @patch('requests.post')
+    def test_stream_answer_error_keeps_partial_answer(self, mock_post):
+        """Test that a failure mid-stream keeps the text produced so far."""
+        self.mock_storage.get_document_with_embeddings.return_value = self.test_document
+        self._mock_stream(mock_post, "Partial")
+        mock_post.return_value.iter_lines.return_value.append("data: {not json")
+        
+        result = self.qa_engine.stream_answer("Which algorithms are discussed?", "test_doc_1").consume()
+        
+        self.assertEqual(result["answer"], "Partial")
+        self.assertIn("error", result)
+        self.mock_storage.add_qa_interaction.assert_not_called()
+    
+    def _mock_answers(self, mock_post, *texts):
+        responses = []
+        for text in texts:
+            response = Mock()
+            response.raise_for_status.return_value = None
+            response.json.return_value = {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+            responses.append(response)
+        mock_post.side_effect = responses
+    
+    @patch('requests.post')
+    def test_answer_questions_batch_packs_questions_into_one_call(self, mock_post):
+        """Test that questions share one call and are stored in one write."""
+        self.mock_storage.get_document_with_embeddings.return_value = self.test_document
+        self._mock_answers(mock_post, json.dumps({"1": "Machine learning.", "2": "Modern technology."}))
+        questions = ["Which algorithms are discussed?", "Where are the applications used in technology?"]
+        
+        results = self.qa_engine.answer_questions_batch("test_doc_1", questions, "session_1")
+        
+        self.assertEqual(mock_post.call_count, 1)
+        self.assertEqual(self.mock_storage.get_document_with_embeddings.call_count, 1)
+        self.assertEqual(sorted(result["answer"] for result in results), ["Machine learning.", "Modern technology."])
+        self.assertTrue(all(result["document_title"] == "Test Document" for result in results))
+        self.mock_storage.add_qa_interactions.assert_called_once()
+        session_id, interactions = self.mock_storage.add_qa_interactions.call_args[0]
+        self.assertEqual(session_id, "session_1")
+        self.assertEqual([question for question, _, _ in interactions], questions)
+        self.mock_storage.add_qa_interaction.assert_not_called()
+    
+    @patch('requests.post')
+    def test_answer_questions_batch_falls_back_for_missing_answers(self, mock_post):
+        """Test that unparsable batch output is retried one question at a time."""
+        self.mock_storage.get_document_with_embeddings.return_value = self.test_document
+        self._mock_answers(mock_post, "Not JSON at all", "First answer", "Second answer")
+        
+        results = self.qa_engine.answer_questions_batch(
+            "test_doc_1", ["Which algorithms are discussed?", "What about machine learning?"]
+        )
+        
+        self.assertEqual(mock_post.call_count, 3)
+        self.assertEqual({result["answer"] for result in results}, {"First answer", "Second answer"})
+    
+    @patch('requests.post')
+    def test_answer_questions_batch_respects_prompt_budget(self, mock_post):
+        """Test that questions beyond the token budget go to separate calls."""
+        self.mock_storage.get_document_with_embeddings.return_value = self.test_document
+        self._mock_answers(mock_post, "Answer one", "Answer two")
+        
+        with patch('src.services.qa_engine.config') as mock_config:
+            mock_config.BATCH_QA_MAX_PROMPT_TOKENS = 10
+            mock_config.BATCH_QA_MAX_QUESTIONS_PER_CALL = 8
+            mock_config.BATCH_QA_MAX_CONCURRENT_CALLS = 1
+            results = self.qa_engine.answer_questions_batch(
+                "test_doc_1", ["Which algorithms are discussed?", "What about machine learning?"]
+            )
+        
+        self.assertEqual(mock_post.call_count, 2)
+        self.assertNotIn("error", results[0])
+        self.assertNotIn("error", results[1])
+    
+    @patch('requests.post')
+    def test_answer_questions_batch_failed_fallback_is_an_error(self, mock_post):
+        """Test that a failed single-question retry is neither cached nor stored."""
+        self.mock_storage.get_document_with_embeddings.return_value = self.test_document
+        self._mock_answers(mock_post, "Not JSON at all", "First answer")
+        mock_post.side_effect = list(mock_post.side_effect) + [Exception("API down")]
+        questions = ["Which algorithms are discussed?", "What about machine learning?"]
+        
+        with patch('src.services.qa_engine.config') as mock_config:
+            mock_config.BATCH_QA_MAX_PROMPT_TOKENS = 6000
+            mock_config.BATCH_QA_MAX_QUESTIONS_PER_CALL = 8
+            mock_config.BATCH_QA_MAX_CONCURRENT_CALLS = 1
+            results = self.qa_engine.answer_questions_batch("test_doc_1", questions, "session_1")
+        
+        self.assertEqual(results[0]["answer"], "First answer")
+        self.assertIn("error", results[1])
+        self.assertEqual(results[1]["confidence"], 0.0)
+        _, interactions = self.mock_storage.add_qa_interactions.call_args[0]
+        self.assertEqual([question for question, _, _ in interactions], questions[:1])
+        if self.qa_engine.semantic_cache:
+            self.assertEqual(self.qa_engine.semantic_cache.get_statistics()['stores'], 1)
+    
+    def test_answer_questions_batch_document_not_found(self):
+        """Test that every question gets the not-found result."""
+        self.mock_storage.get_document_with_embeddings.return_value = None
+        
+        results = self.qa_engine.answer_questions_batch("missing", ["One?", "Two?"])
+        
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all("error" in result for result in results))
+    
     def test_create_qa_session(self):
         """Test creating a Q&A session."""
         # Mock storage
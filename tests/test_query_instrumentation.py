@@ -0,0 +1,120 @@
+"""Tests for SQLite statement instrumentation."""
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from src.storage.database import DatabaseManager
+from src.storage.query_instrumentation import (
+    OVERFLOW_SHAPE, QueryStatistics, normalize_sql
+)
+
+
+class TestNormalizeSql(unittest.TestCase):
+    """Test cases for SQL shape normalization."""
+
+    def test_literals_and_lists_collapse(self):
+        """Test that statements differing only in values share a shape."""
+        self.assertEqual(
+            normalize_sql("SELECT *  FROM documents\n WHERE id IN (?, ?, ?) AND title = 'x''y' LIMIT 10"),
+            "SELECT * FROM documents WHERE id IN (?...) AND title = ? LIMIT ?"
+        )
+        self.assertEqual(
+            normalize_sql("SELECT * FROM t1 WHERE id IN (?)"),
+            normalize_sql("SELECT * FROM t1 WHERE id IN (?, ?)")
+        )
+        self.assertEqual(normalize_sql("INSERT INTO t (a, b) VALUES (?, ?);"), "INSERT INTO t (a, b) VALUES (?...)")
+
+
+class TestQueryInstrumentation(unittest.TestCase):
+    """Test cases for instrumented DatabaseManager connections."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.db = DatabaseManager(os.path.join(self.temp_dir, "test.db"), instrument_queries=True)
+        self.db.query_stats.reset()
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _insert_documents(self, count):
+        with self.db.get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO documents (id, title, file_type, file_size, upload_timestamp) VALUES (?, ?, ?, ?, ?)",
+                [(f"doc-{i}", f"Doc {i}", "txt", 10, "2024-01-01") for i in range(count)]
+            )
+            conn.commit()
+
+    def _stats_for(self, prefix):
+        return [row for row in self.db.query_stats.get_statistics() if row['shape'].startswith(prefix)]
+
+    def test_statements_aggregate_by_shape_with_rows(self):
+        """Test counting, rows fetched via every fetch style, and writes via rowcount."""
+        self._insert_documents(5)
+
+        with self.db.get_connection() as conn:
+            conn.execute("SELECT * FROM documents WHERE file_size > 1").fetchall()
+            cursor = conn.cursor()
+            cursor.execute("SELECT * FROM documents WHERE file_size > 2")
+            self.assertIsNotNone(cursor.fetchone())
+            while cursor.fetchone() is not None:
+                pass
+            list(conn.execute("SELECT * FROM documents WHERE file_size > 3"))
+
+        selects = self._stats_for("SELECT * FROM documents")
+        self.assertEqual(len(selects), 1)
+        self.assertEqual(selects[0]['count'], 3)
+        self.assertEqual(selects[0]['rows'], 15)
+        self.assertGreaterEqual(selects[0]['p95_ms'], 0.0)
+
+        inserts = self._stats_for("INSERT INTO documents")
+        self.assertEqual(inserts[0]['rows'], 5)
+
+    def test_errors_are_counted(self):
+        """Test that failing statements are recorded and re-raised."""
+        with self.db.get_connection() as conn:
+            with self.assertRaises(Exception):
+                conn.execute("SELECT * FROM missing_table")
+
+        self.assertEqual(self._stats_for("SELECT * FROM missing_table")[0]['errors'], 1)
+
+    def test_slow_queries_logged_with_plan(self):
+        """Test the slow-query log and EXPLAIN QUERY PLAN capture."""
+        self.db.query_stats.slow_query_threshold_ms = 0.0
+        self._insert_documents(3)
+
+        with self.db.get_connection() as conn:
+            conn.execute("SELECT * FROM documents WHERE title = ?", ("Doc 1",)).fetchall()
+
+        slow = [entry for entry in self.db.query_stats.get_slow_queries()
+                if entry['shape'].startswith("SELECT * FROM documents WHERE title")]
+        self.assertEqual(len(slow), 1)
+        self.assertTrue(any("documents" in line for line in slow[0]['plan']))
+
+        report = self.db.get_query_statistics()
+        self.assertTrue(report['enabled'])
+        self.assertGreater(report['summary']['slow_queries'], 0)
+
+    def test_uninstrumented_manager(self):
+        """Test that instrumentation can be switched off."""
+        db = DatabaseManager(os.path.join(self.temp_dir, "plain.db"), instrument_queries=False)
+        self.assertEqual(db.get_query_statistics(), {'enabled': False})
+        with db.get_connection() as conn:
+            self.assertEqual(conn.execute("SELECT 1").fetchone()[0], 1)
+
+    def test_shape_cap_uses_overflow(self):
+        """Test that distinct shapes beyond the cap share one entry."""
+        stats = QueryStatistics(max_shapes=2)
+        for table in ("a", "b", "c", "d"):
+            stats.record(f"SELECT * FROM {table}", 0.001)
+
+        shapes = {row['shape']: row['count'] for row in stats.get_statistics()}
+        self.assertEqual(len(shapes), 3)
+        self.assertEqual(shapes[OVERFLOW_SHAPE], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+"""Tests for background report generation and report reuse."""
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from datetime import datetime, timedelta
+from unittest.mock import Mock
+
+from src.models.conversational import ExcelReport, ReportJob
+from src.models.document import Document
+from src.services.report_jobs import ReportJobManager
+from src.storage.database import DatabaseManager
+from src.storage.document_storage import DocumentStorage
+from src.storage.enhanced_storage import EnhancedDocumentStorage
+from src.storage.migrations import DatabaseMigrator
+
+
+class TestReportJobManager(unittest.TestCase):
+    """Test cases for ReportJobManager."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.temp_dir = tempfile.mkdtemp()
+        db = DatabaseManager(os.path.join(self.temp_dir, "test.db"))
+        migrator = DatabaseMigrator()
+        migrator.db_manager = db
+        self.assertTrue(migrator.run_migrations())
+
+        self.storage = DocumentStorage()
+        self.storage.db_manager = db
+        self.enhanced_storage = EnhancedDocumentStorage()
+        self.enhanced_storage.db_manager = db
+        self.storage.create_document(Document(
+            id="doc-1", title="contract.txt", file_type="txt", file_size=10,
+            upload_timestamp=datetime.now(), processing_status="completed", original_text="Text"
+        ))
+
+        self.generator = Mock()
+        self.generator.generate_document_report.side_effect = self._make_report
+        self.manager = ReportJobManager(self.generator, self.storage, self.enhanced_storage, max_workers=2)
+
+    def tearDown(self):
+        """Clean up test fixtures."""
+        self.manager.shutdown()
+        shutil.rmtree(self.temp_dir, ignore_errors=True)
+
+    def _make_report(self, document_id, report_type, expires_in=timedelta(days=7)):
+        report_id = str(uuid.uuid4())
+        file_path = os.path.join(self.temp_dir, f"{report_id}.xlsx")
+        with open(file_path, "wb") as file:
+            file.write(b"xlsx")
+        return ExcelReport(
+            report_id=report_id, filename=os.path.basename(file_path), file_path=file_path,
+            download_url=f"/api/reports/download/{report_id}", sheets=[],
+            created_at=datetime.now(), expires_at=datetime.now() + expires_in
+        )
+
+    def _wait(self, job):
+        deadline = time.monotonic() + 5
+        while time.monotonic() < deadline:
+            job = self.manager.get_job(job.job_id)
+            if job.is_finished:
+                return job
+            time.sleep(0.01)
+        self.fail(f"Report job {job.job_id} did not finish")
+
+    def test_job_completes_and_identical_request_reuses_report(self):
+        """Test background completion and reuse of an unexpired identical report."""
+        first = self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+        self.assertEqual(first.status, "completed")
+        self.assertFalse(first.reused)
+        report = self.manager.get_report(first)
+        self.assertEqual(report.fingerprint, first.fingerprint)
+        self.assertEqual(report.report_type, "comprehensive")
+
+        second = self.manager.submit_document_report("doc-1", "comprehensive")
+
+        self.assertEqual(second.status, "completed")
+        self.assertTrue(second.reused)
+        self.assertEqual(second.report_id, first.report_id)
+        self.assertEqual(self.generator.generate_document_report.call_count, 1)
+
+    def test_changed_inputs_regenerate(self):
+        """Test that another report type, a document update or expiry produces a new report."""
+        first = self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+
+        other_type = self._wait(self.manager.submit_document_report("doc-1", "risks_only"))
+        self.assertNotEqual(other_type.fingerprint, first.fingerprint)
+
+        self.storage.update_document("doc-1", {"summary": "Re-processed"})
+        updated = self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+        self.assertFalse(updated.reused)
+        self.assertNotEqual(updated.fingerprint, first.fingerprint)
+        self.assertEqual(self.generator.generate_document_report.call_count, 3)
+
+    def test_expired_or_missing_reports_are_not_reused(self):
+        """Test that expired reports and deleted files are regenerated."""
+        self.generator.generate_document_report.side_effect = (
+            lambda document_id, report_type: self._make_report(document_id, report_type, timedelta(seconds=-1))
+        )
+        self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+        self.generator.generate_document_report.side_effect = self._make_report
+        first = self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+        self.assertFalse(first.reused)
+
+        os.remove(self.manager.get_report(first).file_path)
+        again = self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+        self.assertFalse(again.reused)
+        self.assertEqual(self.generator.generate_document_report.call_count, 3)
+
+    def test_fallback_reports_are_not_reused(self):
+        """Test that a degraded fallback report is not served to later identical requests."""
+        def fallback_report(document_id, report_type):
+            report = self._make_report(document_id, report_type)
+            report.is_fallback = True
+            return report
+
+        self.generator.generate_document_report.side_effect = fallback_report
+        first = self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+        self.assertEqual(first.status, "completed")
+        self.assertIsNone(self.manager.get_report(first).fingerprint)
+
+        self.generator.generate_document_report.side_effect = self._make_report
+        second = self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+
+        self.assertFalse(second.reused)
+        self.assertNotEqual(second.report_id, first.report_id)
+        self.assertEqual(self.generator.generate_document_report.call_count, 2)
+
+    def test_concurrent_identical_requests_share_a_job(self):
+        """Test that a request matching an in-flight job joins it."""
+        release = threading.Event()
+
+        def slow_report(document_id, report_type):
+            release.wait(5)
+            return self._make_report(document_id, report_type)
+
+        self.generator.generate_document_report.side_effect = slow_report
+        first = self.manager.submit_document_report("doc-1", "comprehensive")
+        second = self.manager.submit_document_report("doc-1", "comprehensive")
+        release.set()
+
+        self.assertEqual(second.job_id, first.job_id)
+        self.assertEqual(self._wait(first).status, "completed")
+        self.assertEqual(self.generator.generate_document_report.call_count, 1)
+
+    def test_only_stale_unfinished_jobs_are_failed(self):
+        """Test that jobs past the timeout are failed while another process's live job is joined."""
+        fingerprint = self.manager.document_fingerprint("doc-1", "comprehensive")
+        stale = ReportJob(
+            job_id="stale", fingerprint=fingerprint, subject_type="document", subject_id="doc-1",
+            report_type="comprehensive", status="running",
+            created_at=datetime.now() - timedelta(seconds=self.manager.job_timeout_seconds + 60)
+        )
+        live = ReportJob(
+            job_id="live", fingerprint=fingerprint, subject_type="document", subject_id="doc-1",
+            report_type="comprehensive", created_at=datetime.now() - timedelta(seconds=5)
+        )
+        self.enhanced_storage.create_report_job(stale)
+        self.enhanced_storage.create_report_job(live)
+
+        joined = self.manager.submit_document_report("doc-1", "comprehensive")
+
+        self.assertEqual(joined.job_id, "live")
+        self.assertEqual(self.manager.get_job("stale").status, "failed")
+        self.assertEqual(self.manager.get_job("live").status, "queued")
+        self.generator.generate_document_report.assert_not_called()
+
+    def test_failed_generation_is_recorded(self):
+        """Test that generator errors fail the job with a message."""
+        self.generator.generate_document_report.side_effect = RuntimeError("Excel library error")
+
+        job = self._wait(self.manager.submit_document_report("doc-1", "comprehensive"))
+
+        self.assertEqual(job.status, "failed")
+        self.assertIn("Excel library error", job.error_message)
+        self.assertIsNone(self.manager.get_report(job))
+
+    def test_unknown_document_is_rejected(self):
+        """Test that reports for missing documents are not queued."""
+        with self.assertRaises(ValueError):
+            self.manager.submit_document_report("missing")
+
+
+if __name__ == '__main__':
+    unittest.main()
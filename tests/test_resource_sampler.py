@@ -0,0 +1,86 @@
+"""
+Tests for background system resource sampling
+"""
+
+import time
+from unittest.mock import patch
+
+from src.services.resource_sampler import SystemResourceSampler
+from src.services.production_monitor import ProductionMonitor
+
+
+class TestSystemResourceSampler:
+    """Test the cached resource snapshot"""
+
+    def test_snapshot_contains_system_metrics(self):
+        """Test that the first read returns a full snapshot"""
+        sampler = SystemResourceSampler(interval_seconds=60)
+        try:
+            snapshot = sampler.snapshot()
+        finally:
+            sampler.stop()
+
+        for key in ("cpu_percent", "memory_percent", "memory_mb", "disk_percent", "load_average"):
+            assert key in snapshot
+
+    def test_reads_do_not_call_psutil(self):
+        """Test that reads after the first sample are served from the cache"""
+        sampler = SystemResourceSampler(interval_seconds=60)
+        sampler.start()
+        try:
+            with patch("src.services.resource_sampler.psutil.virtual_memory") as virtual_memory:
+                for _ in range(100):
+                    sampler.snapshot()
+            assert virtual_memory.call_count == 0
+        finally:
+            sampler.stop()
+
+    def test_background_refresh(self):
+        """Test that the sampler thread replaces the snapshot on its interval"""
+        sampler = SystemResourceSampler(interval_seconds=0.05)
+        sampler.start()
+        try:
+            first_sampled_at = sampler._sampled_at
+            time.sleep(0.2)
+            assert sampler._sampled_at > first_sampled_at
+            assert sampler.age_seconds < 1
+        finally:
+            sampler.stop()
+
+        assert not sampler.running
+
+    def test_snapshot_is_a_copy(self):
+        """Test that callers cannot modify the shared snapshot"""
+        sampler = SystemResourceSampler(interval_seconds=60)
+        try:
+            sampler.snapshot()["memory_percent"] = -1
+            assert sampler.snapshot()["memory_percent"] != -1
+        finally:
+            sampler.stop()
+
+
+class TestMonitorUsesSampler:
+    """Test that the monitor reads system metrics from the sampler"""
+
+    def test_system_metrics_and_health_checks_use_snapshot(self):
+        """Test that health checks no longer block on psutil"""
+        monitor = ProductionMonitor(system_sampling_interval_seconds=60)
+        try:
+            monitor._get_system_metrics()
+            with patch("src.services.resource_sampler.psutil.cpu_percent") as cpu_percent:
+                start = time.perf_counter()
+                monitor._run_health_checks()
+                elapsed = time.perf_counter() - start
+            assert cpu_percent.call_count == 0
+            assert elapsed < 0.5
+            assert monitor.last_health_results["system_memory"].status.value in ("healthy", "critical")
+        finally:
+            monitor.stop_monitoring()
+
+    def test_request_path_overhead_benchmark(self):
+        """Test that cached reads are much cheaper than direct psutil calls"""
+        from benchmarks.resource_sampling import run_benchmark
+
+        results = run_benchmark(calls=300)
+
+        assert results["speedup"] > 10
@@ -0,0 +1,130 @@
+"""
+Tests for the response cache
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from src.services.response_cache import ResponseCache, SQLiteCacheTier, build_cache_key
+
+
+class TestBuildCacheKey:
+    """Test stable cache key generation"""
+
+    def test_key_is_stable_across_processes(self):
+        """Test that keys do not depend on per-process hash randomization"""
+        key = build_cache_key("What is the term?", "doc-1", "v1", {"expertise_level": "expert"})
+
+        code = (
+            "from src.services.response_cache import build_cache_key;"
+            "print(build_cache_key('What is the term?', 'doc-1', 'v1', {'expertise_level': 'expert'}))"
+        )
+        env = dict(os.environ, PYTHONHASHSEED="12345")
+        output = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True, env=env,
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        )
+
+        assert output.stdout.strip().splitlines()[-1] == key
+
+    def test_key_normalizes_question(self):
+        """Test that case and whitespace differences share a key"""
+        assert build_cache_key("What is  the TERM?", "doc-1") == build_cache_key("what is the term?", "doc-1")
+
+    def test_key_changes_with_document_version_and_context(self):
+        """Test that document version and user context are part of the key"""
+        base = build_cache_key("What is the term?", "doc-1", "v1")
+
+        assert build_cache_key("What is the term?", "doc-1", "v2") != base
+        assert build_cache_key("What is the term?", "doc-1", "v1", {"expertise_level": "expert"}) != base
+        assert base.startswith("doc-1:")
+
+
+class TestResponseCache:
+    """Test in-process LRU/TTL cache behavior"""
+
+    def test_get_returns_independent_copies(self):
+        """Test that mutating a returned value does not change the cached one"""
+        cache = ResponseCache()
+        cache.put("k", "doc-1", {"answer": "42"})
+
+        first = cache.get("k")
+        first["answer"] = "changed"
+
+        assert cache.get("k") == {"answer": "42"}
+
+    def test_lru_eviction_by_entry_count(self):
+        """Test that the least recently used entry is evicted first"""
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", "doc-1", 1)
+        cache.put("b", "doc-1", 2)
+        cache.get("a")  # a becomes most recently used
+        cache.put("c", "doc-1", 3)
+
+        assert "a" in cache
+        assert "b" not in cache
+        assert "c" in cache
+        assert cache.stats['evictions'] == 1
+
+    def test_byte_budget_is_enforced(self):
+        """Test byte-size accounting and eviction"""
+        cache = ResponseCache(max_bytes=3000)
+        for i in range(10):
+            cache.put(f"k{i}", "doc-1", "x" * 1000)
+
+        assert cache.total_bytes <= 3000
+        assert len(cache) < 10
+        assert "k9" in cache
+
+    def test_ttl_expiry_beyond_one_day(self):
+        """Test that entries expire even for TTLs longer than a day"""
+        cache = ResponseCache(ttl_seconds=2 * 86400)
+        cache.put("k", "doc-1", "value")
+        cache._entries["k"].expires_at = time.time() - 1
+
+        assert cache.get("k") is None
+        assert len(cache) == 0
+        assert cache.total_bytes == 0
+
+    def test_invalidate_document(self):
+        """Test that invalidation removes only the given document's entries"""
+        cache = ResponseCache()
+        cache.put("a", "doc-1", 1)
+        cache.put("b", "doc-1", 2)
+        cache.put("c", "doc-2", 3)
+
+        assert cache.invalidate_document("doc-1") == 2
+        assert len(cache) == 1
+        assert cache.get("c") == 3
+
+    def test_shrink_keeps_most_recent_entries(self):
+        """Test that shrinking trims the coldest entries"""
+        cache = ResponseCache()
+        for i in range(8):
+            cache.put(f"k{i}", "doc-1", i)
+
+        assert cache.shrink(0.5) == 4
+        assert set(cache._entries) == {"k4", "k5", "k6", "k7"}
+
+
+class TestSQLiteCacheTier:
+    """Test the shared SQLite tier"""
+
+    def test_entries_are_shared_between_cache_instances(self):
+        """Test that a second cache (another worker) sees entries through the shared tier"""
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache.db")
+            writer = ResponseCache(shared_tier=SQLiteCacheTier(path))
+            reader = ResponseCache(shared_tier=SQLiteCacheTier(path))
+
+            writer.put("k", "doc-1", {"answer": "shared"})
+
+            assert reader.get("k") == {"answer": "shared"}
+            assert reader.stats['shared_hits'] == 1
+
+            writer.invalidate_document("doc-1")
+            reader.clear()
+            assert reader.get("k") is None
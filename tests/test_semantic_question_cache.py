@@ -0,0 +1,185 @@
+"""Tests for the semantic near-duplicate question cache."""
+
+import time
+import unittest
+from datetime import datetime
+from unittest.mock import Mock, patch
+
+from src.models.document import Document
+from src.services.contract_analyst_engine import ContractAnalystEngine
+from src.services.qa_engine import GENERATION_ERROR_ANSWER, QAEngine
+from src.services.semantic_question_cache import SemanticQuestionCache, question_guard, stem_term
+
+
+class TestSemanticQuestionCache(unittest.TestCase):
+    """Test cases for SemanticQuestionCache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.cache = SemanticQuestionCache(QAEngine(None, "test_api_key")._extract_key_terms)
+        self.result = {
+            'answer': "Either party may terminate with 30 days written notice.",
+            'sources': ["Document Content (relevance: 0.80)"],
+            'confidence': 0.8
+        }
+    
+    def test_stem_term(self):
+        """Test that related word forms share a stem."""
+        self.assertEqual(stem_term("termination"), stem_term("terminate"))
+        self.assertEqual(stem_term("notices"), stem_term("notice"))
+        self.assertEqual(stem_term("discuss"), stem_term("discussed"))
+        self.assertEqual(stem_term("law"), "law")
+    
+    def test_paraphrase_hits_cache(self):
+        """Test that paraphrased questions return the cached answer with sources."""
+        self.cache.store("doc_1", "v1", "What's the termination notice?", self.result)
+        
+        cached = self.cache.lookup("doc_1", "v1", "How much notice to terminate?")
+        
+        self.assertIsNotNone(cached)
+        self.assertTrue(cached['cache_hit'])
+        self.assertEqual(cached['answer'], self.result['answer'])
+        self.assertEqual(cached['sources'], self.result['sources'])
+        self.assertEqual(cached['cached_question'], "What's the termination notice?")
+    
+    def test_unrelated_question_misses(self):
+        """Test that different questions are not matched."""
+        self.cache.store("doc_1", "v1", "What's the termination notice?", self.result)
+        
+        self.assertIsNone(self.cache.lookup("doc_1", "v1", "Who owns the derivatives?"))
+    
+    def test_cache_is_per_document(self):
+        """Test that answers are never shared between documents."""
+        self.cache.store("doc_1", "v1", "What's the termination notice?", self.result)
+        
+        self.assertIsNone(self.cache.lookup("doc_2", "v1", "What's the termination notice?"))
+    
+    def test_document_version_change_invalidates(self):
+        """Test that a new document version drops cached answers."""
+        self.cache.store("doc_1", "v1", "What's the termination notice?", self.result)
+        
+        self.assertIsNone(self.cache.lookup("doc_1", "v2", "What's the termination notice?"))
+        self.assertEqual(self.cache.get_statistics()['entries'], 0)
+    
+    def test_kind_separates_result_shapes(self):
+        """Test that results cached by one call site are not returned to another."""
+        self.cache.store("doc_1", "v1", "What's the termination notice?", self.result, kind="answer")
+        
+        self.assertIsNone(
+            self.cache.lookup("doc_1", "v1", "What's the termination notice?", kind="contract_analysis")
+        )
+    
+    def test_threshold_is_configurable(self):
+        """Test that a stricter threshold rejects partial matches."""
+        strict = SemanticQuestionCache(self.cache.term_extractor, similarity_threshold=0.99)
+        strict.store("doc_1", "v1", "What is the termination notice period?", self.result)
+        
+        self.assertIsNone(strict.lookup("doc_1", "v1", "What is the termination notice?"))
+    
+    def test_expired_entries_are_ignored(self):
+        """Test TTL expiry of cached answers."""
+        cache = SemanticQuestionCache(self.cache.term_extractor, ttl_seconds=60)
+        cache.store("doc_1", "v1", "What's the termination notice?", self.result)
+        for entry in cache._entries["doc_1"].values():
+            entry.created_at = time.time() - 120
+        
+        self.assertIsNone(cache.lookup("doc_1", "v1", "What's the termination notice?"))
+    
+    def test_lru_bound_per_document(self):
+        """Test that each document keeps a bounded number of entries."""
+        cache = SemanticQuestionCache(self.cache.term_extractor, max_entries_per_document=2)
+        cache.store("doc_1", "v1", "What is the payment schedule?", self.result)
+        cache.store("doc_1", "v1", "Who owns the derivatives?", self.result)
+        cache.store("doc_1", "v1", "What is the governing law?", self.result)
+        
+        self.assertEqual(cache.get_statistics()['entries'], 2)
+        self.assertIsNone(cache.lookup("doc_1", "v1", "What is the payment schedule?"))
+    
+    def test_numbers_and_negations_must_match(self):
+        """Test questions differing only in a number or a negation never share an answer."""
+        self.cache.store("doc_1", "v1", "What happens after 30 days?", self.result)
+        self.cache.store("doc_1", "v1", "What does section 5 say?", self.result)
+        self.cache.store("doc_1", "v1", "Can the recipient publish the results?", self.result)
+        
+        self.assertIsNone(self.cache.lookup("doc_1", "v1", "What happens after 60 days?"))
+        self.assertIsNone(self.cache.lookup("doc_1", "v1", "What does section 7 say?"))
+        self.assertIsNone(self.cache.lookup("doc_1", "v1", "Can the recipient not publish the results?"))
+        self.assertIsNotNone(self.cache.lookup("doc_1", "v1", "What happens after 30 days?"))
+        self.assertEqual(question_guard("Why can't they publish without consent?"), ('not', 'without'))
+
+
+class TestQAEngineSemanticCache(unittest.TestCase):
+    """Test cases for how QAEngine fills the semantic cache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.storage = Mock()
+        self.storage.get_document_with_embeddings.return_value = Document(
+            id="doc_1", title="nda.txt", file_type="txt", file_size=100, upload_timestamp=datetime.now(),
+            processing_status="completed",
+            original_text="Either party may terminate this agreement with thirty days written notice."
+        )
+        self.engine = QAEngine(self.storage, "test_api_key",
+                               semantic_cache=SemanticQuestionCache(QAEngine(None, "test_api_key")._extract_key_terms))
+    
+    def test_failed_generation_is_not_cached(self):
+        """Test an API failure is reported as an error and the next ask calls the API again."""
+        with patch.object(self.engine, '_call_gemini_api', side_effect=[Exception("API down"), "Thirty days."]) as call:
+            failed = self.engine.answer_question("What is the termination notice?", "doc_1")
+            answered = self.engine.answer_question("What is the termination notice?", "doc_1")
+        
+        self.assertEqual(failed['answer'], GENERATION_ERROR_ANSWER)
+        self.assertTrue(failed['error'])
+        self.assertEqual(answered['answer'], "Thirty days.")
+        self.assertNotIn('cache_hit', answered)
+        self.assertEqual(call.call_count, 2)
+
+
+
+class TestContractEngineSemanticCache(unittest.TestCase):
+    """Test cases for how ContractAnalystEngine fills the semantic cache."""
+    
+    def setUp(self):
+        """Set up test fixtures."""
+        self.storage = Mock()
+        self.storage.get_document_with_embeddings.return_value = Document(
+            id="doc_1", title="Non-Disclosure Agreement", file_type="txt", file_size=100,
+            upload_timestamp=datetime.now(), processing_status="completed",
+            original_text="This Agreement between the Parties may be terminated by either party with thirty days "
+                          "written notice. The Recipient shall indemnify the Provider against any liability "
+                          "arising from breach of this Agreement, governed by the laws of Delaware."
+        )
+        self.engine = ContractAnalystEngine(self.storage, "test_api_key")
+        self.engine.semantic_cache = SemanticQuestionCache(QAEngine(None, "test_api_key")._extract_key_terms)
+    
+    def _ask_twice(self, ask):
+        # The structured call and its plain fallback both fail, then the API recovers
+        responses = [Exception("API down"), Exception("API down"), "Direct Evidence: Thirty days."]
+        with patch.object(self.engine, '_call_gemini_api', side_effect=responses) as call:
+            failed = ask("What is the termination notice?")
+            answered = ask("What is the termination notice?")
+        return failed, answered, call.call_count
+    
+    def test_failed_contract_answer_is_not_cached(self):
+        """Test answer_question reports a failed analysis as an error and asks the API again."""
+        failed, answered, calls = self._ask_twice(lambda question: self.engine.answer_question(question, "doc_1"))
+        
+        self.assertIn(GENERATION_ERROR_ANSWER, failed['answer'])
+        self.assertTrue(failed['error'])
+        self.assertEqual(failed['confidence'], 0.0)
+        self.assertNotIn('error', answered)
+        self.assertNotIn('cache_hit', answered)
+        self.assertEqual(calls, 3)
+    
+    def test_failed_router_analysis_is_not_cached(self):
+        """Test analyze_question reports a failed analysis as an error and asks the API again."""
+        failed, answered, calls = self._ask_twice(lambda question: self.engine.analyze_question(question, "doc_1"))
+        
+        self.assertIn(GENERATION_ERROR_ANSWER, failed['response'])
+        self.assertTrue(failed['error'])
+        self.assertNotIn('error', answered)
+        self.assertNotIn('cache_hit', answered)
+        self.assertEqual(calls, 3)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,122 @@
+"""
+Tests for the framework-free text extraction core.
+"""
+
+import hashlib
+import mmap
+import os
+import subprocess
+import sys
+import tempfile
+from unittest.mock import patch
+
+import pytest
+from docx import Document as DocxDocument
+
+from benchmarks.pdf_extraction import build_sample_pdf
+from src.services.extraction_cache import ExtractionCache
+from src.services.pdf_extraction import PdfPageExtractor
+from src.services.text_extraction import TextExtractor
+
+
+class _UnseekableStream:
+    """A pipe-like stream that can only be read forward."""
+
+    def __init__(self, data: bytes, name: str):
+        self._data = memoryview(data)
+        self.name = name
+
+    def read(self, size: int = -1) -> bytes:
+        size = len(self._data) if size is None or size < 0 else size
+        chunk, self._data = bytes(self._data[:size]), self._data[size:]
+        return chunk
+
+    def seekable(self) -> bool:
+        return False
+
+
+class TestTextExtractor:
+    """Test suite for TextExtractor."""
+
+    @pytest.fixture
+    def temp_dir(self):
+        """Scratch directory for files and the cache."""
+        with tempfile.TemporaryDirectory() as temp_dir:
+            yield temp_dir
+
+    @pytest.fixture
+    def extractor(self, temp_dir):
+        """Extractor with a private cache and in-process PDF extraction."""
+        return TextExtractor(PdfPageExtractor(workers=1), ExtractionCache(os.path.join(temp_dir, "cache.db")))
+
+    def test_all_source_kinds_give_the_same_result(self, extractor, temp_dir):
+        """Test paths, bytes, memory maps and unseekable streams."""
+        data = build_sample_pdf(4, lines_per_page=2)
+        path = os.path.join(temp_dir, "bundle.pdf")
+        with open(path, "wb") as file:
+            file.write(data)
+
+        with open(path, "rb") as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            results = [
+                extractor.extract(path),
+                extractor.extract(data, "bundle.pdf"),
+                extractor.extract(mapped, "bundle.pdf"),
+                extractor.extract(_UnseekableStream(data, "bundle.pdf"))
+            ]
+
+        for result in results:
+            assert result.error is None
+            assert result.text == results[0].text
+            assert len(result.pages) == 4
+            assert (result.file_type, result.size) == (".pdf", len(data))
+            assert result.sha256 == hashlib.sha256(data).hexdigest()
+        assert extractor.extraction_cache.get_statistics()['hits'] == 3
+
+    def test_large_pdf_streams_are_spooled_to_a_path(self, temp_dir):
+        """Test that PDFs over the spool threshold reach the page extractor as a file path."""
+        extractor = TextExtractor(PdfPageExtractor(workers=1), ExtractionCache(os.path.join(temp_dir, "cache.db")),
+                                  spool_threshold=1024)
+        data = build_sample_pdf(3, lines_per_page=2)
+        seen = []
+        original = extractor.pdf_extractor.extract
+
+        def record(source):
+            seen.append(source)
+            return original(source)
+
+        with patch.object(extractor.pdf_extractor, "extract", side_effect=record):
+            result = extractor.extract(_UnseekableStream(data, "bundle.pdf"))
+
+        assert result.error is None
+        assert isinstance(seen[0], str)
+        assert not os.path.exists(seen[0])
+
+    def test_limits_and_read_errors(self, extractor, temp_dir):
+        """Test the size limit, unsupported formats and missing files."""
+        small = TextExtractor(extraction_cache=extractor.extraction_cache, max_file_size=10)
+
+        assert "exceeds maximum limit" in small.extract(b"x" * 11, "big.txt").error
+        assert "Unsupported file format" in extractor.extract(b"x", "archive.zip").error
+        assert extractor.extract(os.path.join(temp_dir, "missing.txt")).error.startswith("Could not read file")
+
+    def test_docx_and_txt_from_paths(self, extractor, temp_dir):
+        """Test DOCX and TXT extraction from files on disk."""
+        docx_path = os.path.join(temp_dir, "contract.docx")
+        document = DocxDocument()
+        document.add_paragraph("Term: two years")
+        document.add_paragraph("")
+        document.add_paragraph("Governing law: Delaware")
+        document.save(docx_path)
+        txt_path = os.path.join(temp_dir, "notes.txt")
+        with open(txt_path, "wb") as file:
+            file.write("Café terms".encode("latin-1"))
+
+        assert extractor.extract(docx_path).text == "Term: two years\n\nGoverning law: Delaware"
+        assert extractor.extract(txt_path).text == "Café terms"
+
+    def test_core_does_not_import_streamlit(self):
+        """Test that the extraction core and upload adapter load without Streamlit."""
+        code = ("import sys, src.services.text_extraction, src.services.file_handler; "
+                "sys.exit('streamlit' in sys.modules)")
+
+        assert subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.dirname(__file__))).returncode == 0
@@ -0,0 +1,158 @@
+"""Tests for request tracing."""
+
+import asyncio
+import json
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from src.utils.tracing import Tracer, get_tracer, run_in_context, traced
+from src.services.enhanced_contract_system import ProcessingContext
+from benchmarks.async_pipeline import build_system
+
+
+class TestTracer(unittest.TestCase):
+    """Test cases for Tracer."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tracer = Tracer(sample_rate=1.0, max_traces=5)
+
+    def test_nested_spans_share_trace(self):
+        """Test parent/child linkage and trace completion at the root."""
+        with self.tracer.start_span("root", {"document_id": "doc-1"}) as root:
+            with self.tracer.start_span("child") as child:
+                child.set_attribute("rows", 3)
+
+        trace = self.tracer.recent_traces(1)[0]
+        self.assertEqual(trace.trace_id, root.trace_id)
+        self.assertEqual([span.name for span in trace.spans], ["root", "child"])
+        self.assertEqual(child.parent_id, root.span_id)
+        self.assertEqual(child.attributes, {"rows": 3})
+        self.assertIsNone(self.tracer.current_span())
+
+    def test_exception_marks_span_as_error(self):
+        """Test that failures are recorded and re-raised."""
+        with self.assertRaises(ValueError):
+            with self.tracer.start_span("root"):
+                raise ValueError("boom")
+
+        root = self.tracer.recent_traces(1)[0].root
+        self.assertEqual(root.status, "error")
+        self.assertIn("boom", root.error)
+
+    def test_unsampled_traces_are_not_recorded(self):
+        """Test that sampling is decided once at the root."""
+        tracer = Tracer(sample_rate=0.0)
+        with tracer.start_span("root") as root:
+            with tracer.start_span("child") as child:
+                child.set_attribute("ignored", True)
+
+        self.assertEqual(tracer.recent_traces(), [])
+        self.assertEqual(root.trace_id, child.trace_id)
+
+    def test_ring_buffer_and_slowest(self):
+        """Test bounded retention and ordering by duration."""
+        for delay in (0.0, 0.03, 0.0, 0.0, 0.0, 0.01):
+            with self.tracer.start_span(f"request-{delay}"):
+                time.sleep(delay)
+
+        self.assertEqual(len(self.tracer.recent_traces(10)), 5)
+        slowest = self.tracer.slowest_traces(2)
+        self.assertEqual(slowest[0].root.name, "request-0.03")
+        self.assertEqual(slowest[1].root.name, "request-0.01")
+
+    def test_context_propagates_to_tasks_and_threads(self):
+        """Test spans across asyncio tasks and executor threads."""
+        pool = ThreadPoolExecutor(max_workers=2)
+
+        def blocking_work():
+            with self.tracer.start_span("thread_work"):
+                return threading.get_ident()
+
+        async def request():
+            with self.tracer.start_span("root"):
+                loop = asyncio.get_running_loop()
+                await asyncio.gather(
+                    loop.run_in_executor(pool, run_in_context(blocking_work)),
+                    self._async_child()
+                )
+
+        asyncio.run(request())
+        pool.shutdown()
+
+        trace = self.tracer.recent_traces(1)[0]
+        root = trace.root
+        children = {span.name: span for span in trace.spans if span is not root}
+        self.assertEqual(set(children), {"thread_work", "async_child"})
+        self.assertTrue(all(span.parent_id == root.span_id for span in children.values()))
+        self.assertNotEqual(children["thread_work"].thread_id, root.thread_id)
+
+    async def _async_child(self):
+        with self.tracer.start_span("async_child"):
+            await asyncio.sleep(0)
+
+    def test_chrome_trace_export(self):
+        """Test the Chrome Trace Event JSON layout."""
+        with self.tracer.start_span("router.route_question", {"document": object()}):
+            pass
+
+        exported = json.loads(self.tracer.export_json())
+        event = exported["traceEvents"][0]
+        self.assertEqual(event["ph"], "X")
+        self.assertEqual(event["cat"], "router")
+        self.assertIn("trace_id", event["args"])
+        self.assertIsInstance(event["args"]["document"], str)
+
+    def test_traced_decorator(self):
+        """Test the decorator on sync and async functions with attributes."""
+        tracer = get_tracer()
+        tracer.clear()
+
+        @traced("test.sync", lambda value: {"value": value})
+        def double(value):
+            return value * 2
+
+        @traced("test.async")
+        async def add_one(value):
+            return double(value) + 1
+
+        self.assertEqual(asyncio.run(add_one(3)), 7)
+
+        trace = tracer.recent_traces(1)[0]
+        self.assertEqual([span.name for span in trace.spans], ["test.async", "test.sync"])
+        self.assertEqual(trace.spans[1].attributes, {"value": 3})
+
+
+class TestEnhancedSystemTracing(unittest.TestCase):
+    """Test spans emitted by the enhanced pipeline."""
+
+    def test_pipeline_stages_are_traced(self):
+        """Test that enhancer spans nest under their pipeline stage across threads."""
+        tracer = get_tracer()
+        tracer.clear()
+        system = build_system(llm_latency=0.0, max_concurrent_requests=2)
+        try:
+            asyncio.run(system.process_question(
+                "Who bears liability?", "bench_doc", ProcessingContext(session_id="trace")
+            ))
+        finally:
+            system.shutdown()
+
+        trace = tracer.recent_traces(1)[0]
+        spans = {span.name: span for span in trace.spans}
+        self.assertEqual(trace.root.name, "enhanced_system.process_question")
+        self.assertEqual(trace.root.attributes["document_id"], "bench_doc")
+        for name in ("pipeline.base_response", "pipeline.quality_enhancement",
+                     "quality_enhancer.enhance_response_quality",
+                     "formatter.format_intelligent_response"):
+            self.assertIn(name, spans)
+        self.assertEqual(
+            spans["quality_enhancer.enhance_response_quality"].parent_id,
+            spans["pipeline.quality_enhancement"].span_id
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()